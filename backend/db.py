@@ -0,0 +1,206 @@
+# backend/db.py
+"""
+SQLite storage engine para sa CyBank.
+
+Dito na naka-store ang users, accounts, transactions, linked banks at transfers
+para hindi na mawala ang data pag nag-restart ang app (dati puro in-memory dicts).
+
+KEY LOGIC:
+- WAL journal mode: readers don't block the writer and vice versa
+- ConnectionPool keeps a small set of open connections (no reconnect per call)
+- Each connection caches its prepared statements (sqlite3 cached_statements),
+  so services keep their SQL as module-level constants and reuse them
+- A thread re-uses the connection it already holds, so nested service calls
+  (e.g. transfer → record_transaction) join the same transaction
+- after_transaction() callbacks run when the outermost transaction ends
+- Used by backend/storage/sqlite.py (the "sqlite" storage engine)
+"""
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema.sql")
+
+DEFAULT_POOL_SIZE = 5
+STATEMENT_CACHE_SIZE = 256
+BUSY_TIMEOUT_SECONDS = 5.0
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def to_db_timestamp(value: datetime) -> str:
+    """Convert a datetime to the fixed-width text stored in the database."""
+    return value.strftime(TIMESTAMP_FORMAT)
+
+
+def from_db_timestamp(value: str) -> datetime:
+    """Convert a stored timestamp back to a datetime."""
+    return datetime.strptime(value, TIMESTAMP_FORMAT)
+
+
+class ConnectionPool:
+    """
+    Fixed-size pool of SQLite connections shared across threads.
+
+    Connections are created lazily up to `size`; callers block on acquire()
+    when all of them are in use.
+    """
+
+    def __init__(self, path: str, size: int = DEFAULT_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._all = []
+        # ":memory:" would give every connection its own empty database,
+        # so map it to a named shared-cache in-memory database instead
+        # (shared-cache tables lock per connection, so it only gets one)
+        self._uri = path == ":memory:"
+        if self._uri:
+            self._target = f"file:cybank_mem_{id(self)}?mode=memory&cache=shared"
+            self.size = 1
+        else:
+            self._target = path
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self._target,
+            uri=self._uri,
+            timeout=BUSY_TIMEOUT_SECONDS,
+            isolation_level=None,  # explicit BEGIN/COMMIT in Database.transaction()
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        if not self._uri:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                conn = self._connect()
+                self._created += 1
+                self._all.append(conn)
+                return conn
+        return self._idle.get()
+
+    def release(self, conn: sqlite3.Connection):
+        self._idle.put(conn)
+
+    def close(self):
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+            self._created = 0
+            self._idle = queue.LifoQueue()
+
+
+class Database:
+    """
+    Thin wrapper around a ConnectionPool.
+
+    Usage:
+        db = Database("data/cybank.db")
+        row = db.fetchone("SELECT ... WHERE id = ?", (some_id,))
+        with db.transaction() as conn:
+            conn.execute(...)
+            conn.execute(...)
+    """
+
+    def __init__(self, path: str, pool_size: int = DEFAULT_POOL_SIZE):
+        self.path = path
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.pool = ConnectionPool(self.path, pool_size)
+        self._local = threading.local()
+        self._init_schema()
+
+    def _init_schema(self):
+        with open(SCHEMA_PATH, encoding="utf-8") as f:
+            script = f.read()
+        with self.connection() as conn:
+            conn.executescript(script)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; nested calls on the same thread share it."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+        conn = self.pool.acquire()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self.pool.release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run a block inside one write transaction (BEGIN IMMEDIATE ... COMMIT).
+
+        Any exception rolls everything back. A nested transaction() on the
+        same thread simply joins the outer one. If COMMIT itself fails (busy
+        database, deferred constraint) the transaction is rolled back too, so
+        the connection goes back to the pool with no transaction open.
+        """
+        with self.connection() as conn:
+            depth = getattr(self._local, "depth", 0)
+            if depth == 0:
+                conn.execute("BEGIN IMMEDIATE")
+                self._local.ended = []
+            self._local.depth = depth + 1
+            try:
+                try:
+                    yield conn
+                    if depth == 0:
+                        conn.execute("COMMIT")
+                finally:
+                    self._local.depth = depth
+                    if depth == 0 and conn.in_transaction:
+                        conn.execute("ROLLBACK")  # the block raised, or COMMIT did
+            finally:
+                if depth == 0:
+                    callbacks, self._local.ended = self._local.ended, None
+                    for callback in callbacks:
+                        callback()
+
+    def after_transaction(self, callback):
+        """
+        Run callback once this thread's current transaction ends (COMMIT or
+        ROLLBACK), or right away when no transaction is open.
+        """
+        if getattr(self._local, "depth", 0):
+            self._local.ended.append(callback)
+        else:
+            callback()
+
+    def execute(self, sql: str, params: tuple = ()) -> int:
+        """Execute a single write statement in its own transaction; returns rowcount."""
+        with self.transaction() as conn:
+            return conn.execute(sql, params).rowcount
+
+    def fetchone(self, sql: str, params: tuple = ()) -> sqlite3.Row | None:
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchone()
+
+    def fetchall(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def close(self):
+        self.pool.close()
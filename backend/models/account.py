@@ -1,18 +1,27 @@
 # backend/models/account.py
 
-from dataclasses import dataclass, field
-import uuid
 from datetime import datetime
 
-@dataclass
-class Account:
-    user_id: str
-    account_name: str
-    balance: float = 0.0
-    status: str = "ACTIVE"
+from backend.models.compact import (CompactModel, new_id, parse_id, now_micros, as_micros,
+                                    id_property, time_property)
 
-    account_id: str = field(default_factory=lambda: str(uuid.uuid4()))
-    created_at: datetime = field(default_factory=datetime.utcnow)
+class Account(CompactModel):
+    __slots__ = ("user_id", "account_name", "balance", "status", "_id", "_created_at")
+    FIELDS = ("user_id", "account_name", "balance", "status", "account_id", "created_at")
+
+    def __init__(self, user_id: str, account_name: str,
+                 balance: int = 0, #centavos (see utils/money.py)
+                 status: str = "ACTIVE",
+                 account_id: str = None, created_at: datetime = None):
+        self.user_id = user_id
+        self.account_name = account_name
+        self.balance = balance
+        self.status = status
+        self._id = new_id() if account_id is None else parse_id(account_id)
+        self._created_at = now_micros() if created_at is None else as_micros(created_at)
+
+    account_id = id_property("_id")
+    created_at = time_property("_created_at")
 
     """
     Represents a user's bank account within the CyBank system.
@@ -20,4 +29,5 @@ class Account:
     Represents a CyBank user account with authentication credentials
     Stores hashed password (never plain text) using utils/auth.py
     Email is optional; validation skipped if empty
-    """
\ No newline at end of file
+    Slotted, compact id/timestamp (see backend/models/compact.py)
+    """
@@ -0,0 +1,77 @@
+# backend/models/account_stats.py
+
+from datetime import datetime
+from itertools import compress
+from typing import Optional
+
+from backend.models.compact import CompactModel
+
+class AccountStats(CompactModel):
+    __slots__ = ("account_id", "total_credits", "total_debits", "transaction_count",
+                 "first_timestamp", "last_timestamp", "category_totals")
+    FIELDS = __slots__
+
+    def __init__(self, account_id: str,
+                 total_credits: int = 0, #sum ng lahat ng CREDIT amounts (positive, centavos)
+                 total_debits: int = 0, #sum ng lahat ng DEBIT amounts (positive, centavos)
+                 transaction_count: int = 0,
+                 first_timestamp: Optional[datetime] = None, #oldest transaction
+                 last_timestamp: Optional[datetime] = None, #newest transaction
+                 category_totals: dict = None): #category → signed sum (None = uncategorized)
+        self.account_id = account_id
+        self.total_credits = total_credits
+        self.total_debits = total_debits
+        self.transaction_count = transaction_count
+        self.first_timestamp = first_timestamp
+        self.last_timestamp = last_timestamp
+        self.category_totals = {} if category_totals is None else category_totals
+
+    """
+    Running aggregates of one account's transaction history.
+
+    Model para sa totals ng isang account na hindi na kailangan i-recompute.
+    Updated by the storage engine every time a transaction is recorded,
+    so reports read these in O(1) instead of walking every Transaction.
+    All totals are exact int centavos.
+
+    KEY LOGIC:
+    - apply() adds one transaction (same CREDIT/DEBIT rules as the reports);
+      apply_rows() adds a whole column-wise batch (bulk loads)
+    - net_change = total_credits - total_debits
+    - Hand-written slotted class, not a dataclass: building dataclasses at
+      import time was a visible part of CLI startup
+    """
+
+    @property
+    def net_change(self) -> int:
+        return self.total_credits - self.total_debits
+
+    def apply(self, amount: int, transaction_type: str, category: Optional[str],
+              timestamp: datetime):
+        """Fold one transaction into the aggregates."""
+        if transaction_type == "CREDIT":
+            self.total_credits += abs(amount)
+        else:
+            self.total_debits += abs(amount)
+        self.transaction_count += 1
+        if self.first_timestamp is None or timestamp < self.first_timestamp:
+            self.first_timestamp = timestamp
+        if self.last_timestamp is None or timestamp > self.last_timestamp:
+            self.last_timestamp = timestamp
+        self.category_totals[category] = self.category_totals.get(category, 0) + amount
+
+    def apply_rows(self, amounts, transaction_types, categories, first: datetime, last: datetime):
+        """Fold a batch of transactions (first/last = its oldest/newest timestamp)."""
+        # Credits via compress/map (C loops); only the per-category sums need a Python loop
+        credits = sum(map(abs, compress(amounts, map("CREDIT".__eq__, transaction_types))))
+        totals = self.category_totals
+        for amount, category in zip(amounts, categories):
+            totals[category] = totals.get(category, 0) + amount
+        self.total_credits += credits
+        self.total_debits += sum(map(abs, amounts)) - credits
+        self.transaction_count += len(amounts)
+        if len(amounts):
+            if self.first_timestamp is None or first < self.first_timestamp:
+                self.first_timestamp = first
+            if self.last_timestamp is None or last > self.last_timestamp:
+                self.last_timestamp = last
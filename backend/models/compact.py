@@ -0,0 +1,117 @@
+# backend/models/compact.py
+"""
+Compact ids, timestamps and a slotted base class para sa models.
+
+User, Account, Transaction and LinkedBankAccount used to be plain
+dataclasses: one __dict__ per object, a 36-character uuid4 string and a
+datetime per object. They now keep, in __slots__:
+
+    id          a 128-bit int (44 bytes instead of an 85-byte str)
+    timestamp   int microseconds since 1970-01-01, naive UTC (32 bytes
+                instead of a 48-byte datetime), read from time.time_ns()
+
+The public fields stay the same: `user_id` etc. are still str and
+`created_at` / `timestamp` / `last_synced` are still datetime. The
+properties below render them only when read.
+
+KEY LOGIC:
+- new_id() sets the uuid4 version/variant bits, so format_id() always
+  gives a valid uuid4 string, same as str(uuid.uuid4()) did
+- parse_id() keeps any id that is not a canonical lowercase uuid string
+  as the str itself, so every id round-trips exactly
+- Constructors also accept the int form of ids / timestamps (used by the
+  columnar history to skip the str/datetime round trip)
+"""
+import os
+import time
+from datetime import datetime, timedelta
+
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+_UUID4_CLEAR = ~((0xF000 << 64) | (0xC000 << 48))
+_UUID4_SET = (0x4000 << 64) | (0x8000 << 48)
+
+
+def to_micros(ts: datetime) -> int:
+    return (ts - EPOCH) // ONE_MICROSECOND
+
+
+def from_micros(value: int) -> datetime:
+    return EPOCH + timedelta(microseconds=value)
+
+
+def now_micros() -> int:
+    """Current UTC time in microseconds (no datetime object is built)."""
+    return time.time_ns() // 1000
+
+
+def as_micros(value) -> int:
+    """datetime or int microseconds → int microseconds."""
+    return value if isinstance(value, int) else to_micros(value)
+
+
+def new_id(rng=None) -> int:
+    """A random uuid4, as a 128-bit int (drawn from a random.Random when given, for reproducible data)."""
+    bits = int.from_bytes(os.urandom(16), "big") if rng is None else rng.getrandbits(128)
+    return (bits & _UUID4_CLEAR) | _UUID4_SET
+
+
+def format_id(value) -> str:
+    """Compact id → the str form callers see ("1b4e28ba-2fa1-...")."""
+    if isinstance(value, str):
+        return value
+    h = f"{value:032x}"
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def parse_id(value):
+    """str (or int) id → compact form: an int for canonical uuid strings, else the str as-is."""
+    if isinstance(value, int) or len(value) != 36:
+        return value
+    try:
+        compact = int(value.replace("-", ""), 16)
+    except ValueError:
+        return value
+    return compact if format_id(compact) == value else value
+
+
+def id_property(slot: str, doc: str = None) -> property:
+    """Public str id backed by a compact slot."""
+    def get(self) -> str:
+        return format_id(getattr(self, slot))
+
+    def set(self, value: str):
+        setattr(self, slot, parse_id(value))
+    return property(get, set, doc=doc)
+
+
+def time_property(slot: str, doc: str = None) -> property:
+    """Public datetime backed by an int-microseconds slot."""
+    def get(self) -> datetime:
+        return from_micros(getattr(self, slot))
+
+    def set(self, value: datetime):
+        setattr(self, slot, as_micros(value))
+    return property(get, set, doc=doc)
+
+
+class CompactModel:
+    """
+    Base for the slotted models: repr and == over the public FIELDS,
+    like the dataclasses they replace (and, like them, not hashable).
+    """
+
+    __slots__ = ()
+    FIELDS = ()  # public constructor fields, in order: Model(*values) rebuilds the object
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+        return f"{type(self).__name__}({values})"
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    __hash__ = None
@@ -1,30 +1,43 @@
-from dataclasses import dataclass, field
-import uuid
 from datetime import datetime
 
-@dataclass
-class LinkedBankAccount:
+from backend.models.compact import (CompactModel, new_id, parse_id, now_micros, as_micros,
+                                    id_property, time_property)
+
+class LinkedBankAccount(CompactModel):
     """Represents a bank account linked from an external bank."""
-    user_id: str #string ang input ng user or ung data type na tintanggap
-    bank_name: str #string na para sa bank names
-    account_number: int # assuming account numbers are numeric
-    account_type: str  # e.g., "checking", "savings", "money_market"
-    balance: float = 0.0
-    last_synced: datetime = field(default_factory=datetime.utcnow)
-    linked_bank_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    __slots__ = ("user_id", "bank_name", "account_number", "account_type", "balance",
+                 "_last_synced", "_id")
+    FIELDS = ("user_id", "bank_name", "account_number", "account_type", "balance",
+              "last_synced", "linked_bank_id")
+
+    def __init__(self, user_id: str, #string ang input ng user or ung data type na tintanggap
+                 bank_name: str, #string na para sa bank names
+                 account_number: int, # assuming account numbers are numeric
+                 account_type: str,  # e.g., "checking", "savings", "money_market"
+                 balance: int = 0, #centavos (see utils/money.py)
+                 last_synced: datetime = None,
+                 linked_bank_id: str = None):
+        self.user_id = user_id
+        self.bank_name = bank_name
+        self.account_number = account_number
+        self.account_type = account_type
+        self.balance = balance
+        self._last_synced = now_micros() if last_synced is None else as_micros(last_synced)
+        self._id = new_id() if linked_bank_id is None else parse_id(linked_bank_id)
+
+    last_synced = time_property("_last_synced")
+    linked_bank_id = id_property("_id")
 
     """
     Represents a bank account linked from an external bank.
 
     Model para sa external banked account na naka-link sa CyBank user.
-    Para siyang query sa database pero using dataclass
-    Dataclass - ginagamit to add special methods
-
-    Check niyo na lang to for more infor
-    https://docs.python.org/3/library/dataclasses.html
+    Para siyang query sa database pero using a slotted class
+    (walang __dict__ per object; compact id/timestamp, see
+    backend/models/compact.py)
 
     KEY LOGIC:
     - linked_bank_id is a unique identifier for each linked bank account
     - last_synced tracks the last time the account data was synchronized
     - balance reflects the current balance of the linked bank account
-    """
\ No newline at end of file
+    """
@@ -1,27 +1,42 @@
 # backend/models/transaction.py
 
-from dataclasses import dataclass, field
-import uuid
 from datetime import datetime
 from typing import Optional
 
-@dataclass
-class Transaction:
-    account_id: str #string ang input ng user or ung data type na tintanggap
-    amount: float #float na para sa amount ng transaction
-    transaction_type: str  # "CREDIT" or "DEBIT"
-    description: Optional[str] = None #string na para sa description ng transaction optional lang
-    category: Optional[str] = None #string na para sa category ng transaction optional lang 
+from backend.models.compact import (CompactModel, new_id, parse_id, now_micros, as_micros,
+                                    id_property, time_property)
 
-    transaction_id: str = field(default_factory=lambda: str(uuid.uuid4())) #string na unique identifier para sa transaction
-    timestamp: datetime = field(default_factory=datetime.utcnow)
+class Transaction(CompactModel):
+    __slots__ = ("account_id", "amount", "transaction_type", "description", "category",
+                 "_id", "_timestamp")
+    FIELDS = ("account_id", "amount", "transaction_type", "description", "category",
+              "transaction_id", "timestamp")
+
+    def __init__(self, account_id: str, #string ang input ng user or ung data type na tintanggap
+                 amount: int, #centavos na amount ng transaction (see utils/money.py)
+                 transaction_type: str,  # "CREDIT" or "DEBIT"
+                 description: Optional[str] = None, #string na para sa description ng transaction optional lang
+                 category: Optional[str] = None, #string na para sa category ng transaction optional lang
+                 transaction_id: str = None, #string na unique identifier para sa transaction
+                 timestamp: datetime = None):
+        self.account_id = account_id
+        self.amount = amount
+        self.transaction_type = transaction_type
+        self.description = description
+        self.category = category
+        self._id = new_id() if transaction_id is None else parse_id(transaction_id)
+        self._timestamp = now_micros() if timestamp is None else as_micros(timestamp)
+
+    transaction_id = id_property("_id")
+    timestamp = time_property("_timestamp")
 
     """
     Represents a financial transaction linked to a user's account.
 
     Model para sa financial transaction na naka-link sa user account.
-    Para siyang query sa database pero using dataclass
-    Dataclass - ginagamit to add special methods
+    Slotted class (no per-instance __dict__); the id is kept as a 128-bit
+    int and the timestamp as int microseconds, and both are rendered as
+    str / datetime only when read (see backend/models/compact.py)
 
     Records financial transactions (deposits, withdrawals, transfers)
     Amount is signed; positive for CREDIT, negative for DEBIT
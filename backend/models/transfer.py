@@ -0,0 +1,86 @@
+# backend/models/transfer.py
+
+from datetime import datetime
+from typing import Optional
+
+from backend.models.compact import (CompactModel, new_id, parse_id, now_micros, as_micros,
+                                    id_property, time_property)
+
+TRANSFER_DIRECTIONS = ("external", "internal")
+
+# Keys of the old transfer record dict, per direction (see to_dict())
+_COMMON_KEYS = ("transfer_id", "user_id", "from_account_id", "from_account_name")
+_TAIL_KEYS = ("amount", "description", "timestamp", "status")
+EXTERNAL_KEYS = _COMMON_KEYS + ("to_linked_bank_id", "to_bank_name", "to_account_number") + _TAIL_KEYS
+INTERNAL_KEYS = _COMMON_KEYS + ("to_account_id", "to_account_name") + _TAIL_KEYS
+
+class Transfer(CompactModel):
+    __slots__ = ("user_id", "from_account_id", "amount", "from_account_name", "to_account_id",
+                 "to_account_name", "to_linked_bank_id", "to_bank_name", "to_account_number",
+                 "description", "status", "_id", "_timestamp")
+    FIELDS = ("user_id", "from_account_id", "amount", "from_account_name", "to_account_id",
+              "to_account_name", "to_linked_bank_id", "to_bank_name", "to_account_number",
+              "description", "status", "transfer_id", "timestamp")
+
+    def __init__(self, user_id: str, #may-ari ng transfer
+                 from_account_id: str, #source CyBank account
+                 amount: int, #positive na amount na nilipat, in centavos
+                 from_account_name: Optional[str] = None,
+                 to_account_id: Optional[str] = None, #destination CyBank account (internal transfer lang)
+                 to_account_name: Optional[str] = None,
+                 to_linked_bank_id: Optional[str] = None, #destination linked bank (external transfer lang)
+                 to_bank_name: Optional[str] = None,
+                 to_account_number: Optional[str] = None,
+                 description: Optional[str] = None,
+                 status: str = "completed",
+                 transfer_id: str = None, #string na unique identifier para sa transfer
+                 timestamp: datetime = None):
+        self.user_id = user_id
+        self.from_account_id = from_account_id
+        self.amount = amount
+        self.from_account_name = from_account_name
+        self.to_account_id = to_account_id
+        self.to_account_name = to_account_name
+        self.to_linked_bank_id = to_linked_bank_id
+        self.to_bank_name = to_bank_name
+        self.to_account_number = to_account_number
+        self.description = description
+        self.status = status
+        self._id = new_id() if transfer_id is None else parse_id(transfer_id)
+        self._timestamp = now_micros() if timestamp is None else as_micros(timestamp)
+
+    transfer_id = id_property("_id")
+    timestamp = time_property("_timestamp")
+
+    """
+    Record of one money transfer made by a user.
+
+    Model para sa transfer (CyBank → linked bank, or CyBank → CyBank).
+    Slotted, compact id/timestamp (see backend/models/compact.py): fixed
+    fields, no per-instance __dict__, so it is smaller than the dict it
+    replaces and typos in field names fail loudly.
+
+    KEY LOGIC:
+    - direction is "external" when to_linked_bank_id is set, else "internal"
+    - destination_id is the linked_bank_id or the to_account_id
+    - record["field"] still works for code written against the old dicts;
+      to_dict() gives the same keys the dict had
+    """
+
+    @property
+    def direction(self) -> str:
+        return "external" if self.to_linked_bank_id is not None else "internal"
+
+    @property
+    def destination_id(self) -> str:
+        return self.to_linked_bank_id if self.to_linked_bank_id is not None else self.to_account_id
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def to_dict(self) -> dict:
+        keys = EXTERNAL_KEYS if self.direction == "external" else INTERNAL_KEYS
+        return {k: getattr(self, k) for k in keys}
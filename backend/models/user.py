@@ -1,20 +1,28 @@
 # backend/models/user.py
 
-from dataclasses import dataclass, field
-import uuid
 from datetime import datetime
 from typing import Optional
 
-@dataclass
-class User:
-    username: str
-    password_hash: str
-    full_name: str
-    email: Optional[str] = None
+from backend.models.compact import (CompactModel, new_id, parse_id, now_micros, as_micros,
+                                    id_property, time_property)
 
-    # Fields with default values come after required fields
-    user_id: str = field(default_factory=lambda: str(uuid.uuid4()))
-    created_at: datetime = field(default_factory=datetime.utcnow)
+class User(CompactModel):
+    __slots__ = ("username", "password_hash", "full_name", "email", "_id", "_created_at")
+    FIELDS = ("username", "password_hash", "full_name", "email", "user_id", "created_at")
+
+    def __init__(self, username: str, password_hash: str, full_name: str,
+                 email: Optional[str] = None,
+                 # Fields with default values come after required fields
+                 user_id: str = None, created_at: datetime = None):
+        self.username = username
+        self.password_hash = password_hash
+        self.full_name = full_name
+        self.email = email
+        self._id = new_id() if user_id is None else parse_id(user_id)
+        self._created_at = now_micros() if created_at is None else as_micros(created_at)
+
+    user_id = id_property("_id")
+    created_at = time_property("_created_at")
 
     """
     Represents a user in the CyBank system.
@@ -22,4 +30,5 @@ class User:
     Model para sa CyBank user na may authentication credentials.
     Stores hashed password (never plain text) using utils/auth.py
     Email is optional; validation skipped if empty
-    """
\ No newline at end of file
+    Slotted, compact id/timestamp (see backend/models/compact.py)
+    """
@@ -0,0 +1,111 @@
+-- backend/schema.sql
+-- CyBank SQLite schema. Loaded by backend/db.py on startup (idempotent).
+-- Timestamps are stored as fixed-width "YYYY-MM-DD HH:MM:SS.ffffff" text
+-- so that lexical order == chronological order inside the indexes.
+-- Money columns are INTEGER centavos (PHP minor units, see utils/money.py).
+
+-- Engine settings that must match the data (e.g. username case policy)
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+-- username_key = username normalized by the case policy (see backend/storage/indexes.py)
+CREATE TABLE IF NOT EXISTS users (
+    user_id       TEXT PRIMARY KEY,
+    username      TEXT NOT NULL,
+    username_key  TEXT NOT NULL,
+    password_hash TEXT NOT NULL,
+    full_name     TEXT NOT NULL,
+    email         TEXT,
+    created_at    TEXT NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_users_username_key
+    ON users (username_key);
+
+CREATE TABLE IF NOT EXISTS accounts (
+    account_id   TEXT PRIMARY KEY,
+    user_id      TEXT NOT NULL,
+    account_name TEXT NOT NULL,
+    balance      INTEGER NOT NULL DEFAULT 0,
+    status       TEXT NOT NULL DEFAULT 'ACTIVE',
+    created_at   TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_accounts_user
+    ON accounts (user_id, created_at);
+
+-- seq keeps insertion order; it is the rowid so every index below carries it
+CREATE TABLE IF NOT EXISTS transactions (
+    seq              INTEGER PRIMARY KEY,
+    transaction_id   TEXT NOT NULL UNIQUE,
+    account_id       TEXT NOT NULL,
+    amount           INTEGER NOT NULL,
+    transaction_type TEXT NOT NULL,
+    description      TEXT,
+    category         TEXT,
+    timestamp        TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_transactions_account_time
+    ON transactions (account_id, timestamp);
+
+-- Running per-account aggregates, updated in the same transaction as each
+-- INSERT INTO transactions so reports never have to re-scan the history
+CREATE TABLE IF NOT EXISTS account_aggregates (
+    account_id        TEXT PRIMARY KEY,
+    total_credits     INTEGER NOT NULL DEFAULT 0,
+    total_debits      INTEGER NOT NULL DEFAULT 0,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    first_timestamp   TEXT,
+    last_timestamp    TEXT
+);
+
+-- category '' = uncategorized
+CREATE TABLE IF NOT EXISTS account_category_totals (
+    account_id TEXT NOT NULL,
+    category   TEXT NOT NULL,
+    total      INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (account_id, category)
+);
+
+CREATE TABLE IF NOT EXISTS linked_banks (
+    linked_bank_id TEXT PRIMARY KEY,
+    user_id        TEXT NOT NULL,
+    bank_name      TEXT NOT NULL,
+    account_number TEXT NOT NULL,
+    account_type   TEXT NOT NULL,
+    balance        INTEGER NOT NULL DEFAULT 0,
+    last_synced    TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_linked_banks_user
+    ON linked_banks (user_id);
+
+-- Stalest first, for the balance sync (bank_sync_service)
+CREATE INDEX IF NOT EXISTS idx_linked_banks_synced
+    ON linked_banks (last_synced);
+
+CREATE TABLE IF NOT EXISTS transfers (
+    transfer_id       TEXT PRIMARY KEY,
+    user_id           TEXT NOT NULL,
+    from_account_id   TEXT NOT NULL,
+    from_account_name TEXT,
+    to_account_id     TEXT,
+    to_account_name   TEXT,
+    to_linked_bank_id TEXT,
+    to_bank_name      TEXT,
+    to_account_number TEXT,
+    amount            INTEGER NOT NULL,
+    description       TEXT,
+    timestamp         TEXT NOT NULL,
+    status            TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_transfers_user_time
+    ON transfers (user_id, timestamp);
+
+-- Transfers still waiting for the bank gateway (transfer_service.settle_pending_transfers)
+CREATE INDEX IF NOT EXISTS idx_transfers_pending
+    ON transfers (timestamp) WHERE status = 'pending';
@@ -0,0 +1,126 @@
+# backend/services/bank_adapters.py
+"""
+Bank adapters: kung paano kinukuha ng CyBank ang balance sa external banks.
+
+bank_sync_service refreshes linked bank balances through an adapter, so a
+real bank API can be plugged in without touching the sync engine.
+
+KEY LOGIC:
+- BankAdapter.fetch_balance() is a coroutine: thousands of requests can wait
+  on the network at once on one thread
+- Transient errors raise BankUnavailable; the sync engine retries those (and
+  timeouts) with backoff, any other exception fails that account right away
+- FakeBankAdapter simulates each bank locally: latency, jitter, failures and
+  requests that never answer
+- register_adapter() / get_adapter() pick an adapter by name
+  (config.BANK_ADAPTER), like the storage engine registry
+"""
+import asyncio
+import random
+from abc import ABC, abstractmethod
+
+from backend.models.linked_bank import LinkedBankAccount
+from utils import config
+
+# Seconds per request of a bank FakeBankAdapter has no latency for
+DEFAULT_FAKE_LATENCY = 0.05
+
+
+class BankUnavailable(Exception):
+    """Transient bank error (maintenance, rate limit, 5xx): worth retrying."""
+
+
+class BankAdapter(ABC):
+    """Talks to the external banks behind linked bank accounts."""
+
+    name = "abstract"
+
+    @abstractmethod
+    async def fetch_balance(self, bank: LinkedBankAccount) -> int:
+        """
+        Current balance of a linked account, as the bank reports it.
+
+        Returns:
+            Balance in centavos
+
+        Raises:
+            BankUnavailable: The bank could not answer right now (retryable)
+        """
+
+    async def close(self):
+        """Release connections / sessions held by the adapter."""
+
+
+class FakeBankAdapter(BankAdapter):
+    """
+    Local stand-in for the banks' APIs (development, demos, benchmarks).
+
+    Args:
+        latency: Seconds per request; one value for every bank, or
+                 {bank_name: seconds} (other banks get DEFAULT_FAKE_LATENCY)
+        jitter: Each request takes latency × (1 ± jitter)
+        failure_rate: Share of requests that raise BankUnavailable
+        hang_rate: Share of requests that never answer (the caller's timeout ends them)
+        drift: Reported balance moves by up to ± this many centavos per request
+        seed: Random seed, for repeatable runs
+    """
+
+    name = "fake"
+
+    def __init__(self, latency: float | dict = DEFAULT_FAKE_LATENCY, jitter: float = 0.2,
+                 failure_rate: float = 0.0, hang_rate: float = 0.0, drift: int = 0,
+                 seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.hang_rate = hang_rate
+        self.drift = drift
+        self.calls = 0
+        self._rng = random.Random(seed)
+
+    def latency_for(self, bank_name: str) -> float:
+        if isinstance(self.latency, dict):
+            return self.latency.get(bank_name, DEFAULT_FAKE_LATENCY)
+        return self.latency
+
+    async def fetch_balance(self, bank: LinkedBankAccount) -> int:
+        self.calls += 1
+        rng = self._rng
+        if rng.random() < self.hang_rate:
+            await asyncio.Event().wait()  # never set: only a timeout / cancel gets out
+        await asyncio.sleep(self.latency_for(bank.bank_name) * (1 + rng.uniform(-self.jitter, self.jitter)))
+        if rng.random() < self.failure_rate:
+            raise BankUnavailable(f"{bank.bank_name} is temporarily unavailable")
+        if self.drift:
+            return max(0, bank.balance + rng.randint(-self.drift, self.drift))
+        return bank.balance
+
+
+_ADAPTERS = {"fake": FakeBankAdapter}  # name → factory(**options)
+
+
+def register_adapter(name: str, factory):
+    """Make a bank adapter available to get_adapter() / CYBANK_BANK_ADAPTER."""
+    _ADAPTERS[name] = factory
+
+
+def available_adapters() -> list[str]:
+    return sorted(_ADAPTERS)
+
+
+def get_adapter(name: str = None, **options) -> BankAdapter:
+    """
+    Create a bank adapter by name.
+
+    Args:
+        name: Registered adapter name (default: config.BANK_ADAPTER)
+        **options: Passed to the adapter's factory
+
+    Raises:
+        ValueError: Unknown adapter name
+    """
+    name = name or config.BANK_ADAPTER
+    factory = _ADAPTERS.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown bank adapter '{name}'. Valid: {', '.join(available_adapters())}")
+    return factory(**options)
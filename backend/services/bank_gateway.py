@@ -0,0 +1,454 @@
+# backend/services/bank_gateway.py
+"""
+Bank gateway: ang network call na nagpapadala ng pera sa external bank.
+
+transfer_to_external_bank debits the CyBank account first (the amount is
+reserved), asks the gateway to credit the linked bank, and only then marks
+the transfer completed (or gives the money back if the gateway refuses).
+
+KEY LOGIC:
+- BankGateway is the interface; PooledBankGateway talks to a gateway server
+  over TCP, one JSON object per line ({"id", "op", ...} → {"id", "status", ...})
+- Persistent pooled connections: up to pool_size sockets are opened once and
+  reused, so a transfer never pays for a connection setup. An idle
+  connection is reused before a new one is opened, and a new one is
+  connected outside the pool lock (its slot is reserved first), so a slow
+  connect never holds up requests on the connections already open
+- Pipelining: callers do not wait for a connection to be free; each request
+  is written straight away with its own id and a reader thread per
+  connection hands every answer to the caller waiting for that id, in
+  whatever order the gateway answers
+- Timeouts: connect_timeout for opening a socket, timeout per request
+- Circuit breaker: after failure_threshold failures in a row (timeouts, lost
+  connections, "unavailable" answers) calls fail fast for reset_seconds,
+  then one trial call decides whether to close it again. credit_many() is
+  one call to the breaker: when half-open its first transfer is sent alone
+  as the trial and the rest follow only once that one was answered
+- GatewayUnavailable = the gateway did not take the request (safe to give the
+  money back); GatewayTimeout = it may or may not have been applied (keep the
+  reservation and ask again later, credits are idempotent per transfer_id)
+- CYBANK_BANK_GATEWAY picks the gateway: "stub" (default) starts the local
+  stub server (bank_gateway_stub.py) on first use, "tcp" connects to
+  CYBANK_BANK_GATEWAY_ADDRESS
+"""
+import itertools
+import json
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import NamedTuple
+
+from backend.models.transfer import Transfer
+from utils import config
+
+
+class GatewayError(Exception):
+    """The bank gateway did not give an answer."""
+
+
+class GatewayUnavailable(GatewayError):
+    """The request was not accepted (circuit open, cannot connect, gateway busy)."""
+
+
+class GatewayTimeout(GatewayError):
+    """The request was sent but not answered: it may or may not have been applied."""
+
+
+class GatewayResult(NamedTuple):
+    """The gateway's answer to a credit (or status) request."""
+
+    confirmed: bool
+    reference: str | None = None  # the receiving bank's reference when confirmed
+    reason: str | None = None  # why it was rejected
+
+
+class BankGateway(ABC):
+    """Sends transfers to the external banks behind linked bank accounts."""
+
+    name = "abstract"
+
+    @abstractmethod
+    def credit(self, transfer: Transfer, timeout: float = None) -> GatewayResult:
+        """
+        Ask the receiving bank to credit a transfer (idempotent per transfer_id).
+
+        Raises:
+            GatewayUnavailable: The gateway did not take the request
+            GatewayTimeout: No answer; the outcome is unknown
+        """
+
+    @abstractmethod
+    def status(self, transfer_id: str, timeout: float = None) -> GatewayResult | None:
+        """Outcome of an earlier credit, or None if the gateway never received it."""
+
+    def credit_many(self, transfers: list[Transfer], timeout: float = None) -> list:
+        """
+        credit() for several transfers; one GatewayResult or GatewayError per transfer, in order.
+
+        The default asks one at a time; PooledBankGateway sends them all before waiting.
+        """
+        results = []
+        for transfer in transfers:
+            try:
+                results.append(self.credit(transfer, timeout))
+            except GatewayError as e:
+                results.append(e)
+        return results
+
+    def close(self):
+        """Close connections held by the gateway."""
+
+
+class CircuitBreaker:
+    """
+    Fail fast while the gateway keeps failing.
+
+    closed: calls go through. open (after failure_threshold failures in a
+    row): calls raise GatewayUnavailable for reset_seconds. half-open: one
+    trial call goes through; success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 10.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self._clock = clock
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> bool:
+        """
+        Let a call through, or raise GatewayUnavailable while the circuit is open.
+
+        Returns:
+            True if this call is the half-open trial (its outcome decides the state)
+        """
+        with self._lock:
+            if self.state == "open":
+                if self._clock() - self._opened_at < self.reset_seconds:
+                    raise GatewayUnavailable("Bank gateway circuit is open")
+                self.state = "half-open"
+                self._trial_running = False
+            if self.state == "half-open":
+                if self._trial_running:
+                    raise GatewayUnavailable("Bank gateway circuit is open")
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half-open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = self._clock()
+                self._trial_running = False
+
+
+class _Connection:
+    """One persistent socket to the gateway with any number of requests in flight."""
+
+    def __init__(self, address: tuple[str, int], connect_timeout: float):
+        try:
+            self.sock = socket.create_connection(address, timeout=connect_timeout)
+        except OSError as e:
+            raise GatewayUnavailable(f"Cannot connect to the bank gateway at {address[0]}:{address[1]}: {e}") from e
+        self.sock.settimeout(None)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.alive = True
+        self._pending = {}  # request id → Future
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        threading.Thread(target=self._read_answers, name="cybank-gateway-reader", daemon=True).start()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    def submit(self, request_id: int, payload: bytes) -> Future:
+        future = Future()
+        with self._lock:
+            if not self.alive:
+                raise GatewayUnavailable("Connection to the bank gateway is closed")
+            self._pending[request_id] = future
+        try:
+            with self._send_lock:
+                self.sock.sendall(payload)
+        except OSError as e:
+            self.forget(request_id)  # an incomplete line is never applied by the gateway
+            self._fail()
+            raise GatewayUnavailable(f"Lost the connection to the bank gateway: {e}") from e
+        return future
+
+    def forget(self, request_id: int):
+        with self._lock:
+            self._pending.pop(request_id, None)
+
+    def _read_answers(self):
+        try:
+            with self.sock.makefile("rb") as answers:
+                for line in answers:
+                    answer = json.loads(line)
+                    with self._lock:
+                        future = self._pending.pop(answer.get("id"), None)
+                    if future is not None:
+                        future.set_result(answer)
+        except (OSError, ValueError):
+            pass
+        self._fail()
+
+    def _fail(self):
+        """Close the socket; requests still waiting get GatewayTimeout (they may have been applied)."""
+        with self._lock:
+            self.alive = False
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(GatewayTimeout("Lost the connection to the bank gateway"))
+        self.close()
+
+    def close(self):
+        self.alive = False
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class PooledBankGateway(BankGateway):
+    """
+    TCP client of a bank gateway server, with pooled, pipelined connections.
+
+    Args:
+        host, port: Gateway server address
+        pool_size: Connections kept open (opened on demand, reopened if lost)
+        timeout: Seconds to wait for an answer
+        connect_timeout: Seconds to wait for a new connection
+        breaker: CircuitBreaker (default: from config)
+        server: Local server to stop on close() (the "stub" gateway's own StubGatewayServer)
+    """
+
+    name = "tcp"
+
+    def __init__(self, host: str, port: int, pool_size: int = None, timeout: float = None,
+                 connect_timeout: float = None, breaker: CircuitBreaker = None, server=None):
+        self.address = (host, port)
+        self.server = server
+        self.pool_size = pool_size or config.BANK_GATEWAY_POOL_SIZE
+        self.timeout = config.BANK_GATEWAY_TIMEOUT_SECONDS if timeout is None else timeout
+        self.connect_timeout = (config.BANK_GATEWAY_CONNECT_TIMEOUT_SECONDS
+                                if connect_timeout is None else connect_timeout)
+        self.breaker = breaker or CircuitBreaker(config.BANK_GATEWAY_BREAKER_FAILURES,
+                                                 config.BANK_GATEWAY_BREAKER_RESET_SECONDS)
+        self.connections_opened = 0
+        self._connections = []
+        self._connecting = 0  # pool slots reserved by threads still connecting
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._pool_changed = threading.Condition(self._lock)
+
+    def credit(self, transfer: Transfer, timeout: float = None) -> GatewayResult:
+        return _result(self._call(_credit_request(transfer), timeout))
+
+    def credit_many(self, transfers: list[Transfer], timeout: float = None) -> list:
+        if not transfers:
+            return []
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        requests = [_credit_request(transfer) for transfer in transfers]
+        results = []
+        try:
+            # One breaker check for the whole round, not one per transfer
+            if self.breaker.before_call():
+                # Half-open: the first transfer is the trial; the rest wait for its answer
+                results += self._pipeline(requests[:1], deadline)
+                requests = requests[1:]
+                self.breaker.before_call()  # raises if the trial opened the circuit again
+        except GatewayUnavailable as e:
+            return results + [e] * len(requests)
+        return results + self._pipeline(requests, deadline)
+
+    def _pipeline(self, requests: list[dict], deadline: float) -> list:
+        """Write every request before awaiting the first answer; one GatewayResult or GatewayError each."""
+        sent = []
+        for request in requests:
+            try:
+                sent.append(self._submit(request))
+            except GatewayError as e:
+                sent.append(e)
+        results = []
+        for request in sent:
+            if isinstance(request, GatewayError):
+                results.append(request)
+                continue
+            try:
+                results.append(_result(self._receive(*request, max(0.0, deadline - time.monotonic()))))
+            except GatewayError as e:
+                results.append(e)
+        return results
+
+    def status(self, transfer_id: str, timeout: float = None) -> GatewayResult | None:
+        answer = self._call({"op": "status", "transfer_id": transfer_id}, timeout)
+        return None if answer.get("status") == "unknown" else _result(answer)
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        if self.server is not None:
+            self.server.stop()
+
+    def _connection(self) -> _Connection:
+        """An idle open connection, else a new one while the pool is not full, else the least busy."""
+        with self._lock:
+            while True:
+                self._connections = [c for c in self._connections if c.alive]
+                idle = next((c for c in self._connections if not c.in_flight), None)
+                if idle is not None:
+                    return idle
+                if len(self._connections) + self._connecting < self.pool_size:
+                    self._connecting += 1  # reserve the slot, connect without the lock
+                    break
+                if self._connections:
+                    return min(self._connections, key=lambda c: c.in_flight)
+                self._pool_changed.wait()  # every slot is being opened by another thread
+        conn = None
+        try:
+            conn = _Connection(self.address, self.connect_timeout)
+        finally:
+            with self._lock:
+                self._connecting -= 1
+                if conn is not None:
+                    self._connections.append(conn)
+                    self.connections_opened += 1
+                self._pool_changed.notify_all()
+        return conn
+
+    def _call(self, request: dict, timeout: float = None) -> dict:
+        return self._receive(*self._send(request), self.timeout if timeout is None else timeout)
+
+    def _send(self, request: dict) -> tuple[_Connection, int, Future]:
+        """Write one request; returns what _receive() needs to wait for its answer."""
+        self.breaker.before_call()
+        return self._submit(request)
+
+    def _submit(self, request: dict) -> tuple[_Connection, int, Future]:
+        """_send() for a call the breaker already let through."""
+        request_id = next(self._ids)
+        payload = (json.dumps({"id": request_id, **request}, separators=(",", ":")) + "\n").encode()
+        try:
+            conn = self._connection()
+            return conn, request_id, conn.submit(request_id, payload)
+        except GatewayError:
+            self.breaker.record_failure()
+            raise
+
+    def _receive(self, conn: _Connection, request_id: int, future: Future, timeout: float) -> dict:
+        try:
+            answer = future.result(timeout)
+        except FutureTimeout:
+            conn.forget(request_id)
+            self.breaker.record_failure()
+            raise GatewayTimeout(f"No answer from the bank gateway within {timeout:g}s") from None
+        except GatewayError:
+            self.breaker.record_failure()
+            raise
+        if answer.get("status") == "unavailable":
+            self.breaker.record_failure()
+            raise GatewayUnavailable(answer.get("reason") or "Bank gateway is unavailable")
+        self.breaker.record_success()
+        return answer
+
+
+def _credit_request(transfer: Transfer) -> dict:
+    return {"op": "credit", "transfer_id": transfer.transfer_id, "bank_name": transfer.to_bank_name,
+            "account_number": transfer.to_account_number, "amount": transfer.amount}
+
+
+def _result(answer: dict) -> GatewayResult:
+    if answer.get("status") == "confirmed":
+        return GatewayResult(True, reference=answer.get("reference"))
+    return GatewayResult(False, reason=answer.get("reason") or "Rejected by the receiving bank")
+
+
+def _make_tcp(address: str = None, **options) -> BankGateway:
+    host, _, port = (address or config.BANK_GATEWAY_ADDRESS).rpartition(":")
+    return PooledBankGateway(host, int(port), **options)
+
+
+def _make_stub(server_options: dict = None, **options) -> BankGateway:
+    """A local stub server (background thread) and a pooled client connected to it."""
+    from backend.services.bank_gateway_stub import StubGatewayServer
+    server = StubGatewayServer(**(server_options or {}))
+    host, port = server.start()
+    return PooledBankGateway(host, port, server=server, **options)
+
+
+_GATEWAYS = {"stub": _make_stub, "tcp": _make_tcp}  # name → factory(**options)
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def register_gateway(name: str, factory):
+    """Make a bank gateway available to init_gateway() / CYBANK_BANK_GATEWAY."""
+    _GATEWAYS[name] = factory
+
+
+def available_gateways() -> list[str]:
+    return sorted(_GATEWAYS)
+
+
+def _create_gateway(name: str, **options) -> BankGateway:
+    factory = _GATEWAYS.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown bank gateway '{name}'. Valid: {', '.join(available_gateways())}")
+    return factory(**options)
+
+
+def init_gateway(name: str = None, **options) -> BankGateway:
+    """
+    Create the process-wide bank gateway (closing the previous one).
+
+    Args:
+        name: Registered gateway name (default: config.BANK_GATEWAY)
+        **options: Passed to the gateway's factory
+
+    Raises:
+        ValueError: Unknown gateway name
+    """
+    global _gateway
+    gateway = _create_gateway(name or config.BANK_GATEWAY, **options)
+    with _gateway_lock:
+        old, _gateway = _gateway, gateway
+    if old is not None:
+        old.close()
+    return gateway
+
+
+def get_gateway() -> BankGateway:
+    """The process-wide bank gateway, created with the configured defaults on first use."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = _create_gateway(config.BANK_GATEWAY)
+    return _gateway
+
+
+def close_gateway():
+    """Close the process-wide bank gateway (if one was created)."""
+    global _gateway
+    with _gateway_lock:
+        gateway, _gateway = _gateway, None
+    if gateway is not None:
+        gateway.close()
@@ -0,0 +1,159 @@
+# backend/services/bank_gateway_stub.py
+"""
+Local stub ng bank gateway server (development, demos, benchmarks).
+
+Speaks the same line protocol as a real gateway (see bank_gateway.py), so
+PooledBankGateway can be tested against it without a real bank.
+
+KEY LOGIC:
+- asyncio server on its own daemon thread; start() returns (host, port)
+- Every request line becomes its own task, so answers on one connection can
+  come back out of order (pipelining)
+- capacity = credits the gateway works on at once, latency = seconds each
+  one takes, so the gateway handles about capacity / latency credits a second
+- connect_delay is paid once per new connection (handshake / TLS cost)
+- Credits are idempotent per transfer_id: sending the same transfer again
+  returns the first answer and does not credit twice
+- reject_rate / unavailable_rate / hang_rate simulate a refused account, a
+  busy gateway and a request that is never answered
+"""
+import asyncio
+import json
+import random
+import threading
+
+
+class StubGatewayServer:
+    """
+    In-process bank gateway server.
+
+    Args:
+        host, port: Address to listen on (port 0 = any free port)
+        latency: Seconds per credit
+        capacity: Credits worked on at once
+        reject_rate: Share of credits the receiving bank refuses
+        unavailable_rate: Share of requests answered "unavailable" (nothing applied)
+        hang_rate: Share of credits applied but never answered
+        connect_delay: Seconds before a new connection starts reading requests
+        seed: Random seed, for repeatable runs
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.01,
+                 capacity: int = 200, reject_rate: float = 0.0, unavailable_rate: float = 0.0,
+                 hang_rate: float = 0.0, connect_delay: float = 0.0, seed: int = None):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.capacity = capacity
+        self.reject_rate = reject_rate
+        self.unavailable_rate = unavailable_rate
+        self.hang_rate = hang_rate
+        self.connect_delay = connect_delay
+        self.requests = 0
+        self.connections = 0
+        self.credited = {}  # (bank_name, account_number) → centavos
+        self.results = {}  # transfer_id → answer of its credit
+        self._rng = random.Random(seed)
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._writers = set()
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self.host, self.port
+
+    def start(self) -> tuple[str, int]:
+        """Start listening on a background thread; returns the (host, port) bound."""
+        started = threading.Event()
+        self._loop = asyncio.new_event_loop()
+
+        async def listen():
+            self._capacity = asyncio.Semaphore(self.capacity)
+            self._server = await asyncio.start_server(self._serve, self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+            started.set()
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(listen())
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="cybank-gateway-stub", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self.address
+
+    def stop(self):
+        """Stop listening and drop every open connection."""
+        if self._loop is None:
+            return
+
+        async def shutdown():
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+        self._loop.close()
+        self._loop = None
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        self._writers.add(writer)
+        tasks = set()
+        try:
+            if self.connect_delay:
+                await asyncio.sleep(self.connect_delay)
+            while line := await reader.readline():
+                task = asyncio.ensure_future(self._answer(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _answer(self, line: bytes, writer: asyncio.StreamWriter):
+        request = json.loads(line)
+        self.requests += 1
+        if request.get("op") == "status":
+            answer = self.results.get(request.get("transfer_id"), {"status": "unknown"})
+        elif request.get("op") == "credit":
+            answer = await self._credit(request)
+            if answer is None:
+                return
+        else:
+            answer = {"status": "rejected", "reason": f"Unknown op '{request.get('op')}'"}
+        try:
+            writer.write((json.dumps({**answer, "id": request.get("id")}) + "\n").encode())
+        except (ConnectionError, RuntimeError):
+            pass
+
+    async def _credit(self, request: dict) -> dict | None:
+        transfer_id = request.get("transfer_id")
+        if transfer_id in self.results:
+            return self.results[transfer_id]
+        rng = self._rng
+        if rng.random() < self.unavailable_rate:
+            return {"status": "unavailable", "reason": "Gateway is busy, try again later"}
+        async with self._capacity:
+            await asyncio.sleep(self.latency)
+        if transfer_id in self.results:  # the same transfer sent again while this one ran
+            return self.results[transfer_id]
+        if rng.random() < self.reject_rate:
+            answer = {"status": "rejected", "reason": "Receiving account cannot be credited"}
+        else:
+            key = (request.get("bank_name"), request.get("account_number"))
+            self.credited[key] = self.credited.get(key, 0) + request.get("amount", 0)
+            answer = {"status": "confirmed", "reference": f"GW{len(self.results) + 1:010d}"}
+        self.results[transfer_id] = answer
+        if rng.random() < self.hang_rate:
+            return None
+        return answer
@@ -1,13 +1,25 @@
 # backend/services/bank_integration_service.py
+from backend.models.compact import to_micros
 from backend.models.linked_bank import LinkedBankAccount
+from backend.services.locks import lock_accounts
+from backend.storage import get_store
+from backend.storage.base import HistoryRows
+from utils.statements import CsvStatement, OfxStatement, parse_statement_date, parse_statement_amount
+from collections import Counter
 from datetime import datetime
+from itertools import chain, islice
+from operator import itemgetter
+import os
 
-# In-memory store
-_linked_banks = {}  # linked_bank_id → LinkedBankAccount
-_user_linked_banks = {}  # user_id → list of linked_bank_ids
+# File format → streaming reader (utils/statements.py)
+STATEMENT_READERS = {"csv": CsvStatement, "ofx": OfxStatement, "qfx": OfxStatement}
+# Rows validated and written per store call
+IMPORT_BATCH_SIZE = 5_000
+# Failed rows listed in the import result (all of them are counted)
+MAX_REPORTED_FAILURES = 100
 
 def add_bank_account(user_id: str, bank_name: str, account_number: str, 
-                     account_type: str, initial_balance: float = 0.0) -> LinkedBankAccount:
+                     account_type: str, initial_balance: int = 0) -> LinkedBankAccount:
     """
     Link a new external bank account to the user.
     
@@ -16,7 +28,7 @@ def add_bank_account(user_id: str, bank_name: str, account_number: str,
         bank_name: Name of the bank (e.g., "Chase", "Bank of America")
         account_number: Account number at the external bank
         account_type: Type of account (e.g., "checking", "savings")
-        initial_balance: Starting balance for this linked account
+        initial_balance: Starting balance for this linked account (centavos)
     
     Returns:
         LinkedBankAccount object
@@ -28,8 +40,7 @@ def add_bank_account(user_id: str, bank_name: str, account_number: str,
         account_type=account_type,
         balance=initial_balance
     )
-    _linked_banks[linked_bank.linked_bank_id] = linked_bank
-    _user_linked_banks.setdefault(user_id, []).append(linked_bank.linked_bank_id)
+    get_store().add_linked_bank(linked_bank)
     return linked_bank
 
 
@@ -43,8 +54,7 @@ def list_bank_accounts(user_id: str) -> list[LinkedBankAccount]:
     Returns:
         List of LinkedBankAccount objects
     """
-    bank_ids = _user_linked_banks.get(user_id, [])
-    return [_linked_banks[bid] for bid in bank_ids]
+    return get_store().list_user_linked_banks(user_id)
 
 
 def get_bank_account(linked_bank_id: str) -> LinkedBankAccount | None:
@@ -57,26 +67,21 @@ def get_bank_account(linked_bank_id: str) -> LinkedBankAccount | None:
     Returns:
         LinkedBankAccount or None if not found
     """
-    return _linked_banks.get(linked_bank_id)
+    return get_store().get_linked_bank(linked_bank_id)
 
 
-def update_bank_balance(linked_bank_id: str, new_balance: float) -> bool:
+def update_bank_balance(linked_bank_id: str, new_balance: int) -> bool:
     """
     Update the balance of a linked bank account (mock sync).
     
     Args:
         linked_bank_id: Linked bank account unique identifier
-        new_balance: New balance to set
+        new_balance: New balance to set (centavos)
     
     Returns:
         True if successful, False if account not found
     """
-    if linked_bank_id not in _linked_banks:
-        return False
-    bank_acct = _linked_banks[linked_bank_id]
-    bank_acct.balance = new_balance
-    bank_acct.last_synced = datetime.utcnow()
-    return True
+    return get_store().set_linked_bank_balance(linked_bank_id, new_balance, datetime.utcnow())
 
 
 def remove_bank_account(linked_bank_id: str, user_id: str) -> bool:
@@ -90,19 +95,10 @@ def remove_bank_account(linked_bank_id: str, user_id: str) -> bool:
     Returns:
         True if successful, False if not found or user mismatch
     """
-    if linked_bank_id not in _linked_banks:
-        return False
-    bank_acct = _linked_banks[linked_bank_id]
-    if bank_acct.user_id != user_id:
-        return False
-    
-    del _linked_banks[linked_bank_id]
-    if user_id in _user_linked_banks:
-        _user_linked_banks[user_id].remove(linked_bank_id)
-    return True
+    return get_store().remove_linked_bank(linked_bank_id, user_id)
 
 
-def get_total_linked_balance(user_id: str) -> float:
+def get_total_linked_balance(user_id: str) -> int:
     """
     Calculate total balance across all linked bank accounts for a user.
     
@@ -110,7 +106,189 @@ def get_total_linked_balance(user_id: str) -> float:
         user_id: User's unique identifier
     
     Returns:
-        Total balance across all linked accounts
+        Total balance across all linked accounts (centavos)
     """
     accounts = list_bank_accounts(user_id)
     return sum(acct.balance for acct in accounts)
+
+
+def import_statement(linked_bank_id: str, path: str, file_format: str = None,
+                     batch_size: int = IMPORT_BATCH_SIZE, encoding: str = "utf-8-sig") -> dict | None:
+    """
+    Import an external bank statement (CSV or OFX) into a linked bank's history.
+    
+    The file is streamed: rows are read one at a time, validated and written
+    batch_size at a time, so statements of any size import in constant
+    memory. Rows dated before the newest row already imported are skipped,
+    and so are rows dated at that same time that match an imported row
+    there (same amount and description; statements are usually date-only,
+    so the last day of one statement and the first of the next share a
+    timestamp). Importing the same (or an overlapping) statement again adds
+    nothing. Rows are expected oldest first (disorder inside one batch is
+    sorted); a statement whose first rows go newest to oldest is read to
+    the end first and imported in time order, so it costs memory for every
+    row instead of one batch.
+    
+    Afterwards the linked balance is set to the statement's closing balance
+    (or moved by the imported amounts if the file has none) and last_synced
+    to now. The imported rows are read back with
+    transaction_service.get_transactions(linked_bank_id).
+    
+    Args:
+        linked_bank_id: Linked bank account unique identifier
+        path: Statement file
+        file_format: "csv", "ofx" or "qfx" (default: from the file extension)
+        batch_size: Rows per validated batch / store write
+        encoding: Text encoding of the file
+    
+    Returns:
+        Dictionary containing:
+        - imported_count: rows added to the history
+        - skipped_count: rows already imported by an earlier statement
+        - failed_count: rows rejected (bad date/amount, out of order)
+        - failed: first MAX_REPORTED_FAILURES {"row", "error"} (row = CSV line / OFX transaction number)
+        - total_amount: signed sum of the imported rows (centavos)
+        - balance: linked bank balance after the import (centavos)
+        - last_synced: time of the import
+        or None if the linked bank does not exist
+    
+    Raises:
+        ValueError: if the format is unknown or the file lacks the required columns
+    """
+    file_format = (file_format or os.path.splitext(path)[1].lstrip(".")).lower()
+    reader = STATEMENT_READERS.get(file_format)
+    if reader is None:
+        raise ValueError(f"Unknown statement format '{file_format}'. Valid: {', '.join(STATEMENT_READERS)}")
+    store = get_store()
+    result = {"imported_count": 0, "skipped_count": 0, "failed_count": 0, "failed": [], "total_amount": 0}
+    
+    with lock_accounts(linked_bank_id):
+        bank = store.get_linked_bank(linked_bank_id)
+        if bank is None:
+            return None
+        stats = store.get_account_stats(linked_bank_id)
+        cutoff = stats.last_timestamp if stats else None
+        newest = cutoff
+        # Rows already imported at the cutoff, matched one for one on the boundary day
+        boundary = Counter((t.amount, t.description)
+                           for t in store.query_transactions(linked_bank_id, since=cutoff)) if cutoff else None
+        
+        with open(path, encoding=encoding, newline="") as stream:
+            statement = reader(stream)
+            rows = iter(statement)
+            first = list(islice(rows, batch_size))
+            batches = chain([first], iter(lambda: list(islice(rows, batch_size)), []))
+            if _newest_first(first):
+                # Every row is needed before the oldest one is known
+                parsed = [r for batch in batches for r in _parse_statement_rows(batch, cutoff, boundary, result)]
+                parsed.reverse()  # same-time rows back in time order too
+                parsed.sort(key=itemgetter(0))
+                batches = (parsed[i:i + batch_size] for i in range(0, len(parsed), batch_size))
+            else:
+                batches = (sorted(_parse_statement_rows(batch, cutoff, boundary, result), key=itemgetter(0))
+                           for batch in batches)  # stable: same-time rows keep file order
+            for parsed_batch in batches:
+                history, newest = _statement_rows(parsed_batch, newest, result)
+                if history.amounts:
+                    store.append_statement_rows(linked_bank_id, history)
+                    result["imported_count"] += len(history.amounts)
+                    result["total_amount"] += sum(history.amounts)
+            closing = statement.closing_balance
+        
+        balance = bank.balance + result["total_amount"]
+        if closing is not None:
+            try:
+                balance = parse_statement_amount(closing)
+            except ValueError:
+                _record_failure(result, None, f"Invalid closing balance '{closing}'")
+        synced_at = datetime.utcnow()
+        store.set_linked_bank_balance(linked_bank_id, balance, synced_at)
+    
+    result["balance"] = balance
+    result["last_synced"] = synced_at
+    return result
+
+
+def _newest_first(batch: list) -> bool:
+    """True if the dated rows of a statement's first batch go from newest to oldest."""
+    dates = []
+    for _, fields in batch:
+        try:
+            dates.append(parse_statement_date(fields.get("date", "")))
+        except ValueError:
+            continue
+    return len(dates) > 1 and dates[-1] < dates[0]
+
+
+def _parse_statement_rows(batch: list, cutoff: datetime | None, boundary: Counter | None,
+                          result: dict) -> list[tuple]:
+    """
+    Validate one batch of raw statement rows.
+    
+    Args:
+        cutoff: Timestamp of the newest row already imported
+        boundary: (amount, description) → count of the imported rows at
+                  cutoff; a row at cutoff that matches one uses it up
+    
+    Returns:
+        (timestamp, amount, description, category, row) of the rows newer
+        than cutoff or new at cutoff, in file order
+    """
+    parsed = []
+    for row, fields in batch:
+        try:
+            timestamp = parse_statement_date(fields.get("date", ""))
+            amount = _statement_amount(fields)
+        except ValueError as error:
+            _record_failure(result, row, str(error))
+            continue
+        description = (fields.get("description") or "").strip() or None
+        if cutoff is not None and timestamp <= cutoff:
+            key = (amount, description)
+            if timestamp < cutoff or boundary[key] > 0:
+                if timestamp == cutoff:
+                    boundary[key] -= 1
+                result["skipped_count"] += 1
+                continue
+        parsed.append((timestamp, amount, description, (fields.get("category") or "").strip() or None, row))
+    return parsed
+
+
+def _statement_rows(parsed: list[tuple], newest: datetime | None,
+                    result: dict) -> tuple[HistoryRows, datetime | None]:
+    """
+    Columns of parsed rows (in time order); rows older than the newest one
+    imported so far are rejected.
+    
+    Returns:
+        The rows to import and the newest timestamp imported so far
+    """
+    timestamps, amounts, types, categories, descriptions = [], [], [], [], []
+    for timestamp, amount, description, category, row in parsed:
+        if newest is not None and timestamp < newest:
+            _record_failure(result, row, "Out of order (older than an earlier row)")
+            continue
+        newest = timestamp
+        timestamps.append(to_micros(timestamp))
+        amounts.append(amount)
+        types.append("DEBIT" if amount < 0 else "CREDIT")
+        categories.append(category)
+        descriptions.append(description)
+    return HistoryRows(timestamps, amounts, types, categories, descriptions), newest
+
+
+def _statement_amount(fields: dict) -> int:
+    """Signed centavos of a row: its amount, or credit minus debit."""
+    if (fields.get("amount") or "").strip():
+        return parse_statement_amount(fields["amount"])
+    credit, debit = (fields.get("credit") or "").strip(), (fields.get("debit") or "").strip()
+    if not credit and not debit:
+        raise ValueError("Missing amount")
+    # Some banks print debits as negative numbers already
+    return (parse_statement_amount(credit) if credit else 0) - (abs(parse_statement_amount(debit)) if debit else 0)
+
+
+def _record_failure(result: dict, row: int | None, error: str):
+    result["failed_count"] += 1
+    if len(result["failed"]) < MAX_REPORTED_FAILURES:
+        result["failed"].append({"row": row, "error": error})
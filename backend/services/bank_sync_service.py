@@ -0,0 +1,213 @@
+# backend/services/bank_sync_service.py
+"""
+Sabay-sabay na pag-refresh ng linked bank balances (asyncio).
+
+KEY LOGIC:
+- Staleness scheduling: only linked banks whose last_synced is older than
+  stale_after are refreshed, stalest first (Store.stale_linked_banks)
+- One task per linked account; a semaphore per bank_name caps the requests
+  one bank sees at once, and the banks run side by side, so a refresh takes
+  about as long as the slowest bank instead of the sum of all of them
+- Every request has a timeout; BankUnavailable, timeouts and network errors
+  are retried with exponential backoff + jitter, and the bank's semaphore
+  slot is given back while waiting
+- Fetched balances are written SYNC_WRITE_BATCH at a time (one atomic() per
+  batch, under the linked banks' locks), so a refresh that is stopped
+  midway keeps what it already fetched. The writes run in a worker thread:
+  waiting for an account lock, a busy database or a journal fsync never
+  stalls the fetches and timeouts on the event loop
+- sync_linked_banks() is the blocking entry point; refresh_linked_banks()
+  is the coroutine for callers that already run an event loop
+"""
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from operator import attrgetter
+
+from backend.models.linked_bank import LinkedBankAccount
+from backend.services.bank_adapters import BankAdapter, BankUnavailable, get_adapter
+from backend.services.locks import lock_accounts
+from backend.storage import get_store
+from utils import config
+
+# Worth another try: the bank said so, it did not answer in time, or the network failed
+RETRYABLE_ERRORS = (BankUnavailable, asyncio.TimeoutError, TimeoutError, OSError)
+# Fetched balances written per store atomic() block
+SYNC_WRITE_BATCH = 500
+# Longest wait between two tries of one account
+MAX_BACKOFF_SECONDS = 30.0
+# Failed accounts listed in the result (all of them are counted)
+MAX_REPORTED_FAILURES = 100
+
+def sync_linked_banks(user_id: str = None, adapter: BankAdapter = None,
+                      stale_after: timedelta = None, limit: int = None, **options) -> dict:
+    """
+    Refresh the balances of stale linked bank accounts (blocking).
+    
+    Args:
+        user_id: Only this user's linked banks (default: every user's)
+        adapter: BankAdapter to fetch through (default: get_adapter())
+        stale_after: Refresh banks last synced longer ago than this
+                     (default: config.BANK_SYNC_STALE_MINUTES; timedelta(0) = all)
+        limit: At most this many banks, stalest first
+        **options: per_bank_limit, timeout, retries, backoff (see refresh_linked_banks)
+    
+    Returns:
+        Result dictionary of refresh_linked_banks()
+    """
+    banks = find_stale_linked_banks(user_id, stale_after, limit)
+    return asyncio.run(refresh_linked_banks(banks, adapter, **options))
+
+
+def find_stale_linked_banks(user_id: str = None, stale_after: timedelta = None,
+                            limit: int = None) -> list[LinkedBankAccount]:
+    """
+    Linked bank accounts due for a refresh, stalest first.
+    
+    Args:
+        user_id: Only this user's linked banks (default: every user's)
+        stale_after: Synced longer ago than this (default: config.BANK_SYNC_STALE_MINUTES)
+        limit: At most this many banks
+    
+    Returns:
+        List of LinkedBankAccount objects
+    """
+    if stale_after is None:
+        stale_after = timedelta(minutes=config.BANK_SYNC_STALE_MINUTES)
+    cutoff = datetime.utcnow() - stale_after
+    store = get_store()
+    if user_id is None:
+        return store.stale_linked_banks(cutoff, limit)
+    banks = sorted((b for b in store.list_user_linked_banks(user_id) if b.last_synced < cutoff),
+                   key=attrgetter("last_synced"))
+    return banks if limit is None else banks[:limit]
+
+
+async def refresh_linked_banks(banks: list[LinkedBankAccount], adapter: BankAdapter = None,
+                               per_bank_limit: int = None, timeout: float = None,
+                               retries: int = None, backoff: float = None) -> dict:
+    """
+    Fetch and store the current balance of every given linked bank account.
+    
+    Args:
+        banks: LinkedBankAccount objects to refresh (e.g. find_stale_linked_banks())
+        adapter: BankAdapter to fetch through (default: get_adapter(), closed afterwards)
+        per_bank_limit: Requests in flight per bank_name (default: config.BANK_SYNC_PER_BANK_LIMIT)
+        timeout: Seconds per request (default: config.BANK_SYNC_TIMEOUT_SECONDS)
+        retries: Extra tries after a retryable error (default: config.BANK_SYNC_RETRIES)
+        backoff: Wait before the first retry, doubled each time (default: config.BANK_SYNC_BACKOFF_SECONDS)
+    
+    Returns:
+        Dictionary containing:
+        - requested_count: linked banks given
+        - synced_count: balances fetched and stored
+        - failed_count: linked banks left as they were (out of retries,
+          non-retryable error, or removed meanwhile)
+        - retry_count: retries made in total
+        - failed: first MAX_REPORTED_FAILURES {"linked_bank_id", "bank_name", "error"}
+        - banks: bank_name → {"accounts", "synced", "failed", "seconds"}
+          (seconds = when that bank's last account finished)
+        - elapsed_seconds: wall time of the whole refresh
+    
+    Raises:
+        ValueError: if per_bank_limit < 1, timeout <= 0, retries < 0 or backoff < 0
+    """
+    per_bank_limit = config.BANK_SYNC_PER_BANK_LIMIT if per_bank_limit is None else per_bank_limit
+    timeout = config.BANK_SYNC_TIMEOUT_SECONDS if timeout is None else timeout
+    retries = config.BANK_SYNC_RETRIES if retries is None else retries
+    backoff = config.BANK_SYNC_BACKOFF_SECONDS if backoff is None else backoff
+    if per_bank_limit < 1:
+        raise ValueError(f"per_bank_limit must be at least 1, got {per_bank_limit}")
+    if timeout <= 0:
+        raise ValueError(f"timeout must be positive, got {timeout}")
+    if retries < 0:
+        raise ValueError(f"retries must be 0 or more, got {retries}")
+    if backoff < 0:
+        raise ValueError(f"backoff must be 0 or more, got {backoff}")
+    own_adapter = adapter is None
+    adapter = adapter or get_adapter()
+    
+    result = {"requested_count": len(banks), "synced_count": 0, "failed_count": 0,
+              "retry_count": 0, "failed": [], "banks": {}}
+    for bank in banks:
+        per_bank = result["banks"].setdefault(bank.bank_name,
+                                              {"accounts": 0, "synced": 0, "failed": 0, "seconds": 0.0})
+        per_bank["accounts"] += 1
+    limiters = {name: asyncio.Semaphore(per_bank_limit) for name in result["banks"]}
+    fetched = []  # (bank, balance, synced_at) not written yet
+    started = time.perf_counter()
+    
+    def finish(bank: LinkedBankAccount, error: str = None):
+        per_bank = result["banks"][bank.bank_name]
+        if error is None:
+            per_bank["synced"] += 1
+            result["synced_count"] += 1
+            return
+        per_bank["failed"] += 1
+        result["failed_count"] += 1
+        if len(result["failed"]) < MAX_REPORTED_FAILURES:
+            result["failed"].append({"linked_bank_id": bank.linked_bank_id, "bank_name": bank.bank_name,
+                                     "error": error})
+    
+    async def flush():
+        batch = fetched[:]
+        fetched.clear()
+        if not batch:
+            return
+        # Locks and the store may block (another thread's transfer, BEGIN IMMEDIATE, fsync)
+        missing = {b.linked_bank_id for b in await asyncio.to_thread(_save_balances, batch)}
+        for bank, _, _ in batch:
+            finish(bank, "Linked bank no longer exists" if bank.linked_bank_id in missing else None)
+    
+    async def refresh(bank: LinkedBankAccount):
+        try:
+            await fetch(bank)
+        finally:
+            result["banks"][bank.bank_name]["seconds"] = time.perf_counter() - started
+    
+    async def fetch(bank: LinkedBankAccount):
+        limiter = limiters[bank.bank_name]
+        for attempt in range(retries + 1):
+            if attempt:
+                result["retry_count"] += 1
+                delay = min(backoff * 2 ** (attempt - 1), MAX_BACKOFF_SECONDS)
+                await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+            async with limiter:
+                try:
+                    balance = await asyncio.wait_for(adapter.fetch_balance(bank), timeout)
+                except RETRYABLE_ERRORS as e:
+                    error = _describe(e, timeout)
+                    continue
+                except Exception as e:
+                    finish(bank, _describe(e, timeout))
+                    return
+            fetched.append((bank, balance, datetime.utcnow()))
+            if len(fetched) >= SYNC_WRITE_BATCH:
+                await flush()
+            return
+        finish(bank, f"{error} (gave up after {retries + 1} tries)")
+    
+    try:
+        await asyncio.gather(*(refresh(bank) for bank in banks))
+    finally:
+        await flush()
+        if own_adapter:
+            await adapter.close()
+    result["elapsed_seconds"] = time.perf_counter() - started
+    return result
+
+
+def _save_balances(fetched: list) -> list[LinkedBankAccount]:
+    """Store (bank, balance, synced_at) results in one atomic block; returns the banks that no longer exist."""
+    store = get_store()
+    with lock_accounts(*(bank.linked_bank_id for bank, _, _ in fetched)):
+        with store.atomic():
+            return [bank for bank, balance, synced_at in fetched
+                    if not store.set_linked_bank_balance(bank.linked_bank_id, balance, synced_at)]
+
+
+def _describe(error: Exception, timeout: float) -> str:
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return f"No answer within {timeout:g}s"
+    return str(error) or type(error).__name__
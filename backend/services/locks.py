@@ -0,0 +1,63 @@
+# backend/services/locks.py
+"""
+Per-account locks para sa services.
+
+Any service that reads a balance and then writes it back (deposit, withdraw,
+record_transaction, the transfers) holds the locks of the accounts it
+touches, so two threads can never both pass the same balance check.
+Transfers between different accounts do not share a lock and run side by
+side; only the short write itself goes through the store's atomic().
+
+KEY LOGIC:
+- One re-entrant lock per id (CyBank account_id or linked_bank_id), created
+  on first use and dropped once no caller holds or waits for it (the table
+  only keeps weak references), so the table stays as small as the number of
+  accounts in use right now
+- lock_accounts() always acquires in sorted id order, so two callers that
+  need overlapping sets can never wait on each other in a cycle (no deadlock)
+- Locks are re-entrant: a transfer that already holds an account's lock can
+  call record_transaction() on it
+- Rule: take account locks BEFORE entering get_store().atomic(), and inside
+  an atomic block only re-lock ids that are already held
+- The locks sit inside the store's group_commit(): with a journal, the
+  fsync is waited for after the locks are released, so back-to-back
+  deposits on one busy account share an fsync instead of queueing behind
+  each other's. A later change on the same account is journaled after the
+  earlier one, so it can never become durable first.
+"""
+import threading
+import weakref
+from contextlib import contextmanager
+
+from backend.storage import get_store
+
+_locks = weakref.WeakValueDictionary()  # account_id / linked_bank_id → RLock, while someone uses it
+_locks_guard = threading.Lock()
+
+
+def _lock_for(key: str) -> threading.RLock:
+    """The lock of one id; the caller's reference keeps it in the table."""
+    lock = _locks.get(key)
+    if lock is None:
+        with _locks_guard:
+            lock = _locks.setdefault(key, threading.RLock())
+    return lock
+
+
+@contextmanager
+def lock_accounts(*ids: str):
+    """
+    Hold the locks of several accounts / linked banks for the with-block.
+
+    Args:
+        *ids: account_ids and/or linked_bank_ids (None and duplicates are ignored)
+    """
+    locks = [_lock_for(key) for key in sorted({key for key in ids if isinstance(key, str)})]
+    with get_store().group_commit():
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
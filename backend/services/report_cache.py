@@ -0,0 +1,87 @@
+# backend/services/report_cache.py
+"""
+Versioned LRU cache para sa financial reports.
+
+A cached report is only good for the data version it was built from
+(Store.data_version): any write to the user's accounts, transactions,
+linked banks or transfers moves that version, so the next lookup misses
+and the report is rebuilt. Nothing is invalidated by hand.
+
+KEY LOGIC:
+- One entry per (report, user_id, arguments), holding the version it was
+  built at and the report; a repeated view is one dict lookup
+- get_or_build() is given the version read BEFORE building, so a write that
+  lands while a report is being built leaves it under the older version
+  (it is simply rebuilt on the next view)
+- Reports are built outside the cache lock; two threads missing at once
+  may both build, the newer version wins
+- Bounded: past max_entries the least recently used entry is dropped
+- Cached reports are shared by every caller: treat them as read-only
+"""
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+class ReportCache:
+    """Bounded LRU map of (report, user_id, args) → (data version, report)."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries  # 0 = caching off
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_build(self, key: tuple, version: int | None, build):
+        """
+        Return the report cached under key at this version, else build() and cache it.
+
+        Args:
+            key: (report name, user_id, *arguments)
+            version: Store.data_version() of the user, read before building;
+                     None means the engine has no versions (never cached)
+            build: Zero-argument function that builds the report
+        """
+        if version is None or self.max_entries <= 0:
+            with self._lock:
+                self.misses += 1
+            return build()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        report = build()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < version:
+                self._entries[key] = (version, report)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return report
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """hits, misses, evictions, entries, max_entries and hit_rate (0-1)."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
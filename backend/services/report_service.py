@@ -1,13 +1,53 @@
 # backend/services/report_service.py
 from backend.services.account_service import list_accounts
-from backend.services.transaction_service import get_transactions
+from backend.services.transaction_service import get_transactions, get_account_stats
 from backend.services.bank_integration_service import list_bank_accounts
+from backend.services.transfer_service import get_transfer_history
+from backend.services.report_cache import ReportCache
+from backend.storage import get_store
+from utils import config
+from utils.money import plain_pesos
 from datetime import datetime
+from collections.abc import Iterator
+from itertools import islice
+from operator import itemgetter
+import csv
+import gzip
+import heapq
+import json
+import os
+
+# ---------------- Report cache ----------------
+
+REPORT_CACHE_MAX_ROWS = 1_000  # transaction reports listing more rows than this are not cached
+
+_report_cache = ReportCache(config.REPORT_CACHE_SIZE)
+
+
+def _cached(report: str, user_id: str, args: tuple, build):
+    """build() once per data version of the user (see backend/services/report_cache.py)."""
+    # Read before building: a write during the build must not be hidden under the new version
+    version = get_store().data_version(user_id)
+    return _report_cache.get_or_build((report, user_id, *args), version, build)
+
+
+def report_cache_stats() -> dict:
+    """Hit/miss counters of the report cache (hits, misses, evictions, entries, max_entries, hit_rate)."""
+    return _report_cache.stats()
+
+
+def clear_report_cache():
+    """Forget every cached report and reset the counters."""
+    _report_cache.clear()
+
 
 def generate_account_summary(user_id: str) -> dict:
     """
     Generate a comprehensive summary of all CyBank accounts for a user.
     
+    Cached until the user's data changes; the returned dict is shared, so
+    do not modify it.
+    
     Args:
         user_id: User's unique identifier
     
@@ -18,18 +58,30 @@ def generate_account_summary(user_id: str) -> dict:
         - account_count: number of accounts
         - generated_at: timestamp of report generation
     """
+    return _cached("account_summary", user_id, (), lambda: _account_summary(user_id))
+
+
+def _account_summary(user_id: str) -> dict:
     accounts = list_accounts(user_id)
-    
+    # Maintained aggregates: O(1) per account instead of loading its history
+    stats = [get_account_stats(a.account_id) for a in accounts]
+    return _account_summary_section(accounts, stats, datetime.utcnow().isoformat())
+
+
+def _account_summary_section(accounts: list, all_stats: list, generated_at: str) -> dict:
+    """generate_account_summary() from already fetched accounts and their AccountStats."""
     account_details = []
-    total_balance = 0.0
+    total_balance = 0
     
-    for account in accounts:
-        txn_count = len(get_transactions(account.account_id))
+    for account, stats in zip(accounts, all_stats):
         account_details.append({
             "account_id": account.account_id,
             "account_name": account.account_name,
             "balance": account.balance,
-            "transaction_count": txn_count,
+            "transaction_count": stats.transaction_count,
+            "total_credits": stats.total_credits,
+            "total_debits": stats.total_debits,
+            "last_transaction_at": str(stats.last_timestamp) if stats.last_timestamp else None,
             "created_at": str(account.created_at)
         })
         total_balance += account.balance
@@ -38,27 +90,89 @@ def generate_account_summary(user_id: str) -> dict:
         "cybank_accounts": account_details,
         "total_cybank_balance": total_balance,
         "account_count": len(accounts),
-        "generated_at": datetime.utcnow().isoformat()
+        "generated_at": generated_at
     }
 
 
-def generate_transaction_report(user_id: str, account_id: str = None) -> dict:
+STREAM_PAGE_SIZE = 256  # rows fetched per account at a time while merging
+
+
+def _iter_newest_first(account, page_size: int):
+    """Yield (transaction, account) pairs of one account, newest first, page by page."""
+    cursor = None
+    while True:
+        page = get_transactions(account.account_id, limit=page_size, cursor=cursor, newest_first=True)
+        for txn in page:
+            yield txn, account
+        cursor = page.next_cursor
+        if cursor is None:
+            return
+
+
+def _transaction_row(txn, account) -> dict:
+    return {
+        "transaction_id": txn.transaction_id,
+        "account_id": txn.account_id,
+        "account_name": account.account_name,
+        "amount": txn.amount,
+        "transaction_type": txn.transaction_type,
+        "description": txn.description,
+        "category": txn.category,
+        "timestamp": str(txn.timestamp)
+    }
+
+
+def iter_transactions_newest_first(accounts: list, limit: int = None) -> Iterator[dict]:
+    """
+    Lazily merge the time-ordered histories of several accounts, newest first.
+    
+    Heap-based k-way merge (heapq.merge): only one pending row per account
+    is held at a time and only the rows actually consumed are formatted.
+    
+    Args:
+        accounts: Account objects to merge
+        limit: Stop after this many rows (None = all)
+    
+    Returns:
+        Iterator of transaction detail dicts
+    """
+    page_size = min(limit, STREAM_PAGE_SIZE) if limit else STREAM_PAGE_SIZE
+    merged = heapq.merge(*(_iter_newest_first(a, page_size) for a in accounts),
+                         key=lambda pair: pair[0].timestamp, reverse=True)
+    for txn, account in islice(merged, limit):
+        yield _transaction_row(txn, account)
+
+
+def generate_transaction_report(user_id: str, account_id: str = None, limit: int = None,
+                                stream: bool = False) -> dict:
     """
     Generate transaction report for a user (optionally filtered by account).
     
+    Cached until the user's data changes (not when streaming or listing
+    more than REPORT_CACHE_MAX_ROWS rows); do not modify the returned dict.
+    
     Args:
         user_id: User's unique identifier
         account_id: Optional - filter to specific account only
+        limit: Optional - only the latest N transactions
+        stream: If True, "transactions" is a lazy iterator instead of a list
     
     Returns:
         Dictionary containing:
-        - transactions: list of transaction details
+        - transactions: transaction details, newest first
         - total_credits: sum of all credit transactions
         - total_debits: sum of all debit transactions
         - net_change: total_credits - total_debits
-        - transaction_count: total transactions
+        - transaction_count: total transactions (whole history, not just the ones listed)
         - generated_at: timestamp
     """
+    if stream or limit is None or limit > REPORT_CACHE_MAX_ROWS:
+        return _transaction_report(user_id, account_id, limit, stream)
+    return _cached("transaction_report", user_id, (account_id, limit),
+                   lambda: _transaction_report(user_id, account_id, limit, stream))
+
+
+def _transaction_report(user_id: str, account_id: str, limit: int, stream: bool) -> dict:
     accounts = list_accounts(user_id)
     
     # Filter accounts if account_id specified
@@ -67,40 +181,34 @@ def generate_transaction_report(user_id: str, account_id: str = None) -> dict:
         if not accounts:
             return {"error": "Account not found", "transactions": []}
     
-    transactions = []
-    total_credits = 0.0
-    total_debits = 0.0
-    
-    for account in accounts:
-        account_txns = get_transactions(account.account_id)
-        for txn in account_txns:
-            transaction_details = {
-                "transaction_id": txn.transaction_id,
-                "account_id": txn.account_id,
-                "account_name": account.account_name,
-                "amount": txn.amount,
-                "transaction_type": txn.transaction_type,
-                "description": txn.description,
-                "category": txn.category,
-                "timestamp": str(txn.timestamp)
-            }
-            transactions.append(transaction_details)
-            
-            if txn.transaction_type == "CREDIT":
-                total_credits += abs(txn.amount)
-            else:
-                total_debits += abs(txn.amount)
+    # Totals come from the maintained aggregates, not from re-adding every row
+    stats = [get_account_stats(a.account_id) for a in accounts]
+    return _transaction_section(accounts, stats, limit, stream, datetime.utcnow().isoformat())
+
+
+def _transaction_section(accounts: list, all_stats: list, limit: int, stream: bool, generated_at: str) -> dict:
+    """generate_transaction_report() from already fetched accounts and their AccountStats."""
+    total_credits = 0
+    total_debits = 0
+    transaction_count = 0
+    
+    for stats in all_stats:
+        total_credits += stats.total_credits
+        total_debits += stats.total_debits
+        transaction_count += stats.transaction_count
     
-    # Sort by timestamp (newest first)
-    transactions.sort(key=lambda x: x["timestamp"], reverse=True)
+    # Histories are already time-ordered, so merging replaces the full sort
+    transactions = iter_transactions_newest_first(accounts, limit)
+    if not stream:
+        transactions = list(transactions)
     
     return {
         "transactions": transactions,
         "total_credits": total_credits,
         "total_debits": total_debits,
         "net_change": total_credits - total_debits,
-        "transaction_count": len(transactions),
-        "generated_at": datetime.utcnow().isoformat()
+        "transaction_count": transaction_count,
+        "generated_at": generated_at
     }
 
 
@@ -108,6 +216,8 @@ def generate_multi_bank_portfolio(user_id: str) -> dict:
     """
     Generate a comprehensive portfolio analysis of all linked external banks.
     
+    Cached until the user's data changes; do not modify the returned dict.
+    
     Args:
         user_id: User's unique identifier
     
@@ -116,14 +226,21 @@ def generate_multi_bank_portfolio(user_id: str) -> dict:
         - linked_banks: list of linked banks with details
         - bank_summary: breakdown by bank
         - total_linked_balance: sum across all linked banks
-        - average_balance_per_bank: mean balance
+        - average_balance_per_bank: mean balance (rounded to the centavo)
         - bank_count: number of linked banks
         - generated_at: timestamp
     """
-    banks = list_bank_accounts(user_id)
-    
+    return _cached("portfolio", user_id, (), lambda: _multi_bank_portfolio(user_id))
+
+
+def _multi_bank_portfolio(user_id: str) -> dict:
+    return _portfolio_section(list_bank_accounts(user_id), datetime.utcnow().isoformat())
+
+
+def _portfolio_section(banks: list, generated_at: str) -> dict:
+    """generate_multi_bank_portfolio() from already fetched linked banks."""
     bank_details = []
-    total_balance = 0.0
+    total_balance = 0
     bank_by_type = {}
     
     for bank in banks:
@@ -142,14 +259,15 @@ def generate_multi_bank_portfolio(user_id: str) -> dict:
         if bank.account_type not in bank_by_type:
             bank_by_type[bank.account_type] = {
                 "count": 0,
-                "total_balance": 0.0,
+                "total_balance": 0,
                 "banks": []
             }
         bank_by_type[bank.account_type]["count"] += 1
         bank_by_type[bank.account_type]["total_balance"] += bank.balance
         bank_by_type[bank.account_type]["banks"].append(bank.bank_name)
     
-    average_balance = total_balance / len(banks) if banks else 0.0
+    # Rounded to the nearest centavo so every money field stays an int
+    average_balance = round(total_balance / len(banks)) if banks else 0
     
     return {
         "linked_banks": bank_details,
@@ -157,39 +275,255 @@ def generate_multi_bank_portfolio(user_id: str) -> dict:
         "total_linked_balance": total_balance,
         "average_balance_per_bank": average_balance,
         "bank_count": len(banks),
-        "generated_at": datetime.utcnow().isoformat()
+        "generated_at": generated_at
     }
 
 
-def generate_complete_financial_report(user_id: str) -> dict:
+REPORT_SECTIONS = ("cybank_summary", "transaction_report", "portfolio_report")
+
+
+def generate_complete_financial_report(user_id: str, sections: tuple = None, transaction_limit: int = None,
+                                       stream: bool = False) -> dict:
     """
     Generate a complete financial report combining CyBank and linked bank data.
     
+    Single pass: accounts and linked banks are listed once, each account's
+    aggregates are read once and shared by every section, and transaction
+    rows can be read and formatted only while the caller iterates them
+    (stream=True). The report costs about as much as its largest section.
+    Cached like the other reports unless it lists transactions lazily or
+    more than REPORT_CACHE_MAX_ROWS of them.
+    
     Args:
         user_id: User's unique identifier
+        sections: Sections to build (default: all of REPORT_SECTIONS);
+                  combined_analysis is always included
+        transaction_limit: Optional - only the latest N transactions in transaction_report
+        stream: If True, transaction_report["transactions"] is a lazy iterator
+                (read it once, while the store is open); False (default) builds the list
     
     Returns:
-        Dictionary containing all three reports plus combined analysis
+        Dictionary containing the chosen sections (same shape as the
+        standalone reports) plus combined_analysis
+    
+    Raises:
+        ValueError: if a section name is unknown
+    """
+    sections = REPORT_SECTIONS if sections is None else tuple(sections)
+    for section in sections:
+        if section not in REPORT_SECTIONS:
+            raise ValueError(f"Unknown report section '{section}'. Valid: {', '.join(REPORT_SECTIONS)}")
+    sections = tuple(s for s in REPORT_SECTIONS if s in sections)  # one cache key per set of sections
+    
+    if "transaction_report" in sections and (
+            stream or transaction_limit is None or transaction_limit > REPORT_CACHE_MAX_ROWS):
+        return _complete_report(user_id, sections, transaction_limit, stream)
+    return _cached("complete_report", user_id, (sections, transaction_limit),
+                   lambda: _complete_report(user_id, sections, transaction_limit, stream))
+
+
+def _complete_report(user_id: str, sections: tuple, transaction_limit: int, stream: bool) -> dict:
+    generated_at = datetime.utcnow().isoformat()
+    
+    # Every source is read once; the sections below only reuse these
+    accounts = list_accounts(user_id)
+    all_stats = [get_account_stats(a.account_id) for a in accounts]
+    banks = list_bank_accounts(user_id)
+    
+    report = {}
+    if "cybank_summary" in sections:
+        report["cybank_summary"] = _account_summary_section(accounts, all_stats, generated_at)
+    if "transaction_report" in sections:
+        report["transaction_report"] = _transaction_section(accounts, all_stats, transaction_limit,
+                                                            stream, generated_at)
+    if "portfolio_report" in sections:
+        report["portfolio_report"] = _portfolio_section(banks, generated_at)
+    
+    total_cybank_balance = sum(a.balance for a in accounts)
+    total_linked_balance = sum(b.balance for b in banks)
+    total_balance_all = total_cybank_balance + total_linked_balance
+    
+    report["combined_analysis"] = {
+        "total_cybank_balance": total_cybank_balance,
+        "total_linked_balance": total_linked_balance,
+        "total_balance_all": total_balance_all,
+        "cybank_percentage": (total_cybank_balance / total_balance_all * 100) if total_balance_all > 0 else 0,
+        "linked_percentage": (total_linked_balance / total_balance_all * 100) if total_balance_all > 0 else 0,
+        "total_transactions": sum(stats.transaction_count for stats in all_stats),
+        "total_accounts": len(accounts),
+        "total_linked_banks": len(banks),
+        "generated_at": generated_at
+    }
+    return report
+
+
+# ---------------- Exports ----------------
+
+EXPORT_FORMATS = ("csv", "jsonl")
+EXPORT_PAGE_SIZE = 1_000  # rows fetched per account (or per user, for transfers) at a time
+EXPORT_BUFFER_ROWS = 1_000  # rows formatted per file write
+EXPORT_GZIP_LEVEL = 6  # 9 is much slower for a few % smaller files
+
+TRANSACTION_EXPORT_COLUMNS = ("timestamp", "transaction_id", "account_id", "account_name",
+                              "transaction_type", "amount", "category", "description")
+TRANSFER_EXPORT_COLUMNS = ("timestamp", "transfer_id", "direction", "from_account_id", "from_account_name",
+                           "destination_id", "destination_name", "amount", "description", "status")
+PORTFOLIO_EXPORT_COLUMNS = ("linked_bank_id", "bank_name", "account_number", "account_type",
+                            "balance", "last_synced")
+
+
+def _iter_oldest_first(account, page_size: int):
+    """Yield (timestamp, transaction, account) of one account, oldest first, page by page."""
+    cursor = None
+    while True:
+        page = get_transactions(account.account_id, limit=page_size, cursor=cursor)
+        for txn in page:
+            yield txn.timestamp, txn, account
+        cursor = page.next_cursor
+        if cursor is None:
+            return
+
+
+def iter_transaction_export_rows(accounts: list, page_size: int = EXPORT_PAGE_SIZE) -> Iterator[tuple]:
+    """
+    Transactions of several accounts, oldest first, as TRANSACTION_EXPORT_COLUMNS tuples.
+    
+    Same k-way merge as iter_transactions_newest_first(): at most one page
+    per account is held at a time. Amounts are plain peso text ("-350.50").
+    """
+    histories = [_iter_oldest_first(a, page_size) for a in accounts]
+    # The timestamp is read once per row, for both the merge key and the output
+    merged = heapq.merge(*histories, key=itemgetter(0)) if len(histories) > 1 else histories[0]
+    for timestamp, txn, account in merged:
+        yield (str(timestamp), txn.transaction_id, txn.account_id, account.account_name,
+               txn.transaction_type, plain_pesos(txn.amount), txn.category, txn.description)
+
+
+def iter_transfer_export_rows(user_id: str, page_size: int = EXPORT_PAGE_SIZE) -> Iterator[tuple]:
+    """A user's transfers, oldest first, as TRANSFER_EXPORT_COLUMNS tuples (paged)."""
+    cursor = None
+    while True:
+        page = get_transfer_history(user_id, limit=page_size, cursor=cursor)
+        for t in page:
+            destination_name = t.to_bank_name if t.direction == "external" else t.to_account_name
+            yield (str(t.timestamp), t.transfer_id, t.direction, t.from_account_id, t.from_account_name,
+                   t.destination_id, destination_name, plain_pesos(t.amount), t.description, t.status)
+        cursor = page.next_cursor
+        if cursor is None:
+            return
+
+
+def iter_portfolio_export_rows(user_id: str) -> Iterator[tuple]:
+    """One PORTFOLIO_EXPORT_COLUMNS tuple per linked bank."""
+    for bank in list_bank_accounts(user_id):
+        yield (bank.linked_bank_id, bank.bank_name, str(bank.account_number), bank.account_type,
+               plain_pesos(bank.balance), str(bank.last_synced))
+
+
+def _export_options(path: str, file_format: str | None, compress: bool | None) -> tuple[str, bool]:
+    """(format, gzip?) from the arguments, else from the file name ("x.csv.gz")."""
+    name = path[:-3] if path.endswith(".gz") else path
+    if compress is None:
+        compress = name != path
+    file_format = (file_format or os.path.splitext(name)[1].lstrip(".")).lower()
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{file_format}'. Valid: {', '.join(EXPORT_FORMATS)}")
+    return file_format, compress
+
+
+def write_export(path: str, columns: tuple, rows: Iterator[tuple], file_format: str = None,
+                 compress: bool = None) -> dict:
     """
-    cybank_summary = generate_account_summary(user_id)
-    transaction_report = generate_transaction_report(user_id)
-    portfolio_report = generate_multi_bank_portfolio(user_id)
+    Stream rows into a CSV or JSONL file, optionally gzip-compressed.
+    
+    Rows are pulled from the iterator and written EXPORT_BUFFER_ROWS at a
+    time, so memory stays flat whatever the row count. The file is written
+    under a temporary name and renamed at the end, so a failed export never
+    leaves a half-written file behind under `path`.
+    
+    Args:
+        path: Output file
+        columns: Column names (CSV header / JSON keys)
+        rows: Tuples in column order
+        file_format: "csv" or "jsonl" (default: from the extension)
+        compress: gzip the file (default: if path ends with ".gz")
     
-    total_balance_all = cybank_summary["total_cybank_balance"] + portfolio_report["total_linked_balance"]
+    Returns:
+        Dictionary containing: path, format, compressed, row_count, bytes_written
+    
+    Raises:
+        ValueError: if the format is not one of EXPORT_FORMATS
+    """
+    file_format, compress = _export_options(path, file_format, compress)
+    partial = f"{path}.partial"
+    row_count = 0
+    if compress:
+        stream = gzip.open(partial, "wt", encoding="utf-8", newline="", compresslevel=EXPORT_GZIP_LEVEL)
+    else:
+        stream = open(partial, "w", encoding="utf-8", newline="")
+    try:
+        with stream:
+            if file_format == "csv":
+                writer = csv.writer(stream)
+                writer.writerow(columns)
+                write_rows = writer.writerows
+            else:
+                encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+                
+                def write_rows(buffer):
+                    stream.write("".join([encode(dict(zip(columns, row))) + "\n" for row in buffer]))
+            while True:
+                buffer = list(islice(rows, EXPORT_BUFFER_ROWS))
+                if not buffer:
+                    break
+                write_rows(buffer)
+                row_count += len(buffer)
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
     
     return {
-        "cybank_summary": cybank_summary,
-        "transaction_report": transaction_report,
-        "portfolio_report": portfolio_report,
-        "combined_analysis": {
-            "total_cybank_balance": cybank_summary["total_cybank_balance"],
-            "total_linked_balance": portfolio_report["total_linked_balance"],
-            "total_balance_all": total_balance_all,
-            "cybank_percentage": (cybank_summary["total_cybank_balance"] / total_balance_all * 100) if total_balance_all > 0 else 0,
-            "linked_percentage": (portfolio_report["total_linked_balance"] / total_balance_all * 100) if total_balance_all > 0 else 0,
-            "total_transactions": transaction_report["transaction_count"],
-            "total_accounts": cybank_summary["account_count"],
-            "total_linked_banks": portfolio_report["bank_count"],
-            "generated_at": datetime.utcnow().isoformat()
-        }
+        "path": path,
+        "format": file_format,
+        "compressed": compress,
+        "row_count": row_count,
+        "bytes_written": os.path.getsize(path)
     }
+
+
+def export_transactions(user_id: str, path: str, account_id: str = None, file_format: str = None,
+                        compress: bool = None) -> dict:
+    """
+    Export a user's transactions (optionally one account's) to CSV/JSONL, oldest first.
+    
+    Streams page by page (see write_export); nothing is built per row
+    besides the output line, so 10M rows export in flat memory.
+    
+    Args:
+        user_id: User's unique identifier
+        path: Output file ("x.csv", "x.jsonl", "x.csv.gz", ...)
+        account_id: Optional - only this account
+        file_format, compress: See write_export
+    
+    Returns:
+        write_export() result, or {"error": ...} if the account is not the user's
+    """
+    accounts = list_accounts(user_id)
+    if account_id:
+        accounts = [a for a in accounts if a.account_id == account_id]
+        if not accounts:
+            return {"error": "Account not found"}
+    rows = iter_transaction_export_rows(accounts) if accounts else iter(())
+    return write_export(path, TRANSACTION_EXPORT_COLUMNS, rows, file_format, compress)
+
+
+def export_transfers(user_id: str, path: str, file_format: str = None, compress: bool = None) -> dict:
+    """Export a user's transfer history to CSV/JSONL, oldest first (see export_transactions)."""
+    return write_export(path, TRANSFER_EXPORT_COLUMNS, iter_transfer_export_rows(user_id), file_format, compress)
+
+
+def export_portfolio(user_id: str, path: str, file_format: str = None, compress: bool = None) -> dict:
+    """Export the user's linked banks (one row each) to CSV/JSONL (see export_transactions)."""
+    return write_export(path, PORTFOLIO_EXPORT_COLUMNS, iter_portfolio_export_rows(user_id), file_format, compress)
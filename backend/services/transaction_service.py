@@ -1,38 +1,37 @@
 # backend/services/transaction_service.py
 from backend.models.transaction import Transaction
-from backend.services.account_service import _accounts
+from backend.models.account_stats import AccountStats
+from backend.services.locks import lock_accounts
+from backend.storage import get_store
+from backend.storage.base import Page
+from datetime import datetime
 
-# In-memory store
-_account_transactions = {}  # account_id → list of Transaction
-
-def deposit(account_id: str, amount: float, description: str = "", category: str = None) -> Transaction | None:
-    acct = _accounts.get(account_id)
-    if not acct:
-        return None
+def deposit(account_id: str, amount: int, description: str = "", category: str = None) -> Transaction | None:
     txn = Transaction(account_id=account_id, amount=amount, transaction_type="CREDIT",
                       description=description, category=category)
-    _account_transactions.setdefault(account_id, []).append(txn)
-    acct.balance += amount
+    # post_transaction adds the amount to the balance together with the history entry
+    with lock_accounts(account_id):
+        if not get_store().post_transaction(txn):
+            return None
     return txn
 
-def withdraw(account_id: str, amount: float, description: str = "", category: str = None) -> Transaction | None:
-    acct = _accounts.get(account_id)
-    if not acct or acct.balance < amount:
-        return None
+def withdraw(account_id: str, amount: int, description: str = "", category: str = None) -> Transaction | None:
     txn = Transaction(account_id=account_id, amount=-amount, transaction_type="DEBIT",
                       description=description, category=category)
-    _account_transactions.setdefault(account_id, []).append(txn)
-    acct.balance -= amount
+    # Fails (no change) if the account is missing or the balance is below amount
+    with lock_accounts(account_id):
+        if not get_store().post_transaction(txn):
+            return None
     return txn
 
-def record_transaction(account_id: str, amount: float, transaction_type: str, 
+def record_transaction(account_id: str, amount: int, transaction_type: str, 
                        description: str = "", category: str = None) -> Transaction | None:
     """__
     Record a transaction (generic function for transfers).
     
     Args:
         account_id: Account ID
-        amount: Transaction amount (positive value)
+        amount: Transaction amount in centavos (positive value)
         transaction_type: "DEBIT" or "CREDIT"
         description: Transaction description
         category: Optional category
@@ -40,17 +39,60 @@ def record_transaction(account_id: str, amount: float, transaction_type: str,
     Returns:
         Transaction object or None if account not found
     """
-    acct = _accounts.get(account_id)
-    if not acct:
-        return None
-    
     # Determine the sign based on transaction type
     signed_amount = amount if transaction_type == "CREDIT" else -amount
     
     txn = Transaction(account_id=account_id, amount=signed_amount, transaction_type=transaction_type,
                       description=description, category=category)
-    _account_transactions.setdefault(account_id, []).append(txn)
+    with lock_accounts(account_id):
+        if not get_store().append_transaction(txn):
+            return None
     return txn
 
-def get_transactions(account_id: str) -> list[Transaction]:
-    return _account_transactions.get(account_id, [])
+def get_transactions(account_id: str, since: datetime = None, until: datetime = None,
+                     limit: int = None, cursor: str = None,
+                     newest_first: bool = False, transaction_type: str = None,
+                     category: str = None) -> list[Transaction]:
+    """
+    Transactions of an account, oldest first by default.
+    
+    With no filters this is the whole history. Otherwise the storage engine
+    answers a time-range query (binary search / index range scan) and only
+    the requested page is loaded.
+    
+    Args:
+        account_id: Account ID
+        since: Only transactions at or after this time
+        until: Only transactions before this time
+        limit: Page size (None = everything in range)
+        cursor: next_cursor of the previous page
+        newest_first: Newest transaction first
+        transaction_type: Only "CREDIT" or only "DEBIT" transactions
+        category: Only transactions in this category
+    
+    Returns:
+        List of Transaction; when paging it is a Page whose
+        next_cursor is None on the last page
+    """
+    if (since is None and until is None and limit is None and cursor is None
+            and transaction_type is None and category is None):
+        history = get_store().list_transactions(account_id)
+        return list(reversed(history)) if newest_first else history
+    if limit is not None and limit < 1:
+        return Page()
+    return get_store().query_transactions(account_id, since=since, until=until, limit=limit,
+                                          cursor=cursor, newest_first=newest_first,
+                                          transaction_type=transaction_type, category=category)
+
+def get_account_stats(account_id: str) -> AccountStats | None:
+    """
+    Running totals of an account's history (credits, debits, count, first/last
+    timestamp, per-category sums), maintained on every recorded transaction.
+    
+    Args:
+        account_id: Account ID
+    
+    Returns:
+        AccountStats or None if account not found
+    """
+    return get_store().get_account_stats(account_id)
@@ -2,86 +2,280 @@
 from backend.services.account_service import get_account, update_account_balance
 from backend.services.transaction_service import record_transaction
 from backend.services.bank_integration_service import get_bank_account, update_bank_balance
-from datetime import datetime
+from backend.services.bank_gateway import BankGateway, GatewayError, GatewayTimeout, get_gateway
+from backend.models.transaction import Transaction
+from backend.models.transfer import Transfer, TRANSFER_DIRECTIONS
+from backend.services.locks import lock_accounts
+from backend.storage import get_store
+from backend.storage.base import Page
+from utils import config
+from datetime import datetime, timedelta
+import threading
 import uuid
 
-# In-memory store for transfers
-_transfers = {}  # transfer_id → transfer details
+
+class _TransferFailed(Exception):
+    """Raised inside a transfer to roll back every change made by it."""
+
 
 def transfer_to_external_bank(user_id: str, from_account_id: str, to_linked_bank_id: str, 
-                               amount: float, description: str = "Transfer to external bank") -> dict | None:
+                               amount: int, description: str = "Transfer to external bank") -> Transfer | None:
     """
     Transfer money from a CyBank account to a linked external bank account.
     Logic similar to PayPal to GCash: deduct from CyBank, credit external bank.
     
+    The CyBank debit is made first and the transfer is recorded as "pending"
+    (the amount is reserved). The bank gateway is then asked to credit the
+    linked bank, outside the account locks:
+    - confirmed: the linked bank balance is credited and the transfer is "completed"
+    - rejected / gateway unavailable: the debit is reversed and the transfer is "failed"
+    - no answer in time: the transfer stays "pending" with the amount reserved,
+      and a background sweep (settle_pending_transfers) finishes it later
+    
     Args:
         user_id: User's unique identifier
         from_account_id: Source CyBank account ID
         to_linked_bank_id: Destination linked bank account ID
-        amount: Amount to transfer
+        amount: Amount to transfer (centavos)
         description: Optional description for the transfer
     
     Returns:
-        Transfer record dict on success, None on failure
-    """
-    # Validate source account
-    source_account = get_account(from_account_id)
-    if not source_account or source_account.user_id != user_id:
-        return None
-    
-    # Check sufficient balance
-    if source_account.balance < amount:
-        return None
-    
-    # Validate destination linked bank
-    dest_bank = get_bank_account(to_linked_bank_id)
-    if not dest_bank or dest_bank.user_id != user_id:
-        return None
-    
-    # Perform transfer
-    transfer_id = str(uuid.uuid4())
-    
-    # Deduct from CyBank account
-    new_source_balance = source_account.balance - amount
-    if not update_account_balance(from_account_id, new_source_balance):
-        return None
-    
-    # Record debit transaction in source account
-    debit_txn = record_transaction(from_account_id, amount, "DEBIT", 
-                                   f"Transfer to {dest_bank.bank_name} ({dest_bank.account_number})")
-    if not debit_txn:
-        # Rollback
-        update_account_balance(from_account_id, source_account.balance)
-        return None
-    
-    # Credit linked bank account
-    new_dest_balance = dest_bank.balance + amount
-    if not update_bank_balance(to_linked_bank_id, new_dest_balance):
-        # Rollback both
-        update_account_balance(from_account_id, source_account.balance)
-        return None
-    
-    # Record transfer metadata
-    transfer_record = {
-        "transfer_id": transfer_id,
-        "user_id": user_id,
-        "from_account_id": from_account_id,
-        "from_account_name": source_account.account_name,
-        "to_linked_bank_id": to_linked_bank_id,
-        "to_bank_name": dest_bank.bank_name,
-        "to_account_number": dest_bank.account_number,
-        "amount": amount,
-        "description": description,
-        "timestamp": datetime.utcnow(),
-        "status": "completed"
-    }
-    _transfers[transfer_id] = transfer_record
+        Transfer record ("completed" or "pending") on success, None on failure
+    """
+    # The account locks keep the balance checks below valid until the writes are done
+    with lock_accounts(from_account_id, to_linked_bank_id):
+        # Validate source account
+        source_account = get_account(from_account_id)
+        if not source_account or source_account.user_id != user_id:
+            return None
+        
+        # Check sufficient balance
+        if source_account.balance < amount:
+            return None
+        
+        # Validate destination linked bank
+        dest_bank = get_bank_account(to_linked_bank_id)
+        if not dest_bank or dest_bank.user_id != user_id:
+            return None
+        
+        try:
+            with get_store().atomic():
+                # Perform transfer
+                transfer_id = str(uuid.uuid4())
+                
+                # Deduct from CyBank account (reserved until the gateway confirms)
+                new_source_balance = source_account.balance - amount
+                if not update_account_balance(from_account_id, new_source_balance):
+                    raise _TransferFailed
+                
+                # Record debit transaction in source account
+                debit_txn = record_transaction(from_account_id, amount, "DEBIT", 
+                                               f"Transfer to {dest_bank.bank_name} ({dest_bank.account_number})")
+                if not debit_txn:
+                    raise _TransferFailed  # rolls back the debit
+                
+                # Record transfer metadata
+                transfer_record = Transfer(
+                    transfer_id=transfer_id,
+                    user_id=user_id,
+                    from_account_id=from_account_id,
+                    from_account_name=source_account.account_name,
+                    to_linked_bank_id=to_linked_bank_id,
+                    to_bank_name=dest_bank.bank_name,
+                    to_account_number=dest_bank.account_number,
+                    amount=amount,
+                    description=description,
+                    timestamp=datetime.utcnow(),
+                    status="pending"
+                )
+                get_store().add_transfer(transfer_record)
+        except _TransferFailed:
+            return None
     
+    # Network call to the receiving bank; no account lock is held while waiting
+    if _send_external_transfers([transfer_record]):
+        return None  # refused: the debit was given back
     return transfer_record
 
 
+def settle_pending_transfers(limit: int = None, min_age: timedelta = None,
+                             gateway: BankGateway = None) -> dict:
+    """
+    Finish external transfers left "pending" (the gateway did not answer in time).
+    
+    Each one is looked up on the gateway: a confirmed credit completes the
+    transfer, a rejected one gives the reserved amount back, and a transfer
+    the gateway never received is sent again (credits are idempotent per
+    transfer_id). Transfers the gateway still cannot answer for stay pending.
+    
+    Args:
+        limit: At most this many transfers, oldest first
+        min_age: Skip transfers younger than this, their first answer may still
+                 be on the way (default: config.BANK_GATEWAY_TIMEOUT_SECONDS)
+        gateway: BankGateway to ask (default: get_gateway())
+    
+    Returns:
+        Dictionary containing:
+        - checked_count: pending transfers looked up
+        - completed_count: confirmed and completed
+        - failed_count: rejected, reserved amount given back
+        - pending_count: still pending (gateway timeout / unavailable)
+    """
+    result = {"checked_count": 0, "completed_count": 0, "failed_count": 0, "pending_count": 0}
+    if min_age is None:
+        min_age = timedelta(seconds=config.BANK_GATEWAY_TIMEOUT_SECONDS)
+    cutoff = datetime.utcnow() - min_age
+    records = [r for r in get_store().pending_transfers(limit) if r.timestamp <= cutoff]
+    if not records:
+        return result  # nothing to ask: do not start a gateway for it
+    gateway = gateway or get_gateway()
+    
+    confirmed, refused = [], []
+    for record in records:
+        result["checked_count"] += 1
+        try:
+            answer = gateway.status(record.transfer_id)
+            if answer is None:
+                answer = gateway.credit(record)  # never reached the gateway: send it again
+        except GatewayError:
+            result["pending_count"] += 1
+            continue
+        (confirmed if answer.confirmed else refused).append(record)
+    # Transfers settled meanwhile by the call that was waiting for their answer are not counted
+    result["completed_count"] = _complete_external_transfers(confirmed)
+    result["failed_count"] = _release_external_transfers(refused)
+    return result
+
+
+def resume_pending_transfers() -> dict:
+    """
+    Settle every pending transfer now (e.g. at startup, after a crash) and
+    keep sweeping in the background while some are left.
+    
+    Returns:
+        Result dictionary of settle_pending_transfers()
+    """
+    result = settle_pending_transfers(min_age=timedelta(0))
+    if result["pending_count"]:
+        _schedule_settle()
+    return result
+
+
+# Background sweep: runs settle_pending_transfers() every BANK_GATEWAY_SETTLE_INTERVAL_SECONDS
+# while transfers are pending (started when a transfer is left pending)
+_sweep_timer = None
+_sweep_lock = threading.Lock()
+
+
+def _schedule_settle():
+    global _sweep_timer
+    with _sweep_lock:
+        if _sweep_timer is not None:
+            return
+        _sweep_timer = threading.Timer(config.BANK_GATEWAY_SETTLE_INTERVAL_SECONDS, _sweep)
+        _sweep_timer.name = "cybank-settle-sweep"
+        _sweep_timer.daemon = True
+        _sweep_timer.start()
+
+
+def _sweep():
+    global _sweep_timer
+    try:
+        settle_pending_transfers()
+        remaining = bool(get_store().pending_transfers(1))
+    except Exception:
+        remaining = False  # store closed (shutting down); resume_pending_transfers() picks up next start
+    with _sweep_lock:
+        _sweep_timer = None
+    if remaining:
+        _schedule_settle()
+
+
+def stop_settle_sweep():
+    """Cancel the background sweep (on exit, before the store and gateway are closed)."""
+    global _sweep_timer
+    with _sweep_lock:
+        if _sweep_timer is not None:
+            _sweep_timer.cancel()
+            _sweep_timer = None
+
+
+def _send_external_transfers(records: list[Transfer]) -> list[tuple[Transfer, str]]:
+    """
+    Ask the gateway to credit reserved ("pending") transfers and settle each one by its answer.
+    
+    Returns:
+        (transfer, reason) for every transfer the gateway refused (its debit
+        is given back); unanswered ones stay pending for the background sweep
+    """
+    if not records:
+        return []
+    confirmed, refused, unanswered = [], [], False
+    for record, answer in zip(records, get_gateway().credit_many(records)):
+        if isinstance(answer, GatewayTimeout):
+            unanswered = True  # may have been credited: keep the reservation
+        elif isinstance(answer, GatewayError):
+            refused.append((record, str(answer)))  # not accepted by the gateway
+        elif answer.confirmed:
+            confirmed.append(record)
+        else:
+            refused.append((record, answer.reason))
+    _complete_external_transfers(confirmed)
+    _release_external_transfers([record for record, _ in refused])
+    if unanswered:
+        _schedule_settle()
+    return refused
+
+
+def _complete_external_transfers(records: list[Transfer]) -> int:
+    """Gateway confirmed: credit the linked banks and mark the transfers "completed" (returns how many)."""
+    if not records:
+        return 0
+    store = get_store()
+    done = []
+    # Settling always holds the source account's lock, so a transfer is never settled twice
+    with lock_accounts(*(r.from_account_id for r in records), *(r.to_linked_bank_id for r in records)):
+        with store.atomic():
+            for record in records:
+                current = store.get_transfer(record.transfer_id)
+                if current is None or current.status != "pending":
+                    continue
+                dest_bank = get_bank_account(record.to_linked_bank_id)
+                if dest_bank is not None:  # unlinked meanwhile: the bank still got the money
+                    update_bank_balance(dest_bank.linked_bank_id, dest_bank.balance + record.amount)
+                store.set_transfer_status(record.transfer_id, "completed")
+                done.append(record)
+    for record in done:
+        record.status = "completed"
+    return len(done)
+
+
+def _release_external_transfers(records: list[Transfer]) -> int:
+    """Gateway refused: give the reserved amounts back and mark the transfers "failed" (returns how many)."""
+    if not records:
+        return 0
+    store = get_store()
+    done = []
+    with lock_accounts(*(r.from_account_id for r in records)):
+        with store.atomic():
+            for record in records:
+                current = store.get_transfer(record.transfer_id)
+                if current is None or current.status != "pending":
+                    continue
+                source_account = get_account(record.from_account_id)
+                if source_account is not None:
+                    update_account_balance(source_account.account_id, source_account.balance + record.amount)
+                    record_transaction(source_account.account_id, record.amount, "CREDIT",
+                                       f"Reversal: transfer to {record.to_bank_name} ({record.to_account_number})")
+                store.set_transfer_status(record.transfer_id, "failed")
+                done.append(record)
+    for record in done:
+        record.status = "failed"
+    return len(done)
+
+
 def transfer_between_cybank_accounts(user_id: str, from_account_id: str, to_account_id: str, 
-                                      amount: float, description: str = "Transfer between accounts") -> dict | None:
+                                      amount: int, description: str = "Transfer between accounts") -> Transfer | None:
     """
     Transfer money between two CyBank accounts (same user).
     
@@ -89,94 +283,269 @@ def transfer_between_cybank_accounts(user_id: str, from_account_id: str, to_acco
         user_id: User's unique identifier
         from_account_id: Source CyBank account ID
         to_account_id: Destination CyBank account ID
-        amount: Amount to transfer
+        amount: Amount to transfer (centavos)
         description: Optional description for the transfer
     
     Returns:
-        Transfer record dict on success, None on failure
-    """
-    # Validate source account
-    source_account = get_account(from_account_id)
-    if not source_account or source_account.user_id != user_id:
-        return None
-    
-    # Check sufficient balance
-    if source_account.balance < amount:
-        return None
-    
-    # Validate destination account
-    dest_account = get_account(to_account_id)
-    if not dest_account or dest_account.user_id != user_id:
-        return None
-    
-    # Prevent self-transfer
-    if from_account_id == to_account_id:
-        return None
-    
-    # Perform transfer
-    transfer_id = str(uuid.uuid4())
-    
-    # Deduct from source
-    new_source_balance = source_account.balance - amount
-    if not update_account_balance(from_account_id, new_source_balance):
-        return None
-    
-    # Record debit in source
-    debit_txn = record_transaction(from_account_id, amount, "DEBIT", 
-                                   f"Transfer to {dest_account.account_name}")
-    if not debit_txn:
-        # Rollback
-        update_account_balance(from_account_id, source_account.balance)
-        return None
-    
-    # Add to destination
-    new_dest_balance = dest_account.balance + amount
-    if not update_account_balance(to_account_id, new_dest_balance):
-        # Rollback both
-        update_account_balance(from_account_id, source_account.balance)
-        return None
-    
-    # Record credit in destination
-    credit_txn = record_transaction(to_account_id, amount, "CREDIT", 
-                                    f"Transfer from {source_account.account_name}")
-    if not credit_txn:
-        # Rollback all
-        update_account_balance(from_account_id, source_account.balance)
-        update_account_balance(to_account_id, dest_account.balance)
-        return None
-    
-    # Record transfer metadata
-    transfer_record = {
-        "transfer_id": transfer_id,
-        "user_id": user_id,
-        "from_account_id": from_account_id,
-        "from_account_name": source_account.account_name,
-        "to_account_id": to_account_id,
-        "to_account_name": dest_account.account_name,
-        "amount": amount,
-        "description": description,
-        "timestamp": datetime.utcnow(),
-        "status": "completed"
-    }
-    _transfers[transfer_id] = transfer_record
+        Transfer record on success, None on failure
+    """
+    # The account locks keep the balance checks below valid until the writes are done
+    with lock_accounts(from_account_id, to_account_id):
+        # Validate source account
+        source_account = get_account(from_account_id)
+        if not source_account or source_account.user_id != user_id:
+            return None
+        
+        # Check sufficient balance
+        if source_account.balance < amount:
+            return None
+        
+        # Validate destination account
+        dest_account = get_account(to_account_id)
+        if not dest_account or dest_account.user_id != user_id:
+            return None
+        
+        # Prevent self-transfer
+        if from_account_id == to_account_id:
+            return None
+        
+        try:
+            with get_store().atomic():
+                # Perform transfer
+                transfer_id = str(uuid.uuid4())
+                
+                # Deduct from source
+                new_source_balance = source_account.balance - amount
+                if not update_account_balance(from_account_id, new_source_balance):
+                    raise _TransferFailed
+                
+                # Record debit in source
+                debit_txn = record_transaction(from_account_id, amount, "DEBIT", 
+                                               f"Transfer to {dest_account.account_name}")
+                if not debit_txn:
+                    raise _TransferFailed  # rolls back the debit
+                
+                # Add to destination
+                new_dest_balance = dest_account.balance + amount
+                if not update_account_balance(to_account_id, new_dest_balance):
+                    raise _TransferFailed  # rolls back debit + transaction
+                
+                # Record credit in destination
+                credit_txn = record_transaction(to_account_id, amount, "CREDIT", 
+                                                f"Transfer from {source_account.account_name}")
+                if not credit_txn:
+                    raise _TransferFailed  # rolls back everything
+                
+                # Record transfer metadata
+                transfer_record = Transfer(
+                    transfer_id=transfer_id,
+                    user_id=user_id,
+                    from_account_id=from_account_id,
+                    from_account_name=source_account.account_name,
+                    to_account_id=to_account_id,
+                    to_account_name=dest_account.account_name,
+                    amount=amount,
+                    description=description,
+                    timestamp=datetime.utcnow(),
+                    status="completed"
+                )
+                get_store().add_transfer(transfer_record)
+        except _TransferFailed:
+            return None
     
     return transfer_record
 
 
-def get_transfer_history(user_id: str) -> list[dict]:
+def _check_batch_item(item: dict, accounts: dict, banks: dict, balances: dict) -> str | None:
+    """Why a batch item cannot be applied (None if it can), given the running balances."""
+    amount = item.get("amount")
+    if isinstance(amount, bool) or not isinstance(amount, int) or amount <= 0:  # True is an int too
+        return "Amount must be a positive number of centavos"
+    source_id = item.get("from_account_id")
+    if source_id not in accounts:
+        return "Source account not found"
+    to_account_id, to_bank_id = item.get("to_account_id"), item.get("to_linked_bank_id")
+    if (to_account_id is None) == (to_bank_id is None):
+        return "Give exactly one of to_account_id or to_linked_bank_id"
+    if to_account_id is not None and to_account_id not in accounts:
+        return "Destination account not found"
+    if to_bank_id is not None and to_bank_id not in banks:
+        return "Destination linked bank not found"
+    if to_account_id == source_id:
+        return "Cannot transfer to the same account"
+    if balances[source_id] < amount:
+        return "Insufficient balance"
+    return None
+
+
+def transfer_batch(user_id: str, items: list[dict], all_or_nothing: bool = True) -> dict:
+    """
+    Apply many transfers of one user in a single commit (payroll, sweeps).
+    
+    Each item is a dict with "from_account_id", either "to_account_id"
+    (CyBank → CyBank) or "to_linked_bank_id" (CyBank → linked bank),
+    "amount" in centavos and an optional "description".
+    
+    The whole batch is validated first, in order, against running balances
+    (so an earlier credit can fund a later debit, same as looping over the
+    single-transfer functions). Movements are then netted per account: one
+    balance update per touched account, one bulk insert for the transactions
+    and one for the transfer records.
+    
+    Linked bank items are committed like transfer_to_external_bank: debited
+    and "pending" (reserved). After the commit they are all sent to the bank
+    gateway at once (pipelined); confirmed ones are completed, refused ones
+    are reversed and reported in `failed` (even with all_or_nothing, since
+    the receiving bank only answers after the commit), and unanswered ones
+    stay pending for the background sweep.
+    
+    Args:
+        user_id: User's unique identifier (must own every account in the batch)
+        items: Transfer requests
+        all_or_nothing: True = one invalid item rejects the whole batch;
+                        False = invalid items are skipped and reported
+    
+    Returns:
+        Dictionary containing:
+        - committed: True if the batch (or its valid items) was applied
+        - transfers: Transfer records that were applied ("completed" or "pending")
+        - failed: list of {"index", "error"} for rejected items
+        - completed_count: number of completed transfers
+        - pending_count: number of linked bank transfers still waiting for the gateway
+        - failed_count: number of rejected items
+        - total_amount: sum of applied transfers (centavos)
+    """
+    store = get_store()
+    now = datetime.utcnow()
+    transfers, txns, failed = [], [], []
+    external = {}  # transfer_id → batch index of the linked bank items
+    # Lock every account and linked bank the batch names, in one sorted acquisition
+    ids = [item.get(key) for item in items
+           for key in ("from_account_id", "to_account_id", "to_linked_bank_id")]
+    with lock_accounts(*ids):
+        try:
+            with store.atomic():
+                # One read of the user's accounts and banks for the whole batch
+                accounts = {a.account_id: a for a in store.list_user_accounts(user_id)}
+                banks = {b.linked_bank_id: b for b in store.list_user_linked_banks(user_id)}
+                balances = {account_id: a.balance for account_id, a in accounts.items()}
+                
+                for index, item in enumerate(items):
+                    error = _check_batch_item(item, accounts, banks, balances)
+                    if error:
+                        failed.append({"index": index, "error": error})
+                        continue
+                    
+                    amount = item["amount"]
+                    source = accounts[item["from_account_id"]]
+                    balances[source.account_id] -= amount
+                    record = Transfer(user_id=user_id, from_account_id=source.account_id, amount=amount,
+                                      from_account_name=source.account_name, timestamp=now)
+                    if item.get("to_linked_bank_id") is not None:
+                        bank = banks[item["to_linked_bank_id"]]
+                        record.status = "pending"  # reserved until the gateway confirms
+                        external[record.transfer_id] = index
+                        record.to_linked_bank_id = bank.linked_bank_id
+                        record.to_bank_name = bank.bank_name
+                        record.to_account_number = bank.account_number
+                        record.description = item.get("description", "Transfer to external bank")
+                        txns.append(Transaction(account_id=source.account_id, amount=-amount, transaction_type="DEBIT",
+                                                description=f"Transfer to {bank.bank_name} ({bank.account_number})",
+                                                timestamp=now))
+                    else:
+                        dest = accounts[item["to_account_id"]]
+                        balances[dest.account_id] += amount
+                        record.to_account_id = dest.account_id
+                        record.to_account_name = dest.account_name
+                        record.description = item.get("description", "Transfer between accounts")
+                        txns.append(Transaction(account_id=source.account_id, amount=-amount, transaction_type="DEBIT",
+                                                description=f"Transfer to {dest.account_name}", timestamp=now))
+                        txns.append(Transaction(account_id=dest.account_id, amount=amount, transaction_type="CREDIT",
+                                                description=f"Transfer from {source.account_name}", timestamp=now))
+                    transfers.append(record)
+                
+                if not transfers or (failed and all_or_nothing):
+                    transfers = []
+                    return _batch_report(transfers, failed, committed=False)
+                
+                # Net movement per account: one balance write each, whatever the batch size
+                deltas = {account_id: balance - accounts[account_id].balance
+                          for account_id, balance in balances.items() if balance != accounts[account_id].balance}
+                if deltas and not store.adjust_account_balances(deltas):
+                    raise _TransferFailed
+                if not store.append_transactions(txns):
+                    raise _TransferFailed
+                store.add_transfers(transfers)
+        except _TransferFailed:
+            return _batch_report([], failed, committed=False)
+    
+    # The linked bank legs go to the gateway in one pipelined round, outside the locks
+    refused = _send_external_transfers([t for t in transfers if t.transfer_id in external])
+    if refused:
+        refused_ids = {record.transfer_id for record, _ in refused}
+        transfers = [t for t in transfers if t.transfer_id not in refused_ids]
+        failed.extend({"index": external[record.transfer_id], "error": reason} for record, reason in refused)
+        failed.sort(key=lambda f: f["index"])
+    return _batch_report(transfers, failed, committed=True)
+
+
+def _batch_report(transfers: list, failed: list, committed: bool) -> dict:
+    return {
+        "committed": committed,
+        "transfers": transfers,
+        "failed": failed,
+        "completed_count": sum(t.status == "completed" for t in transfers),
+        "pending_count": sum(t.status == "pending" for t in transfers),
+        "failed_count": len(failed),
+        "total_amount": sum(t.amount for t in transfers)
+    }
+
+
+def get_transfer_history(user_id: str, direction: str = None, destination_id: str = None,
+                         min_amount: int = None, max_amount: int = None,
+                         since: datetime = None, until: datetime = None,
+                         limit: int = None, cursor: str = None,
+                         newest_first: bool = False) -> list[Transfer]:
     """
-    Get all transfers for a user.
+    Get transfers for a user, oldest first by default.
+    
+    Reads the user's own time-ordered transfer index, so the cost depends on
+    this user's transfers only. With no filters this is the whole history.
     
     Args:
         user_id: User's unique identifier
+        direction: "external" (to linked bank) or "internal" (between CyBank accounts)
+        destination_id: Only transfers to this linked_bank_id or account_id
+        min_amount: Only amounts >= min_amount (centavos)
+        max_amount: Only amounts <= max_amount (centavos)
+        since: Only transfers at or after this time
+        until: Only transfers before this time
+        limit: Page size (None = everything that matches)
+        cursor: next_cursor of the previous page
+        newest_first: Newest transfer first
     
     Returns:
-        List of transfer records
+        List of Transfer records; when filtering or paging it is a Page whose
+        next_cursor is None on the last page
+    
+    Raises:
+        ValueError: if direction is not one of TRANSFER_DIRECTIONS
     """
-    return [t for t in _transfers.values() if t["user_id"] == user_id]
+    if direction is not None and direction not in TRANSFER_DIRECTIONS:
+        raise ValueError(f"Unknown transfer direction '{direction}'. Valid: {', '.join(TRANSFER_DIRECTIONS)}")
+    filters = (direction, destination_id, min_amount, max_amount, since, until, limit, cursor)
+    if all(f is None for f in filters):
+        history = get_store().list_user_transfers(user_id)
+        return history[::-1] if newest_first else history
+    if limit is not None and limit < 1:
+        return Page()
+    return get_store().query_user_transfers(user_id, direction=direction, destination_id=destination_id,
+                                            min_amount=min_amount, max_amount=max_amount,
+                                            since=since, until=until, limit=limit, cursor=cursor,
+                                            newest_first=newest_first)
 
 
-def get_transfer(transfer_id: str) -> dict | None:
+def get_transfer(transfer_id: str) -> Transfer | None:
     """
     Retrieve a specific transfer by ID.
     
@@ -184,6 +553,6 @@ def get_transfer(transfer_id: str) -> dict | None:
         transfer_id: Transfer unique identifier
     
     Returns:
-        Transfer record or None if not found
+        Transfer or None if not found
     """
-    return _transfers.get(transfer_id)
+    return get_store().get_transfer(transfer_id)
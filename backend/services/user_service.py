@@ -1,20 +1,68 @@
 from backend.models.user import User
-from utils.auth import hash_password, verify_password
-
-_users = {}
+from backend.storage import get_store
+from utils.auth import hash_password, needs_rehash, submit_verify, averify_password, ahash_password
 
 def register_user(username: str, password: str, full_name: str, email: str = None):
-    for u in _users.values():
-        if u.username == username:
-            return None
+    if get_store().get_user_by_username(username):
+        return None
 
     pwd_hash = hash_password(password)
     user = User(username=username, password_hash=pwd_hash, full_name=full_name, email=email)
-    _users[user.user_id] = user
+    # add_user re-checks the username, in case it was taken in the meantime
+    if not get_store().add_user(user):
+        return None
     return user
 
+def _save_upgraded_hash(user: User, new_hash: str):
+    if get_store().set_password_hash(user.user_id, new_hash):
+        user.password_hash = new_hash
+
 def authenticate_user(username: str, password: str):
-    for u in _users.values():
-        if u.username == username and verify_password(password, u.password_hash):
-            return u
-    return None
\ No newline at end of file
+    u = get_store().get_user_by_username(username)
+    # The check runs on the bounded auth pool so concurrent logins queue up there
+    if u and submit_verify(password, u.password_hash).result():
+        # Password just verified: re-hash it if the KDF settings changed since it was stored
+        if needs_rehash(u.password_hash):
+            _save_upgraded_hash(u, hash_password(password))
+        return u
+    return None
+
+async def authenticate_user_async(username: str, password: str):
+    """
+    Async version of authenticate_user (password check runs off the event loop).
+    
+    Returns:
+        User on success, None on failure
+    """
+    u = get_store().get_user_by_username(username)
+    if u and await averify_password(password, u.password_hash):
+        if needs_rehash(u.password_hash):
+            _save_upgraded_hash(u, await ahash_password(password))
+        return u
+    return None
+
+def rename_user(user_id: str, new_username: str) -> bool:
+    """
+    Change a user's username (the username index is updated with it).
+    
+    Args:
+        user_id: User's unique identifier
+        new_username: New username
+    
+    Returns:
+        True if successful, False if user not found or username already taken
+    """
+    return get_store().rename_user(user_id, new_username)
+
+def search_users(prefix: str, limit: int = 20) -> list[User]:
+    """
+    Find users whose username starts with prefix (admin lookup).
+    
+    Args:
+        prefix: Username prefix (matched with the configured case policy)
+        limit: Maximum number of users returned
+    
+    Returns:
+        List of User objects ordered by username
+    """
+    return get_store().search_users(prefix, limit)
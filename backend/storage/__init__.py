@@ -0,0 +1,93 @@
+# backend.storage package
+"""
+Storage engine registry.
+
+Services call get_store() and never know which engine is behind it.
+The engine is picked once at startup (cli.main.main → init_store) from
+utils.config, or lazily on first use with the configured defaults.
+
+Engine modules are imported inside their factories, so startup only loads
+the engine that is actually picked.
+
+Adding an engine:
+    register_engine("sharded", lambda **opts: ShardedStore(**opts))
+    init_store("sharded", shards=8)
+"""
+import threading
+
+from backend.storage.base import Store
+from utils import config
+
+
+def _make_sqlite(path: str = None, pool_size: int = None, username_case: str = None, **_):
+    from backend.storage.sqlite import SQLiteStore
+    return SQLiteStore(path or config.DB_PATH, pool_size or config.DB_POOL_SIZE,
+                       username_case or config.USERNAME_CASE)
+
+
+def _make_memory(username_case: str = None, history: str = None, journal: str = None,
+                 fsync: str = None, fsync_interval_ms: int = None, snapshot_every: int = None, **_):
+    from backend.storage.journal import Journal
+    from backend.storage.memory import MemoryStore
+    journal_path = config.JOURNAL_PATH if journal is None else journal
+    wal = None
+    if journal_path:
+        wal = Journal(journal_path, fsync or config.JOURNAL_FSYNC,
+                      fsync_interval_ms or config.JOURNAL_FSYNC_INTERVAL_MS)
+    return MemoryStore(username_case or config.USERNAME_CASE, history or config.HISTORY_LAYOUT, wal,
+                       config.SNAPSHOT_EVERY if snapshot_every is None else snapshot_every)
+
+
+# engine name → factory(**options) returning a Store
+_ENGINES = {
+    "memory": _make_memory,
+    "sqlite": _make_sqlite,
+}
+
+_store = None
+_store_lock = threading.RLock()
+
+
+def register_engine(name: str, factory):
+    """Make a new storage engine selectable by name."""
+    _ENGINES[name] = factory
+
+
+def available_engines() -> list[str]:
+    """Names of all registered storage engines."""
+    return list(_ENGINES)
+
+
+def init_store(engine: str = None, **options) -> Store:
+    """
+    Open the process-wide store, closing the previous one if any.
+
+    Args:
+        engine: Registered engine name (default: config.STORAGE_ENGINE)
+        **options: Engine specific options (e.g. path, pool_size for sqlite;
+                   journal, fsync, fsync_interval_ms, snapshot_every for memory)
+
+    Returns:
+        The new Store
+
+    Raises:
+        ValueError: if the engine name is not registered
+    """
+    global _store
+    engine = engine or config.STORAGE_ENGINE
+    if engine not in _ENGINES:
+        raise ValueError(f"Unknown storage engine '{engine}'. Available: {', '.join(_ENGINES)}")
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+        _store = _ENGINES[engine](**options)
+        return _store
+
+
+def get_store() -> Store:
+    """Return the process-wide store, opening the configured engine on first use."""
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                init_store()
+    return _store
@@ -0,0 +1,380 @@
+# backend/storage/base.py
+"""
+Storage interface na ginagamit ng lahat ng services.
+
+Services never touch another service's data directly; they go through the
+Store returned by backend.storage.get_store(). Each engine (memory, sqlite,
+...) implements this class, so a faster store can be dropped in without
+changing any service code.
+
+KEY LOGIC:
+- Every method is keyed by ids and returns model objects
+- Lookups return None when the record does not exist
+- Mutations return False when the target record does not exist
+- atomic() groups several calls; an exception inside rolls all of them back
+- data_version(user_id) changes after every write to that user's accounts,
+  transactions, linked banks or transfers (used to cache reports)
+"""
+import itertools
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from collections.abc import Sequence
+from datetime import datetime
+from typing import NamedTuple
+
+from backend.models.compact import from_micros
+from backend.models.user import User
+from backend.models.account import Account
+from backend.models.account_stats import AccountStats
+from backend.models.transaction import Transaction
+from backend.models.linked_bank import LinkedBankAccount
+from backend.models.transfer import Transfer
+
+
+class Page(list):
+    """
+    One page of a paginated query (a plain list of model objects).
+
+    next_cursor is an opaque string to pass back as `cursor` for the next
+    page, or None when there are no more rows in the requested range.
+    """
+
+    def __init__(self, rows=(), next_cursor: str | None = None):
+        super().__init__(rows)
+        self.next_cursor = next_cursor
+
+
+class HistoryRows(NamedTuple):
+    """
+    A batch of one account's transactions, column by column (Store.load_histories).
+
+    All columns have the same length; rows are in timestamp order.
+    """
+
+    timestamps: Sequence[int]  # int microseconds since 1970-01-01, naive UTC (backend/models/compact.py)
+    amounts: Sequence[int]  # signed centavos (DEBIT rows negative)
+    types: Sequence[str]  # "CREDIT" / "DEBIT"
+    categories: Sequence[str | None]
+    descriptions: Sequence[str | None]
+
+
+# Shared by every store, so a version number is never handed out twice in a process
+_version_clock = itertools.count(1)
+
+
+class DataVersions:
+    """
+    Per-user data version counters of one store (see Store.data_version).
+
+    A user nobody has written to yet is at the version the store was opened
+    with; bump() moves users to a fresh number from the shared clock.
+    """
+
+    def __init__(self):
+        self._opened = next(_version_clock)
+        self._versions = {}  # user_id → version
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> int:
+        return self._versions.get(user_id, self._opened)
+
+    def bump(self, user_ids):
+        with self._lock:  # numbers are taken and stored in order, so a version never goes back
+            version = next(_version_clock)
+            for user_id in user_ids:
+                self._versions[user_id] = version
+
+
+class Store(ABC):
+    """Abstract storage engine for users, accounts, transactions, linked banks and transfers."""
+
+    name = "abstract"
+    versions: DataVersions | None = None  # engines that track data_version() set this
+
+    # ---------------- Transactions / lifecycle ----------------
+
+    @contextmanager
+    def atomic(self):
+        """Group several store calls into one all-or-nothing unit."""
+        yield self
+
+    @contextmanager
+    def group_commit(self):
+        """
+        Let the atomic() blocks inside wait for durability once, at the end.
+
+        Engines with a journal use this to release locks before the fsync so
+        other writers can share it; by the time the block exits, everything
+        committed inside it is durable. Default: no-op.
+        """
+        yield self
+
+    def close(self):
+        """Release any resources held by the engine."""
+
+    def data_version(self, user_id: str) -> int | None:
+        """
+        Version of everything a user owns: accounts, transactions, linked banks, transfers.
+
+        Moves to a new, higher number once a write that touched the user's
+        data ends (committed or rolled back), so anything computed from that
+        data while the version stayed the same is still current. Only writes
+        made through this Store object count.
+
+        Returns:
+            The version, or None if the engine does not track versions
+            (callers must not cache then)
+        """
+        if self.versions is None:
+            return None
+        return self.versions.get(user_id)
+
+    # ---------------- Users ----------------
+
+    @abstractmethod
+    def add_user(self, user: User) -> bool:
+        """Store a new user. Returns False if the username is already taken."""
+
+    @abstractmethod
+    def get_user(self, user_id: str) -> User | None:
+        """Look up a user by id."""
+
+    @abstractmethod
+    def get_user_by_username(self, username: str) -> User | None:
+        """Look up a user by username (using the engine's username case policy)."""
+
+    @abstractmethod
+    def rename_user(self, user_id: str, new_username: str) -> bool:
+        """Change a username. Returns False if the user is missing or the name is taken."""
+
+    @abstractmethod
+    def set_password_hash(self, user_id: str, password_hash: str) -> bool:
+        """Replace a user's stored password hash (e.g. rehash on login)."""
+
+    @abstractmethod
+    def delete_user(self, user_id: str) -> bool:
+        """Delete a user record (accounts are left untouched)."""
+
+    @abstractmethod
+    def search_users(self, prefix: str, limit: int = 20) -> list[User]:
+        """Users whose username starts with prefix, ordered by username."""
+
+    # ---------------- Accounts ----------------
+
+    @abstractmethod
+    def add_account(self, account: Account):
+        """Store a new CyBank account."""
+
+    @abstractmethod
+    def get_account(self, account_id: str) -> Account | None:
+        """Look up an account by id."""
+
+    @abstractmethod
+    def list_user_accounts(self, user_id: str) -> list[Account]:
+        """All accounts of a user, in creation order."""
+
+    @abstractmethod
+    def set_account_balance(self, account_id: str, balance: int) -> bool:
+        """Overwrite an account balance."""
+
+    def adjust_account_balances(self, deltas: dict[str, int]) -> bool:
+        """
+        Add a signed delta to several account balances at once.
+
+        Returns False (and changes nothing) if an account does not exist or
+        would end up negative. Engines may override with a bulk UPDATE.
+        """
+        with self.atomic():
+            accounts = {account_id: self.get_account(account_id) for account_id in deltas}
+            if any(a is None or a.balance + deltas[account_id] < 0 for account_id, a in accounts.items()):
+                return False
+            for account_id, delta in deltas.items():
+                self.set_account_balance(account_id, accounts[account_id].balance + delta)
+        return True
+
+    # ---------------- Transactions ----------------
+
+    @abstractmethod
+    def append_transaction(self, txn: Transaction) -> bool:
+        """Add a transaction to its account's history without touching the balance."""
+
+    @abstractmethod
+    def post_transaction(self, txn: Transaction) -> bool:
+        """
+        Add a transaction and apply its signed amount to the account balance.
+
+        Returns False (and changes nothing) if the account does not exist or
+        a negative amount would overdraw it.
+        """
+
+    def append_transactions(self, txns: list[Transaction]) -> bool:
+        """
+        Add many transactions at once (no balance change), e.g. for a batch.
+
+        Returns False (and adds nothing) if any account does not exist.
+        Engines may override with a bulk insert.
+        """
+        with self.atomic():
+            if any(self.get_account(account_id) is None for account_id in {t.account_id for t in txns}):
+                return False
+            for txn in txns:
+                self.append_transaction(txn)
+        return True
+
+    def load_histories(self, histories: dict[str, HistoryRows]) -> bool:
+        """
+        Bulk-load transaction histories (seeding, imports): the fast path.
+
+        Each account's balance moves by the sum of its rows. Unlike
+        post_transaction() nothing is checked per row: the caller guarantees
+        the amounts never overdraw the account. Transaction ids are new uuid4s.
+        Engines override this with a path that builds no per-row objects.
+
+        Returns:
+            False (and loads nothing) if an account does not exist or a batch
+            starts before that account's newest transaction
+        """
+        with self.atomic():
+            if not self._can_load(histories):
+                return False
+            for account_id, rows in histories.items():
+                self.append_transactions([
+                    Transaction(account_id, amount, transaction_type, description, category, timestamp=ts)
+                    for ts, amount, transaction_type, category, description in zip(*rows)])
+                account = self.get_account(account_id)
+                self.set_account_balance(account_id, account.balance + sum(rows.amounts))
+        return True
+
+    def _can_load(self, histories: dict[str, HistoryRows]) -> bool:
+        """load_histories() preconditions: accounts exist, batches start at or after their newest row."""
+        for account_id, rows in histories.items():
+            stats = self.get_account_stats(account_id)
+            if stats is None:
+                return False
+            if (len(rows.timestamps) and stats.last_timestamp is not None
+                    and from_micros(rows.timestamps[0]) < stats.last_timestamp):
+                return False
+        return True
+
+    @abstractmethod
+    def append_statement_rows(self, linked_bank_id: str, rows: HistoryRows) -> bool:
+        """
+        Add a batch of imported statement rows to a linked bank's history.
+
+        Linked bank histories share the transaction storage, keyed by
+        linked_bank_id: list_transactions(), query_transactions() and
+        get_account_stats() accept a linked_bank_id (stats are None until the
+        first import). The linked bank balance is not touched. Same row rules
+        as load_histories(): time order, not older than the newest row.
+
+        Returns:
+            False (and adds nothing) if the linked bank does not exist
+        """
+
+    @abstractmethod
+    def list_transactions(self, account_id: str) -> list[Transaction]:
+        """Transaction history of an account, oldest first."""
+
+    @abstractmethod
+    def query_transactions(self, account_id: str, since: datetime = None, until: datetime = None,
+                           limit: int = None, cursor: str = None,
+                           newest_first: bool = False, transaction_type: str = None,
+                           category: str = None) -> Page:
+        """
+        Range query over an account's time-ordered history.
+
+        Args:
+            since: Only transactions with timestamp >= since
+            until: Only transactions with timestamp < until
+            limit: Maximum rows in the page (None = all remaining)
+            cursor: next_cursor of the previous page (same query arguments)
+            newest_first: Page backwards from the newest transaction
+            transaction_type, category: Only rows with this type / category
+                (scans the rows in the time range, never the whole history)
+
+        Returns:
+            Page; only the rows of that page are loaded
+        """
+
+    @abstractmethod
+    def get_account_stats(self, account_id: str) -> AccountStats | None:
+        """
+        Running aggregates of an account's history (kept up to date by
+        append_transaction/post_transaction). None if the account does not exist.
+        """
+
+    # ---------------- Linked banks ----------------
+
+    @abstractmethod
+    def add_linked_bank(self, linked_bank: LinkedBankAccount):
+        """Store a new linked external bank account."""
+
+    @abstractmethod
+    def get_linked_bank(self, linked_bank_id: str) -> LinkedBankAccount | None:
+        """Look up a linked bank account by id."""
+
+    @abstractmethod
+    def list_user_linked_banks(self, user_id: str) -> list[LinkedBankAccount]:
+        """All linked bank accounts of a user, in the order they were linked."""
+
+    @abstractmethod
+    def stale_linked_banks(self, synced_before: datetime, limit: int = None) -> list[LinkedBankAccount]:
+        """Linked bank accounts (of every user) last synced before synced_before, stalest first."""
+
+    @abstractmethod
+    def set_linked_bank_balance(self, linked_bank_id: str, balance: int,
+                                synced_at: datetime) -> bool:
+        """Overwrite a linked bank balance and its last_synced time."""
+
+    @abstractmethod
+    def remove_linked_bank(self, linked_bank_id: str, user_id: str) -> bool:
+        """Delete a linked bank account if it belongs to user_id."""
+
+    # ---------------- Transfers ----------------
+
+    @abstractmethod
+    def add_transfer(self, record: Transfer):
+        """Store a transfer record."""
+
+    def add_transfers(self, records: list[Transfer]):
+        """Store many transfer records at once (engines may override with a bulk insert)."""
+        with self.atomic():
+            for record in records:
+                self.add_transfer(record)
+
+    @abstractmethod
+    def get_transfer(self, transfer_id: str) -> Transfer | None:
+        """Look up a transfer record by id."""
+
+    @abstractmethod
+    def set_transfer_status(self, transfer_id: str, status: str) -> bool:
+        """Change a transfer's status (e.g. "pending" → "completed" / "failed")."""
+
+    @abstractmethod
+    def pending_transfers(self, limit: int = None) -> list[Transfer]:
+        """Transfers (of every user) whose status is "pending", oldest first."""
+
+    @abstractmethod
+    def list_user_transfers(self, user_id: str) -> list[Transfer]:
+        """All transfer records of a user, oldest first."""
+
+    @abstractmethod
+    def query_user_transfers(self, user_id: str, direction: str = None, destination_id: str = None,
+                             min_amount: int = None, max_amount: int = None,
+                             since: datetime = None, until: datetime = None,
+                             limit: int = None, cursor: str = None,
+                             newest_first: bool = False) -> Page:
+        """
+        Filtered, paginated scan of one user's time-ordered transfers.
+
+        Args:
+            direction: "external" (to a linked bank) or "internal" (CyBank → CyBank)
+            destination_id: Only transfers to this linked_bank_id / account_id
+            min_amount, max_amount: Inclusive amount range
+            since, until: timestamp >= since and < until
+            limit, cursor, newest_first: Same paging rules as query_transactions()
+
+        Returns:
+            Page of Transfer; cost depends only on this user's transfers
+        """
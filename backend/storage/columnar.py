@@ -0,0 +1,248 @@
+# backend/storage/columnar.py
+"""
+Columnar (array-backed) transaction history for the memory engine.
+
+Instead of one Transaction object per row (compact id + timestamp +
+shared strings, ~170 bytes each), an account's history is kept as
+parallel typed arrays:
+
+    timestamps   int64  microseconds since 1970-01-01 (naive UTC)
+    amounts      int64  signed amount in centavos
+    types        uint32 id in the shared StringTable ("CREDIT", "DEBIT", ...)
+    categories   uint32 id in the shared StringTable (0 = None)
+    descriptions uint32 id in the shared StringTable (0 = None)
+    id_hi/id_lo  uint64 the transaction_id UUID as two 64-bit halves
+
+≈ 44 bytes per transaction. Transaction objects are only built when a caller
+indexes or iterates the history, so scans over e.g. `amounts` never create
+Python objects per row.
+
+Rows are kept in timestamp order, so time-range queries are a bisect over
+the `timestamps` column. A row is written to every column or to none: a
+value a column cannot hold leaves the history as it was.
+
+Enable with CYBANK_HISTORY=columnar (or init_store("memory", history="columnar")).
+"""
+import os
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from datetime import datetime
+
+from backend.models.transaction import Transaction
+from backend.models.compact import parse_id, to_micros, from_micros
+
+# byte → same byte with the uuid4 version nibble / variant bits set
+_VERSION_BYTE = bytes((b & 0x0F) | 0x40 for b in range(256))
+_VARIANT_BYTE = bytes((b & 0x3F) | 0x80 for b in range(256))
+
+
+def random_id_columns(count: int) -> tuple[array, array]:
+    """id_hi / id_lo columns for `count` new uuid4s, without a Python loop per id."""
+    hi = bytearray(os.urandom(8 * count))
+    lo = bytearray(os.urandom(8 * count))
+    # Version = bits 12-15 of id_hi, variant = top 2 bits of id_lo; patch those bytes in place
+    version_at, variant_at = (1, 7) if sys.byteorder == "little" else (6, 0)
+    hi[version_at::8] = hi[version_at::8].translate(_VERSION_BYTE)
+    lo[variant_at::8] = lo[variant_at::8].translate(_VARIANT_BYTE)
+    return array("Q", hi), array("Q", lo)
+
+
+class StringTable:
+    """Interns strings to small integer ids (id 0 is reserved for None)."""
+
+    def __init__(self):
+        self._strings = [None]
+        self._ids = {}
+
+    def intern(self, value: str | None) -> int:
+        if value is None:
+            return 0
+        string_id = self._ids.get(value)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(value)
+            self._ids[value] = string_id
+        return string_id
+
+    def lookup(self, string_id: int) -> str | None:
+        return self._strings[string_id]
+
+    def find(self, value: str | None) -> int | None:
+        """Id of an already interned string (None if it never was); does not intern."""
+        return 0 if value is None else self._ids.get(value)
+
+    def __iter__(self):
+        """The interned strings in id order (interning them again rebuilds the same ids)."""
+        return iter(self._strings[1:])
+
+    def __len__(self):
+        return len(self._strings) - 1
+
+
+class ColumnarHistory(Sequence):
+    """
+    One account's transactions stored column by column.
+
+    Behaves like the list it replaces: len(), indexing, slicing, iteration,
+    append() and pop(). Indexing materializes a new Transaction each time.
+    """
+
+    # Array typecodes of the columns, in _columns() order
+    TYPECODES = ("q", "q", "I", "I", "I", "Q", "Q")
+
+    def __init__(self, account_id: str, strings: StringTable):
+        self.account_id = account_id
+        self.strings = strings
+        self.timestamps = array("q")
+        self.amounts = array("q")
+        self.types = array("I")
+        self.categories = array("I")
+        self.descriptions = array("I")
+        self.id_hi = array("Q")
+        self.id_lo = array("Q")
+        self._odd_ids = {}  # row → transaction_id that is not a UUID string
+
+    @classmethod
+    def restore(cls, account_id: str, strings: StringTable, columns, odd_ids: dict = None):
+        """Rebuild a history from its column arrays (TYPECODES order), e.g. from a snapshot."""
+        history = cls(account_id, strings)
+        (history.timestamps, history.amounts, history.types, history.categories,
+         history.descriptions, history.id_hi, history.id_lo) = columns
+        history._odd_ids = dict(odd_ids or {})
+        return history
+
+    def export(self) -> tuple[tuple, dict]:
+        """The column arrays (TYPECODES order) and the non-UUID ids by row."""
+        return self._columns(), dict(self._odd_ids)
+
+    def _columns(self):
+        return (self.timestamps, self.amounts, self.types, self.categories,
+                self.descriptions, self.id_hi, self.id_lo)
+
+    def _encode(self, txn: Transaction) -> tuple:
+        id_int = parse_id(txn.transaction_id)
+        odd_id = None
+        if not isinstance(id_int, int):
+            id_int, odd_id = 0, txn.transaction_id
+        values = (to_micros(txn.timestamp), txn.amount,
+                  self.strings.intern(txn.transaction_type), self.strings.intern(txn.category),
+                  self.strings.intern(txn.description), id_int >> 64, id_int & 0xFFFFFFFFFFFFFFFF)
+        return values, odd_id
+
+    def _put_row(self, index: int, values: tuple):
+        """Insert one row's values into every column, or into none of them."""
+        written = []
+        try:
+            for column, value in zip(self._columns(), values):
+                column.insert(index, value)
+                written.append(column)
+        except (OverflowError, TypeError):
+            for column in written:
+                column.pop(index)
+            raise
+
+    def append(self, txn: Transaction):
+        values, odd_id = self._encode(txn)
+        row = len(self.timestamps)
+        self._put_row(row, values)
+        if odd_id is not None:
+            self._odd_ids[row] = odd_id
+
+    def insert(self, index: int, txn: Transaction):
+        """Insert a row before `index` (used for back-dated transactions)."""
+        values, odd_id = self._encode(txn)
+        self._put_row(index, values)
+        if self._odd_ids:
+            self._odd_ids = {(r + 1 if r >= index else r): v for r, v in self._odd_ids.items()}
+        if odd_id is not None:
+            self._odd_ids[index] = odd_id
+
+    def extend_rows(self, timestamps, amounts, types, categories, descriptions):
+        """
+        Append a batch given column by column (see backend.storage.base.HistoryRows)
+        without building Transaction objects; every row gets a new uuid4 id.
+
+        The rows must be in time order and not older than the current last row.
+        """
+        intern = self.strings.intern
+
+        def string_ids(values):
+            ids = {value: intern(value) for value in set(values)}
+            return map(ids.__getitem__, values)
+
+        id_hi, id_lo = random_id_columns(len(amounts))
+        size = len(self.timestamps)
+        try:
+            self.timestamps.extend(timestamps)
+            self.amounts.extend(amounts)
+            self.types.extend(string_ids(types))
+            self.categories.extend(string_ids(categories))
+            self.descriptions.extend(string_ids(descriptions))
+            self.id_hi.extend(id_hi)
+            self.id_lo.extend(id_lo)
+        except (OverflowError, TypeError):
+            self.truncate(size)  # keep the columns the same length
+            raise
+
+    def truncate(self, size: int):
+        """Drop every row from position `size` on (used to undo extend_rows)."""
+        for column in self._columns():
+            del column[size:]
+        if self._odd_ids:
+            self._odd_ids = {r: v for r, v in self._odd_ids.items() if r < size}
+
+    def bisect(self, ts: datetime, side: str = "left") -> int:
+        """Row position of `ts` in the time order (like bisect.bisect_left/right)."""
+        find = bisect_left if side == "left" else bisect_right
+        return find(self.timestamps, to_micros(ts))
+
+    def pop(self, index: int = -1) -> Transaction:
+        """Remove a row (used to undo an append or insert)."""
+        if index < 0:
+            index += len(self)
+        txn = self[index]
+        for column in self._columns():
+            column.pop(index)
+        if self._odd_ids:
+            self._odd_ids.pop(index, None)
+            self._odd_ids = {(r - 1 if r > index else r): v for r, v in self._odd_ids.items()}
+        return txn
+
+    def _transaction_id(self, row: int):
+        odd = self._odd_ids.get(row)
+        if odd is not None:
+            return odd
+        return (self.id_hi[row] << 64) | self.id_lo[row]  # compact form, see backend/models/compact.py
+
+    def _materialize(self, row: int) -> Transaction:
+        lookup = self.strings.lookup
+        return Transaction(
+            account_id=self.account_id,
+            amount=self.amounts[row],
+            transaction_type=lookup(self.types[row]),
+            description=lookup(self.descriptions[row]),
+            category=lookup(self.categories[row]),
+            transaction_id=self._transaction_id(row),
+            timestamp=self.timestamps[row],
+        )
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._materialize(r) for r in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("transaction index out of range")
+        return self._materialize(index)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self._materialize(row)
+
+    def __repr__(self):
+        return f"ColumnarHistory(account_id={self.account_id!r}, rows={len(self)})"
@@ -0,0 +1,106 @@
+# backend/storage/indexes.py
+"""
+Secondary indexes shared by the storage engines.
+
+KEY LOGIC:
+- normalize_username() applies the configured case policy, so "Juan" and
+  "juan" map to the same key when the policy is "casefold"
+- UsernameIndex gives O(1) key → user_id lookups for register/login
+- Prefix search keeps a sorted copy of the keys that is only re-sorted
+  when someone searches after new registrations (admin-only path), so
+  registration itself never pays for keeping the order
+"""
+from bisect import bisect_left
+
+USERNAME_CASE_POLICIES = ("casefold", "exact")
+
+
+def normalize_username(username: str, policy: str = "casefold") -> str:
+    """
+    Convert a username to its index key.
+
+    Args:
+        username: Username as typed by the user
+        policy: "casefold" (case-insensitive) or "exact"
+
+    Raises:
+        ValueError: if the policy is unknown
+    """
+    if policy == "casefold":
+        return username.casefold()
+    if policy == "exact":
+        return username
+    raise ValueError(f"Unknown username case policy '{policy}'. Valid: {', '.join(USERNAME_CASE_POLICIES)}")
+
+
+class UsernameIndex:
+    """Username key → user_id map with lazy prefix search."""
+
+    def __init__(self, policy: str = "casefold"):
+        normalize_username("", policy)  # validate policy early
+        self.policy = policy
+        self._ids = {}  # username key → user_id
+        self._sorted = []  # sorted keys, may contain removed keys
+        self._pending = []  # keys added since the last sort
+
+    def key(self, username: str) -> str:
+        return normalize_username(username, self.policy)
+
+    def get(self, username: str) -> str | None:
+        return self._ids.get(self.key(username))
+
+    def add(self, username: str, user_id: str) -> bool:
+        """Returns False if the (normalized) username is already taken."""
+        k = self.key(username)
+        if k in self._ids:
+            return False
+        self._ids[k] = user_id
+        self._pending.append(k)
+        return True
+
+    def remove(self, username: str) -> str | None:
+        """Drop a username; returns the user_id it pointed to."""
+        # Stale keys in _sorted are skipped by search() and dropped on the next sort
+        return self._ids.pop(self.key(username), None)
+
+    def rename(self, old_username: str, new_username: str) -> bool:
+        """Point new_username at old_username's user. False if taken or old is missing."""
+        old_key, new_key = self.key(old_username), self.key(new_username)
+        user_id = self._ids.get(old_key)
+        if user_id is None:
+            return False
+        if new_key == old_key:
+            return True
+        if new_key in self._ids:
+            return False
+        del self._ids[old_key]
+        self._ids[new_key] = user_id
+        self._pending.append(new_key)
+        return True
+
+    def search(self, prefix: str, limit: int = 20) -> list[str]:
+        """user_ids whose username key starts with prefix, in key order."""
+        if self._pending:
+            # Timsort merges the two sorted runs in linear time
+            self._pending.sort()
+            merged = self._sorted + self._pending
+            merged.sort()
+            # Drop removed keys and duplicates left by remove-then-re-add
+            self._sorted = [k for i, k in enumerate(merged)
+                            if k in self._ids and (i == 0 or merged[i - 1] != k)]
+            self._pending = []
+        p = self.key(prefix)
+        results = []
+        i = bisect_left(self._sorted, p)
+        while i < len(self._sorted) and len(results) < limit:
+            k = self._sorted[i]
+            if not k.startswith(p):
+                break
+            user_id = self._ids.get(k)
+            if user_id is not None:
+                results.append(user_id)
+            i += 1
+        return results
+
+    def __len__(self):
+        return len(self._ids)
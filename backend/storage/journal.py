@@ -0,0 +1,393 @@
+# backend/storage/journal.py
+"""
+Append-only write-ahead journal para sa memory engine.
+
+Every committed change to a MemoryStore (one atomic() block = one record)
+is appended to a binary file before the caller is told it is done. On the
+next start the store replays the journal, so deposits, withdrawals and
+transfers survive a restart even without a database.
+
+File layout:
+    MAGIC (8 bytes) | base lsn (u64) then records, each:
+    payload length (u32) | crc32 of payload (u32) | payload
+    payload = lsn (u64) | op count (u32) | ops
+    op      = opcode (u8) | value count (u8) | values
+    value   = b"N" | b"I" int64 | b"T" int64 micros | b"S" u32 length + utf-8
+
+KEY LOGIC:
+- Group commit: writers queue encoded records under a short lock
+  (submit), then wait(). The first waiter becomes the leader and does one
+  write + fsync for everything queued so far; the others wake up already
+  durable. Under load one fsync covers many operations.
+- fsync policy:
+    "every-op"  wait() returns only after the record is fsync'd
+    "interval"  wait() returns after the OS write; a background thread
+                fsyncs every interval_ms (a crash loses at most that window)
+    "off"       OS write only, no fsync (the OS decides when to flush)
+- Every record carries a CRC32; reading stops at the first record that is
+  short or fails its checksum (a torn write at crash time) and opening a
+  journal cuts that tail off before appending
+- A write or fsync that fails stops the journal for good: part of the
+  batch may be on disk and the rest lost, so appending later records after
+  it would let replay apply them without the ones before. Every thread
+  waiting on a record that was not durable yet, and every later submit,
+  raises JournalFailed (reopen the store to recover up to the last good record)
+- After a snapshot (backend/storage/snapshot.py) covers every record,
+  reset() swaps in an empty journal whose base lsn is the snapshot's, so
+  lsns keep counting up across restarts
+"""
+import os
+import struct
+import threading
+import zlib
+from datetime import datetime
+
+from backend.storage.columnar import to_micros, from_micros
+
+MAGIC = b"CYBJRNL1"
+FSYNC_POLICIES = ("every-op", "interval", "off")
+
+_FILE_HEADER = struct.Struct("<8sQ")  # MAGIC, base lsn
+_HEADER = struct.Struct("<II")  # payload length, crc32
+_RECORD = struct.Struct("<QI")  # lsn, op count (a transfer_batch can log 100k+ ops)
+_OP = struct.Struct("<BB")  # opcode, value count
+_I64 = struct.Struct("<q")
+_U32 = struct.Struct("<I")
+
+
+class JournalFailed(OSError):
+    """A journal write or fsync failed earlier; the journal takes no more records."""
+
+
+def _encode_value(out: bytearray, value):
+    if value is None:
+        out += b"N"
+    elif isinstance(value, int) and not isinstance(value, bool):
+        out += b"I"
+        out += _I64.pack(value)
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        out += b"S"
+        out += _U32.pack(len(data))
+        out += data
+    elif isinstance(value, datetime):
+        out += b"T"
+        out += _I64.pack(to_micros(value))
+    else:
+        raise TypeError(f"Cannot journal value of type {type(value).__name__}")
+
+
+def encode_record(lsn: int, ops: list[tuple]) -> bytes:
+    """
+    Encode one record (header + payload).
+
+    Args:
+        lsn: Log sequence number of the record
+        ops: List of (opcode, *values); values are None, int, str or datetime
+
+    Returns:
+        The bytes to append to the journal file
+    """
+    payload = bytearray(_RECORD.pack(lsn, len(ops)))
+    for opcode, *values in ops:
+        payload += _OP.pack(opcode, len(values))
+        for value in values:
+            _encode_value(payload, value)
+    return _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_payload(payload) -> tuple[int, list[tuple]]:
+    """Inverse of encode_record() for a checksummed payload: (lsn, ops)."""
+    lsn, count = _RECORD.unpack_from(payload, 0)
+    pos = _RECORD.size
+    ops = []
+    for _ in range(count):
+        opcode, nvalues = _OP.unpack_from(payload, pos)
+        pos += _OP.size
+        op = [opcode]
+        for _ in range(nvalues):
+            tag = payload[pos]
+            pos += 1
+            if tag == 0x4E:  # N
+                op.append(None)
+            elif tag == 0x49:  # I
+                op.append(_I64.unpack_from(payload, pos)[0])
+                pos += 8
+            elif tag == 0x54:  # T
+                op.append(from_micros(_I64.unpack_from(payload, pos)[0]))
+                pos += 8
+            else:  # S
+                size = _U32.unpack_from(payload, pos)[0]
+                pos += 4
+                op.append(bytes(payload[pos:pos + size]).decode("utf-8"))
+                pos += size
+        ops.append(tuple(op))
+    return lsn, ops
+
+
+def unpack_records(buf) -> list[list[tuple]]:
+    """
+    Decode a buffer that holds only whole records (e.g. a snapshot section).
+
+    Raises:
+        ValueError: if a record is short or fails its checksum
+    """
+    records = []
+    pos, end = 0, len(buf)
+    while pos < end:
+        if end - pos < _HEADER.size:
+            raise ValueError("truncated record header")
+        size, crc = _HEADER.unpack_from(buf, pos)
+        pos += _HEADER.size
+        payload = buf[pos:pos + size]
+        if len(payload) < size or zlib.crc32(payload) != crc:
+            raise ValueError("record checksum mismatch")
+        records.append(decode_payload(payload)[1])
+        pos += size
+    return records
+
+
+def _write_header(path: str, base_lsn: int):
+    """Atomically replace path with an empty journal starting after base_lsn."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_FILE_HEADER.pack(MAGIC, base_lsn))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    fsync_directory(path)
+
+
+def fsync_directory(path: str):
+    """Make a rename inside the directory durable (not supported on Windows)."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def scan_records(f, after_lsn: int = 0):
+    """
+    Yield (end_offset, lsn, ops) for each valid record of an open journal file.
+
+    f must be positioned just after the file header. Stops quietly at the
+    first short or corrupt record. Records with lsn <= after_lsn are skipped
+    without decoding their ops (ops is None for those).
+    """
+    offset = f.tell()
+    while True:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return
+        size, crc = _HEADER.unpack(header)
+        payload = f.read(size)
+        if len(payload) < size or size < _RECORD.size or zlib.crc32(payload) != crc:
+            return
+        offset += _HEADER.size + size
+        lsn = _RECORD.unpack_from(payload, 0)[0]
+        if lsn <= after_lsn:
+            yield offset, lsn, None
+        else:
+            yield offset, lsn, decode_payload(payload)[1]
+
+
+class Journal:
+    """Append-only, checksummed, group-committed journal file."""
+
+    def __init__(self, path: str, fsync: str = "every-op", interval_ms: int = 10):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync}'. Valid: {', '.join(FSYNC_POLICIES)}")
+        self.path = path
+        self.fsync = fsync
+        self.interval_ms = interval_ms
+        self.fsync_count = 0  # how many fsyncs were issued
+        self.record_count = 0  # records written since open
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        if not os.path.exists(path) or os.path.getsize(path) < _FILE_HEADER.size:
+            # New journal (or a crash while creating one, before any record)
+            _write_header(path, 0)
+        self._file = open(path, "a+b")
+        self._file.seek(0)
+        magic, self.base_lsn = _FILE_HEADER.unpack(self._file.read(_FILE_HEADER.size))
+        if magic != MAGIC:
+            self._file.close()
+            raise ValueError(f"{path} is not a CyBank journal")
+        # Find the end of the last good record and drop any torn tail after it
+        end, last_lsn = _FILE_HEADER.size, self.base_lsn
+        for end, last_lsn, _ in scan_records(self._file, after_lsn=float("inf")):
+            pass
+        self._file.truncate(end)
+        self._file.seek(end)
+
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._queue = []  # encoded records not written yet
+        self._next_lsn = last_lsn + 1
+        self._written_lsn = last_lsn  # handed to the OS
+        self._durable_lsn = last_lsn  # fsync'd
+        self._flushing = False
+        self._failure = None  # the write / fsync error that stopped the journal
+        self._closed = threading.Event()
+        self._flusher = None
+        if fsync == "interval":
+            self._flusher = threading.Thread(target=self._flush_periodically, daemon=True,
+                                             name="cybank-journal-fsync")
+            self._flusher.start()
+
+    @property
+    def last_lsn(self) -> int:
+        """LSN of the newest record submitted so far (0 if none)."""
+        return self._next_lsn - 1
+
+    @property
+    def failed(self) -> bool:
+        return self._failure is not None
+
+    def raise_if_failed(self):
+        """Raise JournalFailed if an earlier write or fsync failed."""
+        if self._failure is not None:
+            raise JournalFailed(f"Journal {self.path} stopped after a failed write: {self._failure}") \
+                from self._failure
+
+    def records(self, after_lsn: int = 0):
+        """
+        Yield (lsn, ops) for every valid record after after_lsn, oldest first.
+
+        Reads through a separate handle, so it is safe while the journal is open.
+        """
+        with open(self.path, "rb") as f:
+            f.seek(_FILE_HEADER.size)
+            for _, lsn, ops in scan_records(f, after_lsn):
+                if ops is not None:
+                    yield lsn, ops
+
+    def submit(self, ops: list[tuple]) -> int:
+        """
+        Queue one record (cheap; call it while holding the store lock so the
+        journal order matches the order changes were applied).
+
+        Returns:
+            The record's lsn, to pass to wait()
+
+        Raises:
+            TypeError: a value that cannot be journaled (nothing is queued)
+            JournalFailed: an earlier write failed (nothing is queued)
+        """
+        with self._lock:
+            self.raise_if_failed()
+            lsn = self._next_lsn
+            record = encode_record(lsn, ops)  # raises before anything is queued
+            self._next_lsn += 1
+            self._queue.append(record)
+            return lsn
+
+    def wait(self, lsn: int):
+        """
+        Block until record lsn is as durable as the fsync policy requires.
+
+        Raises:
+            JournalFailed: the write or fsync that should have covered lsn failed
+        """
+        self._commit(lsn, durable=self.fsync == "every-op")
+
+    def sync(self):
+        """Write and fsync everything submitted so far."""
+        self._commit(self.last_lsn, durable=True)
+
+    def _commit(self, lsn: int, durable: bool):
+        with self._cond:
+            while (self._durable_lsn if durable else self._written_lsn) < lsn:
+                self.raise_if_failed()
+                if self._flushing:
+                    # Another thread is writing; it may cover our record too
+                    self._cond.wait()
+                    continue
+                batch, self._queue = self._queue, []
+                upto = self._next_lsn - 1
+                self._flushing = True
+                self._lock.release()
+                error = None
+                try:
+                    if batch:
+                        self._file.write(b"".join(batch))
+                        self._file.flush()
+                    if durable:
+                        os.fsync(self._file.fileno())
+                except BaseException as e:
+                    error = e
+                self._lock.acquire()
+                self._flushing = False
+                self._cond.notify_all()
+                if error is not None:
+                    # Never advance the lsns: the leader and every waiter it covered raise
+                    self._failure = error
+                    continue
+                self.record_count += len(batch)
+                self._written_lsn = upto
+                if durable:
+                    self.fsync_count += 1
+                    self._durable_lsn = upto
+
+    def advance(self, lsn: int):
+        """Make sure the next record gets an lsn above `lsn` (e.g. a loaded snapshot's)."""
+        with self._lock:
+            if self._next_lsn <= lsn:
+                self._next_lsn = lsn + 1
+                self._written_lsn = self._durable_lsn = lsn
+
+    def reset(self, lsn: int):
+        """
+        Start over with an empty journal once a durable snapshot covers
+        every record up to lsn.
+
+        The caller must stop new submits meanwhile (the store holds its lock)
+        and lsn must be the last submitted lsn. Threads still waiting on a
+        dropped record are released: the snapshot made it durable.
+
+        Raises:
+            JournalFailed: an earlier write failed (the journal is left as it is)
+        """
+        with self._cond:
+            while self._flushing:
+                self._cond.wait()
+            self.raise_if_failed()
+            if lsn < self._next_lsn - 1:
+                raise ValueError(f"snapshot at lsn {lsn} does not cover lsn {self._next_lsn - 1}")
+            self._file.close()
+            _write_header(self.path, lsn)
+            self._file = open(self.path, "a+b")
+            self._file.seek(0, os.SEEK_END)
+            self.base_lsn = lsn
+            self._queue = []
+            self._next_lsn = lsn + 1
+            self._written_lsn = self._durable_lsn = lsn
+            self._cond.notify_all()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.interval_ms / 1000):
+            if self._durable_lsn < self.last_lsn and not self.failed:
+                try:
+                    self.sync()
+                except JournalFailed:
+                    pass  # the writers waiting on those records raise it
+
+    def close(self):
+        """Flush and fsync what is queued, then close the file (only close it after a failed write)."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        try:
+            if not self.failed:
+                self.sync()
+        finally:
+            self._file.close()
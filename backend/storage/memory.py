@@ -0,0 +1,828 @@
+# backend/storage/memory.py
+"""
+In-memory storage engine (same behavior as the original module-level dicts).
+
+Data lives only while the process runs. Objects returned are the stored
+objects themselves, so e.g. an Account fetched before a deposit shows the
+new balance afterwards.
+
+KEY LOGIC:
+- history="columnar" keeps each account's transactions in typed arrays
+  (backend/storage/columnar.py) instead of a list of Transaction objects
+- Each account's history stays sorted by timestamp (back-dated entries are
+  inserted in place), so query_transactions() bisects to the requested range
+  and only touches the rows of the page it returns
+- Page cursors are keysets like SQLite's: "<timestamp micros>|<n>" names the
+  last row of the page as the n-th row with that timestamp (rows with equal
+  timestamps keep their insertion order), so a back-dated insert between
+  two pages does not shift the next page the way a row position would
+- Transfers are also indexed per user in time order, so transfer history
+  never scans other users' transfers
+- atomic() holds a re-entrant lock and keeps an undo log; if the block raises,
+  every change made inside it is undone in reverse order
+- Single-call mutations run as their own atomic() block, so they never
+  interleave with an atomic block on another thread
+- With a journal (backend/storage/journal.py) every committed atomic block
+  is also appended as one record; the store lock is released before waiting
+  for the fsync, so concurrent writers share one group commit. Inside
+  group_commit() the wait moves to the end of that block
+- Every atomic() block collects the users whose data it touched and bumps
+  their data_version() when it ends, after a rollback too (readers see
+  changes before the block ends, so a version must not outlive them)
+- Imported bank statements (append_statement_rows) live in the same
+  history/aggregate dicts, keyed by linked_bank_id
+- load_histories() appends whole column batches (no undo log, no journal
+  record per row) and then takes a snapshot if there is a journal
+- checkpoint() writes a snapshot (backend/storage/snapshot.py) of the whole
+  store and empties the journal; it runs every snapshot_every journal
+  records and on close(). Opening the store loads the snapshot, then
+  replays only the journal records written after it
+"""
+import heapq
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import repeat
+from operator import attrgetter
+
+from backend.models.user import User
+from backend.models.account import Account
+from backend.models.account_stats import AccountStats
+from backend.models.transaction import Transaction
+from backend.models.linked_bank import LinkedBankAccount
+from backend.models.transfer import Transfer
+from backend.storage.base import Store, Page, HistoryRows, DataVersions
+from backend.storage.indexes import UsernameIndex
+from backend.storage.columnar import ColumnarHistory, StringTable, from_micros, to_micros
+from backend.storage.journal import Journal
+from backend.storage.snapshot import Snapshot, read_snapshot, write_snapshot
+
+HISTORY_LAYOUTS = ("list", "columnar")
+
+# Journal opcodes (never renumber: old journals must still replay)
+_OP_ADD_USER = 1
+_OP_RENAME_USER = 2
+_OP_SET_PASSWORD_HASH = 3
+_OP_DELETE_USER = 4
+_OP_ADD_ACCOUNT = 5
+_OP_SET_ACCOUNT_BALANCE = 6
+_OP_APPEND_TRANSACTION = 7
+_OP_ADD_LINKED_BANK = 8
+_OP_SET_LINKED_BANK_BALANCE = 9
+_OP_REMOVE_LINKED_BANK = 10
+_OP_ADD_TRANSFER = 11
+_OP_APPEND_STATEMENT_ROW = 12
+_OP_SET_TRANSFER_STATUS = 13
+# Snapshot-only opcodes
+_OP_STRING = 100
+_OP_ACCOUNT_STATS = 101
+_OP_CATEGORY_TOTAL = 102
+
+
+def _field_values(model):
+    """Getter for a model's fields in constructor order (model(*values) rebuilds it)."""
+    return attrgetter(*model.FIELDS)
+
+
+_USER_VALUES = _field_values(User)
+_ACCOUNT_VALUES = _field_values(Account)
+_TRANSACTION_VALUES = _field_values(Transaction)
+_LINKED_BANK_VALUES = _field_values(LinkedBankAccount)
+_TRANSFER_VALUES = _field_values(Transfer)
+
+
+def _timestamp_at(history, row: int) -> datetime:
+    if isinstance(history, ColumnarHistory):
+        return from_micros(history.timestamps[row])
+    return history[row].timestamp
+
+
+def _bisect_time(history, ts: datetime, side: str = "left") -> int:
+    """Row position of ts in a (time-ordered) history or transfer list, list or columnar."""
+    if isinstance(history, ColumnarHistory):
+        return history.bisect(ts, side)
+    find = bisect_left if side == "left" else bisect_right
+    return find(history, ts, key=attrgetter("timestamp"))
+
+
+def _row_cursor(rows, row: int) -> str:
+    """Keyset cursor of a page's last row: its timestamp and how many earlier rows share it."""
+    ts = _timestamp_at(rows, row)
+    return f"{to_micros(ts)}|{row - _bisect_time(rows, ts)}"
+
+
+def _cursor_row(rows, cursor: str, newest_first: bool) -> int:
+    """
+    Where the page after a cursor starts (oldest-first) or ends, exclusive
+    (newest-first), in today's row positions.
+    """
+    micros, offset = cursor.rsplit("|", 1)
+    ts = from_micros(int(micros))
+    row = _bisect_time(rows, ts) + int(offset) + (0 if newest_first else 1)
+    return min(row, _bisect_time(rows, ts, "right"))
+
+
+def _scan_page(rows, keep, lo: int, hi: int, limit: int | None, cursor: str | None,
+               newest_first: bool) -> Page:
+    """
+    One page of the rows in positions [lo, hi) for which keep(position) is true.
+
+    Same cursors as the unfiltered pages: the keyset of the page's last row.
+    """
+    if newest_first:
+        end = min(hi, _cursor_row(rows, cursor, True)) if cursor else hi
+        positions = range(end - 1, lo - 1, -1)
+    else:
+        positions = range(max(lo, _cursor_row(rows, cursor, False)) if cursor else lo, hi)
+    page = Page()
+    last = None
+    for pos in positions:
+        if not keep(pos):
+            continue
+        if limit is not None and len(page) == limit:
+            # One more match exists, so there is a next page after the last row
+            page.next_cursor = _row_cursor(rows, last)
+            break
+        page.append(rows[pos])
+        last = pos
+    return page
+
+
+class MemoryStore(Store):
+    """Dict-backed Store; nothing survives a restart."""
+
+    name = "memory"
+
+    def __init__(self, username_case: str = "casefold", history: str = "list",
+                 journal: Journal = None, snapshot_every: int = 0):
+        if history not in HISTORY_LAYOUTS:
+            raise ValueError(f"Unknown history layout '{history}'. Valid: {', '.join(HISTORY_LAYOUTS)}")
+        self.history_layout = history
+        self._strings = StringTable()  # shared by all columnar histories
+        self._users = {}  # user_id → User
+        self._usernames = UsernameIndex(username_case)  # username key → user_id
+        self._accounts = {}  # account_id → Account
+        self._user_accounts = {}  # user_id → list of account_ids
+        self._account_transactions = {}  # account_id → list of Transaction (or ColumnarHistory)
+        self._account_stats = {}  # account_id → AccountStats
+        self._linked_banks = {}  # linked_bank_id → LinkedBankAccount
+        self._user_linked_banks = {}  # user_id → list of linked_bank_ids
+        self._transfers = {}  # transfer_id → Transfer
+        self._user_transfers = {}  # user_id → list of Transfer, oldest first
+        self._pending_transfers = {}  # transfer_id → Transfer with status "pending"
+
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self.versions = DataVersions()
+
+        self.journal = None  # set after loading so replayed changes are not logged again
+        self.snapshot_every = snapshot_every  # journal records between snapshots (0 = only on close)
+        self.snapshot_path = None
+        self._snapshot_lsn = 0
+        self._unjournaled = False  # bulk-loaded rows that only a snapshot can persist
+        self._checkpointing = threading.Lock()
+        if journal is not None:
+            self.snapshot_path = f"{journal.path}.snapshot"
+            snapshot = read_snapshot(self.snapshot_path)
+            if snapshot is not None:
+                self._load_snapshot(snapshot)
+                self._snapshot_lsn = snapshot.lsn
+                journal.advance(snapshot.lsn)
+            for _, ops in journal.records(after_lsn=self._snapshot_lsn):
+                self._apply(ops)
+        self.journal = journal
+
+    # ---------------- Transactions / lifecycle ----------------
+
+    @contextmanager
+    def atomic(self):
+        if getattr(self._local, "undo", None) is not None:
+            # Nested block joins the outer one (this thread already holds the lock)
+            yield self
+            return
+        lsn = None
+        with self._lock:
+            self._local.undo = []
+            self._local.ops = []
+            self._local.touched = set()
+            try:
+                yield self
+                if self._local.ops and self.journal is not None:
+                    # Still inside the try: a record that cannot be journaled is undone too
+                    lsn = self.journal.submit(self._local.ops)
+            except BaseException:
+                for undo in reversed(self._local.undo):
+                    undo()
+                raise
+            finally:
+                if self._local.touched:
+                    self.versions.bump(self._local.touched)
+                self._local.undo = None
+                self._local.ops = None
+                self._local.touched = None
+        if lsn is not None:
+            if getattr(self._local, "deferred_lsn", None) is not None:
+                self._local.deferred_lsn = lsn  # group_commit() waits on exit
+            else:
+                # Outside the lock: other writers keep going and join the same fsync
+                self._committed(lsn)
+
+    @contextmanager
+    def group_commit(self):
+        if self.journal is None or getattr(self._local, "deferred_lsn", None) is not None:
+            yield self
+            return
+        self._local.deferred_lsn = 0
+        try:
+            yield self
+        finally:
+            lsn, self._local.deferred_lsn = self._local.deferred_lsn, None
+            if lsn:
+                self._committed(lsn)
+
+    def _committed(self, lsn: int):
+        """Wait for the journal, then take a snapshot if enough records piled up."""
+        self.journal.wait(lsn)
+        if (self.snapshot_every and lsn - self._snapshot_lsn >= self.snapshot_every
+                and self._checkpointing.acquire(blocking=False)):
+            try:
+                self.checkpoint()
+            finally:
+                self._checkpointing.release()
+
+    def checkpoint(self) -> int | None:
+        """
+        Write a snapshot of the whole store and start an empty journal.
+
+        Holds the store lock while writing, so the snapshot is consistent
+        (writers wait meanwhile).
+
+        Returns:
+            The journal lsn the snapshot covers, or None without a journal
+
+        Raises:
+            JournalFailed: an earlier journal write failed
+        """
+        if self.journal is None:
+            return None
+        if getattr(self._local, "undo", None) is not None:
+            raise RuntimeError("checkpoint() cannot run inside atomic()")
+        with self._lock:
+            self.journal.raise_if_failed()
+            lsn = self.journal.last_lsn
+            if lsn == self._snapshot_lsn and not self._unjournaled and os.path.exists(self.snapshot_path):
+                return lsn  # nothing new since the last snapshot
+            write_snapshot(self.snapshot_path, lsn, self._snapshot_histories(), self._snapshot_ops())
+            self.journal.reset(lsn)
+            self._snapshot_lsn = lsn
+            self._unjournaled = False
+            return lsn
+
+    def _snapshot_histories(self):
+        for account_id, history in self._account_transactions.items():
+            if not isinstance(history, ColumnarHistory):
+                columnar = ColumnarHistory(account_id, self._strings)
+                for txn in history:
+                    columnar.append(txn)
+                history = columnar
+            yield (account_id, *history.export())
+
+    def _snapshot_ops(self):
+        # Strings first: loading interns them again in the same order, so ids match
+        for value in self._strings:
+            yield (_OP_STRING, value)
+        for user in self._users.values():
+            yield (_OP_ADD_USER, *_USER_VALUES(user))
+        for account_ids in self._user_accounts.values():
+            for account_id in account_ids:
+                yield (_OP_ADD_ACCOUNT, *_ACCOUNT_VALUES(self._accounts[account_id]))
+        for bank_ids in self._user_linked_banks.values():
+            for bank_id in bank_ids:
+                yield (_OP_ADD_LINKED_BANK, *_LINKED_BANK_VALUES(self._linked_banks[bank_id]))
+        # Accounts and linked banks with an imported statement
+        for owner_id, stats in self._account_stats.items():
+            yield (_OP_ACCOUNT_STATS, owner_id, stats.total_credits, stats.total_debits,
+                   stats.transaction_count, stats.first_timestamp, stats.last_timestamp)
+            for category, total in stats.category_totals.items():
+                yield (_OP_CATEGORY_TOTAL, owner_id, category, total)
+        for transfers in self._user_transfers.values():
+            for record in transfers:
+                yield (_OP_ADD_TRANSFER, *_TRANSFER_VALUES(record))
+
+    def _load_snapshot(self, snapshot: Snapshot):
+        """Fill the (empty) store straight from a snapshot; aggregates are not recomputed."""
+        for opcode, *values in snapshot.ops:
+            if opcode == _OP_ADD_TRANSFER:
+                record = Transfer(*values)
+                self._transfers[record.transfer_id] = record
+                self._user_transfers.setdefault(record.user_id, []).append(record)
+                if record.status == "pending":
+                    self._pending_transfers[record.transfer_id] = record
+            elif opcode == _OP_CATEGORY_TOTAL:
+                account_id, category, total = values
+                self._account_stats[account_id].category_totals[category] = total
+            elif opcode == _OP_ACCOUNT_STATS:
+                self._account_stats[values[0]] = AccountStats(*values)
+            elif opcode == _OP_ADD_ACCOUNT:
+                account = Account(*values)
+                self._accounts[account.account_id] = account
+                self._user_accounts.setdefault(account.user_id, []).append(account.account_id)
+            elif opcode == _OP_ADD_USER:
+                user = User(*values)
+                self._users[user.user_id] = user
+                self._usernames.add(user.username, user.user_id)
+            elif opcode == _OP_ADD_LINKED_BANK:
+                bank_acct = LinkedBankAccount(*values)
+                self._linked_banks[bank_acct.linked_bank_id] = bank_acct
+                self._user_linked_banks.setdefault(bank_acct.user_id, []).append(bank_acct.linked_bank_id)
+            elif opcode == _OP_STRING:
+                self._strings.intern(values[0])
+            else:
+                raise ValueError(f"Unknown snapshot opcode {opcode}")
+        for account_id, columns, odd_ids in snapshot.histories:
+            history = ColumnarHistory.restore(account_id, self._strings, columns, odd_ids)
+            if self.history_layout == "list":
+                history = list(history)
+            self._account_transactions[account_id] = history
+
+    def close(self):
+        if self.journal is not None:
+            if not self.journal.failed:  # after a failed write the snapshot would hold lost records
+                self.checkpoint()
+            self.journal.close()
+            self.journal = None
+
+    def _on_rollback(self, undo):
+        """Remember how to reverse a change if the enclosing atomic() fails."""
+        log = getattr(self._local, "undo", None)
+        if log is not None:
+            log.append(undo)
+
+    def _log(self, *op):
+        """Record a change for the journal record of the enclosing atomic() block."""
+        if self.journal is not None:
+            self._local.ops.append(op)
+
+    def _changed(self, user_id: str):
+        """Bump user_id's data version when the enclosing atomic() block ends."""
+        self._local.touched.add(user_id)
+
+    def _owner_changed(self, owner_id: str):
+        """_changed() for the user who owns an account or linked bank."""
+        owner = self._accounts.get(owner_id) or self._linked_banks.get(owner_id)
+        if owner is not None:
+            self._changed(owner.user_id)
+
+    def _apply(self, ops: list[tuple]):
+        """Redo one journal record (used by replay)."""
+        with self.atomic():
+            for opcode, *values in ops:
+                if opcode == _OP_APPEND_TRANSACTION:
+                    self.append_transaction(Transaction(*values))
+                elif opcode == _OP_APPEND_STATEMENT_ROW:
+                    self._add_to_history(Transaction(*values))
+                elif opcode == _OP_SET_ACCOUNT_BALANCE:
+                    self.set_account_balance(*values)
+                elif opcode == _OP_ADD_TRANSFER:
+                    self.add_transfer(Transfer(*values))
+                elif opcode == _OP_SET_TRANSFER_STATUS:
+                    self.set_transfer_status(*values)
+                elif opcode == _OP_ADD_USER:
+                    self.add_user(User(*values))
+                elif opcode == _OP_RENAME_USER:
+                    self.rename_user(*values)
+                elif opcode == _OP_SET_PASSWORD_HASH:
+                    self.set_password_hash(*values)
+                elif opcode == _OP_DELETE_USER:
+                    self.delete_user(*values)
+                elif opcode == _OP_ADD_ACCOUNT:
+                    self.add_account(Account(*values))
+                elif opcode == _OP_ADD_LINKED_BANK:
+                    self.add_linked_bank(LinkedBankAccount(*values))
+                elif opcode == _OP_SET_LINKED_BANK_BALANCE:
+                    self.set_linked_bank_balance(*values)
+                elif opcode == _OP_REMOVE_LINKED_BANK:
+                    self.remove_linked_bank(*values)
+                else:
+                    raise ValueError(f"Unknown journal opcode {opcode}")
+
+    # ---------------- Users ----------------
+
+    def add_user(self, user: User) -> bool:
+        with self.atomic():
+            if not self._usernames.add(user.username, user.user_id):
+                return False
+            self._users[user.user_id] = user
+            self._on_rollback(lambda: (self._users.pop(user.user_id, None),
+                                       self._usernames.remove(user.username)))
+            self._log(_OP_ADD_USER, *_USER_VALUES(user))
+            return True
+
+    def get_user(self, user_id: str) -> User | None:
+        return self._users.get(user_id)
+
+    def get_user_by_username(self, username: str) -> User | None:
+        user_id = self._usernames.get(username)
+        return self._users.get(user_id) if user_id else None
+
+    def rename_user(self, user_id: str, new_username: str) -> bool:
+        with self.atomic():
+            user = self._users.get(user_id)
+            if not user or not self._usernames.rename(user.username, new_username):
+                return False
+            old_username = user.username
+            user.username = new_username
+            self._on_rollback(lambda: (self._usernames.rename(new_username, old_username),
+                                       setattr(user, "username", old_username)))
+            self._log(_OP_RENAME_USER, user_id, new_username)
+            return True
+
+    def set_password_hash(self, user_id: str, password_hash: str) -> bool:
+        with self.atomic():
+            user = self._users.get(user_id)
+            if not user:
+                return False
+            old = user.password_hash
+            user.password_hash = password_hash
+            self._on_rollback(lambda: setattr(user, "password_hash", old))
+            self._log(_OP_SET_PASSWORD_HASH, user_id, password_hash)
+            return True
+
+    def delete_user(self, user_id: str) -> bool:
+        with self.atomic():
+            user = self._users.pop(user_id, None)
+            if not user:
+                return False
+            self._usernames.remove(user.username)
+            self._on_rollback(lambda: (self._users.__setitem__(user_id, user),
+                                       self._usernames.add(user.username, user_id)))
+            self._log(_OP_DELETE_USER, user_id)
+            self._changed(user_id)
+            return True
+
+    def search_users(self, prefix: str, limit: int = 20) -> list[User]:
+        return [self._users[u] for u in self._usernames.search(prefix, limit)]
+
+    # ---------------- Accounts ----------------
+
+    def add_account(self, account: Account):
+        with self.atomic():
+            self._accounts[account.account_id] = account
+            self._account_stats[account.account_id] = AccountStats(account.account_id)
+            ids = self._user_accounts.setdefault(account.user_id, [])
+            ids.append(account.account_id)
+            self._on_rollback(lambda: (self._accounts.pop(account.account_id, None),
+                                       self._account_stats.pop(account.account_id, None),
+                                       ids.remove(account.account_id)))
+            self._log(_OP_ADD_ACCOUNT, *_ACCOUNT_VALUES(account))
+            self._changed(account.user_id)
+
+    def get_account(self, account_id: str) -> Account | None:
+        return self._accounts.get(account_id)
+
+    def list_user_accounts(self, user_id: str) -> list[Account]:
+        ids = self._user_accounts.get(user_id, [])
+        return [self._accounts[a] for a in ids]
+
+    def set_account_balance(self, account_id: str, balance: int) -> bool:
+        with self.atomic():
+            acct = self._accounts.get(account_id)
+            if not acct:
+                return False
+            old = acct.balance
+            acct.balance = balance
+            self._on_rollback(lambda: setattr(acct, "balance", old))
+            self._log(_OP_SET_ACCOUNT_BALANCE, account_id, balance)
+            self._changed(acct.user_id)
+            return True
+
+    # ---------------- Transactions ----------------
+
+    def append_transaction(self, txn: Transaction) -> bool:
+        with self.atomic():
+            if txn.account_id not in self._accounts:
+                return False
+            self._add_to_history(txn)
+            self._log(_OP_APPEND_TRANSACTION, *_TRANSACTION_VALUES(txn))
+            return True
+
+    def _add_to_history(self, txn: Transaction):
+        """Insert txn into its (time-ordered) history and aggregates; undone on rollback."""
+        history = self._history(txn.account_id)
+        pos = len(history)
+        if pos and txn.timestamp < _timestamp_at(history, pos - 1):
+            pos = _bisect_time(history, txn.timestamp, "right")
+            history.insert(pos, txn)
+        else:
+            history.append(txn)
+        stats = self._history_stats(txn.account_id)
+        saved = (stats.total_credits, stats.total_debits, stats.transaction_count,
+                 stats.first_timestamp, stats.last_timestamp)
+        saved_category = stats.category_totals.get(txn.category)
+        stats.apply(txn.amount, txn.transaction_type, txn.category, txn.timestamp)
+
+        def undo():
+            history.pop(pos)
+            (stats.total_credits, stats.total_debits, stats.transaction_count,
+             stats.first_timestamp, stats.last_timestamp) = saved
+            if saved_category is None:
+                del stats.category_totals[txn.category]
+            else:
+                stats.category_totals[txn.category] = saved_category
+        self._on_rollback(undo)
+        self._owner_changed(txn.account_id)
+
+    def _history(self, owner_id: str):
+        """The history of an account or linked bank, created empty on first use."""
+        history = self._account_transactions.get(owner_id)
+        if history is None:
+            history = self._account_transactions[owner_id] = self._new_history(owner_id)
+        return history
+
+    def _history_stats(self, owner_id: str) -> AccountStats:
+        """Aggregates of a history; a linked bank gets them on its first imported row."""
+        stats = self._account_stats.get(owner_id)
+        if stats is None:
+            stats = self._account_stats[owner_id] = AccountStats(owner_id)
+            self._on_rollback(lambda: self._account_stats.pop(owner_id, None))
+        return stats
+
+    def _new_history(self, account_id: str):
+        if self.history_layout == "columnar":
+            return ColumnarHistory(account_id, self._strings)
+        return []
+
+    def post_transaction(self, txn: Transaction) -> bool:
+        with self.atomic():
+            acct = self._accounts.get(txn.account_id)
+            if not acct:
+                return False
+            if txn.amount < 0 and acct.balance < -txn.amount:
+                return False
+            self.append_transaction(txn)
+            self.set_account_balance(txn.account_id, acct.balance + txn.amount)
+            return True
+
+    def load_histories(self, histories: dict[str, HistoryRows]) -> bool:
+        if getattr(self._local, "undo", None) is not None:
+            return super().load_histories(histories)  # inside atomic(): row by row, undoable
+        with self._lock:
+            if not self._can_load(histories):
+                return False
+            for account_id, rows in histories.items():
+                if not len(rows.amounts):
+                    continue
+                self._extend_history(self._history(account_id), account_id, rows)
+                self._account_stats[account_id].apply_rows(
+                    rows.amounts, rows.types, rows.categories,
+                    from_micros(rows.timestamps[0]), from_micros(rows.timestamps[-1]))
+                self._accounts[account_id].balance += sum(rows.amounts)
+            self.versions.bump({self._accounts[account_id].user_id for account_id in histories})
+            if self.journal is not None:
+                # Rows were not journaled one by one; a snapshot makes the load durable
+                self._unjournaled = True
+                self.checkpoint()
+        return True
+
+    @staticmethod
+    def _extend_history(history, owner_id: str, rows: HistoryRows):
+        if isinstance(history, ColumnarHistory):
+            history.extend_rows(*rows)
+        else:
+            history.extend(map(Transaction, repeat(owner_id), rows.amounts, rows.types,
+                               rows.descriptions, rows.categories, repeat(None), rows.timestamps))
+
+    def append_statement_rows(self, linked_bank_id: str, rows: HistoryRows) -> bool:
+        with self.atomic():
+            bank_acct = self._linked_banks.get(linked_bank_id)
+            if not bank_acct:
+                return False
+            if not len(rows.amounts):
+                return True
+            history = self._history(linked_bank_id)
+            stats = self._history_stats(linked_bank_id)
+            size = len(history)
+            saved = (stats.total_credits, stats.total_debits, stats.transaction_count,
+                     stats.first_timestamp, stats.last_timestamp, dict(stats.category_totals))
+            self._extend_history(history, linked_bank_id, rows)
+            stats.apply_rows(rows.amounts, rows.types, rows.categories,
+                             from_micros(rows.timestamps[0]), from_micros(rows.timestamps[-1]))
+
+            def undo():
+                if isinstance(history, ColumnarHistory):
+                    history.truncate(size)
+                else:
+                    del history[size:]
+                (stats.total_credits, stats.total_debits, stats.transaction_count,
+                 stats.first_timestamp, stats.last_timestamp, stats.category_totals) = saved
+            self._on_rollback(undo)
+            self._changed(bank_acct.user_id)
+            if self.journal is not None:
+                # Row ids are only known after the extend; one journal record per batch
+                for txn in history[size:]:
+                    self._log(_OP_APPEND_STATEMENT_ROW, *_TRANSACTION_VALUES(txn))
+            return True
+
+    def list_transactions(self, account_id: str) -> list[Transaction]:
+        return self._account_transactions.get(account_id, [])
+
+    def query_transactions(self, account_id: str, since: datetime = None, until: datetime = None,
+                           limit: int = None, cursor: str = None,
+                           newest_first: bool = False, transaction_type: str = None,
+                           category: str = None) -> Page:
+        # Cursor = keyset of the previous page's last row (see _row_cursor)
+        with self._lock:
+            history = self._account_transactions.get(account_id, [])
+            lo = _bisect_time(history, since) if since else 0
+            hi = _bisect_time(history, until) if until else len(history)
+            if transaction_type is not None or category is not None:
+                keep = self._row_filter(history, transaction_type, category)
+                return _scan_page(history, keep, lo, hi, limit, cursor, newest_first)
+            if not newest_first:
+                start = max(lo, _cursor_row(history, cursor, False)) if cursor else lo
+                end = hi if limit is None else min(hi, start + limit)
+                return Page(history[start:end], _row_cursor(history, end - 1) if end < hi else None)
+            end = min(hi, _cursor_row(history, cursor, True)) if cursor else hi
+            start = lo if limit is None else max(lo, end - limit)
+            return Page(history[start:end][::-1], _row_cursor(history, start) if start > lo else None)
+
+    def _row_filter(self, history, transaction_type: str | None, category: str | None):
+        """Row position → True if the row has this type and category (None = any)."""
+        if isinstance(history, ColumnarHistory):
+            # Compare string ids in the columns; no Transaction is built for skipped rows
+            types, categories = history.types, history.categories
+            type_id = None if transaction_type is None else self._strings.find(transaction_type)
+            category_id = None if category is None else self._strings.find(category)
+            if (transaction_type is not None and type_id is None) or (category is not None and category_id is None):
+                return lambda pos: False  # never stored, so nothing matches
+            return lambda pos: ((type_id is None or types[pos] == type_id)
+                                and (category_id is None or categories[pos] == category_id))
+        return lambda pos: ((transaction_type is None or history[pos].transaction_type == transaction_type)
+                            and (category is None or history[pos].category == category))
+
+    def get_account_stats(self, account_id: str) -> AccountStats | None:
+        return self._account_stats.get(account_id)
+
+    # ---------------- Linked banks ----------------
+
+    def add_linked_bank(self, linked_bank: LinkedBankAccount):
+        with self.atomic():
+            self._linked_banks[linked_bank.linked_bank_id] = linked_bank
+            ids = self._user_linked_banks.setdefault(linked_bank.user_id, [])
+            ids.append(linked_bank.linked_bank_id)
+            self._on_rollback(lambda: (self._linked_banks.pop(linked_bank.linked_bank_id, None),
+                                       ids.remove(linked_bank.linked_bank_id)))
+            self._log(_OP_ADD_LINKED_BANK, *_LINKED_BANK_VALUES(linked_bank))
+            self._changed(linked_bank.user_id)
+
+    def get_linked_bank(self, linked_bank_id: str) -> LinkedBankAccount | None:
+        return self._linked_banks.get(linked_bank_id)
+
+    def list_user_linked_banks(self, user_id: str) -> list[LinkedBankAccount]:
+        bank_ids = self._user_linked_banks.get(user_id, [])
+        return [self._linked_banks[bid] for bid in bank_ids]
+
+    def stale_linked_banks(self, synced_before: datetime, limit: int = None) -> list[LinkedBankAccount]:
+        with self._lock:
+            stale = [b for b in self._linked_banks.values() if b.last_synced < synced_before]
+        by_sync = attrgetter("last_synced")
+        return heapq.nsmallest(limit, stale, key=by_sync) if limit is not None else sorted(stale, key=by_sync)
+
+    def set_linked_bank_balance(self, linked_bank_id: str, balance: int,
+                                synced_at: datetime) -> bool:
+        with self.atomic():
+            bank_acct = self._linked_banks.get(linked_bank_id)
+            if not bank_acct:
+                return False
+            old = (bank_acct.balance, bank_acct.last_synced)
+            bank_acct.balance = balance
+            bank_acct.last_synced = synced_at
+            self._on_rollback(lambda: (setattr(bank_acct, "balance", old[0]),
+                                       setattr(bank_acct, "last_synced", old[1])))
+            self._log(_OP_SET_LINKED_BANK_BALANCE, linked_bank_id, balance, synced_at)
+            self._changed(bank_acct.user_id)
+            return True
+
+    def remove_linked_bank(self, linked_bank_id: str, user_id: str) -> bool:
+        with self.atomic():
+            bank_acct = self._linked_banks.get(linked_bank_id)
+            if not bank_acct or bank_acct.user_id != user_id:
+                return False
+            del self._linked_banks[linked_bank_id]
+            ids = self._user_linked_banks.get(user_id, [])
+            pos = ids.index(linked_bank_id)
+            del ids[pos]
+            self._on_rollback(lambda: (self._linked_banks.__setitem__(linked_bank_id, bank_acct),
+                                       ids.insert(pos, linked_bank_id)))
+            self._log(_OP_REMOVE_LINKED_BANK, linked_bank_id, user_id)
+            self._changed(user_id)
+            return True
+
+    # ---------------- Transfers ----------------
+
+    def add_transfer(self, record: Transfer):
+        with self.atomic():
+            transfer_id = record.transfer_id
+            self._transfers[transfer_id] = record
+            user_transfers = self._user_transfers.setdefault(record.user_id, [])
+            pos = bisect_right(user_transfers, record.timestamp, key=attrgetter("timestamp"))
+            user_transfers.insert(pos, record)
+            if record.status == "pending":
+                self._pending_transfers[transfer_id] = record
+
+            def undo():
+                self._transfers.pop(transfer_id, None)
+                self._pending_transfers.pop(transfer_id, None)
+                del user_transfers[pos]
+            self._on_rollback(undo)
+            self._log(_OP_ADD_TRANSFER, *_TRANSFER_VALUES(record))
+            self._changed(record.user_id)
+
+    def add_transfers(self, records: list[Transfer]):
+        by_time = attrgetter("timestamp")
+        by_user = {}
+        for record in records:
+            by_user.setdefault(record.user_id, []).append(record)
+        with self.atomic():
+            for user_id, batch in by_user.items():
+                batch.sort(key=by_time)  # stable: ties keep their order, like add_transfer()
+                user_transfers = self._user_transfers.setdefault(user_id, [])
+                if user_transfers and by_time(batch[0]) < by_time(user_transfers[-1]):
+                    for record in batch:  # back-dated: insert one by one
+                        self.add_transfer(record)
+                    continue
+                # Newer than everything this user has: one extend instead of a bisect per record
+                size = len(user_transfers)
+                user_transfers.extend(batch)
+                for record in batch:
+                    self._transfers[record.transfer_id] = record
+                    if record.status == "pending":
+                        self._pending_transfers[record.transfer_id] = record
+                if self.journal is not None:
+                    for record in batch:
+                        self._log(_OP_ADD_TRANSFER, *_TRANSFER_VALUES(record))
+
+                def undo(user_transfers=user_transfers, size=size, batch=batch):
+                    del user_transfers[size:]
+                    for record in batch:
+                        self._transfers.pop(record.transfer_id, None)
+                        self._pending_transfers.pop(record.transfer_id, None)
+                self._on_rollback(undo)
+                self._changed(user_id)
+
+    def get_transfer(self, transfer_id: str) -> Transfer | None:
+        return self._transfers.get(transfer_id)
+
+    def set_transfer_status(self, transfer_id: str, status: str) -> bool:
+        with self.atomic():
+            record = self._transfers.get(transfer_id)
+            if record is None:
+                return False
+            old = record.status
+            record.status = status
+            if status == "pending":
+                self._pending_transfers[transfer_id] = record
+            else:
+                self._pending_transfers.pop(transfer_id, None)
+
+            def undo():
+                record.status = old
+                if old == "pending":
+                    self._pending_transfers[transfer_id] = record
+                else:
+                    self._pending_transfers.pop(transfer_id, None)
+            self._on_rollback(undo)
+            self._log(_OP_SET_TRANSFER_STATUS, transfer_id, status)
+            self._changed(record.user_id)
+            return True
+
+    def pending_transfers(self, limit: int = None) -> list[Transfer]:
+        with self._lock:
+            pending = list(self._pending_transfers.values())
+        by_time = attrgetter("timestamp")
+        return heapq.nsmallest(limit, pending, key=by_time) if limit is not None else sorted(pending, key=by_time)
+
+    def list_user_transfers(self, user_id: str) -> list[Transfer]:
+        return list(self._user_transfers.get(user_id, []))
+
+    def query_user_transfers(self, user_id: str, direction: str = None, destination_id: str = None,
+                             min_amount: int = None, max_amount: int = None,
+                             since: datetime = None, until: datetime = None,
+                             limit: int = None, cursor: str = None,
+                             newest_first: bool = False) -> Page:
+        # Cursor = keyset of the previous page's last transfer (see _row_cursor)
+        with self._lock:
+            transfers = self._user_transfers.get(user_id, [])
+            by_time = attrgetter("timestamp")
+            lo = bisect_left(transfers, since, key=by_time) if since else 0
+            hi = bisect_left(transfers, until, key=by_time) if until else len(transfers)
+
+            def keep(pos):
+                t = transfers[pos]
+                return not ((direction and t.direction != direction)
+                            or (destination_id and t.destination_id != destination_id)
+                            or (min_amount is not None and t.amount < min_amount)
+                            or (max_amount is not None and t.amount > max_amount))
+            return _scan_page(transfers, keep, lo, hi, limit, cursor, newest_first)
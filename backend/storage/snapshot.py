@@ -0,0 +1,164 @@
+# backend/storage/snapshot.py
+"""
+Compact snapshot file para sa memory engine (paired with the journal).
+
+A snapshot is the whole state of a MemoryStore as of one journal lsn, so
+startup loads it and replays only the journal records after that lsn
+instead of the entire history.
+
+File layout:
+    header   MAGIC (8) | lsn (u64) | byte order (u8) | padding (7)
+    columns  every account's transaction history, column by column, as raw
+             array bytes (ColumnarHistory.TYPECODES order)
+    records  journal-format records (CRC32 each): the users, accounts,
+             aggregates, linked banks, transfers and string table, plus
+             (account_id, rows, offset, crc32) for each history
+    trailer  records offset (u64) | records length (u64) | MAGIC
+
+KEY LOGIC:
+- Written to a temp file, fsync'd, then renamed over the old snapshot, so a
+  crash never leaves a half-written snapshot in place
+- Loading memory-maps the file (plain read() where mmap is not possible);
+  history columns are copied straight from the mapping into arrays, one
+  memcpy per column and no per-row parsing, and checked against their CRC32
+- Columns are in the writer's byte order; a snapshot from a machine with
+  the other byte order is byte-swapped on load
+"""
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from itertools import chain, islice
+
+from backend.storage.columnar import ColumnarHistory
+from backend.storage.journal import encode_record, unpack_records, fsync_directory
+
+MAGIC = b"CYBSNAP1"
+
+_HEAD = struct.Struct("<8sQB7x")  # MAGIC, lsn, byte order
+_TRAILER = struct.Struct("<QQ8s")  # records offset, records length, MAGIC
+_LITTLE, _BIG = 0, 1
+_BYTE_ORDER = _LITTLE if sys.byteorder == "little" else _BIG
+
+# Opcodes used only inside snapshots (entity opcodes come from the caller)
+_OP_HISTORY = 200  # account_id, rows, offset, crc32
+_OP_ODD_ID = 201  # account_id, row, transaction_id
+
+_OPS_PER_RECORD = 4096
+
+
+class Snapshot:
+    """A loaded snapshot: its lsn, the entity ops and the history columns."""
+
+    def __init__(self, lsn: int, ops: list[tuple], histories: list[tuple]):
+        self.lsn = lsn
+        self.ops = ops  # (opcode, *values), in the order they were written
+        self.histories = histories  # (account_id, columns, odd_ids)
+
+
+def _chunks(items, size: int):
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield chunk
+
+
+def write_snapshot(path: str, lsn: int, histories, ops):
+    """
+    Atomically write a snapshot file.
+
+    Args:
+        path: Snapshot file to (re)place
+        lsn: Last journal lsn the snapshot covers
+        histories: Iterable of (account_id, columns, odd_ids); written first
+        ops: Iterable of (opcode, *values) entity records; consumed after
+             histories, so it may include what writing them produced
+    """
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEAD.pack(MAGIC, lsn, _BYTE_ORDER))
+        index = []
+        offset = 0
+        for account_id, columns, odd_ids in histories:
+            crc = 0
+            for column in columns:
+                f.write(column)
+                crc = zlib.crc32(column, crc)
+            index.append((_OP_HISTORY, account_id, len(columns[0]), offset, crc))
+            index.extend((_OP_ODD_ID, account_id, row, tid) for row, tid in odd_ids.items())
+            offset += sum(column.itemsize * len(column) for column in columns)
+        records_offset = f.tell()
+        for chunk in _chunks(chain(ops, index), _OPS_PER_RECORD):
+            f.write(encode_record(lsn, chunk))
+        f.write(_TRAILER.pack(records_offset, f.tell() - records_offset, MAGIC))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    fsync_directory(path)
+
+
+def read_snapshot(path: str) -> Snapshot | None:
+    """
+    Load a snapshot file.
+
+    Returns:
+        The Snapshot, or None if the file does not exist
+
+    Raises:
+        ValueError: if the file is not a snapshot or fails a checksum
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            buf = f.read()
+        try:
+            with memoryview(buf) as view:
+                return _parse(view)
+        finally:
+            if isinstance(buf, mmap.mmap):
+                buf.close()
+
+
+def _parse(view: memoryview) -> Snapshot:
+    if len(view) < _HEAD.size + _TRAILER.size:
+        raise ValueError("snapshot file is truncated")
+    magic, lsn, byte_order = _HEAD.unpack_from(view, 0)
+    records_offset, records_length, end_magic = _TRAILER.unpack_from(view, len(view) - _TRAILER.size)
+    if magic != MAGIC or end_magic != MAGIC:
+        raise ValueError("not a CyBank snapshot")
+    with view[records_offset:records_offset + records_length] as section:
+        records = unpack_records(section)
+
+    ops, histories, odd_ids = [], [], {}
+    for record in records:
+        for op in record:
+            if op[0] == _OP_HISTORY:
+                histories.append(op[1:])
+            elif op[0] == _OP_ODD_ID:
+                odd_ids.setdefault(op[1], {})[op[2]] = op[3]
+            else:
+                ops.append(op)
+
+    loaded = []
+    for account_id, rows, offset, crc in histories:
+        pos = _HEAD.size + offset
+        columns = []
+        actual_crc = 0
+        for typecode in ColumnarHistory.TYPECODES:
+            column = array(typecode)
+            size = rows * column.itemsize
+            with view[pos:pos + size] as data:
+                column.frombytes(data)
+                actual_crc = zlib.crc32(data, actual_crc)
+            if byte_order != _BYTE_ORDER:
+                column.byteswap()
+            columns.append(column)
+            pos += size
+        if actual_crc != crc:
+            raise ValueError(f"snapshot history of account {account_id} fails its checksum")
+        loaded.append((account_id, tuple(columns), odd_ids.get(account_id, {})))
+    return Snapshot(lsn, ops, loaded)
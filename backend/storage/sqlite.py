@@ -0,0 +1,592 @@
+# backend/storage/sqlite.py
+"""
+SQLite storage engine (persistent; see backend/db.py and backend/schema.sql).
+
+Objects returned are fresh copies built from rows, so callers must fetch
+again after a mutation to see the new values.
+
+KEY LOGIC:
+- All SQL lives here as module-level constants, so each pooled connection
+  reuses its prepared statements
+- atomic() is one BEGIN IMMEDIATE transaction; nested calls join it
+- query_transactions() pages with keyset cursors ("<timestamp>|<seq>"), so
+  every page is an index range scan no matter how deep the caller pages
+- Money columns hold int centavos
+- post_transaction() debits with a guarded UPDATE (balance >= amount), so the
+  overdraft check and the balance change are a single statement
+- data_version() is bumped once the write's transaction ends
+  (Database.after_transaction); owners of account / linked bank ids are
+  looked up once and remembered, since an id never changes owner
+"""
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial
+from itertools import repeat
+
+from backend.db import Database, DEFAULT_POOL_SIZE, to_db_timestamp, from_db_timestamp
+from backend.models.user import User
+from backend.models.account import Account
+from backend.models.account_stats import AccountStats
+from backend.models.compact import new_id, format_id, from_micros
+from backend.models.transaction import Transaction
+from backend.models.linked_bank import LinkedBankAccount
+from backend.models.transfer import Transfer, EXTERNAL_KEYS, INTERNAL_KEYS
+from backend.storage.base import Store, Page, HistoryRows, DataVersions
+from backend.storage.indexes import normalize_username
+
+# ---------------- SQL statements ----------------
+
+_INSERT_USER = """
+    INSERT INTO users (user_id, username, username_key, password_hash, full_name, email, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+_SELECT_USER = "SELECT * FROM users WHERE user_id = ?"
+# username_key has a UNIQUE index, so these are index lookups instead of scans
+_SELECT_USER_BY_USERNAME = "SELECT * FROM users WHERE username_key = ?"
+_SELECT_USERS_BY_PREFIX = """
+    SELECT * FROM users WHERE username_key >= ? AND username_key < ?
+    ORDER BY username_key LIMIT ?
+"""
+_RENAME_USER = "UPDATE users SET username = ?, username_key = ? WHERE user_id = ?"
+_SET_PASSWORD_HASH = "UPDATE users SET password_hash = ? WHERE user_id = ?"
+_DELETE_USER = "DELETE FROM users WHERE user_id = ?"
+_SELECT_ALL_USERNAMES = "SELECT user_id, username FROM users"
+_SET_USERNAME_KEY = "UPDATE users SET username_key = ? WHERE user_id = ?"
+
+_SELECT_META = "SELECT value FROM meta WHERE key = ?"
+_UPSERT_META = "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)"
+
+_INSERT_ACCOUNT = """
+    INSERT INTO accounts (account_id, user_id, account_name, balance, status, created_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+_SELECT_USER_ACCOUNTS = "SELECT * FROM accounts WHERE user_id = ? ORDER BY created_at, rowid"
+_SELECT_ACCOUNT = "SELECT * FROM accounts WHERE account_id = ?"
+_ACCOUNT_EXISTS = "SELECT 1 FROM accounts WHERE account_id = ?"
+_SELECT_OWNER = """
+    SELECT user_id FROM accounts WHERE account_id = ?
+    UNION ALL
+    SELECT user_id FROM linked_banks WHERE linked_bank_id = ?
+"""
+_UPDATE_BALANCE = "UPDATE accounts SET balance = ? WHERE account_id = ?"
+_CREDIT_BALANCE = "UPDATE accounts SET balance = balance + ? WHERE account_id = ?"
+_DEBIT_BALANCE = "UPDATE accounts SET balance = balance - ? WHERE account_id = ? AND balance >= ?"
+_ADJUST_BALANCE = "UPDATE accounts SET balance = balance + ? WHERE account_id = ? AND balance + ? >= 0"
+
+_INSERT_TRANSACTION = """
+    INSERT INTO transactions (transaction_id, account_id, amount, transaction_type,
+                              description, category, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+_SELECT_ACCOUNT_TRANSACTIONS = "SELECT * FROM transactions WHERE account_id = ? ORDER BY timestamp, seq"
+# Keyset pages over idx_transactions_account_time; (timestamp, seq) is the cursor.
+# Params: account_id, since, until, cursor timestamp, cursor seq, limit (-1 = no limit)
+# Optional filters: a NULL parameter disables its condition
+_TRANSACTION_FILTERS = """
+    AND (? IS NULL OR transaction_type = ?)
+    AND (? IS NULL OR category = ?)
+"""
+_PAGE_TRANSACTIONS_ASC = """
+    SELECT * FROM transactions
+    WHERE account_id = ? AND timestamp >= ? AND timestamp < ? AND (timestamp, seq) > (?, ?)
+""" + _TRANSACTION_FILTERS + """
+    ORDER BY timestamp, seq LIMIT ?
+"""
+_PAGE_TRANSACTIONS_DESC = """
+    SELECT * FROM transactions
+    WHERE account_id = ? AND timestamp >= ? AND timestamp < ? AND (timestamp, seq) < (?, ?)
+""" + _TRANSACTION_FILTERS + """
+    ORDER BY timestamp DESC, seq DESC LIMIT ?
+"""
+_MIN_TIMESTAMP = ""
+_MAX_TIMESTAMP = "~"  # sorts after every "%Y-%m-%d ..." string
+
+# Aggregates: one upsert per recorded transaction (O(1), same DB transaction)
+_UPSERT_AGGREGATES = """
+    INSERT INTO account_aggregates (account_id, total_credits, total_debits, transaction_count,
+                                    first_timestamp, last_timestamp)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (account_id) DO UPDATE SET
+        total_credits = total_credits + excluded.total_credits,
+        total_debits = total_debits + excluded.total_debits,
+        transaction_count = transaction_count + excluded.transaction_count,
+        first_timestamp = MIN(first_timestamp, excluded.first_timestamp),
+        last_timestamp = MAX(last_timestamp, excluded.last_timestamp)
+"""
+_UPSERT_CATEGORY_TOTAL = """
+    INSERT INTO account_category_totals (account_id, category, total) VALUES (?, ?, ?)
+    ON CONFLICT (account_id, category) DO UPDATE SET total = total + excluded.total
+"""
+_SELECT_AGGREGATES = "SELECT * FROM account_aggregates WHERE account_id = ?"
+_SELECT_CATEGORY_TOTALS = "SELECT category, total FROM account_category_totals WHERE account_id = ?"
+
+_INSERT_LINKED_BANK = """
+    INSERT INTO linked_banks (linked_bank_id, user_id, bank_name, account_number,
+                              account_type, balance, last_synced)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+_SELECT_USER_LINKED_BANKS = "SELECT * FROM linked_banks WHERE user_id = ? ORDER BY rowid"
+_SELECT_LINKED_BANK = "SELECT * FROM linked_banks WHERE linked_bank_id = ?"
+_SELECT_STALE_LINKED_BANKS = "SELECT * FROM linked_banks WHERE last_synced < ? ORDER BY last_synced LIMIT ?"
+_LINKED_BANK_EXISTS = "SELECT 1 FROM linked_banks WHERE linked_bank_id = ?"
+_UPDATE_LINKED_BALANCE = "UPDATE linked_banks SET balance = ?, last_synced = ? WHERE linked_bank_id = ?"
+_DELETE_LINKED_BANK = "DELETE FROM linked_banks WHERE linked_bank_id = ? AND user_id = ?"
+
+_INSERT_TRANSFER = """
+    INSERT INTO transfers (transfer_id, user_id, from_account_id, from_account_name,
+                           to_account_id, to_account_name, to_linked_bank_id, to_bank_name,
+                           to_account_number, amount, description, timestamp, status)
+    VALUES (:transfer_id, :user_id, :from_account_id, :from_account_name,
+            :to_account_id, :to_account_name, :to_linked_bank_id, :to_bank_name,
+            :to_account_number, :amount, :description, :timestamp, :status)
+"""
+_SELECT_USER_TRANSFERS = "SELECT * FROM transfers WHERE user_id = ? ORDER BY timestamp, rowid"
+_SELECT_TRANSFER = "SELECT * FROM transfers WHERE transfer_id = ?"
+_UPDATE_TRANSFER_STATUS = "UPDATE transfers SET status = ? WHERE transfer_id = ?"
+_SELECT_TRANSFER_OWNER = "SELECT user_id FROM transfers WHERE transfer_id = ?"
+_SELECT_PENDING_TRANSFERS = "SELECT * FROM transfers WHERE status = 'pending' ORDER BY timestamp LIMIT ?"
+# Range scan of idx_transfers_user_time; a NULL filter parameter means "any".
+# Params: user_id, since, until, cursor timestamp, cursor rowid, direction x2,
+#         destination_id x2, min_amount x2, max_amount x2, limit (-1 = no limit)
+_TRANSFER_FILTERS = """
+    AND (? IS NULL OR (CASE WHEN to_linked_bank_id IS NULL THEN 'internal' ELSE 'external' END) = ?)
+    AND (? IS NULL OR COALESCE(to_linked_bank_id, to_account_id) = ?)
+    AND (? IS NULL OR amount >= ?)
+    AND (? IS NULL OR amount <= ?)
+"""
+_PAGE_TRANSFERS_ASC = """
+    SELECT rowid AS seq, * FROM transfers
+    WHERE user_id = ? AND timestamp >= ? AND timestamp < ? AND (timestamp, rowid) > (?, ?)
+""" + _TRANSFER_FILTERS + """
+    ORDER BY timestamp, rowid LIMIT ?
+"""
+_PAGE_TRANSFERS_DESC = """
+    SELECT rowid AS seq, * FROM transfers
+    WHERE user_id = ? AND timestamp >= ? AND timestamp < ? AND (timestamp, rowid) < (?, ?)
+""" + _TRANSFER_FILTERS + """
+    ORDER BY timestamp DESC, rowid DESC LIMIT ?
+"""
+
+
+# ---------------- Row ↔ model conversion ----------------
+
+def _row_to_user(row) -> User:
+    return User(username=row["username"], password_hash=row["password_hash"],
+                full_name=row["full_name"], email=row["email"], user_id=row["user_id"],
+                created_at=from_db_timestamp(row["created_at"]))
+
+
+def _row_to_account(row) -> Account:
+    return Account(user_id=row["user_id"], account_name=row["account_name"],
+                   balance=int(row["balance"]), status=row["status"],
+                   account_id=row["account_id"], created_at=from_db_timestamp(row["created_at"]))
+
+
+def _row_to_transaction(row) -> Transaction:
+    return Transaction(account_id=row["account_id"], amount=int(row["amount"]),
+                       transaction_type=row["transaction_type"], description=row["description"],
+                       category=row["category"], transaction_id=row["transaction_id"],
+                       timestamp=from_db_timestamp(row["timestamp"]))
+
+
+def _row_to_linked_bank(row) -> LinkedBankAccount:
+    return LinkedBankAccount(user_id=row["user_id"], bank_name=row["bank_name"],
+                             account_number=row["account_number"], account_type=row["account_type"],
+                             balance=int(row["balance"]), last_synced=from_db_timestamp(row["last_synced"]),
+                             linked_bank_id=row["linked_bank_id"])
+
+
+def _row_to_transfer(row) -> Transfer:
+    return Transfer(user_id=row["user_id"], from_account_id=row["from_account_id"], amount=int(row["amount"]),
+                    from_account_name=row["from_account_name"], to_account_id=row["to_account_id"],
+                    to_account_name=row["to_account_name"], to_linked_bank_id=row["to_linked_bank_id"],
+                    to_bank_name=row["to_bank_name"], to_account_number=row["to_account_number"],
+                    description=row["description"], status=row["status"],
+                    transfer_id=row["transfer_id"], timestamp=from_db_timestamp(row["timestamp"]))
+
+
+def _transfer_params(record: Transfer) -> dict:
+    params = {k: getattr(record, k) for k in EXTERNAL_KEYS + INTERNAL_KEYS}
+    if params["to_account_number"] is not None:
+        params["to_account_number"] = str(params["to_account_number"])
+    params["timestamp"] = to_db_timestamp(record.timestamp)
+    return params
+
+
+def _page_bounds(since: datetime, until: datetime, cursor: str, newest_first: bool) -> tuple:
+    """(since, until, cursor timestamp, cursor seq) parameters of a keyset page query."""
+    if cursor:
+        cursor_ts, cursor_seq = cursor.rsplit("|", 1)
+        cursor_seq = int(cursor_seq)
+    elif newest_first:
+        cursor_ts, cursor_seq = _MAX_TIMESTAMP, 0
+    else:
+        cursor_ts, cursor_seq = _MIN_TIMESTAMP, 0
+    return (to_db_timestamp(since) if since else _MIN_TIMESTAMP,
+            to_db_timestamp(until) if until else _MAX_TIMESTAMP,
+            cursor_ts, cursor_seq)
+
+
+def _trim_page(rows: list, limit: int) -> tuple:
+    """Drop the look-ahead row; returns (rows, next_cursor)."""
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        return rows, f"{rows[-1]['timestamp']}|{rows[-1]['seq']}"
+    return rows, None
+
+
+def _insert_transaction(conn, txn: Transaction):
+    """INSERT the transaction and fold it into the account aggregates."""
+    ts = to_db_timestamp(txn.timestamp)
+    conn.execute(_INSERT_TRANSACTION, (txn.transaction_id, txn.account_id, txn.amount,
+                                       txn.transaction_type, txn.description, txn.category, ts))
+    credit = abs(txn.amount) if txn.transaction_type == "CREDIT" else 0
+    debit = 0 if txn.transaction_type == "CREDIT" else abs(txn.amount)
+    conn.execute(_UPSERT_AGGREGATES, (txn.account_id, credit, debit, 1, ts, ts))
+    conn.execute(_UPSERT_CATEGORY_TOTAL, (txn.account_id, txn.category or "", txn.amount))
+
+
+def _insert_transactions(conn, txns: list[Transaction]):
+    """Bulk version of _insert_transaction: one upsert per account, not per row."""
+    rows = []
+    aggregates = {}  # account_id → AccountStats of just these txns
+    for txn in txns:
+        rows.append((txn.transaction_id, txn.account_id, txn.amount, txn.transaction_type,
+                     txn.description, txn.category, to_db_timestamp(txn.timestamp)))
+        stats = aggregates.get(txn.account_id)
+        if stats is None:
+            stats = aggregates[txn.account_id] = AccountStats(txn.account_id)
+        stats.apply(txn.amount, txn.transaction_type, txn.category, txn.timestamp)
+    conn.executemany(_INSERT_TRANSACTION, rows)
+    _upsert_aggregates(conn, aggregates)
+
+
+def _insert_rows(conn, owner_id: str, rows: HistoryRows) -> AccountStats:
+    """executemany the rows of one history (new ids); returns their aggregates, not yet upserted."""
+    conn.executemany(_INSERT_TRANSACTION, zip(
+        (format_id(new_id()) for _ in range(len(rows.amounts))), repeat(owner_id),
+        rows.amounts, rows.types, rows.descriptions, rows.categories,
+        (to_db_timestamp(from_micros(ts)) for ts in rows.timestamps)))
+    stats = AccountStats(owner_id)
+    stats.apply_rows(rows.amounts, rows.types, rows.categories,
+                     from_micros(rows.timestamps[0]), from_micros(rows.timestamps[-1]))
+    return stats
+
+
+def _upsert_aggregates(conn, aggregates: dict):
+    """Add per-account AccountStats deltas to account_aggregates / account_category_totals."""
+    conn.executemany(_UPSERT_AGGREGATES, [
+        (s.account_id, s.total_credits, s.total_debits, s.transaction_count,
+         to_db_timestamp(s.first_timestamp), to_db_timestamp(s.last_timestamp))
+        for s in aggregates.values()])
+    conn.executemany(_UPSERT_CATEGORY_TOTAL, [
+        (s.account_id, category or "", total)
+        for s in aggregates.values() for category, total in s.category_totals.items()])
+
+
+class _Rollback(Exception):
+    """Raised inside db.transaction() to undo it; caught by the same method."""
+
+
+class SQLiteStore(Store):
+    """Store backed by a pooled SQLite database file."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str, pool_size: int = DEFAULT_POOL_SIZE, username_case: str = "casefold"):
+        normalize_username("", username_case)  # validate policy early
+        self.username_case = username_case
+        self.db = Database(path, pool_size)
+        self.versions = DataVersions()
+        self._owners = {}  # account_id / linked_bank_id → user_id
+        self._sync_username_keys()
+
+    def _sync_username_keys(self):
+        """
+        Re-key usernames if the database was written under another case policy.
+
+        Raises:
+            ValueError: if two existing usernames collide under the new policy
+        """
+        row = self.db.fetchone(_SELECT_META, ("username_case",))
+        if row and row["value"] == self.username_case:
+            return
+        try:
+            with self.db.transaction() as conn:
+                rows = conn.execute(_SELECT_ALL_USERNAMES).fetchall()
+                conn.executemany(_SET_USERNAME_KEY, [(self._key(r["username"]), r["user_id"]) for r in rows])
+                conn.execute(_UPSERT_META, ("username_case", self.username_case))
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Existing usernames collide under the '{self.username_case}' case policy")
+
+    def _key(self, username: str) -> str:
+        return normalize_username(username, self.username_case)
+
+    # ---------------- Transactions / lifecycle ----------------
+
+    @contextmanager
+    def atomic(self):
+        with self.db.transaction():
+            yield self
+
+    def close(self):
+        self.db.close()
+
+    def _user_changed(self, *user_ids: str):
+        """Bump the users' data versions once the current transaction ends."""
+        self.db.after_transaction(partial(self.versions.bump, user_ids))
+
+    def _owner_changed(self, *owner_ids: str):
+        """_user_changed() for the users who own these accounts / linked banks."""
+        user_ids = set()
+        for owner_id in owner_ids:
+            user_id = self._owners.get(owner_id)
+            if user_id is None:
+                row = self.db.fetchone(_SELECT_OWNER, (owner_id, owner_id))
+                if row is None:
+                    continue
+                user_id = self._owners[owner_id] = row["user_id"]
+            user_ids.add(user_id)
+        self._user_changed(*user_ids)
+
+    # ---------------- Users ----------------
+
+    def add_user(self, user: User) -> bool:
+        try:
+            self.db.execute(_INSERT_USER, (user.user_id, user.username, self._key(user.username),
+                                           user.password_hash, user.full_name, user.email,
+                                           to_db_timestamp(user.created_at)))
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def get_user(self, user_id: str) -> User | None:
+        row = self.db.fetchone(_SELECT_USER, (user_id,))
+        return _row_to_user(row) if row else None
+
+    def get_user_by_username(self, username: str) -> User | None:
+        row = self.db.fetchone(_SELECT_USER_BY_USERNAME, (self._key(username),))
+        return _row_to_user(row) if row else None
+
+    def rename_user(self, user_id: str, new_username: str) -> bool:
+        try:
+            return self.db.execute(_RENAME_USER, (new_username, self._key(new_username), user_id)) > 0
+        except sqlite3.IntegrityError:
+            return False
+
+    def set_password_hash(self, user_id: str, password_hash: str) -> bool:
+        return self.db.execute(_SET_PASSWORD_HASH, (password_hash, user_id)) > 0
+
+    def delete_user(self, user_id: str) -> bool:
+        if self.db.execute(_DELETE_USER, (user_id,)) == 0:
+            return False
+        self._user_changed(user_id)
+        return True
+
+    def search_users(self, prefix: str, limit: int = 20) -> list[User]:
+        low = self._key(prefix)
+        # Every key starting with low sorts below low + the highest code point
+        rows = self.db.fetchall(_SELECT_USERS_BY_PREFIX, (low, low + "\U0010ffff", limit))
+        return [_row_to_user(r) for r in rows]
+
+    # ---------------- Accounts ----------------
+
+    def add_account(self, account: Account):
+        self.db.execute(_INSERT_ACCOUNT, (account.account_id, account.user_id, account.account_name,
+                                          account.balance, account.status,
+                                          to_db_timestamp(account.created_at)))
+        self._owners[account.account_id] = account.user_id
+        self._user_changed(account.user_id)
+
+    def get_account(self, account_id: str) -> Account | None:
+        row = self.db.fetchone(_SELECT_ACCOUNT, (account_id,))
+        return _row_to_account(row) if row else None
+
+    def list_user_accounts(self, user_id: str) -> list[Account]:
+        return [_row_to_account(r) for r in self.db.fetchall(_SELECT_USER_ACCOUNTS, (user_id,))]
+
+    def set_account_balance(self, account_id: str, balance: int) -> bool:
+        if self.db.execute(_UPDATE_BALANCE, (balance, account_id)) == 0:
+            return False
+        self._owner_changed(account_id)
+        return True
+
+    def adjust_account_balances(self, deltas: dict[str, int]) -> bool:
+        try:
+            with self.db.transaction() as conn:
+                # Guarded UPDATEs: a missing or overdrawn account updates no row
+                cur = conn.executemany(_ADJUST_BALANCE, [(d, account_id, d) for account_id, d in deltas.items()])
+                if cur.rowcount != len(deltas):
+                    raise _Rollback
+        except _Rollback:
+            return False
+        self._owner_changed(*deltas)
+        return True
+
+    # ---------------- Transactions ----------------
+
+    def append_transactions(self, txns: list[Transaction]) -> bool:
+        with self.db.transaction() as conn:
+            for account_id in {t.account_id for t in txns}:
+                if conn.execute(_ACCOUNT_EXISTS, (account_id,)).fetchone() is None:
+                    return False
+            _insert_transactions(conn, txns)
+        self._owner_changed(*{t.account_id for t in txns})
+        return True
+
+    def load_histories(self, histories: dict[str, HistoryRows]) -> bool:
+        # One transaction, one executemany per account, no Transaction objects
+        with self.db.transaction() as conn:
+            if not self._can_load(histories):
+                return False
+            aggregates = {}
+            for account_id, rows in histories.items():
+                if not len(rows.amounts):
+                    continue
+                aggregates[account_id] = _insert_rows(conn, account_id, rows)
+                conn.execute(_CREDIT_BALANCE, (sum(rows.amounts), account_id))
+            _upsert_aggregates(conn, aggregates)
+        self._owner_changed(*histories)
+        return True
+
+    def append_statement_rows(self, linked_bank_id: str, rows: HistoryRows) -> bool:
+        # Statement rows go into the transactions table with account_id = linked_bank_id
+        with self.db.transaction() as conn:
+            if conn.execute(_LINKED_BANK_EXISTS, (linked_bank_id,)).fetchone() is None:
+                return False
+            if not len(rows.amounts):
+                return True
+            _upsert_aggregates(conn, {linked_bank_id: _insert_rows(conn, linked_bank_id, rows)})
+        self._owner_changed(linked_bank_id)
+        return True
+
+    def append_transaction(self, txn: Transaction) -> bool:
+        with self.db.transaction() as conn:
+            if conn.execute(_ACCOUNT_EXISTS, (txn.account_id,)).fetchone() is None:
+                return False
+            _insert_transaction(conn, txn)
+        self._owner_changed(txn.account_id)
+        return True
+
+    def post_transaction(self, txn: Transaction) -> bool:
+        with self.db.transaction() as conn:
+            if txn.amount < 0:
+                cur = conn.execute(_DEBIT_BALANCE, (-txn.amount, txn.account_id, -txn.amount))
+            else:
+                cur = conn.execute(_CREDIT_BALANCE, (txn.amount, txn.account_id))
+            if cur.rowcount == 0:
+                return False
+            _insert_transaction(conn, txn)
+        self._owner_changed(txn.account_id)
+        return True
+
+    def list_transactions(self, account_id: str) -> list[Transaction]:
+        return [_row_to_transaction(r) for r in self.db.fetchall(_SELECT_ACCOUNT_TRANSACTIONS, (account_id,))]
+
+    def query_transactions(self, account_id: str, since: datetime = None, until: datetime = None,
+                           limit: int = None, cursor: str = None,
+                           newest_first: bool = False, transaction_type: str = None,
+                           category: str = None) -> Page:
+        sql = _PAGE_TRANSACTIONS_DESC if newest_first else _PAGE_TRANSACTIONS_ASC
+        # One extra row tells us whether another page exists
+        rows = self.db.fetchall(sql, (account_id, *_page_bounds(since, until, cursor, newest_first),
+                                      transaction_type, transaction_type, category, category,
+                                      -1 if limit is None else limit + 1))
+        rows, next_cursor = _trim_page(rows, limit)
+        return Page([_row_to_transaction(r) for r in rows], next_cursor)
+
+    def get_account_stats(self, account_id: str) -> AccountStats | None:
+        with self.db.connection() as conn:
+            row = conn.execute(_SELECT_AGGREGATES, (account_id,)).fetchone()
+            if row is None:
+                exists = conn.execute(_ACCOUNT_EXISTS, (account_id,)).fetchone()
+                return AccountStats(account_id) if exists else None
+            categories = conn.execute(_SELECT_CATEGORY_TOTALS, (account_id,)).fetchall()
+        return AccountStats(
+            account_id=account_id,
+            total_credits=int(row["total_credits"]),
+            total_debits=int(row["total_debits"]),
+            transaction_count=row["transaction_count"],
+            first_timestamp=from_db_timestamp(row["first_timestamp"]),
+            last_timestamp=from_db_timestamp(row["last_timestamp"]),
+            category_totals={(c["category"] or None): int(c["total"]) for c in categories},
+        )
+
+    # ---------------- Linked banks ----------------
+
+    def add_linked_bank(self, linked_bank: LinkedBankAccount):
+        self.db.execute(_INSERT_LINKED_BANK, (linked_bank.linked_bank_id, linked_bank.user_id,
+                                              linked_bank.bank_name, str(linked_bank.account_number),
+                                              linked_bank.account_type, linked_bank.balance,
+                                              to_db_timestamp(linked_bank.last_synced)))
+        self._owners[linked_bank.linked_bank_id] = linked_bank.user_id
+        self._user_changed(linked_bank.user_id)
+
+    def get_linked_bank(self, linked_bank_id: str) -> LinkedBankAccount | None:
+        row = self.db.fetchone(_SELECT_LINKED_BANK, (linked_bank_id,))
+        return _row_to_linked_bank(row) if row else None
+
+    def list_user_linked_banks(self, user_id: str) -> list[LinkedBankAccount]:
+        return [_row_to_linked_bank(r) for r in self.db.fetchall(_SELECT_USER_LINKED_BANKS, (user_id,))]
+
+    def stale_linked_banks(self, synced_before: datetime, limit: int = None) -> list[LinkedBankAccount]:
+        rows = self.db.fetchall(_SELECT_STALE_LINKED_BANKS,
+                                (to_db_timestamp(synced_before), -1 if limit is None else limit))
+        return [_row_to_linked_bank(r) for r in rows]
+
+    def set_linked_bank_balance(self, linked_bank_id: str, balance: int,
+                                synced_at: datetime) -> bool:
+        params = (balance, to_db_timestamp(synced_at), linked_bank_id)
+        if self.db.execute(_UPDATE_LINKED_BALANCE, params) == 0:
+            return False
+        self._owner_changed(linked_bank_id)
+        return True
+
+    def remove_linked_bank(self, linked_bank_id: str, user_id: str) -> bool:
+        # The user_id condition makes a mismatched owner delete nothing
+        if self.db.execute(_DELETE_LINKED_BANK, (linked_bank_id, user_id)) == 0:
+            return False
+        self._user_changed(user_id)
+        return True
+
+    # ---------------- Transfers ----------------
+
+    def add_transfer(self, record: Transfer):
+        self.db.execute(_INSERT_TRANSFER, _transfer_params(record))
+        self._user_changed(record.user_id)
+
+    def add_transfers(self, records: list[Transfer]):
+        with self.db.transaction() as conn:
+            conn.executemany(_INSERT_TRANSFER, [_transfer_params(r) for r in records])
+        self._user_changed(*{r.user_id for r in records})
+
+    def get_transfer(self, transfer_id: str) -> Transfer | None:
+        row = self.db.fetchone(_SELECT_TRANSFER, (transfer_id,))
+        return _row_to_transfer(row) if row else None
+
+    def set_transfer_status(self, transfer_id: str, status: str) -> bool:
+        if self.db.execute(_UPDATE_TRANSFER_STATUS, (status, transfer_id)) == 0:
+            return False
+        self._user_changed(self.db.fetchone(_SELECT_TRANSFER_OWNER, (transfer_id,))["user_id"])
+        return True
+
+    def pending_transfers(self, limit: int = None) -> list[Transfer]:
+        rows = self.db.fetchall(_SELECT_PENDING_TRANSFERS, (-1 if limit is None else limit,))
+        return [_row_to_transfer(r) for r in rows]
+
+    def list_user_transfers(self, user_id: str) -> list[Transfer]:
+        return [_row_to_transfer(r) for r in self.db.fetchall(_SELECT_USER_TRANSFERS, (user_id,))]
+
+    def query_user_transfers(self, user_id: str, direction: str = None, destination_id: str = None,
+                             min_amount: int = None, max_amount: int = None,
+                             since: datetime = None, until: datetime = None,
+                             limit: int = None, cursor: str = None,
+                             newest_first: bool = False) -> Page:
+        sql = _PAGE_TRANSFERS_DESC if newest_first else _PAGE_TRANSFERS_ASC
+        rows = self.db.fetchall(sql, (user_id, *_page_bounds(since, until, cursor, newest_first),
+                                      direction, direction, destination_id, destination_id,
+                                      min_amount, min_amount, max_amount, max_amount,
+                                      -1 if limit is None else limit + 1))
+        rows, next_cursor = _trim_page(rows, limit)
+        return Page([_row_to_transfer(r) for r in rows], next_cursor)
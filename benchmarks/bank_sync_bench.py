@@ -0,0 +1,120 @@
+# benchmarks/bank_sync_bench.py
+"""
+Linked bank balance refresh (bank_sync_service) against FakeBankAdapter.
+
+Seeds --accounts linked bank accounts spread over every Philippine bank
+(utils.validators.get_philippines_banks), gives each bank a random latency
+between --min-latency and --max-latency, and refreshes them all at once.
+Then the slowest bank's accounts are refreshed again on their own. Because
+banks are refreshed side by side, the full refresh should take about as
+long as that slowest bank alone, not the sum of all the banks.
+
+    python -m benchmarks.bank_sync_bench
+    python -m benchmarks.bank_sync_bench --accounts 50000 --per-bank-limit 100
+    python -m benchmarks.bank_sync_bench --engine sqlite --failure-rate 0.05
+    python -m benchmarks.bank_sync_bench --max-ratio 1.3
+
+Exits with status 1 if an account fails to sync, or if the full refresh
+takes more than --max-ratio × the slowest bank alone.
+"""
+import argparse
+import asyncio
+import math
+import os
+import random
+import sys
+import tempfile
+from datetime import timedelta
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.storage import init_store, get_store, available_engines
+from backend.services import user_service, bank_integration_service, bank_sync_service
+from backend.services.bank_adapters import FakeBankAdapter
+from utils import config
+from utils.validators import get_philippines_banks
+
+USERS = 20
+
+
+def seed(accounts: int, rng: random.Random) -> list[str]:
+    """`accounts` linked banks over USERS users, round-robin over the bank names (returned)."""
+    banks = get_philippines_banks()
+    store = get_store()
+    for u in range(USERS):
+        user = user_service.register_user(f"syncbench{u}", "benchpass1", f"Sync Bench {u}")
+        with store.atomic():
+            for i in range(u, accounts, USERS):
+                bank_integration_service.add_bank_account(user.user_id, banks[i % len(banks)],
+                                                          f"{i:010d}", "Savings", rng.randint(0, 500_000_00))
+    return banks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent linked bank balance refresh benchmark")
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--engine", choices=available_engines(), default="memory")
+    parser.add_argument("--min-latency", type=float, default=0.05, help="seconds per request, fastest bank")
+    parser.add_argument("--max-latency", type=float, default=0.5, help="seconds per request, slowest bank")
+    parser.add_argument("--failure-rate", type=float, default=0.01)
+    parser.add_argument("--per-bank-limit", type=int, default=config.BANK_SYNC_PER_BANK_LIMIT)
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--retries", type=int, default=5)
+    parser.add_argument("--backoff", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-ratio", type=float, default=1.5,
+                        help="fail if the full refresh takes longer than this × the slowest bank alone")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        store = init_store(args.engine, path=os.path.join(tmp, "sync.db"))
+        bank_names = seed(args.accounts, rng)
+        latency = {name: rng.uniform(args.min_latency, args.max_latency) for name in bank_names}
+        options = {"per_bank_limit": args.per_bank_limit, "timeout": args.timeout,
+                   "retries": args.retries, "backoff": args.backoff}
+
+        def adapter():
+            return FakeBankAdapter(latency, failure_rate=args.failure_rate, drift=100_00, seed=args.seed)
+
+        result = bank_sync_service.sync_linked_banks(adapter=adapter(), stale_after=timedelta(0), **options)
+        elapsed = result["elapsed_seconds"]
+        # Lower bound per bank: its accounts go per_bank_limit at a time
+        rounds = {name: math.ceil(b["accounts"] / args.per_bank_limit) * latency[name]
+                  for name, b in result["banks"].items()}
+        slowest = max(result["banks"], key=lambda name: result["banks"][name]["seconds"])
+
+        alone = asyncio.run(bank_sync_service.refresh_linked_banks(
+            [b for b in bank_sync_service.find_stale_linked_banks(stale_after=timedelta(0))
+             if b.bank_name == slowest], adapter(), **options))
+
+        print(f"engine {args.engine}, {args.accounts:,} linked accounts, {len(result['banks'])} banks, "
+              f"{args.per_bank_limit} requests in flight per bank, failure rate {args.failure_rate:.0%}")
+        print(f"{'bank':<34}{'accounts':>9}{'latency':>9}{'ideal s':>9}{'done at s':>11}")
+        for name, b in sorted(result["banks"].items(), key=lambda item: -item[1]["seconds"]):
+            print(f"{name[:33]:<34}{b['accounts']:>9,}{latency[name]:>9.3f}{rounds[name]:>9.2f}{b['seconds']:>11.2f}")
+        print(f"all banks         {elapsed:8.2f}s  ({result['synced_count']:,} synced, "
+              f"{result['failed_count']:,} failed, {result['retry_count']:,} retries, "
+              f"{args.accounts / elapsed:,.0f} accounts/s)")
+        print(f"slowest bank alone{alone['elapsed_seconds']:8.2f}s  ({slowest})")
+        print(f"banks one by one  {sum(rounds.values()):8.2f}s  (ideal, sum of every bank)")
+        ratio = elapsed / alone["elapsed_seconds"]
+        print(f"all / slowest     {ratio:8.2f}x")
+
+        if result["failed_count"] or alone["failed_count"]:
+            print(f"FAIL      {result['failed_count'] + alone['failed_count']} accounts did not sync: "
+                  f"{(result['failed'] or alone['failed'])[:3]}")
+            failed = True
+        if ratio > args.max_ratio:
+            print(f"FAIL      full refresh took {ratio:.2f}x the slowest bank alone (limit {args.max_ratio})")
+            failed = True
+        store.close()
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/cli_startup_bench.py
+"""
+Launch-to-first-menu time of the CLI (python run.py), plus the slowest
+imports on the way there, from `python -X importtime`.
+
+Each run starts a fresh interpreter, waits for the main menu prompt on
+stdout, records the elapsed time, then answers "3" (Exit). One unmeasured
+warm-up run goes first so .pyc files are up to date.
+
+    python -m benchmarks.cli_startup_bench
+    python -m benchmarks.cli_startup_bench --runs 20 --storage sqlite
+    python -m benchmarks.cli_startup_bench --max-ms 150
+
+Exits with status 1 if the median launch-to-menu time is above --max-ms.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUN_PY = os.path.join(project_root, "run.py")
+MENU_PROMPT = b"Select an option"
+
+
+def launch_to_menu(storage: str, db_path: str) -> float:
+    """Seconds from process start until the main menu prompt is printed."""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, RUN_PY, "--storage", storage, "--db-path", db_path],
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                            cwd=project_root)
+    output = b""
+    while MENU_PROMPT not in output:
+        chunk = os.read(proc.stdout.fileno(), 4096)
+        if not chunk:
+            proc.wait()
+            raise RuntimeError(f"CLI exited before showing the menu:\n{output.decode(errors='replace')}")
+        output += chunk
+    elapsed = time.perf_counter() - start
+    proc.communicate(b"3\n")
+    return elapsed
+
+
+def import_times(storage: str, db_path: str) -> list[tuple[int, int, str]]:
+    """(self µs, cumulative µs, module) for every import done before the first menu."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", RUN_PY, "--storage", storage, "--db-path", db_path],
+                          input=b"3\n", capture_output=True, cwd=project_root)
+    rows = []
+    for line in proc.stderr.decode(errors="replace").splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), module.strip()))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CLI launch-to-menu time and import breakdown")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--storage", default="memory", help="storage engine passed to run.py")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument("--max-ms", type=float, default=None, help="fail if the median is slower")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "cybank.db")
+        launch_to_menu(args.storage, db_path)  # warm-up: writes .pyc files
+        samples = [launch_to_menu(args.storage, db_path) * 1000 for _ in range(args.runs)]
+        rows = import_times(args.storage, db_path)
+
+    median = statistics.median(samples)
+    print(f"storage {args.storage}, {args.runs} runs")
+    print(f"launch → menu   median {median:.1f} ms   min {min(samples):.1f} ms   max {max(samples):.1f} ms")
+
+    cli = next((r for r in rows if r[2] == "cli.main"), None)
+    if cli is not None:
+        print(f"import cli.main {cli[1] / 1000:.1f} ms cumulative ({len(rows)} modules imported in total)")
+    print(f"\n{'self ms':>9}{'cumul. ms':>11}  module (slowest {args.top} by self time)")
+    for self_us, cumulative_us, module in sorted(rows, reverse=True)[:args.top]:
+        print(f"{self_us / 1000:9.1f}{cumulative_us / 1000:11.1f}  {module}")
+
+    if args.max_ms is not None and median > args.max_ms:
+        print(f"FAIL      median launch-to-menu {median:.1f} ms is above {args.max_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+# benchmarks/concurrency_stress.py
+"""
+Stress test for the per-account locks (backend/services/locks.py).
+
+Many threads run deposits, withdrawals and both kinds of transfers against a
+small set of shared accounts, then the script checks:
+
+    no lost updates   every balance == sum of its own transaction history,
+                      and money is conserved across accounts + linked bank
+    no overdraft      no balance ever ends up negative; N threads racing to
+                      drain one account succeed exactly once
+    no deadlock       every worker finishes within --timeout seconds
+    parallelism       a transfer between two accounts completes while
+                      another thread holds the locks of two other accounts
+
+Exits with status 1 if any check fails.
+
+    python -m benchmarks.concurrency_stress --engine memory --threads 16 --ops 500
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.storage import init_store, available_engines
+from backend.services.user_service import register_user
+from backend.services.account_service import create_account, get_account
+from backend.services.transaction_service import deposit, withdraw, get_transactions
+from backend.services.bank_integration_service import add_bank_account, get_bank_account
+from backend.services.transfer_service import transfer_between_cybank_accounts, transfer_to_external_bank
+from backend.services.locks import lock_accounts
+
+ACCOUNTS = 6
+START_BALANCE = 10_000_00
+
+
+class Ledger:
+    """Thread-safe tally of money entering/leaving the system."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.deposited = 0
+        self.withdrawn = 0
+
+    def add(self, deposited: int = 0, withdrawn: int = 0):
+        with self.lock:
+            self.deposited += deposited
+            self.withdrawn += withdrawn
+
+
+def worker(seed: int, ops: int, user_id: str, account_ids: list, bank_id: str, ledger: Ledger):
+    rng = random.Random(seed)
+    for _ in range(ops):
+        amount = rng.randint(1, 500_00)
+        source, dest = rng.sample(account_ids, 2)
+        action = rng.random()
+        if action < 0.2:
+            if deposit(source, amount):
+                ledger.add(deposited=amount)
+        elif action < 0.4:
+            if withdraw(source, amount):
+                ledger.add(withdrawn=amount)
+        elif action < 0.5:
+            transfer_to_external_bank(user_id, source, bank_id, amount)
+        else:
+            transfer_between_cybank_accounts(user_id, source, dest, amount)
+
+
+def check_consistency(account_ids: list, bank_id: str, ledger: Ledger) -> list[str]:
+    errors = []
+    total = 0
+    for account_id in account_ids:
+        balance = get_account(account_id).balance
+        history = sum(t.amount for t in get_transactions(account_id))
+        total += balance
+        if balance < 0:
+            errors.append(f"negative balance on {account_id}: {balance}")
+        if balance != history:
+            errors.append(f"lost update on {account_id}: balance {balance} != history {history}")
+    bank_gain = get_bank_account(bank_id).balance  # the bank started at 0
+    expected = ACCOUNTS * START_BALANCE + ledger.deposited - ledger.withdrawn - bank_gain
+    if total != expected:
+        errors.append(f"money not conserved: {total} != {expected}")
+    return errors
+
+
+def check_drain_race(user_id: str, threads: int) -> list[str]:
+    """N threads try to move the whole balance out of one account; one may win."""
+    source = create_account(user_id, "Race Source")
+    dest = create_account(user_id, "Race Dest")
+    deposit(source.account_id, 1_000_00)
+    barrier = threading.Barrier(threads)
+    wins = []
+
+    def race():
+        barrier.wait()
+        if transfer_between_cybank_accounts(user_id, source.account_id, dest.account_id, 1_000_00):
+            wins.append(1)
+
+    pool = [threading.Thread(target=race) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    if len(wins) != 1 or get_account(source.account_id).balance != 0:
+        return [f"drain race: {len(wins)} winners, source balance {get_account(source.account_id).balance}"]
+    return []
+
+
+def check_parallel(user_id: str, timeout: float) -> list[str]:
+    """A transfer C→D must not wait for a thread that holds A and B."""
+    a, b, c, d = (create_account(user_id, f"Parallel {n}") for n in "ABCD")
+    deposit(c.account_id, 100_00)
+    holding = threading.Event()
+    release = threading.Event()
+
+    def hold_a_b():
+        with lock_accounts(a.account_id, b.account_id):
+            holding.set()
+            release.wait(timeout)
+
+    holder = threading.Thread(target=hold_a_b)
+    holder.start()
+    holding.wait(timeout)
+    result = []
+    mover = threading.Thread(target=lambda: result.append(
+        transfer_between_cybank_accounts(user_id, c.account_id, d.account_id, 50_00)))
+    mover.start()
+    mover.join(timeout)
+    finished_while_held = not mover.is_alive()
+    release.set()
+    holder.join()
+    mover.join()
+    if not finished_while_held or not result or result[0] is None:
+        return ["transfer between disjoint accounts waited for another thread's locks"]
+    return []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent transfer stress test")
+    parser.add_argument("--engine", choices=available_engines(), default="memory")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=500, help="operations per thread")
+    parser.add_argument("--timeout", type=float, default=60.0, help="deadlock timeout (seconds)")
+    args = parser.parse_args(argv)
+    # Switch threads as often as possible so check-then-act races actually show up
+    sys.setswitchinterval(1e-6)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        init_store(args.engine, path=os.path.join(tmp, "stress.db"))
+        user = register_user("stress", "stresspass1", "Stress Test")
+        account_ids = [create_account(user.user_id, f"Stress {i}").account_id for i in range(ACCOUNTS)]
+        for account_id in account_ids:
+            deposit(account_id, START_BALANCE)
+        bank = add_bank_account(user.user_id, "BPI", "9876543210", "checking")
+        ledger = Ledger()
+
+        start = time.perf_counter()
+        pool = [threading.Thread(target=worker, daemon=True,
+                                 args=(seed, args.ops, user.user_id, account_ids, bank.linked_bank_id, ledger))
+                for seed in range(args.threads)]
+        for t in pool:
+            t.start()
+        deadline = start + args.timeout
+        for t in pool:
+            t.join(max(0.0, deadline - time.perf_counter()))
+        elapsed = time.perf_counter() - start
+
+        errors = []
+        stuck = sum(t.is_alive() for t in pool)
+        if stuck:
+            errors.append(f"deadlock: {stuck} worker(s) still running after {args.timeout}s")
+        else:
+            errors += check_consistency(account_ids, bank.linked_bank_id, ledger)
+            errors += check_drain_race(user.user_id, args.threads)
+            errors += check_parallel(user.user_id, min(args.timeout, 5.0))
+
+    total_ops = args.threads * args.ops
+    print(f"engine    {args.engine}, {args.threads} threads x {args.ops} ops")
+    print(f"elapsed   {elapsed:.2f}s ({total_ops / elapsed:.0f} ops/s)")
+    if errors:
+        for error in errors:
+            print(f"FAIL      {error}")
+        sys.exit(1)
+    print("PASS      no lost updates, no overdraft, no deadlock, disjoint transfers not blocked")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/export_bench.py
+"""
+Export throughput and working memory of report_service.export_transactions().
+
+Bulk-loads one user with --rows transactions (spread over ACCOUNTS accounts,
+Store.load_histories), then exports them once per --formats entry
+("csv", "jsonl", "csv.gz", "jsonl.gz") and reports rows/s, file size and the
+export's working memory (tracemalloc peak of a second, traced export; the
+data being exported is already in the store, so a streaming export should
+stay at a few MiB for any row count).
+
+    python -m benchmarks.export_bench
+    python -m benchmarks.export_bench --rows 10000000 --formats csv jsonl.gz
+    python -m benchmarks.export_bench --engine sqlite --rows 200000
+    python -m benchmarks.export_bench --max-working-mib 16
+
+Exits with status 1 if an export needs more than --max-working-mib.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from datetime import datetime
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.models.compact import to_micros
+from backend.storage import init_store, get_store, available_engines
+from backend.storage.base import HistoryRows
+from backend.storage.memory import HISTORY_LAYOUTS
+from backend.services import user_service, account_service, report_service
+
+ACCOUNTS = 3
+DESCRIPTIONS = ("Payroll", "Jollibee", "Meralco", "Grab", "SM Supermarket")
+CATEGORIES = ("salary", "food", "bills", "transport", None)
+
+
+def seed(rows: int) -> str:
+    """One user whose ACCOUNTS accounts hold `rows` transactions in total (one per minute)."""
+    user = user_service.register_user("exportbench", "benchpass1", "Export Bench")
+    start = to_micros(datetime(2015, 1, 1))
+    histories = {}
+    for i in range(ACCOUNTS):
+        account = account_service.create_account(user.user_id, f"Export Account {i}")
+        count = rows // ACCOUNTS + (i < rows % ACCOUNTS)
+        amounts = array("q", [25_000_00, -1_250_50, -499_75, -3_000_00, -150_00]) * (count // 5 + 1)
+        del amounts[count:]
+        histories[account.account_id] = HistoryRows(
+            array("q", range(start + i, start + i + count * 60_000_000, 60_000_000)), amounts,
+            ["DEBIT" if a < 0 else "CREDIT" for a in amounts],
+            (CATEGORIES * (count // 5 + 1))[:count], (DESCRIPTIONS * (count // 5 + 1))[:count])
+    if not get_store().load_histories(histories):
+        raise RuntimeError("seeding failed")
+    return user.user_id
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streaming transaction export benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--formats", nargs="+", default=["csv", "jsonl", "csv.gz"],
+                        choices=["csv", "jsonl", "csv.gz", "jsonl.gz"])
+    parser.add_argument("--engine", choices=available_engines(), default="memory")
+    parser.add_argument("--history", choices=HISTORY_LAYOUTS, default="columnar", help="memory engine layout")
+    parser.add_argument("--no-trace", action="store_true", help="skip the traced (slower) memory run")
+    parser.add_argument("--max-working-mib", type=float, default=None,
+                        help="fail if an export needs more working memory")
+    args = parser.parse_args(argv)
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        store = init_store(args.engine, path=os.path.join(tmp, "export.db"), history=args.history)
+        t0 = time.perf_counter()
+        user_id = seed(args.rows)
+        print(f"engine {args.engine}, history {args.history}, {args.rows:,} rows seeded in "
+              f"{time.perf_counter() - t0:.1f}s")
+        print(f"{'format':<10}{'seconds':>9}{'rows/s':>11}{'file MB':>9}{'working MiB':>13}")
+        for file_format in args.formats:
+            path = os.path.join(tmp, f"export.{file_format}")
+            t0 = time.perf_counter()
+            result = report_service.export_transactions(user_id, path)
+            elapsed = time.perf_counter() - t0
+            if result["row_count"] != args.rows:
+                raise RuntimeError(f"{file_format}: exported {result['row_count']} of {args.rows} rows")
+            working = None
+            if not args.no_trace:
+                # Traced separately: tracemalloc slows every allocation down
+                tracemalloc.start()
+                report_service.export_transactions(user_id, path)
+                working = tracemalloc.get_traced_memory()[1] / 2 ** 20
+                tracemalloc.stop()
+            print(f"{file_format:<10}{elapsed:>9.2f}{args.rows / elapsed:>11,.0f}{result['bytes_written'] / 1e6:>9.1f}"
+                  + (f"{working:>13.1f}" if working is not None else f"{'-':>13}"))
+            if args.max_working_mib is not None and working is not None and working > args.max_working_mib:
+                print(f"FAIL      {file_format} export used {working:.1f} MiB of working memory "
+                      f"(limit {args.max_working_mib})")
+                failed = True
+            os.remove(path)
+        store.close()
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# benchmarks/gateway_bench.py
+"""
+Outbound transfer throughput through the bank gateway (bank_gateway.py).
+
+Starts a local StubGatewayServer that works on --capacity credits at once,
+--latency seconds each, and charges --connect-delay seconds for every new
+connection (handshake). --threads callers then send --transfers
+transfer_to_external_bank calls, first through PooledBankGateway (persistent
+pipelined connections), then through a client that opens a new connection
+per request. The pooled run should come close to what the gateway itself
+can do, min(threads, capacity) / latency transfers a second.
+
+Finally the server is stopped, to check that the circuit breaker opens and
+later transfers fail fast with their reserved amounts given back.
+
+    python -m benchmarks.gateway_bench
+    python -m benchmarks.gateway_bench --engine sqlite --threads 64 --capacity 50
+    python -m benchmarks.gateway_bench --connect-delay 0.1 --min-share 0.8
+
+Exits with status 1 if money is lost (CyBank + linked banks + reserved does
+not add up), if the pooled run reaches less than --min-share of the
+gateway's limit, or if the breaker does not open.
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.storage import init_store, get_store, available_engines
+from backend.services.user_service import register_user
+from backend.services.account_service import create_account
+from backend.services.transaction_service import deposit
+from backend.services.bank_integration_service import add_bank_account
+from backend.services.transfer_service import transfer_to_external_bank
+from backend.services.bank_gateway import (BankGateway, GatewayResult, GatewayUnavailable,
+                                           init_gateway, register_gateway, close_gateway)
+from backend.services.bank_gateway_stub import StubGatewayServer
+
+START_BALANCE = 1_000_000_00
+
+
+class ConnectionPerRequestGateway(BankGateway):
+    """Baseline: a new TCP connection for every credit, closed after the answer."""
+
+    name = "per-request"
+
+    def __init__(self, host: str, port: int, timeout: float = 5.0):
+        self.address = (host, port)
+        self.timeout = timeout
+
+    def credit(self, transfer, timeout: float = None) -> GatewayResult:
+        request = {"id": 1, "op": "credit", "transfer_id": transfer.transfer_id, "amount": transfer.amount,
+                   "bank_name": transfer.to_bank_name, "account_number": transfer.to_account_number}
+        try:
+            with socket.create_connection(self.address, timeout=timeout or self.timeout) as sock:
+                sock.sendall((json.dumps(request) + "\n").encode())
+                with sock.makefile("rb") as answers:
+                    answer = json.loads(answers.readline())
+        except OSError as e:
+            raise GatewayUnavailable(str(e)) from e
+        if answer["status"] == "confirmed":
+            return GatewayResult(True, reference=answer.get("reference"))
+        return GatewayResult(False, reason=answer.get("reason"))
+
+    def status(self, transfer_id: str, timeout: float = None):
+        return None
+
+
+def setup(threads: int):
+    """One user; per thread a funded account and a linked bank, so callers never share a lock."""
+    user = register_user("gatewaybench", "benchpass1", "Gateway Bench")
+    pairs = []
+    for i in range(threads):
+        account = create_account(user.user_id, f"Account {i}")
+        deposit(account.account_id, START_BALANCE)
+        bank = add_bank_account(user.user_id, "BDO Unibank", f"{i:010d}", "Savings", 0)
+        pairs.append((account, bank))
+    return user, pairs
+
+
+def run(user, pairs, transfers: int) -> tuple[float, int]:
+    """Send `transfers` external transfers from len(pairs) threads; returns (seconds, completed)."""
+    per_thread = transfers // len(pairs)
+    completed = []
+
+    def send(account, bank):
+        done = 0
+        for i in range(per_thread):
+            record = transfer_to_external_bank(user.user_id, account.account_id, bank.linked_bank_id, 100 + i % 50)
+            done += record is not None and record.status == "completed"
+        completed.append(done)
+
+    pool = [threading.Thread(target=send, args=pair) for pair in pairs]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return time.perf_counter() - start, sum(completed)
+
+
+def check_money(pairs) -> list[str]:
+    """Every centavo is in a CyBank account, a linked bank, or reserved by a pending transfer."""
+    store = get_store()
+    cybank = sum(store.get_account(account.account_id).balance for account, _ in pairs)
+    linked = sum(store.get_linked_bank(bank.linked_bank_id).balance for _, bank in pairs)
+    reserved = sum(t.amount for t in store.pending_transfers())
+    if cybank + linked + reserved != START_BALANCE * len(pairs):
+        return [f"money not conserved: {cybank} + {linked} + {reserved} != {START_BALANCE * len(pairs)}"]
+    return []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pooled, pipelined bank gateway vs connection per request")
+    parser.add_argument("--engine", choices=available_engines(), default="memory")
+    parser.add_argument("--transfers", type=int, default=4000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.05, help="gateway seconds per credit")
+    parser.add_argument("--capacity", type=int, default=200, help="credits the gateway works on at once")
+    parser.add_argument("--connect-delay", type=float, default=0.05, help="seconds per new connection")
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--min-share", type=float, default=0.75,
+                        help="fail if the pooled run reaches less than this share of the gateway's limit")
+    args = parser.parse_args(argv)
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        store = init_store(args.engine, path=os.path.join(tmp, "gateway.db"))
+        user, pairs = setup(args.threads)
+        server = StubGatewayServer(latency=args.latency, capacity=args.capacity, connect_delay=args.connect_delay)
+        host, port = server.start()
+        limit = min(args.threads, args.capacity) / args.latency
+
+        gateway = init_gateway("tcp", address=f"{host}:{port}", pool_size=args.pool_size)
+        pooled_time, pooled_done = run(user, pairs, args.transfers)
+        pooled_connections = gateway.connections_opened
+
+        register_gateway("per-request", ConnectionPerRequestGateway)
+        before = server.connections
+        init_gateway("per-request", host=host, port=port)
+        naive_time, naive_done = run(user, pairs, args.transfers)
+        naive_connections = server.connections - before
+
+        print(f"engine {args.engine}, {args.threads} threads, gateway: {args.capacity} at once x "
+              f"{args.latency * 1000:g} ms, {args.connect_delay * 1000:g} ms per new connection")
+        print(f"gateway limit     {limit:10,.0f} transfers/s")
+        print(f"pooled            {pooled_done / pooled_time:10,.0f} transfers/s  "
+              f"({pooled_done:,} in {pooled_time:.2f}s, {pooled_connections} connections)")
+        print(f"per request       {naive_done / naive_time:10,.0f} transfers/s  "
+              f"({naive_done:,} in {naive_time:.2f}s, {naive_connections:,} connections)")
+        share = pooled_done / pooled_time / limit
+        print(f"pooled / limit    {share:10.2f}")
+
+        # Gateway down: the breaker opens and transfers fail fast, reservations given back
+        gateway = init_gateway("tcp", address=f"{host}:{port}", pool_size=args.pool_size,
+                               connect_timeout=1.0)
+        server.stop()
+        account, bank = pairs[0]
+        start = time.perf_counter()
+        refused = sum(transfer_to_external_bank(user.user_id, account.account_id, bank.linked_bank_id, 100) is None
+                      for _ in range(100))
+        down_time = time.perf_counter() - start
+        print(f"gateway down      {refused} of 100 refused in {down_time * 1000:.1f} ms, breaker {gateway.breaker.state}")
+
+        errors = check_money(pairs)
+        if pooled_done + naive_done != 2 * (args.transfers // args.threads) * args.threads:
+            errors.append(f"{2 * (args.transfers // args.threads) * args.threads - pooled_done - naive_done} "
+                          f"transfers did not complete")
+        if share < args.min_share:
+            errors.append(f"pooled run reached {share:.2f} of the gateway limit (minimum {args.min_share})")
+        if refused != 100 or gateway.breaker.state != "open":
+            errors.append(f"gateway down: {refused} of 100 refused, breaker {gateway.breaker.state}")
+        for error in errors:
+            print(f"FAIL      {error}")
+            failed = True
+        close_gateway()
+        store.close()
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# benchmarks/history_memory_bench.py
+"""
+Memory per transaction: list of Transaction objects vs ColumnarHistory.
+
+    python -m benchmarks.history_memory_bench --rows 200000
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.models.transaction import Transaction
+from backend.storage.columnar import ColumnarHistory, StringTable
+
+CATEGORIES = [None, "salary", "food", "bills", "transfer"]
+
+
+def make_transactions(rows: int):
+    start = datetime(2024, 1, 1)
+    for i in range(rows):
+        credit = i % 3 == 0
+        yield Transaction(account_id="acct", amount=(12550 if credit else -4225),
+                          transaction_type="CREDIT" if credit else "DEBIT",
+                          description="Deposit via CLI" if credit else "Withdraw via CLI",
+                          category=CATEGORIES[i % len(CATEGORIES)],
+                          timestamp=start + timedelta(seconds=i))
+
+
+def measure(layout: str, rows: int) -> int:
+    """Bytes still allocated after storing `rows` transactions in the given layout."""
+    tracemalloc.start()
+    history = [] if layout == "list" else ColumnarHistory("acct", StringTable())
+    for txn in make_transactions(rows):
+        history.append(txn)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del history
+    return current
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transaction history memory per row")
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    results = {layout: measure(layout, args.rows) for layout in ("list", "columnar")}
+    for layout, used in results.items():
+        print(f"{layout:<9} {used / args.rows:8.1f} bytes/transaction  ({used / 2**20:.1f} MiB)")
+    print(f"ratio     {results['list'] / results['columnar']:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
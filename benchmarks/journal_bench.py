@@ -0,0 +1,70 @@
+# benchmarks/journal_bench.py
+"""
+Deposits per second on the memory engine with the write-ahead journal
+(backend/storage/journal.py) under each fsync policy, plus how many deposits
+one fsync covered thanks to group commit.
+
+All threads deposit into the SAME account (the busiest-account case).
+
+    python -m benchmarks.journal_bench --threads 16 --deposits 500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.storage import init_store
+from backend.storage.journal import FSYNC_POLICIES
+from backend.services.user_service import register_user
+from backend.services.account_service import create_account
+from backend.services.transaction_service import deposit
+
+
+def run(journal: str, fsync: str, threads: int, deposits: int) -> tuple[float, int]:
+    """Returns (elapsed seconds, fsyncs issued)."""
+    store = init_store("memory", journal=journal, fsync=fsync, snapshot_every=0)
+    user = register_user(f"bench{time.perf_counter_ns()}", "benchpass1", "Bench User")
+    account_id = create_account(user.user_id, "Hot Account").account_id
+
+    def worker():
+        for _ in range(deposits):
+            deposit(account_id, 100)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+    fsyncs = store.journal.fsync_count if store.journal else 0
+    store.close()
+    return elapsed, fsyncs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Journal fsync policy / group commit throughput")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--deposits", type=int, default=500, help="deposits per thread")
+    args = parser.parse_args(argv)
+    total = args.threads * args.deposits
+
+    print(f"memory engine, {args.threads} threads x {args.deposits} deposits into one account")
+    print(f"{'journal':<12}{'deposits/s':>12}{'fsyncs':>10}{'deposits/fsync':>16}")
+    with tempfile.TemporaryDirectory() as tmp:
+        elapsed, _ = run("", "off", args.threads, args.deposits)
+        print(f"{'none':<12}{total / elapsed:12.0f}{'-':>10}{'-':>16}")
+        for policy in FSYNC_POLICIES:
+            elapsed, fsyncs = run(os.path.join(tmp, f"{policy}.journal"), policy, args.threads, args.deposits)
+            per_fsync = f"{total / fsyncs:.1f}" if fsyncs else "-"
+            print(f"{policy:<12}{total / elapsed:12.0f}{fsyncs:10d}{per_fsync:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# benchmarks/kdf_bench.py
+"""
+Password KDF benchmark: hashes per second for each cost setting.
+
+Use it to pick SCRYPT_N / PBKDF2_ITERATIONS for the hardware you deploy on
+(aim for roughly 50-250 ms per hash on a single core).
+
+    python -m benchmarks.kdf_bench
+    python -m benchmarks.kdf_bench --seconds 2 --threads 4
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.auth import hash_password
+
+# (kdf, cost parameters) combinations to measure
+COST_SETTINGS = [
+    ("scrypt", {"n": 2 ** 13, "r": 8, "p": 1}),
+    ("scrypt", {"n": 2 ** 14, "r": 8, "p": 1}),
+    ("scrypt", {"n": 2 ** 15, "r": 8, "p": 1}),
+    ("scrypt", {"n": 2 ** 16, "r": 8, "p": 1}),
+    ("pbkdf2_sha256", {"iterations": 100_000}),
+    ("pbkdf2_sha256", {"iterations": 300_000}),
+    ("pbkdf2_sha256", {"iterations": 600_000}),
+]
+
+
+def measure(kdf: str, cost: dict, seconds: float, threads: int) -> float:
+    """Run hash_password for about `seconds` on `threads` threads; returns hashes/sec."""
+    deadline = time.perf_counter() + seconds
+
+    def worker() -> int:
+        count = 0
+        while time.perf_counter() < deadline:
+            hash_password("benchmark-password", kdf, **cost)
+            count += 1
+        return count
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        total = sum(pool.map(lambda _: worker(), range(threads)))
+    return total / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Password KDF throughput per cost setting")
+    parser.add_argument("--seconds", type=float, default=1.0, help="time spent per setting")
+    parser.add_argument("--threads", type=int, default=1, help="concurrent hashing threads")
+    args = parser.parse_args(argv)
+
+    print(f"{'kdf':<15} {'cost':<28} {'hashes/s':>10} {'ms/hash':>9}")
+    for kdf, cost in COST_SETTINGS:
+        rate = measure(kdf, cost, args.seconds, args.threads)
+        cost_text = ",".join(f"{k}={v}" for k, v in cost.items())
+        print(f"{kdf:<15} {cost_text:<28} {rate:>10.1f} {1000 * args.threads / rate:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# benchmarks/model_memory_bench.py
+"""
+Memory per object and construction time: the slotted compact models
+(backend/models/) vs the plain @dataclass definitions they replaced
+(copied below as the baseline), at a million instances each.
+
+    python -m benchmarks.model_memory_bench --count 1000000
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.models.user import User
+from backend.models.account import Account
+from backend.models.transaction import Transaction
+from backend.models.linked_bank import LinkedBankAccount
+
+
+# ---------------- Baseline: the previous plain dataclasses ----------------
+
+@dataclass
+class OldUser:
+    username: str
+    password_hash: str
+    full_name: str
+    email: Optional[str] = None
+    user_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass
+class OldAccount:
+    user_id: str
+    account_name: str
+    balance: int = 0
+    status: str = "ACTIVE"
+    account_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass
+class OldTransaction:
+    account_id: str
+    amount: int
+    transaction_type: str
+    description: Optional[str] = None
+    category: Optional[str] = None
+    transaction_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    timestamp: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass
+class OldLinkedBankAccount:
+    user_id: str
+    bank_name: str
+    account_number: int
+    account_type: str
+    balance: int = 0
+    last_synced: datetime = field(default_factory=datetime.utcnow)
+    linked_bank_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+
+
+OWNER_ID = str(uuid.uuid4())
+PASSWORD_HASH = "scrypt$16384$8$1$" + "0" * 64
+
+# name → (old class, new class, constructor args shared by every instance)
+MODELS = {
+    "User": (OldUser, User, ("juan", PASSWORD_HASH, "Juan Dela Cruz")),
+    "Account": (OldAccount, Account, (OWNER_ID, "Savings", 1_000_00)),
+    "Transaction": (OldTransaction, Transaction, (OWNER_ID, 125_50, "CREDIT", "Deposit via CLI")),
+    "LinkedBankAccount": (OldLinkedBankAccount, LinkedBankAccount, (OWNER_ID, "BDO", "1234567890", "savings")),
+}
+
+
+def build(cls, args: tuple, count: int) -> float:
+    """Seconds to create `count` instances (tracemalloc off)."""
+    start = time.perf_counter()
+    objects = [cls(*args) for _ in range(count)]
+    elapsed = time.perf_counter() - start
+    del objects
+    return elapsed
+
+
+def measure(cls, args: tuple, count: int) -> float:
+    """Bytes per instance still allocated after creating `count` of them."""
+    gc.collect()
+    tracemalloc.start()
+    objects = [cls(*args) for _ in range(count)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_object = (current - sys.getsizeof(objects)) / count
+    del objects
+    return per_object
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-object memory of the model classes")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    print(f"{args.count:,} instances per model")
+    print(f"{'model':<19}{'old B/obj':>11}{'new B/obj':>11}{'saved':>8}{'old s':>8}{'new s':>8}")
+    for name, (old_cls, new_cls, ctor_args) in MODELS.items():
+        old_bytes = measure(old_cls, ctor_args, args.count)
+        new_bytes = measure(new_cls, ctor_args, args.count)
+        old_time = build(old_cls, ctor_args, args.count)
+        new_time = build(new_cls, ctor_args, args.count)
+        print(f"{name:<19}{old_bytes:11.1f}{new_bytes:11.1f}{1 - new_bytes / old_bytes:8.0%}"
+              f"{old_time:8.2f}{new_time:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+# benchmarks/service_bench.py
+"""
+Service-layer benchmark: ops/s, p50/p99 latency and peak memory of every
+public service call, at several history sizes.
+
+For each --scales N the script opens a fresh store, gives one bench user
+ACCOUNTS accounts holding N transactions in total plus a linked bank, then
+times each operation below against that user:
+
+    register_user, authenticate_user           (password hashing bound)
+    deposit, withdraw
+    transfer_between_cybank_accounts, transfer_to_external_bank
+    get_transactions (whole history of one account, and a 50-row page)
+    generate_account_summary, generate_transaction_report,
+    generate_multi_bank_portfolio, generate_complete_financial_report
+        (each built from scratch: the report cache is cleared before every call)
+    report_views_cached                        (the three Reports menu views again,
+                                                with no write in between: cache hits)
+
+Each operation runs --ops times or until --budget seconds are used (at least
+once). Peak memory is the tracemalloc peak of one extra call, measured
+separately so tracing does not slow the timed calls; the process max RSS is
+reported per scale.
+
+    python -m benchmarks.service_bench --scales 1000 10000 100000
+    python -m benchmarks.service_bench --engine sqlite --json results.json
+    python -m benchmarks.service_bench --json new.json --compare old.json
+    python -m benchmarks.service_bench --history columnar --scales 10000000 \
+        --only deposit get_transactions_page generate_account_summary
+
+At 10^6+ use the columnar history; generate_transaction_report builds one
+dict per row of the whole history, so at 10^7 it needs more memory than
+most machines have (the complete report lists its transactions lazily).
+
+--json writes the results (with the git commit) so two runs can be compared;
+--compare prints the ops/s ratio of this run against a saved one.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from datetime import datetime
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.models.compact import to_micros
+from backend.storage import init_store, available_engines
+from backend.storage.base import HistoryRows
+from backend.storage.memory import HISTORY_LAYOUTS
+from backend.services import user_service, account_service, transaction_service
+from backend.services import bank_integration_service, transfer_service, report_service
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ACCOUNTS = 5
+PASSWORD = "benchpass1"
+CATEGORIES = ("salary", "food", "bills", "transport", None)
+
+
+def percentile(sorted_samples: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    return sorted_samples[min(len(sorted_samples) - 1, int(fraction * len(sorted_samples)))]
+
+
+def max_rss_mib() -> float | None:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2 ** 20 if sys.platform == "darwin" else rss / 2 ** 10  # bytes on macOS, KiB elsewhere
+
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                             text=True, cwd=project_root, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def seed(store, transactions: int) -> dict:
+    """The bench user: ACCOUNTS accounts sharing `transactions` rows over the past year, and a linked bank."""
+    user = user_service.register_user("benchuser", PASSWORD, "Bench User")
+    accounts = [account_service.create_account(user.user_id, f"Bench Account {i}") for i in range(ACCOUNTS)]
+    year = 365 * 86_400_000_000
+    start = to_micros(datetime.utcnow()) - year
+    histories = {}
+    for i, account in enumerate(accounts):
+        rows = transactions // ACCOUNTS + (i < transactions % ACCOUNTS)
+        # 3 credits of 1,000.00 then 1 debit of 500.00: the balance never goes negative
+        amounts = array("q", [1_000_00, 1_000_00, 1_000_00, -500_00]) * (rows // 4 + 1)
+        del amounts[rows:]
+        histories[account.account_id] = HistoryRows(
+            array("q", range(start, start + year, max(1, year // max(rows, 1))))[:rows], amounts,
+            ["DEBIT" if a < 0 else "CREDIT" for a in amounts], (CATEGORIES * (rows // len(CATEGORIES) + 1))[:rows],
+            ["Seed"] * rows)
+    # Bulk path (no per-row service calls); the bench operations then run on top of it
+    store.load_histories(histories)
+    for account in accounts:
+        store.set_account_balance(account.account_id, store.get_account(account.account_id).balance + 1_000_000_00)
+    bank = bank_integration_service.add_bank_account(user.user_id, "BDO Unibank", "0012345678", "Savings", 0)
+    return {"user_id": user.user_id, "account_ids": [a.account_id for a in accounts],
+            "bank_id": bank.linked_bank_id}
+
+
+def operations(ctx: dict) -> dict:
+    """Operation name → zero-argument callable, all against the seeded user."""
+    user_id, (a, b, *_), bank_id = ctx["user_id"], ctx["account_ids"], ctx["bank_id"]
+    counter = iter(range(10 ** 9))
+
+    def uncached(report):
+        def call():
+            report_service.clear_report_cache()
+            return report(user_id)
+        return call
+
+    def report_views():
+        return (report_service.generate_account_summary(user_id),
+                report_service.generate_transaction_report(user_id, limit=10),
+                report_service.generate_multi_bank_portfolio(user_id))
+    return {
+        "register_user": lambda: user_service.register_user(f"bench{next(counter)}", PASSWORD, "Bench User"),
+        "authenticate_user": lambda: user_service.authenticate_user("benchuser", PASSWORD),
+        "deposit": lambda: transaction_service.deposit(a, 100_00, "Bench deposit"),
+        "withdraw": lambda: transaction_service.withdraw(a, 1_00, "Bench withdraw"),
+        "transfer_between_cybank_accounts": lambda: transfer_service.transfer_between_cybank_accounts(user_id, a, b, 1_00),
+        "transfer_to_external_bank": lambda: transfer_service.transfer_to_external_bank(user_id, a, bank_id, 1_00),
+        "get_transactions": lambda: transaction_service.get_transactions(b),
+        "get_transactions_page": lambda: transaction_service.get_transactions(b, limit=50, newest_first=True),
+        "generate_account_summary": uncached(report_service.generate_account_summary),
+        "generate_transaction_report": uncached(report_service.generate_transaction_report),
+        "generate_multi_bank_portfolio": uncached(report_service.generate_multi_bank_portfolio),
+        "generate_complete_financial_report": uncached(report_service.generate_complete_financial_report),
+        "report_views_cached": report_views,
+    }
+
+
+def measure(func, ops: int, budget: float) -> dict:
+    samples = []
+    deadline = time.perf_counter() + budget
+    while len(samples) < ops and (not samples or time.perf_counter() < deadline):
+        t0 = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - t0)
+        if result is None or result is False:
+            raise RuntimeError(f"{func} failed")
+        del result
+    total = sum(samples)
+    samples.sort()
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"calls": len(samples), "ops_per_sec": len(samples) / total,
+            "p50_us": percentile(samples, 0.50) * 1e6, "p99_us": percentile(samples, 0.99) * 1e6,
+            "peak_kib": peak / 1024}
+
+
+def run_scale(args, scale: int, tmp: str) -> tuple[dict, list]:
+    store = init_store(args.engine, path=os.path.join(tmp, f"bench{scale}.db"), history=args.history)
+    t0 = time.perf_counter()
+    ctx = seed(store, scale)
+    info = {"scale": scale, "seed_seconds": time.perf_counter() - t0}
+    results = []
+    for name, func in operations(ctx).items():
+        if args.only and name not in args.only:
+            continue
+        ops = args.auth_ops if name in ("register_user", "authenticate_user") else args.ops
+        result = {"scale": scale, "op": name, **measure(func, ops, args.budget)}
+        results.append(result)
+        print(f"{scale:>10,}  {name:<36}{result['ops_per_sec']:>12.1f}{result['p50_us']:>12.1f}"
+              f"{result['p99_us']:>12.1f}{result['peak_kib']:>12.0f}{result['calls']:>7}")
+    info["max_rss_mib"] = max_rss_mib()
+    store.close()
+    return info, results
+
+
+def compare(results: list, baseline_path: str):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    old = {(r["scale"], r["op"]): r for r in baseline["results"]}
+    print(f"\nvs {baseline_path} (commit {baseline['meta'].get('commit')}): ops/s ratio, >1 = faster now")
+    for r in results:
+        before = old.get((r["scale"], r["op"]))
+        if before:
+            print(f"{r['scale']:>10,}  {r['op']:<36}{r['ops_per_sec'] / before['ops_per_sec']:>8.2f}x"
+                  f"   p99 {before['p99_us']:.0f} → {r['p99_us']:.0f} µs")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Service-layer ops/s, p50/p99 latency and peak memory")
+    parser.add_argument("--engine", choices=available_engines(), default="memory")
+    parser.add_argument("--history", choices=HISTORY_LAYOUTS, default="list", help="memory engine layout")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="transactions in the bench user's history (10^3 .. 10^7)")
+    parser.add_argument("--ops", type=int, default=1000, help="calls per operation")
+    parser.add_argument("--auth-ops", type=int, default=20, help="calls of register/authenticate (slow KDF)")
+    parser.add_argument("--budget", type=float, default=2.0, help="seconds per operation before stopping early")
+    parser.add_argument("--only", nargs="+", default=None, help="operation names to run")
+    parser.add_argument("--json", default=None, help="write results to this file")
+    parser.add_argument("--compare", default=None, help="results file of an earlier run")
+    args = parser.parse_args(argv)
+
+    print(f"engine {args.engine}, history {args.history}, {ACCOUNTS} accounts")
+    print(f"{'scale':>10}  {'operation':<36}{'ops/s':>12}{'p50 µs':>12}{'p99 µs':>12}{'peak KiB':>12}{'calls':>7}")
+    scales, results = [], []
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.scales:
+            info, scale_results = run_scale(args, scale, tmp)
+            scales.append(info)
+            results.extend(scale_results)
+            rss = f", max RSS {info['max_rss_mib']:.0f} MiB" if info["max_rss_mib"] is not None else ""
+            print(f"{'':>10}  seeded in {info['seed_seconds']:.1f}s{rss}")
+
+    if args.json:
+        meta = {"commit": git_commit(), "engine": args.engine, "history": args.history,
+                "python": platform.python_version(), "platform": platform.platform(),
+                "date": datetime.utcnow().isoformat()}
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "scales": scales, "results": results}, f, indent=2)
+        print(f"\nresults written to {args.json}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
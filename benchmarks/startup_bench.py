@@ -0,0 +1,123 @@
+# benchmarks/startup_bench.py
+"""
+Cold-start time of the memory engine: load the newest snapshot and replay
+the journal tail written after it (what run.py → cli.main.main does with a
+journal configured).
+
+For each size the script seeds a store with that many transactions, takes a
+snapshot, journals --tail more deposits, "crashes" (no final snapshot) and
+then times opening the store again. Histories are seeded straight into
+column arrays because posting 10M transactions one by one would take far
+longer than the thing being measured; the snapshot file is the same either
+way.
+
+    python -m benchmarks.startup_bench --transactions 1000000 10000000
+    python -m benchmarks.startup_bench --transactions 1000000 --max-seconds 5
+
+Exits with status 1 if a startup takes longer than --max-seconds.
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+from array import array
+from datetime import datetime
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.models.user import User
+from backend.models.account import Account
+from backend.models.account_stats import AccountStats
+from backend.models.transaction import Transaction
+from backend.storage.columnar import ColumnarHistory, to_micros, from_micros
+from backend.storage.journal import Journal
+from backend.storage.memory import MemoryStore, HISTORY_LAYOUTS
+
+ACCOUNTS_PER_USER = 5
+AMOUNT = 100_00
+START = datetime(2020, 1, 1)
+
+
+def seed(store: MemoryStore, transactions: int, accounts: int) -> list[str]:
+    """Users, accounts and `transactions` CREDIT rows spread over the accounts."""
+    account_ids = []
+    for i in range(accounts):
+        if i % ACCOUNTS_PER_USER == 0:
+            user = User(f"user{i}", "not-a-real-hash", f"User {i}")
+            store.add_user(user)
+        rows = transactions // accounts + (i < transactions % accounts)
+        account = Account(user.user_id, f"Account {i}", balance=AMOUNT * rows)
+        store.add_account(account)
+        account_ids.append(account.account_id)
+
+        start = to_micros(START)
+        columns = (array("q", range(start, start + rows * 1_000_000, 1_000_000)),
+                   array("q", [AMOUNT]) * rows,
+                   array("I", [store._strings.intern("CREDIT")]) * rows,
+                   array("I", [store._strings.intern("salary")]) * rows,
+                   array("I", [store._strings.intern("Payroll")]) * rows,
+                   array("Q", os.urandom(8 * rows)),
+                   array("Q", os.urandom(8 * rows)))
+        store._account_transactions[account.account_id] = ColumnarHistory.restore(
+            account.account_id, store._strings, columns)
+        stats = AccountStats(account.account_id, AMOUNT * rows, 0, rows, START,
+                             from_micros(columns[0][-1]) if rows else None)
+        stats.category_totals["salary"] = AMOUNT * rows
+        store._account_stats[account.account_id] = stats
+    return account_ids
+
+
+def run(transactions: int, accounts: int, tail: int, history: str, tmp: str) -> dict:
+    path = os.path.join(tmp, f"startup{transactions}.journal")
+    store = MemoryStore(history=history, journal=Journal(path, fsync="off"))
+    account_ids = seed(store, transactions, accounts)
+    store.checkpoint()
+    for i in range(tail):
+        store.post_transaction(Transaction(account_ids[i % accounts], AMOUNT, "CREDIT", "Tail deposit"))
+    store.journal.close()  # crash: no final snapshot, the tail stays in the journal
+    expected = store.get_account(account_ids[0]).balance
+    del store
+    gc.collect()
+
+    start = time.perf_counter()
+    reopened = MemoryStore(history=history, journal=Journal(path, fsync="off"))
+    elapsed = time.perf_counter() - start
+    assert reopened.get_account(account_ids[0]).balance == expected
+    assert sum(len(reopened.list_transactions(a)) for a in account_ids) == transactions + tail
+    result = {"seconds": elapsed,
+              "snapshot_mib": os.path.getsize(reopened.snapshot_path) / 2 ** 20,
+              "journal_kib": os.path.getsize(path) / 2 ** 10}
+    reopened.journal.close()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory engine cold-start time (snapshot + journal tail)")
+    parser.add_argument("--transactions", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--tail", type=int, default=10_000, help="journal records after the snapshot")
+    parser.add_argument("--history", choices=HISTORY_LAYOUTS, default="columnar")
+    parser.add_argument("--max-seconds", type=float, default=None, help="fail if a startup takes longer")
+    args = parser.parse_args(argv)
+
+    print(f"history {args.history}, {args.accounts} accounts, {args.tail} journal records after the snapshot")
+    print(f"{'transactions':>14}{'startup (s)':>14}{'snapshot MiB':>15}{'journal KiB':>14}")
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        for transactions in args.transactions:
+            result = run(transactions, args.accounts, args.tail, args.history, tmp)
+            print(f"{transactions:>14,}{result['seconds']:>14.2f}{result['snapshot_mib']:>15.1f}"
+                  f"{result['journal_kib']:>14.0f}")
+            if args.max_seconds is not None and result["seconds"] > args.max_seconds:
+                print(f"FAIL      startup with {transactions:,} transactions took longer than {args.max_seconds}s")
+                failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
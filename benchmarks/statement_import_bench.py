@@ -0,0 +1,131 @@
+# benchmarks/statement_import_bench.py
+"""
+Statement import throughput and working memory (bank_integration_service.import_statement).
+
+Writes a synthetic statement of --rows transactions (CSV and/or OFX) to a
+temp dir, imports it into a fresh linked bank and reports rows/s and MB/s.
+A second, traced import into another linked bank gives the working memory:
+tracemalloc peak minus what is still held afterwards (the imported history
+itself). For a streaming import the working memory stays flat however big
+the file gets.
+
+    python -m benchmarks.statement_import_bench
+    python -m benchmarks.statement_import_bench --rows 2000000 --formats csv
+    python -m benchmarks.statement_import_bench --engine sqlite --rows 200000
+    python -m benchmarks.statement_import_bench --max-working-mib 16
+
+Exits with status 1 if the working memory is above --max-working-mib.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.storage import init_store, available_engines
+from backend.storage.memory import HISTORY_LAYOUTS
+from backend.services import user_service, bank_integration_service
+
+PAYEES = ("Jollibee", "Meralco", "Globe Telecom", "SM Supermarket", "Grab", "Mercury Drug",
+          "Shell", "Manila Water", "Lazada", "Payroll")
+START = datetime(2020, 1, 1)
+
+
+def _statement_rows(count: int, seed: int):
+    """(datetime, signed centavos, payee) oldest first."""
+    rng = random.Random(seed)
+    ts = START
+    for _ in range(count):
+        ts += timedelta(seconds=rng.randint(60, 3_600))
+        payee = rng.choice(PAYEES)
+        amount = rng.randint(10_000_00, 60_000_00) if payee == "Payroll" else -rng.randint(50_00, 5_000_00)
+        yield ts, amount, payee
+
+
+def write_csv(path: str, count: int, seed: int):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("Posting Date,Particulars,Amount\n")
+        for ts, amount, payee in _statement_rows(count, seed):
+            sign = "-" if amount < 0 else ""
+            f.write(f"{ts:%Y-%m-%d %H:%M:%S},{payee},{sign}{abs(amount) // 100}.{abs(amount) % 100:02d}\n")
+
+
+def write_ofx(path: str, count: int, seed: int):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("OFXHEADER:100\nDATA:OFXSGML\nVERSION:102\n\n<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS>\n"
+                "<BANKTRANLIST>\n")
+        for n, (ts, amount, payee) in enumerate(_statement_rows(count, seed)):
+            sign = "-" if amount < 0 else ""
+            f.write(f"<STMTTRN><TRNTYPE>{'DEBIT' if amount < 0 else 'CREDIT'}"
+                    f"<DTPOSTED>{ts:%Y%m%d%H%M%S}.000[+8:PHT]<TRNAMT>{sign}{abs(amount) // 100}.{abs(amount) % 100:02d}"
+                    f"<FITID>{n}<NAME>{payee}</STMTTRN>\n")
+        f.write("</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>\n")
+
+
+WRITERS = {"csv": write_csv, "ofx": write_ofx}
+
+
+def run(args, file_format: str, tmp: str) -> dict:
+    path = os.path.join(tmp, f"statement.{file_format}")
+    WRITERS[file_format](path, args.rows, args.seed)
+    store = init_store(args.engine, path=os.path.join(tmp, f"{file_format}.db"), history=args.history)
+    user = user_service.register_user(f"import{file_format}", "benchpass1", "Import Bench")
+
+    def import_once():
+        bank = bank_integration_service.add_bank_account(user.user_id, "BDO", "0012345678", "savings")
+        result = bank_integration_service.import_statement(bank.linked_bank_id, path, batch_size=args.batch_size)
+        if result is None or result["imported_count"] != args.rows:
+            raise RuntimeError(f"{file_format} import failed: {result and result['failed'][:5]}")
+
+    t0 = time.perf_counter()
+    import_once()
+    elapsed = time.perf_counter() - t0
+    # Traced separately: tracemalloc slows every allocation down
+    tracemalloc.start()
+    import_once()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    store.close()
+    size_mb = os.path.getsize(path) / 1e6
+    return {"format": file_format, "size_mb": size_mb, "seconds": elapsed,
+            "rows_per_sec": args.rows / elapsed, "mb_per_sec": size_mb / elapsed,
+            "working_mib": (peak - current) / 2 ** 20, "held_mib": current / 2 ** 20}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streaming CSV/OFX statement import benchmark")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--formats", nargs="+", choices=sorted(WRITERS), default=sorted(WRITERS))
+    parser.add_argument("--engine", choices=available_engines(), default="memory")
+    parser.add_argument("--history", choices=HISTORY_LAYOUTS, default="columnar", help="memory engine layout")
+    parser.add_argument("--batch-size", type=int, default=bank_integration_service.IMPORT_BATCH_SIZE)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-working-mib", type=float, default=None,
+                        help="fail if an import needs more working memory")
+    args = parser.parse_args(argv)
+
+    print(f"engine {args.engine}, history {args.history}, {args.rows:,} rows, batch {args.batch_size:,}")
+    print(f"{'format':<8}{'file MB':>9}{'seconds':>9}{'rows/s':>11}{'MB/s':>7}{'working MiB':>13}{'held MiB':>10}")
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        for file_format in args.formats:
+            r = run(args, file_format, tmp)
+            print(f"{r['format']:<8}{r['size_mb']:>9.1f}{r['seconds']:>9.2f}{r['rows_per_sec']:>11,.0f}"
+                  f"{r['mb_per_sec']:>7.1f}{r['working_mib']:>13.1f}{r['held_mib']:>10.1f}")
+            if args.max_working_mib is not None and r["working_mib"] > args.max_working_mib:
+                print(f"FAIL      {file_format} import used {r['working_mib']:.1f} MiB of working memory "
+                      f"(limit {args.max_working_mib})")
+                failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/transfer_batch_bench.py
+"""
+Transfers per second: looping transfer_between_cybank_accounts /
+transfer_to_external_bank vs one transfer_batch call.
+
+    python -m benchmarks.transfer_batch_bench --engine sqlite --transfers 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.storage import init_store, available_engines
+from backend.services.user_service import register_user
+from backend.services.account_service import create_account
+from backend.services.transaction_service import deposit
+from backend.services.bank_integration_service import add_bank_account
+from backend.services.transfer_service import (transfer_batch, transfer_between_cybank_accounts,
+                                               transfer_to_external_bank)
+
+ACCOUNTS = 10
+
+
+def setup(username: str):
+    """One user with ACCOUNTS funded accounts and one linked bank."""
+    user = register_user(username, "benchpass1", "Bench User")
+    accounts = [create_account(user.user_id, f"Account {i}") for i in range(ACCOUNTS)]
+    for acct in accounts:
+        deposit(acct.account_id, 1_000_000_00)
+    bank = add_bank_account(user.user_id, "BDO", "1234567890", "savings")
+    return user, accounts, bank
+
+
+def make_items(accounts, bank, count: int) -> list[dict]:
+    items = []
+    for i in range(count):
+        source = accounts[i % ACCOUNTS]
+        if i % 4 == 0:
+            items.append({"from_account_id": source.account_id, "to_linked_bank_id": bank.linked_bank_id,
+                          "amount": 100 + i % 50})
+        else:
+            dest = accounts[(i + 1) % ACCOUNTS]
+            items.append({"from_account_id": source.account_id, "to_account_id": dest.account_id,
+                          "amount": 100 + i % 50})
+    return items
+
+
+def run_loop(user, items) -> float:
+    start = time.perf_counter()
+    for item in items:
+        if "to_linked_bank_id" in item:
+            transfer_to_external_bank(user.user_id, item["from_account_id"], item["to_linked_bank_id"], item["amount"])
+        else:
+            transfer_between_cybank_accounts(user.user_id, item["from_account_id"], item["to_account_id"], item["amount"])
+    return time.perf_counter() - start
+
+
+def run_batch(user, items) -> float:
+    start = time.perf_counter()
+    report = transfer_batch(user.user_id, items)
+    elapsed = time.perf_counter() - start
+    assert report["committed"] and report["completed_count"] == len(items), report["failed"][:3]
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Single-transfer loop vs transfer_batch throughput")
+    parser.add_argument("--engine", choices=available_engines(), default="sqlite")
+    parser.add_argument("--transfers", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        init_store(args.engine, path=os.path.join(tmp, "bench.db"))
+        user, accounts, bank = setup("benchloop")
+        loop_time = run_loop(user, make_items(accounts, bank, args.transfers))
+        user, accounts, bank = setup("benchbatch")
+        batch_time = run_batch(user, make_items(accounts, bank, args.transfers))
+
+    print(f"engine    {args.engine}, {args.transfers} transfers")
+    print(f"loop      {args.transfers / loop_time:10.0f} transfers/s  ({loop_time:.2f}s)")
+    print(f"batch     {args.transfers / batch_time:10.0f} transfers/s  ({batch_time:.2f}s)")
+    print(f"speedup   {loop_time / batch_time:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
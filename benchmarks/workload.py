@@ -0,0 +1,352 @@
+# benchmarks/workload.py
+"""
+Seeded synthetic workload generator and bulk loader.
+
+generate() builds users, CyBank accounts, linked banks (PHILIPPINES_BANKS /
+ACCOUNT_TYPES from utils/validators.py) and a deposit / withdrawal /
+transfer mix; load() puts it into a store through the bulk paths
+(Store.load_histories(), batched add_* calls) instead of one service call
+per transaction, so 10M transactions load in seconds.
+
+The same --seed always gives the same users, accounts, banks, amounts and
+timestamps; only transaction ids are random (the store assigns them).
+
+Realism:
+    - rows are spread over --days ending at END (fixed, so runs compare)
+    - weekends are quieter than weekdays; hours peak around midday
+    - every user gets a salary on the 15th and the last day of each month
+    - amounts are log-normal (many small, a few large)
+    - withdrawals and transfers never exceed the balance at that moment, so
+      the data passes the same checks deposit()/withdraw()/transfers enforce
+
+Every user's password is WORKLOAD_PASSWORD (hashed once and shared: hashing
+per user would take longer than the whole load).
+
+    python -m benchmarks.workload --users 10000 --transactions 10000000 --history columnar
+    python -m benchmarks.workload --engine sqlite --db-path data/load.db --transactions 1000000
+    python -m benchmarks.workload --journal data/load.journal   # then: python run.py --journal data/load.journal
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from array import array
+from calendar import monthrange
+from datetime import datetime, timedelta
+from math import exp, sqrt
+from statistics import NormalDist
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from backend.models.user import User
+from backend.models.account import Account
+from backend.models.linked_bank import LinkedBankAccount
+from backend.models.transfer import Transfer
+from backend.models.compact import new_id, to_micros
+from backend.storage import init_store, available_engines
+from backend.storage.base import HistoryRows
+from backend.storage.memory import HISTORY_LAYOUTS
+from utils.auth import hash_password
+from utils.validators import PHILIPPINES_BANKS, ACCOUNT_TYPES
+
+WORKLOAD_PASSWORD = "workload1"
+END = datetime(2025, 1, 1)
+LOAD_CHUNK = 10_000  # records per atomic() block while loading
+
+# Share of events (a salary is an extra deposit on paydays)
+DEFAULT_MIX = {"deposit": 0.38, "withdraw": 0.42, "internal": 0.12, "external": 0.08}
+
+ACCOUNT_NAMES = ("Savings", "Checking", "Emergency Fund", "Bills", "Travel", "Business", "Allowance")
+FIRST_NAMES = ("Juan", "Maria", "Jose", "Ana", "Mark", "Angel", "John Paul", "Kristine",
+               "Carlo", "Patricia", "Miguel", "Camille", "Rafael", "Bea", "Paolo", "Nicole")
+LAST_NAMES = ("Santos", "Reyes", "Cruz", "Bautista", "Ocampo", "Garcia", "Mendoza", "Torres",
+              "Castillo", "Flores", "Villanueva", "Ramos", "Aquino", "Dela Cruz", "Gonzales", "Lim")
+DEPOSIT_CATEGORIES = ("cash-in", "refund", "allowance", "freelance", "sale")
+SPENDING_CATEGORIES = ("food", "groceries", "transport", "bills", "shopping", "load", "health", "rent")
+
+DAY_US = 86_400_000_000
+HOUR_US = 3_600_000_000
+WEEKEND_SKIP = 0.35  # chance a weekend event is moved to another (random) day
+TABLE_SIZE = 4096  # quantiles per lookup table: one rng.random() per draw instead of a distribution call
+
+
+class Workload:
+    """Everything generate() produced, ready for load()."""
+
+    def __init__(self):
+        self.users = []
+        self.accounts = []
+        self.linked_banks = []
+        self.transfers = []  # per user in time order
+        self.histories = {}  # account_id → HistoryRows, time order
+
+    @property
+    def transaction_count(self) -> int:
+        return sum(len(rows.amounts) for rows in self.histories.values())
+
+
+def _history_rows(rows: list[tuple]) -> HistoryRows:
+    """(ts, amount, type, category, description) tuples → HistoryRows columns."""
+    if not rows:
+        return HistoryRows(array("q"), array("q"), [], [], [])
+    timestamps, amounts, types, categories, descriptions = zip(*rows)
+    return HistoryRows(array("q", timestamps), array("q", amounts), list(types), list(categories),
+                       list(descriptions))
+
+
+def _paydays(start: datetime, end: datetime) -> list[datetime]:
+    days = []
+    year, month = start.year, start.month
+    while True:
+        for day in (15, monthrange(year, month)[1]):
+            payday = datetime(year, month, day, 9)
+            if payday >= end:
+                return days
+            if payday >= start:
+                days.append(payday)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def _lognormal_table(median_pesos: float, sigma: float = 1.0) -> tuple:
+    """TABLE_SIZE evenly spaced quantiles of a log-normal amount, in centavos (at least ₱1.00)."""
+    normal = NormalDist()
+    return tuple(max(1_00, round(exp(sigma * normal.inv_cdf((i + 0.5) / TABLE_SIZE)) * median_pesos * 100))
+                 for i in range(TABLE_SIZE))
+
+
+def _hour_table(low: float = 6, high: float = 23, mode: float = 12.5) -> tuple:
+    """TABLE_SIZE + 1 quantiles of a triangular time of day, in microseconds after midnight."""
+    split = (mode - low) / (high - low)
+    hours = []
+    for i in range(TABLE_SIZE + 1):
+        q = i / TABLE_SIZE
+        if q < split:
+            hours.append(low + sqrt(q * (high - low) * (mode - low)))
+        else:
+            hours.append(high - sqrt((1 - q) * (high - low) * (high - mode)))
+    return tuple(int(h * HOUR_US) for h in hours)
+
+
+HOURS = _hour_table()
+DEPOSIT_AMOUNTS = _lognormal_table(1_500)
+WITHDRAW_AMOUNTS = _lognormal_table(400)
+INTERNAL_AMOUNTS = _lognormal_table(1_000)
+EXTERNAL_AMOUNTS = _lognormal_table(2_000)
+BANK_BALANCES = _lognormal_table(5_000)
+SALARIES = _lognormal_table(20_000, 0.5)
+
+
+def _draw(rng: random.Random, table: tuple):
+    return table[int(rng.random() * TABLE_SIZE)]
+
+
+def _pick(rng: random.Random, options: tuple):
+    return options[int(rng.random() * len(options))]
+
+
+def _event_times(rng: random.Random, count: int, start_us: int, days: int, start_weekday: int) -> list[int]:
+    times = []
+    random_ = rng.random
+    for _ in range(count):
+        day = int(days * random_())
+        if (start_weekday + day) % 7 >= 5 and random_() < WEEKEND_SKIP:
+            day = int(days * random_())
+        q = random_() * TABLE_SIZE
+        i = int(q)
+        offset = HOURS[i] + int((HOURS[i + 1] - HOURS[i]) * (q - i))  # interpolate between quantiles
+        times.append(start_us + day * DAY_US + offset)
+    return times
+
+
+def generate(users: int = 1000, transactions: int = 100_000, accounts_per_user: int = 3,
+             banks_per_user: int = 2, days: int = 365, mix: dict = None, seed: int = 42,
+             password_hash: str = None) -> Workload:
+    """
+    Build a deterministic workload of about `transactions` rows.
+
+    Args:
+        users: Number of users
+        transactions: Target number of transaction rows (all users together)
+        accounts_per_user: CyBank accounts per user
+        banks_per_user: Linked banks per user
+        days: Length of the history, ending at END
+        mix: Event shares {"deposit", "withdraw", "internal", "external"} (DEFAULT_MIX)
+        seed: Random seed; same arguments + seed = same workload
+        password_hash: Shared hash for every user (default: hash of WORKLOAD_PASSWORD)
+
+    Returns:
+        Workload (an internal transfer is 2 rows, so the count is approximate)
+    """
+    mix = mix or DEFAULT_MIX
+    kinds, weights = list(mix), list(mix.values())
+    rng = random.Random(seed)
+    password_hash = password_hash or hash_password(WORKLOAD_PASSWORD)
+    start = END - timedelta(days=days)
+    start_us = to_micros(start)
+    paydays = [to_micros(p) for p in _paydays(start, END)]
+    rows_per_event = 1 + mix.get("internal", 0) / sum(weights)
+
+    workload = Workload()
+    for u in range(users):
+        user = User(f"user{u:07d}", password_hash,
+                    f"{_pick(rng, FIRST_NAMES)} {_pick(rng, LAST_NAMES)}", f"user{u:07d}@example.ph",
+                    user_id=new_id(rng), created_at=start_us)
+        user_id = user.user_id
+        accounts = [Account(user_id, name, account_id=new_id(rng), created_at=start_us)
+                    for name in rng.sample(ACCOUNT_NAMES, min(accounts_per_user, len(ACCOUNT_NAMES)))]
+        banks = [LinkedBankAccount(user_id, _pick(rng, PHILIPPINES_BANKS),
+                                   str(rng.randrange(10 ** 11, 10 ** 12)), _pick(rng, ACCOUNT_TYPES),
+                                   _draw(rng, BANK_BALANCES), END, new_id(rng))
+                 for _ in range(banks_per_user)]
+        workload.users.append(user)
+        workload.accounts.extend(accounts)
+        workload.linked_banks.extend(banks)
+        account_ids = [a.account_id for a in accounts]
+        names = [a.account_name for a in accounts]
+        bank_info = [(b.linked_bank_id, b.bank_name, b.account_number,
+                      f"Transfer to {b.bank_name} ({b.account_number})") for b in banks]
+        bank_credits = [0] * len(banks)
+
+        rows = transactions // users + (u < transactions % users)
+        salary = _draw(rng, SALARIES)
+        salary_days = paydays if rows >= 4 * len(paydays) else []
+        events = max(0, round((rows - len(salary_days)) / rows_per_event))
+        timeline = list(zip(_event_times(rng, events, start_us, days, start.weekday()),
+                            rng.choices(kinds, weights, k=events)))
+        timeline += [(payday + int(rng.random() * HOUR_US), "salary") for payday in salary_days]
+        timeline.sort()
+
+        n = len(accounts)
+        histories = [[] for _ in accounts]  # per account: (ts, amount, type, category, description)
+        add = [history.append for history in histories]
+        balances = [0] * n
+        to_names = [f"Transfer to {name}" for name in names]
+        from_names = [f"Transfer from {name}" for name in names]
+        random_ = rng.random  # hot loop: one rng.random() per draw
+        for ts, kind in timeline:
+            if kind == "salary":
+                add[0]((ts, salary, "CREDIT", "salary", "Payroll"))
+                balances[0] += salary
+                continue
+            src = 0 if random_() < 0.5 else int(random_() * n)
+            if kind != "deposit" and balances[src] < 1_00:
+                kind = "deposit"  # nothing to spend yet
+            if kind == "internal" and n < 2 or kind == "external" and not banks:
+                kind = "withdraw"
+            if kind == "deposit":
+                amount = DEPOSIT_AMOUNTS[int(random_() * TABLE_SIZE)]
+                add[src]((ts, amount, "CREDIT", _pick(rng, DEPOSIT_CATEGORIES), "Deposit"))
+                balances[src] += amount
+            elif kind == "withdraw":
+                amount = min(WITHDRAW_AMOUNTS[int(random_() * TABLE_SIZE)], balances[src])
+                add[src]((ts, -amount, "DEBIT", _pick(rng, SPENDING_CATEGORIES), "Withdrawal"))
+                balances[src] -= amount
+            elif kind == "internal":
+                dst = (src + 1 + int(random_() * (n - 1))) % n
+                amount = min(INTERNAL_AMOUNTS[int(random_() * TABLE_SIZE)], balances[src])
+                add[src]((ts, -amount, "DEBIT", None, to_names[dst]))
+                add[dst]((ts, amount, "CREDIT", None, from_names[src]))
+                balances[src] -= amount
+                balances[dst] += amount
+                workload.transfers.append(Transfer(
+                    user_id, account_ids[src], amount, names[src],
+                    to_account_id=account_ids[dst], to_account_name=names[dst],
+                    description="Transfer between accounts", transfer_id=new_id(rng), timestamp=ts))
+            else:
+                b = int(random_() * len(banks))
+                bank_id, bank_name, account_number, description = bank_info[b]
+                amount = min(EXTERNAL_AMOUNTS[int(random_() * TABLE_SIZE)], balances[src])
+                add[src]((ts, -amount, "DEBIT", None, description))
+                balances[src] -= amount
+                bank_credits[b] += amount
+                workload.transfers.append(Transfer(
+                    user_id, account_ids[src], amount, names[src],
+                    to_linked_bank_id=bank_id, to_bank_name=bank_name, to_account_number=account_number,
+                    description="Transfer to external bank", transfer_id=new_id(rng), timestamp=ts))
+        for bank, credited in zip(banks, bank_credits):
+            bank.balance += credited
+        for account_id, history in zip(account_ids, histories):
+            workload.histories[account_id] = _history_rows(history)
+    return workload
+
+
+def _chunks(items: list):
+    for i in range(0, len(items), LOAD_CHUNK):
+        yield items[i:i + LOAD_CHUNK]
+
+
+def load(store, workload: Workload) -> bool:
+    """
+    Put a workload into a (fresh) store through the bulk paths.
+
+    Returns:
+        False if a user could not be added (username taken) or a history was rejected
+    """
+    for chunk in _chunks(workload.users):
+        with store.atomic():
+            if not all([store.add_user(user) is not False for user in chunk]):
+                return False
+    for chunk in _chunks(workload.accounts):
+        with store.atomic():
+            for account in chunk:
+                store.add_account(account)
+    for chunk in _chunks(workload.linked_banks):
+        with store.atomic():
+            for bank in chunk:
+                store.add_linked_bank(bank)
+    for chunk in _chunks(workload.transfers):
+        store.add_transfers(chunk)
+    # Last: with a memory journal this ends with one snapshot of everything
+    return store.load_histories(workload.histories)
+
+
+def _parse_mix(text: str) -> dict:
+    mix = dict(DEFAULT_MIX)
+    for part in text.split(","):
+        kind, _, share = part.partition("=")
+        if kind not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown event kind '{kind}' (use {', '.join(DEFAULT_MIX)})")
+        mix[kind] = float(share)
+    return mix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a seeded workload and bulk-load it")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--transactions", type=int, default=100_000)
+    parser.add_argument("--accounts-per-user", type=int, default=3)
+    parser.add_argument("--banks-per-user", type=int, default=2)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--mix", type=_parse_mix, default=DEFAULT_MIX,
+                        help="event shares, e.g. deposit=0.5,withdraw=0.3,internal=0.1,external=0.1")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--engine", choices=available_engines(), default="memory")
+    parser.add_argument("--history", choices=HISTORY_LAYOUTS, default="columnar", help="memory engine layout")
+    parser.add_argument("--db-path", default=None, help="sqlite database file")
+    parser.add_argument("--journal", default="", help="memory engine journal (keeps the data)")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    workload = generate(args.users, args.transactions, args.accounts_per_user, args.banks_per_user,
+                        args.days, args.mix, args.seed)
+    generated = time.perf_counter() - t0
+    rows = workload.transaction_count
+    print(f"generated {len(workload.users):,} users, {len(workload.accounts):,} accounts, "
+          f"{len(workload.linked_banks):,} linked banks, {len(workload.transfers):,} transfers, "
+          f"{rows:,} transactions in {generated:.1f}s")
+
+    store = init_store(args.engine, path=args.db_path, history=args.history, journal=args.journal)
+    t0 = time.perf_counter()
+    if not load(store, workload):
+        print("FAIL      the store rejected the workload (not empty?)")
+        sys.exit(1)
+    loaded = time.perf_counter() - t0
+    print(f"loaded into {args.engine} in {loaded:.1f}s ({rows / loaded:,.0f} transactions/s)")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
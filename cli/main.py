@@ -1,10 +1,11 @@
 import sys
 import os
-import platform
+import argparse
+from datetime import datetime, timedelta
 from getpass import getpass
 
 # Windows-specific imports
-if platform.system() == "Windows":
+if sys.platform == "win32":
     try:
         import msvcrt
     except ImportError:
@@ -16,16 +17,23 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from backend.services.user_service import register_user, authenticate_user
-from backend.services.account_service import create_account, list_accounts
-from backend.services.transaction_service import deposit, withdraw, get_transactions
-from backend.services.bank_integration_service import add_bank_account, list_bank_accounts, remove_bank_account, get_total_linked_balance
-from backend.services.transfer_service import transfer_to_external_bank, transfer_between_cybank_accounts
-from backend.services.report_service import generate_account_summary, generate_transaction_report, generate_multi_bank_portfolio, generate_complete_financial_report
+from backend.storage import init_store, available_engines
 from utils.validators import (validate_username, validate_password, validate_full_name, 
                               validate_email, validate_account_number, validate_account_type, validate_account_name,
                               validate_balance, validate_transaction_amount, validate_bank_name,
                               get_account_types, get_philippines_banks, format_currency)
+from utils.money import parse_amount, format_pesos
+from utils.lazy import lazy_import
+from utils import config
+
+# Services load on first use, not before the first menu (python -m benchmarks.cli_startup_bench)
+user_service = lazy_import("backend.services.user_service")
+account_service = lazy_import("backend.services.account_service")
+transaction_service = lazy_import("backend.services.transaction_service")
+bank_integration_service = lazy_import("backend.services.bank_integration_service")
+transfer_service = lazy_import("backend.services.transfer_service")
+report_service = lazy_import("backend.services.report_service")
+bank_gateway = lazy_import("backend.services.bank_gateway")
 
 current_user = None
 
@@ -42,6 +50,12 @@ class Colors:
     def light_brown(text):
         return f"{Colors.LIGHT_BROWN}{text}{Colors.RESET}"
     
+    @staticmethod
+    def print_block(lines):
+        """Print many light brown lines with a single write (one screenful at a time)"""
+        sys.stdout.write(f"{Colors.LIGHT_BROWN}{chr(10).join(lines)}{Colors.RESET}\n")
+        sys.stdout.flush()
+    
     @staticmethod
     def input_brown(prompt):
         """Get input with colored prompt and reset color afterwards"""
@@ -140,7 +154,7 @@ def handle_register():
             email = email_input if email_input else None
             break
 
-    user = register_user(username, password, full_name, email)
+    user = user_service.register_user(username, password, full_name, email)
     if user:
         print(Colors.light_brown("✅ Registration successful. You can now login."))
     else:
@@ -152,7 +166,7 @@ def handle_login():
     username = Colors.input_brown("Username: ").strip()
     password = Colors.getpass_brown("Password: ").strip()
     
-    user = authenticate_user(username, password)
+    user = user_service.authenticate_user(username, password)
     if user:
         current_user = user
         print(Colors.light_brown(f"✅ Login successful. Welcome, {user.full_name}"))
@@ -174,11 +188,11 @@ def handle_create_account():
         if is_valid:
             break
     
-    acct = create_account(current_user.user_id, acct_name)
+    acct = account_service.create_account(current_user.user_id, acct_name)
     print(Colors.light_brown(f"✅ Account created. Account ID: {acct.account_id} (Balance: {format_currency(acct.balance)})"))
 
 def handle_list_accounts():
-    accts = list_accounts(current_user.user_id)
+    accts = account_service.list_accounts(current_user.user_id)
     if not accts:
         print(Colors.light_brown("⚠️  No accounts found."))
         return
@@ -187,7 +201,7 @@ def handle_list_accounts():
         print(Colors.light_brown(f" {i}. ID: {a.account_id} | Name: {a.account_name} | Balance: {format_currency(a.balance)}"))
 
 def select_account(exclude_account_id: str = None):
-    accts = list_accounts(current_user.user_id)
+    accts = account_service.list_accounts(current_user.user_id)
     if not accts:
         print(Colors.light_brown("⚠️  No accounts found."))
         return None
@@ -229,7 +243,7 @@ def handle_deposit():
             if not amt_input:
                 retry_count += 1
                 continue
-            amt = float(amt_input)
+            amt = parse_amount(amt_input)
             is_valid, msg = validate_transaction_amount(amt)
             if not is_valid:
                 print(Colors.light_brown(f"❌ {msg}"))
@@ -237,15 +251,16 @@ def handle_deposit():
                 continue
             break
         except ValueError:
-            print(Colors.light_brown("❌ Invalid amount. Please enter a valid number."))
+            print(Colors.light_brown("❌ Invalid amount. Please enter a valid number (up to 2 decimal places)."))
             retry_count += 1
     
     if retry_count >= max_retries:
         print(Colors.light_brown("⚠️  Max retries exceeded. Returning to menu."))
         return
 
-    txn = deposit(acct.account_id, amt, description="Deposit via CLI")
+    txn = transaction_service.deposit(acct.account_id, amt, description="Deposit via CLI")
     if txn:
+        acct = account_service.get_account(acct.account_id)
         print(Colors.light_brown(f"✅ Deposit successful. New balance: {format_currency(acct.balance)}"))
     else:
         print(Colors.light_brown("❌ Deposit failed."))
@@ -268,7 +283,7 @@ def handle_withdraw():
             if not amt_input:
                 retry_count += 1
                 continue
-            amt = float(amt_input)
+            amt = parse_amount(amt_input)
             is_valid, msg = validate_transaction_amount(amt)
             if not is_valid:
                 print(Colors.light_brown(f"❌ {msg}"))
@@ -280,36 +295,107 @@ def handle_withdraw():
                 continue
             break
         except ValueError:
-            print(Colors.light_brown("❌ Invalid amount. Please enter a valid number."))
+            print(Colors.light_brown("❌ Invalid amount. Please enter a valid number (up to 2 decimal places)."))
             retry_count += 1
     
     if retry_count >= max_retries:
         print(Colors.light_brown("⚠️  Max retries exceeded. Returning to menu."))
         return
 
-    txn = withdraw(acct.account_id, amt, description="Withdraw via CLI")
+    txn = transaction_service.withdraw(acct.account_id, amt, description="Withdraw via CLI")
     if txn:
+        acct = account_service.get_account(acct.account_id)
         print(Colors.light_brown(f"✅ Withdrawal successful. New balance: {format_currency(acct.balance)}"))
     else:
         print(Colors.light_brown("❌ Withdrawal failed — insufficient funds or invalid account."))
 
+TRANSACTION_PAGE_SIZE = 20
+MAX_TRANSACTION_PAGE_SIZE = 200
+
+def render_transaction_page(acct, page, page_number: int, total: int, filters: dict) -> list[str]:
+    """Lines of one pager screen (header, rows, footer), joined and written once by the caller"""
+    shown = [f"type {filters['transaction_type']}" if filters["transaction_type"] else "",
+             f"category {filters['category']}" if filters["category"] else "",
+             f"on/before {(filters['until'] - timedelta(days=1)):%Y-%m-%d}" if filters["until"] else ""]
+    lines = [f"\nTransactions for account {acct.account_name} (ID: {acct.account_id})",
+             f"Page {page_number} | {total} transaction(s) in account | newest first"
+             + "".join(f" | {f}" for f in shown if f),
+             "-" * 60]
+    for txn in page:
+        category = f" [{txn.category}]" if txn.category else ""
+        lines.append(f"{txn.timestamp} | {txn.transaction_type} | {format_pesos(txn.amount, signed=True)} | "
+                     f"{txn.description or ''}{category}")
+    if not page:
+        lines.append("⚠️  No transactions match.")
+    lines.append("-" * 60)
+    return lines
+
 def handle_show_transactions():
     acct = select_account()
     if not acct:
         return
-    txns = get_transactions(acct.account_id)
-    if not txns:
+    stats = transaction_service.get_account_stats(acct.account_id)
+    if not stats or not stats.transaction_count:
         print(Colors.light_brown("⚠️  No transactions found."))
         return
-    print(Colors.brown(f"\nTransactions for account {acct.account_name} (ID: {acct.account_id}):"))
-    print(Colors.light_brown("-" * 60))
-    for txn in txns:
-        typ = txn.transaction_type
-        amt = txn.amount
-        time = txn.timestamp
-        desc = txn.description or ""
-        print(Colors.light_brown(f"{time} | {typ} | {amt:+.2f} | {desc}"))
-    print(Colors.light_brown("-" * 60))
+    
+    page_size = TRANSACTION_PAGE_SIZE
+    filters = {"until": None, "transaction_type": None, "category": None}
+    # Cursor of every page seen so far (the current page is last), so prev is a pop
+    cursors = [None]
+    
+    while True:
+        # Only this page is read from the history (range query on the store)
+        page = transaction_service.get_transactions(acct.account_id, limit=page_size, cursor=cursors[-1],
+                                                    newest_first=True, **filters)
+        Colors.print_block(render_transaction_page(acct, page, len(cursors), stats.transaction_count, filters))
+        
+        cmd = Colors.input_brown("[n]ext [p]rev [d]ate [t]ype [c]ategory [s]ize [r]eset [q]uit: ").strip().lower()
+        if cmd in ("n", "next"):
+            if page.next_cursor:
+                cursors.append(page.next_cursor)
+            else:
+                print(Colors.light_brown("⚠️  This is the last page."))
+        elif cmd in ("p", "prev"):
+            if len(cursors) > 1:
+                cursors.pop()
+            else:
+                print(Colors.light_brown("⚠️  This is the first page."))
+        elif cmd in ("d", "date"):
+            text = Colors.input_brown("Jump to date (YYYY-MM-DD, blank = newest): ").strip()
+            try:
+                filters["until"] = datetime.strptime(text, "%Y-%m-%d") + timedelta(days=1) if text else None
+            except ValueError:
+                print(Colors.light_brown("❌ Invalid date. Use YYYY-MM-DD."))
+                continue
+            cursors = [None]
+        elif cmd in ("t", "type"):
+            text = Colors.input_brown("Type (CREDIT/DEBIT, blank = all): ").strip().upper()
+            if text and text not in ("CREDIT", "DEBIT"):
+                print(Colors.light_brown("❌ Type must be CREDIT or DEBIT."))
+                continue
+            filters["transaction_type"] = text or None
+            cursors = [None]
+        elif cmd in ("c", "category"):
+            known = sorted(c for c in stats.category_totals if c)
+            if known:
+                print(Colors.light_brown(f"Categories: {', '.join(known)}"))
+            filters["category"] = Colors.input_brown("Category (blank = all): ").strip() or None
+            cursors = [None]
+        elif cmd in ("s", "size"):
+            text = Colors.input_brown(f"Rows per page (1-{MAX_TRANSACTION_PAGE_SIZE}): ").strip()
+            if not text.isdigit() or not 1 <= int(text) <= MAX_TRANSACTION_PAGE_SIZE:
+                print(Colors.light_brown(f"❌ Enter a number from 1 to {MAX_TRANSACTION_PAGE_SIZE}."))
+                continue
+            page_size = int(text)
+            cursors = [None]
+        elif cmd in ("r", "reset"):
+            filters = {"until": None, "transaction_type": None, "category": None}
+            cursors = [None]
+        elif cmd in ("q", "quit", ""):
+            return
+        else:
+            print(Colors.light_brown("⚠️  Invalid option."))
 
 def prompt_bank_menu():
     print(Colors.brown("\n--- Linked Bank Accounts --"))
@@ -372,7 +458,7 @@ def handle_link_bank_account():
     # Validate initial balance
     while True:
         try:
-            initial_balance = float(Colors.input_brown("Enter initial balance (PHP): ").strip())
+            initial_balance = parse_amount(Colors.input_brown("Enter initial balance (PHP): ").strip())
             is_valid, msg = validate_balance(initial_balance)
             print(Colors.light_brown(msg))
             if is_valid:
@@ -380,7 +466,7 @@ def handle_link_bank_account():
         except ValueError:
             print(Colors.light_brown("❌ Invalid amount entered."))
     
-    linked_bank = add_bank_account(current_user.user_id, bank_name, account_number, account_type, initial_balance)
+    linked_bank = bank_integration_service.add_bank_account(current_user.user_id, bank_name, account_number, account_type, initial_balance)
     print(Colors.light_brown(f"✅ Bank account linked successfully!"))
     print(Colors.light_brown(f"   Bank: {linked_bank.bank_name}"))
     print(Colors.light_brown(f"   Account: {linked_bank.account_number}"))
@@ -388,7 +474,7 @@ def handle_link_bank_account():
     print(Colors.light_brown(f"   Balance: {format_currency(linked_bank.balance)}"))
 
 def handle_view_linked_banks():
-    banks = list_bank_accounts(current_user.user_id)
+    banks = bank_integration_service.list_bank_accounts(current_user.user_id)
     if not banks:
         print(Colors.light_brown("⚠️  No linked bank accounts found."))
         return
@@ -403,8 +489,8 @@ def handle_view_linked_banks():
         print(Colors.light_brown(f" {i}. Bank: {bank.bank_name} | Account: {bank.account_number} | Type: {bank.account_type} | Balance: {format_currency(bank.balance)}"))
 
 def handle_view_total_linked_balance():
-    total = get_total_linked_balance(current_user.user_id)
-    banks = list_bank_accounts(current_user.user_id)
+    total = bank_integration_service.get_total_linked_balance(current_user.user_id)
+    banks = bank_integration_service.list_bank_accounts(current_user.user_id)
     if not banks:
         print(Colors.light_brown("⚠️  No linked bank accounts found."))
         return
@@ -413,7 +499,7 @@ def handle_view_total_linked_balance():
     print(Colors.light_brown(f"Total Balance Across All Banks: {format_currency(total)}"))
 
 def select_linked_bank():
-    banks = list_bank_accounts(current_user.user_id)
+    banks = bank_integration_service.list_bank_accounts(current_user.user_id)
     if not banks:
         print(Colors.light_brown("⚠️  No linked bank accounts found."))
         return None
@@ -466,7 +552,7 @@ def handle_transfer_to_external_bank():
             if not amt_input:
                 retry_count += 1
                 continue
-            amt = float(amt_input)
+            amt = parse_amount(amt_input)
             is_valid, msg = validate_transaction_amount(amt)
             if not is_valid:
                 print(Colors.light_brown(f"❌ {msg}"))
@@ -478,7 +564,7 @@ def handle_transfer_to_external_bank():
                 continue
             break
         except ValueError:
-            print(Colors.light_brown("❌ Invalid amount. Please enter a valid number."))
+            print(Colors.light_brown("❌ Invalid amount. Please enter a valid number (up to 2 decimal places)."))
             retry_count += 1
     
     if retry_count >= max_retries:
@@ -493,9 +579,12 @@ def handle_transfer_to_external_bank():
     confirm = Colors.input_brown("Proceed with transfer? (yes/no): ").strip().lower()
     
     if confirm == "yes":
-        transfer_record = transfer_to_external_bank(current_user.user_id, source_account.account_id, 
+        transfer_record = transfer_service.transfer_to_external_bank(current_user.user_id, source_account.account_id, 
                                                    dest_bank.linked_bank_id, amt)
-        if transfer_record:
+        if transfer_record and transfer_record.status == "pending":
+            print(Colors.light_brown(f"⏳ Transfer sent, waiting for {dest_bank.bank_name} to confirm."))
+            print(Colors.light_brown(f"   {format_currency(amt)} stays reserved from {source_account.account_name} until then."))
+        elif transfer_record:
             print(Colors.light_brown(f"✅ Transfer successful!"))
             print(Colors.light_brown(f"   New CyBank balance: {format_currency(source_account.balance - amt)}"))
             print(Colors.light_brown(f"   {dest_bank.bank_name} balance: {format_currency(dest_bank.balance + amt)}"))
@@ -508,7 +597,7 @@ def handle_transfer_between_cybank_accounts():
     print(Colors.brown("\n--- Transfer Between CyBank Accounts ---"))
     
     # Check if user has at least 2 accounts
-    accts = list_accounts(current_user.user_id)
+    accts = account_service.list_accounts(current_user.user_id)
     if len(accts) < 2:
         print(Colors.light_brown("❌ You need at least 2 accounts to transfer between accounts."))
         print(Colors.light_brown(f"   You currently have {len(accts)} account(s)."))
@@ -540,7 +629,7 @@ def handle_transfer_between_cybank_accounts():
             if not amt_input:
                 retry_count += 1
                 continue
-            amt = float(amt_input)
+            amt = parse_amount(amt_input)
             is_valid, msg = validate_transaction_amount(amt)
             if not is_valid:
                 print(Colors.light_brown(f"❌ {msg}"))
@@ -552,7 +641,7 @@ def handle_transfer_between_cybank_accounts():
                 continue
             break
         except ValueError:
-            print(Colors.light_brown("❌ Invalid amount. Please enter a valid number."))
+            print(Colors.light_brown("❌ Invalid amount. Please enter a valid number (up to 2 decimal places)."))
             retry_count += 1
     
     if retry_count >= max_retries:
@@ -567,7 +656,7 @@ def handle_transfer_between_cybank_accounts():
     confirm = Colors.input_brown("Proceed with transfer? (yes/no): ").strip().lower()
     
     if confirm == "yes":
-        transfer_record = transfer_between_cybank_accounts(current_user.user_id, source_account.account_id, 
+        transfer_record = transfer_service.transfer_between_cybank_accounts(current_user.user_id, source_account.account_id, 
                                                           dest_account.account_id, amt)
         if transfer_record:
             print(Colors.light_brown(f"✅ Transfer successful!"))
@@ -584,12 +673,13 @@ def prompt_reports_menu():
     print(Colors.light_brown("2. Transaction Report"))
     print(Colors.light_brown("3. Multi-Bank Portfolio"))
     print(Colors.light_brown("4. Complete Financial Report"))
-    print(Colors.light_brown("5. Back to Main Menu"))
+    print(Colors.light_brown("5. Export to File (CSV/JSONL)"))
+    print(Colors.light_brown("6. Back to Main Menu"))
     return Colors.input_brown("Select an option: ").strip()
 
 def handle_account_summary():
     print(Colors.brown("\n--- Account Summary Report ---"))
-    report = generate_account_summary(current_user.user_id)
+    report = report_service.generate_account_summary(current_user.user_id)
     
     print(Colors.light_brown(f"\n📊 CyBank Account Summary:"))
     print(Colors.light_brown(f"   Total Accounts: {report['account_count']}"))
@@ -618,7 +708,8 @@ def handle_transaction_report():
             return
         account_id = acct.account_id
     
-    report = generate_transaction_report(current_user.user_id, account_id)
+    # Only the latest 10 are shown, so only those are merged and formatted
+    report = report_service.generate_transaction_report(current_user.user_id, account_id, limit=10)
     
     if "error" in report:
         print(Colors.light_brown(f"❌ {report['error']}"))
@@ -632,11 +723,10 @@ def handle_transaction_report():
     
     if report['transactions']:
         print(Colors.light_brown("Recent Transactions (Latest First):"))
-        display_limit = min(10, len(report['transactions']))
-        if len(report['transactions']) > 10:
-            print(Colors.light_brown(f"   (Showing first 10 of {len(report['transactions'])})\n"))
+        if report['transaction_count'] > 10:
+            print(Colors.light_brown(f"   (Showing first 10 of {report['transaction_count']})\n"))
         
-        for i, txn in enumerate(report['transactions'][:display_limit], 1):
+        for i, txn in enumerate(report['transactions'], 1):
             symbol = "+" if txn['transaction_type'] == "CREDIT" else "-"
             print(Colors.light_brown(f"   {i}. [{txn['transaction_type']}] {symbol}{format_currency(abs(txn['amount']))}"))
             print(Colors.light_brown(f"      Account: {txn['account_name']}"))
@@ -647,7 +737,7 @@ def handle_transaction_report():
 
 def handle_portfolio_report():
     print(Colors.brown("\n--- Multi-Bank Portfolio Report ---"))
-    report = generate_multi_bank_portfolio(current_user.user_id)
+    report = report_service.generate_multi_bank_portfolio(current_user.user_id)
     
     print(Colors.light_brown(f"\n🏦 Linked Banks Portfolio:"))
     print(Colors.light_brown(f"   Total Linked Banks: {report['bank_count']}"))
@@ -675,7 +765,9 @@ def handle_portfolio_report():
 
 def handle_complete_report():
     print(Colors.brown("\n--- Complete Financial Report ---"))
-    report = generate_complete_financial_report(current_user.user_id)
+    # No transaction list is shown here, so that section is not built
+    report = report_service.generate_complete_financial_report(
+        current_user.user_id, sections=("cybank_summary", "portfolio_report"))
     combined = report['combined_analysis']
     
     print(Colors.light_brown(f"\n💰 Financial Overview:"))
@@ -702,6 +794,58 @@ def handle_complete_report():
     else:
         print(Colors.light_brown(f"   Linked Banks: None\n"))
 
+def handle_export_report():
+    print(Colors.brown("\n--- Export to File ---"))
+    print(Colors.light_brown("1. Transactions"))
+    print(Colors.light_brown("2. Transfers"))
+    print(Colors.light_brown("3. Linked Banks Portfolio"))
+    kind = {"1": "transactions", "2": "transfers", "3": "portfolio"}.get(
+        Colors.input_brown("What to export: ").strip())
+    if kind is None:
+        print(Colors.light_brown("⚠️  Invalid option."))
+        return
+    
+    account_id = None
+    if kind == "transactions":
+        filter_choice = Colors.input_brown("Filter by account? (yes/no): ").strip().lower()
+        if filter_choice == "yes":
+            acct = select_account()
+            if not acct:
+                return
+            account_id = acct.account_id
+    
+    file_format = Colors.input_brown("Format (csv/jsonl) [csv]: ").strip().lower() or "csv"
+    if file_format not in ("csv", "jsonl"):
+        print(Colors.light_brown("⚠️  Format must be csv or jsonl."))
+        return
+    compress = Colors.input_brown("Compress with gzip? (yes/no) [no]: ").strip().lower() == "yes"
+    
+    default_name = f"cybank_{kind}_{current_user.username}_{datetime.now():%Y%m%d_%H%M%S}.{file_format}"
+    if compress:
+        default_name += ".gz"
+    path = Colors.input_brown(f"Save as [{os.path.join(config.EXPORT_DIR, default_name)}]: ").strip()
+    if not path:
+        os.makedirs(config.EXPORT_DIR, exist_ok=True)
+        path = os.path.join(config.EXPORT_DIR, default_name)
+    
+    try:
+        if kind == "transactions":
+            result = report_service.export_transactions(current_user.user_id, path, account_id,
+                                                        file_format, compress)
+        elif kind == "transfers":
+            result = report_service.export_transfers(current_user.user_id, path, file_format, compress)
+        else:
+            result = report_service.export_portfolio(current_user.user_id, path, file_format, compress)
+    except OSError as e:
+        print(Colors.light_brown(f"❌ Could not write {path}: {e.strerror or e}"))
+        return
+    
+    if "error" in result:
+        print(Colors.light_brown(f"❌ {result['error']}"))
+        return
+    print(Colors.light_brown(f"✅ Exported {result['row_count']:,} row(s) to {result['path']} "
+                             f"({result['bytes_written'] / 1024:,.1f} KiB)"))
+
 def handle_reports_menu():
     while True:
         cmd = prompt_reports_menu()
@@ -714,6 +858,8 @@ def handle_reports_menu():
         elif cmd == "4":
             handle_complete_report()
         elif cmd == "5":
+            handle_export_report()
+        elif cmd == "6":
             break
         else:
             print(Colors.light_brown("⚠️  Invalid option. Please select a valid menu option."))
@@ -724,7 +870,7 @@ def handle_unlink_bank_account():
         return
     confirm = Colors.input_brown(f"Are you sure you want to unlink {bank.bank_name} ({bank.account_number})? (yes/no): ").strip().lower()
     if confirm == "yes":
-        if remove_bank_account(bank.linked_bank_id, current_user.user_id):
+        if bank_integration_service.remove_bank_account(bank.linked_bank_id, current_user.user_id):
             print(Colors.light_brown(f"✅ Bank account unlinked successfully."))
         else:
             print(Colors.light_brown("❌ Failed to unlink bank account."))
@@ -751,7 +897,26 @@ def handle_bank_accounts_menu():
         else:
             print(Colors.light_brown("⚠️  Invalid option. Please select a valid menu option."))
 
-def main():
+def parse_args(argv=None):
+    """Startup options; defaults come from utils/config.py (env vars)."""
+    parser = argparse.ArgumentParser(description="CyBank CLI")
+    parser.add_argument("--storage", choices=available_engines(), default=config.STORAGE_ENGINE,
+                        help=f"storage engine (default: {config.STORAGE_ENGINE})")
+    parser.add_argument("--db-path", default=config.DB_PATH,
+                        help="SQLite database file, used by the sqlite engine")
+    parser.add_argument("--journal", default=config.JOURNAL_PATH,
+                        help="write-ahead journal file, used by the memory engine (empty = none)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    store = init_store(args.storage, path=args.db_path, journal=args.journal)
+    if store.pending_transfers(1):
+        # Bank transfers left unanswered last time (only then is the gateway started)
+        settled = transfer_service.resume_pending_transfers()
+        print(Colors.light_brown(f"Checked {settled['checked_count']} pending bank transfer(s): "
+                                 f"{settled['completed_count']} completed, {settled['failed_count']} refused, "
+                                 f"{settled['pending_count']} still pending."))
     while True:
         choice = prompt_main_menu()
         if choice == "1":
@@ -782,6 +947,9 @@ def main():
                         print(Colors.light_brown("⚠️  Invalid option. Please select a valid menu option."))
         elif choice == "3":
             print(Colors.brown("\nExiting CyBank. Goodbye!"))
+            transfer_service.stop_settle_sweep()
+            bank_gateway.close_gateway()
+            store.close()
             sys.exit(0)
         else:
             print(Colors.light_brown("⚠️  Invalid option. Please select a valid menu option."))
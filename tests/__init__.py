@@ -0,0 +1,7 @@
+# tests/__init__.py
+"""
+Regression tests (stdlib unittest; pytest runs them too).
+
+    python -m unittest discover -s tests -t .
+    python -m pytest -q tests
+"""
@@ -0,0 +1,65 @@
+# tests/test_bank_sync.py
+"""Linked bank refresh: argument checks, and balance writes kept off the event loop."""
+import asyncio
+import threading
+import unittest
+from unittest import mock
+
+from backend.storage import init_store, get_store
+from backend.services import bank_sync_service
+from backend.services.bank_adapters import FakeBankAdapter
+from backend.services.bank_integration_service import add_bank_account
+from backend.services.locks import lock_accounts
+from backend.services.user_service import register_user
+
+
+class BankSyncTest(unittest.TestCase):
+    def setUp(self):
+        init_store("memory")
+        user = register_user("syncuser", "testpass1", "Sync User")
+        self.banks = [add_bank_account(user.user_id, "BDO", f"12345678{n:02d}", "Savings", 1_000)
+                      for n in range(4)]
+
+    def tearDown(self):
+        get_store().close()
+
+    def refresh(self, **options):
+        adapter = FakeBankAdapter(latency=0, drift=0, seed=1)
+        return asyncio.run(bank_sync_service.refresh_linked_banks(self.banks, adapter, **options))
+
+    def test_bad_options_are_refused(self):
+        for options in ({"retries": -1}, {"per_bank_limit": 0}, {"timeout": 0}, {"backoff": -1}):
+            with self.subTest(**options), self.assertRaises(ValueError):
+                self.refresh(**options)
+
+    def test_blocked_write_does_not_stall_the_event_loop(self):
+        held, release = threading.Event(), threading.Event()
+
+        def hold_lock():
+            with lock_accounts(self.banks[0].linked_bank_id):
+                held.set()
+                release.wait(5)
+
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        held.wait(2)
+
+        async def run():
+            ticks = 0
+            refresh = asyncio.ensure_future(bank_sync_service.refresh_linked_banks(
+                self.banks, FakeBankAdapter(latency=0, seed=1)))
+            while ticks < 5:  # the loop keeps running while the first write waits for the lock
+                await asyncio.sleep(0.01)
+                ticks += 1
+            self.assertFalse(refresh.done())
+            release.set()
+            return await refresh
+
+        with mock.patch.object(bank_sync_service, "SYNC_WRITE_BATCH", 1):
+            result = asyncio.run(run())
+        holder.join(2)
+        self.assertEqual((result["synced_count"], result["failed_count"]), (4, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+# tests/test_columnar.py
+"""Columnar transaction history (CYBANK_HISTORY=columnar)."""
+import unittest
+
+from backend.models.transaction import Transaction
+from backend.storage import init_store
+from backend.storage.columnar import ColumnarHistory, StringTable
+from backend.services.user_service import register_user
+from backend.services.account_service import create_account
+from backend.services.transaction_service import deposit, withdraw
+
+
+class ColumnarHistoryTest(unittest.TestCase):
+    def test_many_distinct_descriptions_then_withdraw(self):
+        store = init_store("memory", history="columnar")
+        user = register_user("columnardesc", "testpass1", "Columnar Desc")
+        account = create_account(user.user_id, "Main")
+        for i in range(300):
+            deposit(account.account_id, 100, description=f"Deposit #{i}")
+        self.assertIsNotNone(withdraw(account.account_id, 50))
+
+        history = store.list_transactions(account.account_id)
+        self.assertEqual(len(history), 301)
+        self.assertEqual(store.get_account_stats(account.account_id).transaction_count, 301)
+        self.assertEqual(history[-1].transaction_type, "DEBIT")
+        self.assertEqual(history[0].description, "Deposit #0")
+        self.assertEqual(store.get_account(account.account_id).balance, 300 * 100 - 50)
+        store.close()
+
+    def test_value_a_column_cannot_hold_leaves_columns_aligned(self):
+        history = ColumnarHistory("acct", StringTable())
+        history.append(Transaction(account_id="acct", amount=100, transaction_type="CREDIT"))
+        with self.assertRaises(OverflowError):
+            history.append(Transaction(account_id="acct", amount=2 ** 63, transaction_type="CREDIT"))
+        with self.assertRaises(OverflowError):
+            history.insert(0, Transaction(account_id="acct", amount=2 ** 63, transaction_type="CREDIT"))
+        with self.assertRaises(OverflowError):
+            history.extend_rows([history.timestamps[-1]], [2 ** 63], ["CREDIT"], [None], [None])
+        self.assertEqual({len(column) for column in history.export()[0]}, {1})
+        self.assertEqual([t.amount for t in history], [100])
+
+
+if __name__ == "__main__":
+    unittest.main()
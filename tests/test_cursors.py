@@ -0,0 +1,109 @@
+# tests/test_cursors.py
+"""Page cursors survive back-dated inserts between pages, on every engine and layout."""
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from backend.storage import init_store, get_store
+from backend.models.transaction import Transaction
+from backend.models.transfer import Transfer
+from backend.services.user_service import register_user
+from backend.services.account_service import create_account
+
+T0 = datetime(2026, 1, 1, 9, 0)
+
+
+class CursorTests:
+    """Mixed into one TestCase per engine (ENGINE, OPTIONS)."""
+
+    ENGINE = None
+    OPTIONS = {}
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        store = init_store(self.ENGINE, path=os.path.join(self.tmp.name, "cybank.db"), **self.OPTIONS)
+        user = register_user("cursoruser", "testpass1", "Cursor User")
+        self.user_id = user.user_id
+        self.account_id = create_account(user.user_id, "Main").account_id
+        self.store = store
+
+    def tearDown(self):
+        get_store().close()
+        self.tmp.cleanup()
+
+    def add(self, amount, ts, transaction_type="CREDIT"):
+        txn = Transaction(account_id=self.account_id, amount=amount, transaction_type=transaction_type,
+                          description=f"row {amount}", timestamp=ts)
+        self.assertTrue(self.store.append_transaction(txn))
+
+    def amounts(self, page):
+        return [t.amount for t in page]
+
+    def test_back_dated_insert_between_oldest_first_pages(self):
+        for n in range(1, 7):
+            self.add(n, T0 + timedelta(minutes=n))
+        first = self.store.query_transactions(self.account_id, limit=3)
+        self.assertEqual(self.amounts(first), [1, 2, 3])
+        self.add(100, T0)  # older than every row already listed
+        second = self.store.query_transactions(self.account_id, limit=3, cursor=first.next_cursor)
+        self.assertEqual(self.amounts(second), [4, 5, 6])
+        self.assertIsNone(second.next_cursor)
+
+    def test_back_dated_insert_between_newest_first_pages(self):
+        for n in range(1, 7):
+            self.add(n, T0 + timedelta(minutes=n))
+        first = self.store.query_transactions(self.account_id, limit=3, newest_first=True)
+        self.assertEqual(self.amounts(first), [6, 5, 4])
+        self.add(100, T0 + timedelta(minutes=3, seconds=30))  # between row 3 and row 4
+        second = self.store.query_transactions(self.account_id, limit=3, cursor=first.next_cursor,
+                                               newest_first=True)
+        self.assertEqual(self.amounts(second), [100, 3, 2])
+
+    def test_equal_timestamps_keep_insertion_order(self):
+        for n in range(1, 5):
+            self.add(n, T0)
+        first = self.store.query_transactions(self.account_id, limit=2)
+        self.add(100, T0)
+        self.add(200, T0 - timedelta(seconds=1))
+        second = self.store.query_transactions(self.account_id, cursor=first.next_cursor)
+        self.assertEqual(self.amounts(first) + self.amounts(second), [1, 2, 3, 4, 100])
+
+    def test_filtered_pages(self):
+        for n in range(1, 9):
+            self.add(n, T0 + timedelta(minutes=n), "CREDIT" if n % 2 else "DEBIT")
+        first = self.store.query_transactions(self.account_id, limit=2, transaction_type="CREDIT")
+        self.assertEqual(self.amounts(first), [1, 3])
+        self.add(101, T0, "CREDIT")
+        second = self.store.query_transactions(self.account_id, limit=2, transaction_type="CREDIT",
+                                               cursor=first.next_cursor)
+        self.assertEqual(self.amounts(second), [5, 7])
+        self.assertIsNone(second.next_cursor)
+
+    def test_transfer_pages(self):
+        other = create_account(self.user_id, "Other").account_id
+        for n in range(1, 5):
+            self.store.add_transfer(Transfer(user_id=self.user_id, from_account_id=self.account_id,
+                                             to_account_id=other, amount=n, timestamp=T0 + timedelta(minutes=n)))
+        first = self.store.query_user_transfers(self.user_id, limit=2)
+        self.store.add_transfer(Transfer(user_id=self.user_id, from_account_id=self.account_id,
+                                         to_account_id=other, amount=100, timestamp=T0))
+        second = self.store.query_user_transfers(self.user_id, limit=2, cursor=first.next_cursor)
+        self.assertEqual(self.amounts(first) + self.amounts(second), [1, 2, 3, 4])
+
+
+class MemoryCursorTest(CursorTests, unittest.TestCase):
+    ENGINE = "memory"
+
+
+class ColumnarCursorTest(CursorTests, unittest.TestCase):
+    ENGINE = "memory"
+    OPTIONS = {"history": "columnar"}
+
+
+class SqliteCursorTest(CursorTests, unittest.TestCase):
+    ENGINE = "sqlite"
+
+
+if __name__ == "__main__":
+    unittest.main()
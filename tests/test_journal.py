@@ -0,0 +1,112 @@
+# tests/test_journal.py
+"""Memory engine write-ahead journal: big records, failed writes, replay."""
+import os
+import tempfile
+import threading
+import unittest
+
+from backend.storage import init_store, get_store
+from backend.storage.journal import JournalFailed
+from backend.services.user_service import register_user
+from backend.services.account_service import create_account
+from backend.services.transaction_service import deposit
+from backend.services.transfer_service import transfer_batch
+
+
+class JournalTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cybank.journal")
+        init_store("memory", journal=self.path)
+
+    def tearDown(self):
+        get_store().close()
+        self.tmp.cleanup()
+
+    def reopen(self):
+        return init_store("memory", journal=self.path)
+
+    def test_batch_over_65535_ops_survives_restart(self):
+        user = register_user("journalbatch", "testpass1", "Journal Batch")
+        source = create_account(user.user_id, "Source")
+        dest = create_account(user.user_id, "Dest")
+        deposit(source.account_id, 1_000_000_000)
+        items = [{"from_account_id": source.account_id, "to_account_id": dest.account_id, "amount": 1}
+                 for _ in range(22_000)]
+        self.assertTrue(transfer_batch(user.user_id, items)["committed"])
+
+        store = self.reopen()
+        self.assertEqual(store.get_account(source.account_id).balance, 1_000_000_000 - 22_000)
+        self.assertEqual(store.get_account(dest.account_id).balance, 22_000)
+        self.assertEqual(len(store.list_transactions(dest.account_id)), 22_000)
+
+    def test_record_that_cannot_be_journaled_is_rolled_back(self):
+        user = register_user("journalbad", "testpass1", "Journal Bad")
+        account = create_account(user.user_id, "Main")
+        deposit(account.account_id, 500)
+        store = get_store()
+        with self.assertRaises(TypeError):
+            with store.atomic():
+                deposit(account.account_id, 700)
+                store._log(0, object())  # not a journal value type
+        self.assertEqual(store.get_account(account.account_id).balance, 500)
+        self.assertEqual(len(store.list_transactions(account.account_id)), 1)
+
+        deposit(account.account_id, 100)  # the journal still takes later records
+        store = self.reopen()
+        self.assertEqual(store.get_account(account.account_id).balance, 600)
+
+    def test_failed_write_fails_every_waiter(self):
+        user = register_user("journaldisk", "testpass1", "Journal Disk")
+        account = create_account(user.user_id, "Main")
+        deposit(account.account_id, 1_000)
+        journal = get_store().journal
+        writing, release = threading.Event(), threading.Event()
+        journal._file = _FailingFile(journal._file, writing, release)
+        errors = []
+
+        def deposit_and_record(amount):
+            try:
+                deposit(account.account_id, amount)
+                errors.append(None)
+            except Exception as e:
+                errors.append(type(e))  # not e: its traceback would keep the account locks alive
+
+        leader = threading.Thread(target=deposit_and_record, args=(10,))
+        leader.start()
+        self.assertTrue(writing.wait(2))  # the leader is inside write()
+        follower = threading.Thread(target=deposit_and_record, args=(20,))
+        follower.start()
+        while journal.last_lsn < journal._written_lsn + 2:  # the follower's record is queued
+            threading.Event().wait(0.001)
+        release.set()
+        leader.join(2)
+        follower.join(2)
+        self.assertEqual(len(errors), 2)
+        self.assertTrue(all(e is not None and issubclass(e, OSError) for e in errors), errors)
+
+        with self.assertRaises(JournalFailed):  # nothing is appended after the gap
+            deposit(account.account_id, 30)
+        store = self.reopen()  # closing the failed store takes no snapshot
+        self.assertEqual(store.get_account(account.account_id).balance, 1_000)
+
+
+class _FailingFile:
+    """Journal file whose write() blocks until released, then fails like a full disk."""
+
+    def __init__(self, f, writing, release):
+        self._f = f
+        self._writing = writing
+        self._release = release
+
+    def write(self, data):
+        self._writing.set()
+        self._release.wait(2)
+        raise OSError(28, "No space left on device")
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+
+if __name__ == "__main__":
+    unittest.main()
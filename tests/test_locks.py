@@ -0,0 +1,43 @@
+# tests/test_locks.py
+"""Per-account locks: shared while in use, dropped once released."""
+import threading
+import unittest
+
+from backend.storage import init_store, get_store
+from backend.services import locks
+from backend.services.locks import lock_accounts
+
+
+class LockAccountsTest(unittest.TestCase):
+    def setUp(self):
+        init_store("memory")
+
+    def tearDown(self):
+        get_store().close()
+
+    def test_released_locks_leave_the_table(self):
+        for n in range(1_000):
+            with lock_accounts(f"account-{n}", f"bank-{n}"):
+                self.assertIn(f"account-{n}", locks._locks)
+        self.assertEqual(len(locks._locks), 0)
+
+    def test_held_lock_is_shared_and_reentrant(self):
+        entered = threading.Event()
+        with lock_accounts("a", "b"):
+            with lock_accounts("a"):  # same thread: re-entrant
+                pass
+            worker = threading.Thread(target=self._lock_and_signal, args=("b", entered))
+            worker.start()
+            self.assertFalse(entered.wait(0.2))  # blocked on the held lock
+        worker.join(2)
+        self.assertTrue(entered.is_set())
+        self.assertEqual(len(locks._locks), 0)
+
+    @staticmethod
+    def _lock_and_signal(key, entered):
+        with lock_accounts(key):
+            entered.set()
+
+
+if __name__ == "__main__":
+    unittest.main()
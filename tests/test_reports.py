@@ -0,0 +1,45 @@
+# tests/test_reports.py
+"""Financial reports: the complete report returns lists unless streaming is asked for."""
+import unittest
+from collections.abc import Iterator
+
+from backend.storage import init_store, get_store
+from backend.services.user_service import register_user
+from backend.services.account_service import create_account
+from backend.services.transaction_service import deposit
+from backend.services.report_service import generate_complete_financial_report, generate_transaction_report
+
+
+class CompleteReportTest(unittest.TestCase):
+    def setUp(self):
+        init_store("memory")
+        user = register_user("reportuser", "testpass1", "Report User")
+        self.user_id = user.user_id
+        account = create_account(self.user_id, "Main")
+        for amount in (1_000, 2_000, 3_000):
+            deposit(account.account_id, amount)
+
+    def tearDown(self):
+        get_store().close()
+
+    def test_transactions_are_a_list_by_default(self):
+        transactions = generate_complete_financial_report(self.user_id)["transaction_report"]["transactions"]
+        self.assertIsInstance(transactions, list)
+        self.assertEqual(transactions, generate_transaction_report(self.user_id)["transactions"])
+        self.assertEqual(len(transactions), 3)
+
+    def test_stream_returns_a_lazy_iterator(self):
+        report = generate_complete_financial_report(self.user_id, stream=True)
+        transactions = report["transaction_report"]["transactions"]
+        self.assertIsInstance(transactions, Iterator)
+        self.assertEqual(len(list(transactions)), 3)
+
+    def test_cached_report_is_a_list(self):
+        first = generate_complete_financial_report(self.user_id, transaction_limit=2)
+        second = generate_complete_financial_report(self.user_id, transaction_limit=2)
+        self.assertIs(first, second)
+        self.assertEqual(len(second["transaction_report"]["transactions"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+# tests/test_snapshot.py
+"""Memory engine recovery: snapshot (memory-mapped) plus the journal tail after it."""
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from backend.storage import init_store, get_store
+from backend.storage.snapshot import read_snapshot
+from backend.models.transaction import Transaction
+from backend.services.user_service import register_user
+from backend.services.account_service import create_account
+from backend.services.transaction_service import deposit, withdraw
+from backend.services.bank_integration_service import add_bank_account, import_statement
+
+
+class SnapshotRecoveryTests:
+    """Mixed into one TestCase per history layout (HISTORY)."""
+
+    HISTORY = None
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cybank.journal")
+        self.open()
+        user = register_user("snapshotuser", "testpass1", "Snapshot User")
+        self.user_id = user.user_id
+        self.account_id = create_account(user.user_id, "Main").account_id
+
+    def tearDown(self):
+        get_store().close()
+        self.tmp.cleanup()
+
+    def open(self, snapshot_every=0):
+        return init_store("memory", journal=self.path, history=self.HISTORY, snapshot_every=snapshot_every)
+
+    def crash(self):
+        """Stop the store the way a crash would: journal synced, no snapshot on the way out."""
+        store = get_store()
+        store.journal.close()
+        store.journal = None
+
+    def history(self, store):
+        return [(t.amount, t.description, t.category) for t in store.list_transactions(self.account_id)]
+
+    def test_snapshot_then_journal_tail(self):
+        deposit(self.account_id, 10_000, "Before snapshot", category="Salary")
+        store = get_store()
+        lsn = store.checkpoint()
+        self.assertEqual(os.path.getsize(self.path), 16)  # header only: the journal started over
+        withdraw(self.account_id, 2_500, "After snapshot", category="Food")
+        before = self.history(store)
+        self.crash()
+
+        store = self.open()
+        self.assertEqual(read_snapshot(self.path + ".snapshot").lsn, lsn)
+        self.assertEqual(self.history(store), before)
+        self.assertEqual(store.get_account(self.account_id).balance, 7_500)
+        stats = store.get_account_stats(self.account_id)
+        self.assertEqual((stats.total_credits, stats.total_debits, stats.transaction_count), (10_000, 2_500, 2))
+        self.assertEqual(stats.category_totals, {"Salary": 10_000, "Food": -2_500})
+        # New records continue after the snapshot's lsn
+        deposit(self.account_id, 1)
+        self.assertGreater(store.journal.last_lsn, lsn)
+
+    def test_everything_in_the_snapshot_comes_back(self):
+        store = get_store()
+        deposit(self.account_id, 5_000)
+        store.append_transaction(Transaction(account_id=self.account_id, amount=700, transaction_type="CREDIT",
+                                             description="Legacy row", transaction_id="legacy-0001",
+                                             timestamp=datetime(2020, 1, 1)))
+        bank_id = add_bank_account(self.user_id, "BDO", "1234567890", "Savings", 0).linked_bank_id
+        statement = os.path.join(self.tmp.name, "statement.csv")
+        with open(statement, "w") as f:
+            f.write("Date,Description,Amount\n2026-02-01,Payroll,1500.00\n2026-02-02,Rent,-800.00\n")
+        import_statement(bank_id, statement)
+        ids = [t.transaction_id for t in store.list_transactions(self.account_id)]
+        store.close()  # snapshot on the way out
+
+        store = self.open()
+        self.assertEqual([t.transaction_id for t in store.list_transactions(self.account_id)], ids)
+        self.assertEqual(ids[0], "legacy-0001")
+        self.assertEqual(store.get_account_stats(self.account_id).total_credits, 5_700)
+        self.assertEqual([t.amount for t in store.list_transactions(bank_id)], [150_000, -80_000])
+        self.assertEqual(store.get_linked_bank(bank_id).balance, 70_000)
+        self.assertEqual(store.get_user_by_username("SnapshotUser").user_id, self.user_id)
+
+    def test_torn_journal_tail_is_dropped(self):
+        get_store().checkpoint()
+        deposit(self.account_id, 300)
+        self.crash()
+        with open(self.path, "ab") as f:
+            f.write(b"\x40\x00\x00\x00torn")  # half a record header and payload
+        store = self.open()
+        self.assertEqual(store.get_account(self.account_id).balance, 300)
+        deposit(self.account_id, 200)  # appended where the good records end
+        store.close()
+        self.assertEqual(self.open().get_account(self.account_id).balance, 500)
+
+    def test_snapshot_every_records(self):
+        get_store().close()
+        store = self.open(snapshot_every=5)
+        for _ in range(12):
+            deposit(self.account_id, 100)
+        self.assertTrue(os.path.exists(self.path + ".snapshot"))
+        self.assertLess(sum(1 for _ in store.journal.records()), 5)
+        self.crash()
+        self.assertEqual(self.open().get_account(self.account_id).balance, 1_200)
+
+    def test_corrupt_snapshot_is_refused(self):
+        deposit(self.account_id, 100)
+        get_store().close()
+        snapshot = self.path + ".snapshot"
+        with open(snapshot, "r+b") as f:
+            f.seek(24 + 3)  # inside the first history column (after the 24-byte header)
+            byte = f.read(1)
+            f.seek(-1, os.SEEK_CUR)
+            f.write(bytes([byte[0] ^ 0xFF]))
+        with self.assertRaises(ValueError):
+            self.open()
+        os.remove(snapshot)
+        init_store("memory")  # for tearDown
+
+
+class ListSnapshotTest(SnapshotRecoveryTests, unittest.TestCase):
+    HISTORY = "list"
+
+
+class ColumnarSnapshotTest(SnapshotRecoveryTests, unittest.TestCase):
+    HISTORY = "columnar"
+
+
+if __name__ == "__main__":
+    unittest.main()
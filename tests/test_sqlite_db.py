@@ -0,0 +1,73 @@
+# tests/test_sqlite_db.py
+"""SQLite engine: schema.sql on a new database, failed COMMITs, reopening."""
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from backend.db import Database
+from backend.storage import init_store, get_store
+from backend.services.user_service import register_user
+from backend.services.account_service import create_account
+from backend.services.transaction_service import deposit
+
+
+class DatabaseTransactionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, "cybank.db"), pool_size=1)
+        with self.db.connection() as conn:
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("CREATE TABLE parent (id INTEGER PRIMARY KEY)")
+            conn.execute("CREATE TABLE child (parent_id INTEGER REFERENCES parent (id) "
+                         "DEFERRABLE INITIALLY DEFERRED)")
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_failed_commit_is_rolled_back_before_the_connection_is_reused(self):
+        # A deferred foreign key is only checked by COMMIT, so COMMIT itself fails
+        with self.assertRaises(sqlite3.IntegrityError):
+            with self.db.transaction() as conn:
+                conn.execute("INSERT INTO child VALUES (1)")
+        with self.db.connection() as conn:
+            self.assertFalse(conn.in_transaction)
+        self.assertEqual(self.db.fetchone("SELECT COUNT(*) FROM child")[0], 0)
+
+        # The pooled connection starts the next transaction normally
+        with self.db.transaction() as conn:
+            conn.execute("INSERT INTO parent VALUES (1)")
+            conn.execute("INSERT INTO child VALUES (1)")
+        self.assertEqual(self.db.fetchone("SELECT COUNT(*) FROM child")[0], 1)
+
+    def test_exception_in_block_rolls_back(self):
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction() as conn:
+                conn.execute("INSERT INTO parent VALUES (7)")
+                raise RuntimeError
+        self.assertIsNone(self.db.fetchone("SELECT id FROM parent"))
+
+
+class SqliteStoreTest(unittest.TestCase):
+    def test_new_database_from_schema_survives_reopen(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cybank.db")
+            init_store("sqlite", path=path)
+            user = register_user("sqliteuser", "testpass1", "Sqlite User")
+            account = create_account(user.user_id, "Main")
+            deposit(account.account_id, 12_345, category="Salary")
+            get_store().close()
+
+            store = init_store("sqlite", path=path)
+            try:
+                self.assertEqual(store.get_user_by_username("SQLITEUSER").user_id, user.user_id)
+                self.assertEqual(store.get_account(account.account_id).balance, 12_345)
+                stats = store.get_account_stats(account.account_id)
+                self.assertEqual((stats.total_credits, stats.transaction_count), (12_345, 1))
+            finally:
+                store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+# tests/test_statement_import.py
+"""Bank statement import: oldest-first and newest-first files, re-imports, shared boundary days, bad rows."""
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from backend.storage import init_store, get_store
+from backend.services.user_service import register_user
+from backend.services.bank_integration_service import add_bank_account, import_statement
+
+START = datetime(2026, 3, 1, 8, 0)
+
+
+class StatementImportTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        init_store("memory")
+        user = register_user("statementuser", "testpass1", "Statement User")
+        self.bank_id = add_bank_account(user.user_id, "BPI", "9876543210", "Savings", 0).linked_bank_id
+
+    def tearDown(self):
+        get_store().close()
+        self.tmp.cleanup()
+
+    def write_csv(self, name, days, extra_rows=()):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", newline="") as f:
+            f.write("Date,Description,Amount\n")
+            for day in days:
+                f.write(f"{(START + timedelta(days=day)).isoformat()},Row {day},{day + 1}.00\n")
+            for line in extra_rows:
+                f.write(line + "\n")
+        return path
+
+    def history(self):
+        return get_store().list_transactions(self.bank_id)
+
+    def assert_imported_in_time_order(self, count):
+        history = self.history()
+        self.assertEqual([t.description for t in history], [f"Row {day}" for day in range(count)])
+
+    def test_oldest_first_file(self):
+        result = import_statement(self.bank_id, self.write_csv("asc.csv", range(25)), batch_size=10)
+        self.assertEqual((result["imported_count"], result["failed_count"]), (25, 0))
+        self.assert_imported_in_time_order(25)
+
+    def test_newest_first_file_keeps_every_row(self):
+        path = self.write_csv("desc.csv", reversed(range(25)), extra_rows=["not a date,Bad,1.00"])
+        result = import_statement(self.bank_id, path, batch_size=10)
+        self.assertEqual((result["imported_count"], result["failed_count"]), (25, 1))
+        self.assertEqual(result["total_amount"], sum(range(1, 26)) * 100)
+        self.assert_imported_in_time_order(25)
+
+        # Importing it again adds nothing
+        again = import_statement(self.bank_id, path, batch_size=10)
+        self.assertEqual((again["imported_count"], again["skipped_count"]), (0, 25))
+        self.assertEqual(len(self.history()), 25)
+
+    def test_newest_first_file_after_earlier_import(self):
+        import_statement(self.bank_id, self.write_csv("first.csv", range(10)), batch_size=4)
+        result = import_statement(self.bank_id, self.write_csv("next.csv", reversed(range(25))), batch_size=4)
+        self.assertEqual((result["imported_count"], result["skipped_count"], result["failed_count"]), (15, 10, 0))
+        self.assert_imported_in_time_order(25)
+
+    def write_lines(self, name, lines):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", newline="") as f:
+            f.write("Date,Description,Amount\n" + "".join(line + "\n" for line in lines))
+        return path
+
+    def test_statements_sharing_a_boundary_day(self):
+        first = self.write_lines("march.csv", ["2026-03-30,Payroll,5000.00", "2026-03-31,Coffee,-120.00",
+                                               "2026-03-31,Rent,-3000.00"])
+        self.assertEqual(import_statement(self.bank_id, first)["imported_count"], 3)
+        # Date-only rows: March 31 is the last day of one statement and the first of the next
+        second = self.write_lines("april.csv", ["2026-03-31,Coffee,-120.00", "2026-03-31,Rent,-3000.00",
+                                                "2026-03-31,Coffee,-120.00", "2026-03-31,Late fee,-50.00",
+                                                "2026-04-01,Groceries,-800.00"])
+        result = import_statement(self.bank_id, second)
+        self.assertEqual((result["imported_count"], result["skipped_count"]), (3, 2))
+        self.assertEqual([(t.description, t.amount) for t in self.history()],
+                         [("Payroll", 500_000), ("Coffee", -12_000), ("Rent", -300_000), ("Coffee", -12_000),
+                          ("Late fee", -5_000), ("Groceries", -80_000)])
+
+        again = import_statement(self.bank_id, second)  # the boundary is now April 1
+        self.assertEqual((again["imported_count"], again["skipped_count"]), (0, 5))
+
+    def test_row_older_than_an_earlier_batch_is_reported(self):
+        result = import_statement(self.bank_id, self.write_csv("late.csv", [0, 1, 2, 3, 4, 5, 1]), batch_size=3)
+        self.assertEqual((result["imported_count"], result["failed_count"]), (6, 1))
+        self.assertEqual(result["failed"][0]["error"], "Out of order (older than an earlier row)")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+# tests/test_transfer_batch.py
+"""transfer_batch validation: bad items are refused before anything is applied."""
+import unittest
+
+from backend.storage import init_store, get_store
+from backend.services.user_service import register_user
+from backend.services.account_service import create_account
+from backend.services.transaction_service import deposit
+from backend.services.transfer_service import transfer_batch
+
+
+class TransferBatchTest(unittest.TestCase):
+    def setUp(self):
+        init_store("memory")
+        user = register_user("batchuser", "testpass1", "Batch User")
+        self.user_id = user.user_id
+        self.source = create_account(user.user_id, "Source").account_id
+        self.dest = create_account(user.user_id, "Dest").account_id
+        deposit(self.source, 10_000)
+
+    def tearDown(self):
+        get_store().close()
+
+    def item(self, amount):
+        return {"from_account_id": self.source, "to_account_id": self.dest, "amount": amount}
+
+    def test_amount_must_be_whole_centavos(self):
+        for amount in (True, 1.5, "100", 0, -5, None):
+            with self.subTest(amount=amount):
+                result = transfer_batch(self.user_id, [self.item(100), self.item(amount)])
+                self.assertFalse(result["committed"])
+                self.assertEqual(result["failed"], [{"index": 1, "error": "Amount must be a positive number of centavos"}])
+        self.assertEqual(get_store().get_account(self.dest).balance, 0)
+
+    def test_skipped_items_are_reported(self):
+        result = transfer_batch(self.user_id, [self.item(False), self.item(2_500), self.item(20_000)],
+                                all_or_nothing=False)
+        self.assertTrue(result["committed"])
+        self.assertEqual([f["index"] for f in result["failed"]], [0, 2])
+        self.assertEqual((result["completed_count"], result["total_amount"]), (1, 2_500))
+        self.assertEqual(get_store().get_account(self.dest).balance, 2_500)
+
+
+if __name__ == "__main__":
+    unittest.main()
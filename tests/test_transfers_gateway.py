@@ -0,0 +1,301 @@
+# tests/test_transfers_gateway.py
+"""External transfers through the bank gateway: every status change, on both engines."""
+import os
+import tempfile
+import threading
+import time
+import unittest
+from datetime import timedelta
+from unittest import mock
+
+from backend.storage import init_store, get_store
+from backend.models.transfer import Transfer
+from backend.services import bank_gateway, locks, transfer_service
+from backend.services.bank_gateway import (BankGateway, CircuitBreaker, GatewayResult, GatewayTimeout,
+                                           GatewayUnavailable, init_gateway, close_gateway, register_gateway)
+from backend.services.user_service import register_user
+from backend.services.account_service import create_account
+from backend.services.bank_integration_service import add_bank_account
+from backend.services.transaction_service import deposit
+
+
+class SilentGateway(BankGateway):
+    """Takes nothing in and never answers: every credit times out."""
+
+    name = "silent"
+
+    def credit(self, transfer, timeout=None):
+        raise GatewayTimeout("no answer")
+
+    def status(self, transfer_id, timeout=None):
+        return None
+
+
+class RecordingGateway(BankGateway):
+    """Confirms every credit and remembers it (status() knows nothing before that)."""
+
+    name = "recording"
+
+    def __init__(self):
+        self.credits = []
+
+    def credit(self, transfer, timeout=None):
+        self.credits.append(transfer.transfer_id)
+        return GatewayResult(True, reference="REF1")
+
+    def status(self, transfer_id, timeout=None):
+        return GatewayResult(True) if transfer_id in self.credits else None
+
+
+class ExternalTransferTests:
+    """Mixed into one TestCase per storage engine (ENGINE)."""
+
+    ENGINE = None
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        init_store(self.ENGINE, path=os.path.join(self.tmp.name, "cybank.db"))
+        user = register_user("gatewayuser", "testpass1", "Gateway User")
+        self.user_id = user.user_id
+        self.account = create_account(self.user_id, "Main")
+        deposit(self.account.account_id, 100_000)
+        self.bank = add_bank_account(self.user_id, "BDO", "1234567890", "Savings", 0)
+
+    def tearDown(self):
+        transfer_service.stop_settle_sweep()
+        close_gateway()
+        get_store().close()
+        self.tmp.cleanup()
+
+    def use_stub(self, timeout=2.0, **server_options):
+        return init_gateway("stub", server_options={"latency": 0.0, "seed": 1, **server_options},
+                            timeout=timeout)
+
+    def send(self, amount=10_000):
+        return transfer_service.transfer_to_external_bank(self.user_id, self.account.account_id,
+                                                          self.bank.linked_bank_id, amount)
+
+    def balances(self):
+        store = get_store()
+        return (store.get_account(self.account.account_id).balance,
+                store.get_linked_bank(self.bank.linked_bank_id).balance)
+
+    def status(self, transfer_id):
+        return get_store().get_transfer(transfer_id).status
+
+    def test_confirmed_transfer_is_completed(self):
+        gateway = self.use_stub()
+        record = self.send()
+        self.assertEqual(record.status, "completed")
+        self.assertEqual(self.status(record.transfer_id), "completed")
+        self.assertEqual(self.balances(), (90_000, 10_000))
+        self.assertEqual(gateway.server.credited, {("BDO", "1234567890"): 10_000})
+
+    def test_rejected_transfer_is_reversed(self):
+        gateway = self.use_stub(reject_rate=1.0)
+        self.assertIsNone(self.send())
+        self.assertEqual(self.balances(), (100_000, 0))
+        (transfer_id,) = gateway.server.results
+        self.assertEqual(self.status(transfer_id), "failed")
+        descriptions = [t.description for t in get_store().list_transactions(self.account.account_id)]
+        self.assertIn("Reversal: transfer to BDO (1234567890)", descriptions)
+
+    def test_unavailable_gateway_reverses_the_debit(self):
+        gateway = self.use_stub()
+        gateway.server.stop()  # nothing listening: the connection is refused
+        self.assertIsNone(self.send())
+        self.assertEqual(self.balances(), (100_000, 0))
+        self.assertEqual(get_store().pending_transfers(None), [])
+
+    def test_unanswered_transfer_stays_pending_until_settled(self):
+        gateway = self.use_stub(timeout=0.2, hang_rate=1.0)
+        record = self.send()
+        self.assertEqual(record.status, "pending")
+        self.assertEqual(self.balances(), (90_000, 0))  # reserved, not credited yet
+
+        result = transfer_service.settle_pending_transfers(min_age=timedelta(0))
+        self.assertEqual(result["completed_count"], 1)
+        self.assertEqual(self.status(record.transfer_id), "completed")
+        self.assertEqual(self.balances(), (90_000, 10_000))
+        # Settling twice changes nothing
+        self.assertEqual(transfer_service.settle_pending_transfers(min_age=timedelta(0))["checked_count"], 0)
+        self.assertEqual(gateway.server.credited, {("BDO", "1234567890"): 10_000})
+
+    def test_unanswered_rejection_is_released_when_settled(self):
+        self.use_stub(timeout=0.2, hang_rate=1.0, reject_rate=1.0)
+        record = self.send()
+        self.assertEqual(record.status, "pending")
+
+        result = transfer_service.settle_pending_transfers(min_age=timedelta(0))
+        self.assertEqual(result["failed_count"], 1)
+        self.assertEqual(self.status(record.transfer_id), "failed")
+        self.assertEqual(self.balances(), (100_000, 0))
+
+    def test_settle_skips_transfers_younger_than_min_age(self):
+        self.use_stub(timeout=0.2, hang_rate=1.0)
+        record = self.send()
+        result = transfer_service.settle_pending_transfers(min_age=timedelta(hours=1))
+        self.assertEqual(result["checked_count"], 0)
+        self.assertEqual(self.status(record.transfer_id), "pending")
+
+    def test_transfer_the_gateway_never_received_is_sent_again(self):
+        register_gateway("silent", SilentGateway)
+        register_gateway("recording", RecordingGateway)
+        init_gateway("silent")
+        record = self.send()
+        self.assertEqual(record.status, "pending")
+
+        gateway = init_gateway("recording")
+        result = transfer_service.resume_pending_transfers()
+        self.assertEqual(result, {"checked_count": 1, "completed_count": 1, "failed_count": 0, "pending_count": 0})
+        self.assertEqual(gateway.credits, [record.transfer_id])
+        self.assertEqual(self.status(record.transfer_id), "completed")
+        self.assertEqual(self.balances(), (90_000, 10_000))
+
+    def test_settling_takes_no_lock_per_transfer(self):
+        self.use_stub(timeout=0.2, hang_rate=1.0)
+        records = [self.send(1_000) for _ in range(3)]
+        transfer_service.settle_pending_transfers(min_age=timedelta(0))
+        self.assertFalse({r.transfer_id for r in records} & set(locks._locks))
+
+    def test_batch_sends_linked_bank_items_through_the_gateway(self):
+        gateway = self.use_stub()
+        other = add_bank_account(self.user_id, "BPI", "5555500000", "Checking", 0)
+        items = [{"from_account_id": self.account.account_id, "to_linked_bank_id": self.bank.linked_bank_id,
+                  "amount": 1_000},
+                 {"from_account_id": self.account.account_id, "to_linked_bank_id": other.linked_bank_id,
+                  "amount": 2_000}]
+        report = transfer_service.transfer_batch(self.user_id, items)
+        self.assertEqual((report["completed_count"], report["pending_count"], report["failed_count"]), (2, 0, 0))
+        self.assertEqual(gateway.server.credited, {("BDO", "1234567890"): 1_000, ("BPI", "5555500000"): 2_000})
+        self.assertEqual(get_store().get_linked_bank(other.linked_bank_id).balance, 2_000)
+
+        gateway.server.reject_rate = 1.0
+        savings = create_account(self.user_id, "Savings")
+        report = transfer_service.transfer_batch(self.user_id, items[:1] + [
+            {"from_account_id": self.account.account_id, "to_account_id": savings.account_id, "amount": 500}])
+        self.assertTrue(report["committed"])
+        self.assertEqual(report["failed"][0]["index"], 0)
+        self.assertEqual((report["completed_count"], report["failed_count"]), (1, 1))
+        self.assertEqual(self.balances(), (96_500, 1_000))
+
+
+class MemoryExternalTransferTest(ExternalTransferTests, unittest.TestCase):
+    ENGINE = "memory"
+
+
+class SqliteExternalTransferTest(ExternalTransferTests, unittest.TestCase):
+    ENGINE = "sqlite"
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=lambda: self.now)
+
+    def test_opens_after_failures_then_half_opens_and_closes(self):
+        self.breaker.before_call()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, "closed")
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, "open")
+        with self.assertRaises(GatewayUnavailable):
+            self.breaker.before_call()
+
+        self.now = 10.0
+        self.breaker.before_call()  # the trial call
+        self.assertEqual(self.breaker.state, "half-open")
+        with self.assertRaises(GatewayUnavailable):
+            self.breaker.before_call()  # only one trial at a time
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, "closed")
+        self.breaker.before_call()
+
+    def test_failed_trial_opens_it_again(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.now = 10.0
+        self.breaker.before_call()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, "open")
+        with self.assertRaises(GatewayUnavailable):
+            self.breaker.before_call()
+
+    def test_open_circuit_fails_fast_without_connecting(self):
+        gateway = bank_gateway.PooledBankGateway("127.0.0.1", 1, breaker=self.breaker, connect_timeout=0.5)
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        with self.assertRaises(GatewayUnavailable):
+            gateway.status("any")
+        self.assertEqual(gateway.connections_opened, 0)
+        gateway.close()
+
+    def stub_gateway(self, **server_options):
+        gateway = init_gateway("stub", server_options={"latency": 0.0, "seed": 1, **server_options},
+                               breaker=self.breaker, timeout=2.0)
+        self.addCleanup(close_gateway)
+        return gateway
+
+    def open_circuit(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.now = 10.0  # half-open on the next call
+
+    @staticmethod
+    def transfers(count):
+        return [Transfer(user_id="u", from_account_id="a", amount=100 * (n + 1), to_bank_name="BDO",
+                         to_account_number=f"{n:010d}", status="pending") for n in range(count)]
+
+    def test_half_open_batch_sends_the_trial_then_the_rest(self):
+        gateway = self.stub_gateway()
+        self.open_circuit()
+        results = gateway.credit_many(self.transfers(4))
+        self.assertTrue(all(isinstance(r, GatewayResult) and r.confirmed for r in results), results)
+        self.assertEqual(self.breaker.state, "closed")
+        self.assertEqual(gateway.server.requests, 4)
+
+    def test_half_open_batch_stops_after_a_failed_trial(self):
+        gateway = self.stub_gateway(unavailable_rate=1.0)
+        self.open_circuit()
+        results = gateway.credit_many(self.transfers(3))
+        self.assertTrue(all(isinstance(r, GatewayUnavailable) for r in results), results)
+        self.assertEqual(self.breaker.state, "open")
+        self.assertEqual(gateway.server.requests, 1)  # only the trial reached the gateway
+
+
+class ConnectionPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.gateway = init_gateway("stub", server_options={"latency": 0.0, "seed": 1}, pool_size=4, timeout=2.0)
+
+    def tearDown(self):
+        close_gateway()
+
+    def test_idle_connection_is_reused(self):
+        for _ in range(5):
+            self.assertIsNone(self.gateway.status("any"))
+        self.assertEqual(self.gateway.connections_opened, 1)
+
+    def test_slow_connect_does_not_hold_up_other_callers(self):
+        connecting, release = threading.Event(), threading.Event()
+        real = bank_gateway._Connection
+
+        def connection(address, connect_timeout):
+            if not connecting.is_set():  # the first connect hangs until released
+                connecting.set()
+                release.wait(5)
+            return real(address, connect_timeout)
+
+        with mock.patch.object(bank_gateway, "_Connection", side_effect=connection):
+            slow = threading.Thread(target=self.gateway.status, args=("slow",))
+            slow.start()
+            self.assertTrue(connecting.wait(2))
+            started = time.monotonic()
+            self.assertIsNone(self.gateway.status("fast"))  # opens its own connection meanwhile
+            self.assertLess(time.monotonic() - started, 1.0)
+            release.set()
+            slow.join(2)
+        self.assertEqual(self.gateway.connections_opened, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
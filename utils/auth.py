@@ -1,12 +1,133 @@
 # utils/auth.py
+"""
+Password hashing para sa CyBank users.
+
+Stored hash formats (the cost parameters travel with the hash):
+    scrypt$<n>$<r>$<p>$<salt hex>$<hash hex>
+    pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>
+    <salt hex>$<sha256 hex>                      (legacy, verify only)
+
+KEY LOGIC:
+- hash_password() uses the KDF and cost set in utils/config.py
+- needs_rehash() tells login to upgrade hashes made with other settings
+- Verification runs on a small bounded thread pool (hashlib releases the GIL
+  while hashing), so a burst of logins cannot take over every thread;
+  submit_verify() returns a Future; averify_password() and
+  ahash_password() are awaitable
+- asyncio and concurrent.futures are imported on first use, so importing
+  this module (and user_service) stays cheap at CLI startup
+"""
 import hashlib
+import hmac
 import os
+import threading
+from typing import TYPE_CHECKING
+
+from utils import config
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+SALT_BYTES = 16
+DKLEN = 32
+
+
+def _scrypt(raw_password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    # scrypt needs ~128 * r * n bytes; give it headroom above the 32 MiB default
+    maxmem = 256 * r * n * p + 1024 * 1024
+    return hashlib.scrypt(raw_password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=maxmem, dklen=DKLEN)
+
+
+def _pbkdf2(raw_password: str, salt: bytes, iterations: int) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", raw_password.encode(), salt, iterations, dklen=DKLEN)
+
+
+def hash_password(raw_password: str, kdf: str = None, **cost) -> str:
+    """
+    Hash a password with a salted KDF.
+
+    Args:
+        raw_password: Plain text password
+        kdf: "scrypt" or "pbkdf2_sha256" (default: config.PASSWORD_KDF)
+        **cost: Override cost parameters (n, r, p for scrypt; iterations for pbkdf2)
+
+    Returns:
+        Encoded hash string including KDF name, cost and salt
+    """
+    kdf = kdf or config.PASSWORD_KDF
+    salt = os.urandom(SALT_BYTES)
+    if kdf == "scrypt":
+        n = cost.get("n", config.SCRYPT_N)
+        r = cost.get("r", config.SCRYPT_R)
+        p = cost.get("p", config.SCRYPT_P)
+        digest = _scrypt(raw_password, salt, n, r, p)
+        return f"scrypt${n}${r}${p}${salt.hex()}${digest.hex()}"
+    if kdf == "pbkdf2_sha256":
+        iterations = cost.get("iterations", config.PBKDF2_ITERATIONS)
+        digest = _pbkdf2(raw_password, salt, iterations)
+        return f"pbkdf2_sha256${iterations}${salt.hex()}${digest.hex()}"
+    raise ValueError(f"Unknown password KDF '{kdf}'")
 
-def hash_password(raw_password: str) -> str:
-    salt = os.urandom(16).hex()
-    pwd_hash = hashlib.sha256((salt + raw_password).encode()).hexdigest()
-    return f"{salt}${pwd_hash}"
 
 def verify_password(raw_password: str, stored_hash: str) -> bool:
-    salt, pwd = stored_hash.split('$', 1)
-    return hashlib.sha256((salt + raw_password).encode()).hexdigest() == pwd
\ No newline at end of file
+    """Check a password against any supported stored hash format."""
+    parts = stored_hash.split('$')
+    if parts[0] == "scrypt" and len(parts) == 6:
+        _, n, r, p, salt, pwd = parts
+        digest = _scrypt(raw_password, bytes.fromhex(salt), int(n), int(r), int(p)).hex()
+    elif parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+        _, iterations, salt, pwd = parts
+        digest = _pbkdf2(raw_password, bytes.fromhex(salt), int(iterations)).hex()
+    elif len(parts) == 2:
+        # Legacy single SHA-256 hash
+        salt, pwd = parts
+        digest = hashlib.sha256((salt + raw_password).encode()).hexdigest()
+    else:
+        return False
+    return hmac.compare_digest(digest, pwd)
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    """True if the hash was not made with the currently configured KDF and cost."""
+    parts = stored_hash.split('$')
+    kdf = config.PASSWORD_KDF
+    if kdf == "scrypt":
+        return parts[:4] != ["scrypt", str(config.SCRYPT_N), str(config.SCRYPT_R), str(config.SCRYPT_P)]
+    if kdf == "pbkdf2_sha256":
+        return parts[:2] != ["pbkdf2_sha256", str(config.PBKDF2_ITERATIONS)]
+    return True
+
+
+# ---------------- Bounded verification pool ----------------
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> "ThreadPoolExecutor":
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                _executor = ThreadPoolExecutor(max_workers=config.AUTH_WORKERS,
+                                               thread_name_prefix="cybank-auth")
+    return _executor
+
+
+def submit_verify(raw_password: str, stored_hash: str) -> "Future":
+    """Queue a password check on the auth pool; the Future resolves to a bool."""
+    return _get_executor().submit(verify_password, raw_password, stored_hash)
+
+
+async def averify_password(raw_password: str, stored_hash: str) -> bool:
+    """Awaitable verify_password() that runs on the auth pool, not the event loop."""
+    import asyncio
+    return await asyncio.wrap_future(submit_verify(raw_password, stored_hash))
+
+
+async def ahash_password(raw_password: str) -> str:
+    """Awaitable hash_password() that runs on the auth pool, not the event loop."""
+    import asyncio
+    return await asyncio.wrap_future(_get_executor().submit(hash_password, raw_password))
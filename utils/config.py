@@ -0,0 +1,71 @@
+# utils/config.py
+"""
+Central configuration for CyBank.
+
+Values come from environment variables (see .env) so the same code can run
+against different storage engines without edits. cli.main.main() can also
+override them with command-line flags at startup.
+"""
+import os
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Storage engine: "sqlite" (persistent, default) or "memory" (lost on exit)
+STORAGE_ENGINE = os.environ.get("CYBANK_STORAGE", "sqlite")
+
+# Memory engine transaction history: "list" (Transaction objects) or "columnar" (typed arrays)
+HISTORY_LAYOUT = os.environ.get("CYBANK_HISTORY", "list")
+
+# Memory engine write-ahead journal (backend/storage/journal.py); empty = no journal
+JOURNAL_PATH = os.environ.get("CYBANK_JOURNAL_PATH", "")
+# When a committed change is fsync'd: "every-op" (group commit), "interval" or "off"
+JOURNAL_FSYNC = os.environ.get("CYBANK_JOURNAL_FSYNC", "every-op")
+JOURNAL_FSYNC_INTERVAL_MS = int(os.environ.get("CYBANK_JOURNAL_FSYNC_INTERVAL_MS", "10"))
+# Snapshot (<journal>.snapshot) every N journal records, plus on exit; 0 = only on exit
+SNAPSHOT_EVERY = int(os.environ.get("CYBANK_SNAPSHOT_EVERY", "100000"))
+
+# SQLite engine settings
+DB_PATH = os.environ.get("CYBANK_DB_PATH", os.path.join(PROJECT_ROOT, "data", "cybank.db"))
+DB_POOL_SIZE = int(os.environ.get("CYBANK_DB_POOL_SIZE", "5"))
+
+# Financial reports cached per user until their data changes; 0 = no caching
+REPORT_CACHE_SIZE = int(os.environ.get("CYBANK_REPORT_CACHE_SIZE", "256"))
+
+# Linked bank balance sync (backend/services/bank_sync_service.py)
+BANK_ADAPTER = os.environ.get("CYBANK_BANK_ADAPTER", "fake")  # see bank_adapters.register_adapter
+# Requests in flight per bank (banks are refreshed side by side)
+BANK_SYNC_PER_BANK_LIMIT = int(os.environ.get("CYBANK_BANK_SYNC_PER_BANK_LIMIT", "50"))
+BANK_SYNC_TIMEOUT_SECONDS = float(os.environ.get("CYBANK_BANK_SYNC_TIMEOUT_SECONDS", "10"))
+BANK_SYNC_RETRIES = int(os.environ.get("CYBANK_BANK_SYNC_RETRIES", "3"))
+# First retry waits about this long, then doubles (with jitter)
+BANK_SYNC_BACKOFF_SECONDS = float(os.environ.get("CYBANK_BANK_SYNC_BACKOFF_SECONDS", "0.5"))
+# Linked banks synced longer ago than this are refreshed
+BANK_SYNC_STALE_MINUTES = float(os.environ.get("CYBANK_BANK_SYNC_STALE_MINUTES", "15"))
+
+# Outbound transfers to linked banks (backend/services/bank_gateway.py)
+BANK_GATEWAY = os.environ.get("CYBANK_BANK_GATEWAY", "stub")  # "stub" (local server) or "tcp"
+BANK_GATEWAY_ADDRESS = os.environ.get("CYBANK_BANK_GATEWAY_ADDRESS", "127.0.0.1:9750")
+# Persistent connections to the gateway (requests are pipelined on each)
+BANK_GATEWAY_POOL_SIZE = int(os.environ.get("CYBANK_BANK_GATEWAY_POOL_SIZE", "4"))
+BANK_GATEWAY_TIMEOUT_SECONDS = float(os.environ.get("CYBANK_BANK_GATEWAY_TIMEOUT_SECONDS", "5"))
+BANK_GATEWAY_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("CYBANK_BANK_GATEWAY_CONNECT_TIMEOUT_SECONDS", "2"))
+# Circuit breaker: fail fast for RESET_SECONDS after FAILURES failed calls in a row
+BANK_GATEWAY_BREAKER_FAILURES = int(os.environ.get("CYBANK_BANK_GATEWAY_BREAKER_FAILURES", "5"))
+BANK_GATEWAY_BREAKER_RESET_SECONDS = float(os.environ.get("CYBANK_BANK_GATEWAY_BREAKER_RESET_SECONDS", "10"))
+# While transfers are left pending (no answer in time), they are re-checked this often
+BANK_GATEWAY_SETTLE_INTERVAL_SECONDS = float(os.environ.get("CYBANK_BANK_GATEWAY_SETTLE_INTERVAL_SECONDS", "30"))
+
+# Default folder for report exports (CLI Financial Reports → Export)
+EXPORT_DIR = os.environ.get("CYBANK_EXPORT_DIR", os.path.join(PROJECT_ROOT, "exports"))
+
+# Username matching: "casefold" (Juan == juan, default) or "exact"
+USERNAME_CASE = os.environ.get("CYBANK_USERNAME_CASE", "casefold")
+
+# Password hashing (utils/auth.py). Changing these upgrades hashes on next login.
+PASSWORD_KDF = os.environ.get("CYBANK_PASSWORD_KDF", "scrypt")  # "scrypt" or "pbkdf2_sha256"
+SCRYPT_N = int(os.environ.get("CYBANK_SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.environ.get("CYBANK_SCRYPT_R", "8"))
+SCRYPT_P = int(os.environ.get("CYBANK_SCRYPT_P", "1"))
+PBKDF2_ITERATIONS = int(os.environ.get("CYBANK_PBKDF2_ITERATIONS", "600000"))
+# Max password checks running at once
+AUTH_WORKERS = int(os.environ.get("CYBANK_AUTH_WORKERS", "4"))
@@ -0,0 +1,43 @@
+# utils/lazy.py
+"""
+Lazy module imports para sa mabilis na CLI start.
+
+lazy_import(name) returns the module object right away, but the module's
+code (and everything it imports) only runs the first time one of its
+attributes is read. cli/main.py uses it for the services, so the first menu
+appears without loading reports, transfers, password hashing, etc.
+
+KEY LOGIC:
+- Built on importlib.util.LazyLoader; the module is registered in
+  sys.modules immediately, so a later normal import gets the same object
+- A module that is already imported is returned as is
+- Call sites must use module.attribute (from-imports would load it at once)
+"""
+import importlib.util
+import sys
+
+
+def lazy_import(name: str):
+    """
+    Import a module on first attribute access.
+
+    Args:
+        name: Absolute module name (e.g. "backend.services.report_service")
+
+    Returns:
+        The (not yet executed) module
+
+    Raises:
+        ModuleNotFoundError: if the module does not exist
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
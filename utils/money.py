@@ -0,0 +1,73 @@
+# utils/money.py
+"""
+Fixed-point money para sa CyBank.
+
+Every balance and amount in the app is an int number of centavos (PHP minor
+units): ₱1,234.50 is 123450. Integer sums are exact, so long histories never
+drift like float totals do, and the storage engines can keep amounts in
+plain int64 columns.
+
+KEY LOGIC:
+- Convert only at the edges: parse_amount() for what the user types,
+  to_centavos() for pesos coming from elsewhere, format_pesos() for display,
+  plain_pesos() for files (exports)
+- Pesos are converted through Decimal, so 0.1 + 0.2 style errors never reach
+  the stored value
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+CENTAVOS_PER_PESO = 100
+CENTAVO = Decimal("0.01")
+
+
+def to_centavos(pesos) -> int:
+    """
+    Convert a peso amount (int, float, Decimal or numeric string) to centavos.
+
+    Rounds half-up to the nearest centavo.
+
+    Raises:
+        ValueError: if the value is not a finite number
+    """
+    try:
+        value = Decimal(str(pesos).strip())
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount '{pesos}'") from None
+    if not value.is_finite():
+        raise ValueError(f"Invalid amount '{pesos}'")
+    return int(value.quantize(CENTAVO, rounding=ROUND_HALF_UP) * CENTAVOS_PER_PESO)
+
+
+def parse_amount(text: str) -> int:
+    """
+    Parse a peso amount typed by the user ("1,250.50", "₱300") into centavos.
+
+    Raises:
+        ValueError: if it is not a number or has more than 2 decimal places
+    """
+    cleaned = str(text).strip().replace(",", "").lstrip("₱").strip()
+    try:
+        value = Decimal(cleaned)
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount '{text}'") from None
+    if not value.is_finite() or value != value.quantize(CENTAVO):
+        raise ValueError(f"Invalid amount '{text}'")
+    return int(value * CENTAVOS_PER_PESO)
+
+
+def to_pesos(centavos: int) -> Decimal:
+    """Exact peso value of a centavo amount (e.g. for export)."""
+    return Decimal(centavos) / CENTAVOS_PER_PESO
+
+
+def plain_pesos(centavos: int) -> str:
+    """123450 → "1234.50", -5 → "-0.05" (no separators; for CSV/JSON files)."""
+    pesos, cents = divmod(abs(int(centavos)), CENTAVOS_PER_PESO)
+    return f"{'-' if centavos < 0 else ''}{pesos}.{cents:02d}"
+
+
+def format_pesos(centavos: int, signed: bool = False) -> str:
+    """123450 → "1,234.50" (signed=True adds "+" to non-negative amounts)."""
+    pesos, cents = divmod(abs(int(centavos)), CENTAVOS_PER_PESO)
+    sign = "-" if centavos < 0 else ("+" if signed else "")
+    return f"{sign}{pesos:,}.{cents:02d}"
@@ -0,0 +1,200 @@
+# utils/statements.py
+"""
+Streaming readers para sa bank statement files (CSV and OFX).
+
+Both readers take an open text stream and yield one row at a time, so a
+statement of any size is read in constant memory. They only split the file
+into raw text fields; bank_integration_service.import_statement() turns the
+fields into dates and centavos (parse_statement_date / parse_statement_amount)
+and validates them batch by batch.
+
+Each row is (row_number, fields) where fields maps a canonical column name
+("date", "amount", "debit", "credit", "description", "category") to its
+raw text. row_number is the line of the record for CSV and the 1-based
+position of the <STMTTRN> for OFX.
+
+KEY LOGIC:
+- CSV: the header names the columns (case-insensitive, common bank aliases
+  like "Posting Date", "Particulars", "Withdrawal"/"Deposit" are accepted);
+  a signed "amount" column or separate "debit"/"credit" columns
+- OFX 1.x (SGML) and 2.x (XML): the file is read in chunks and cut at "<",
+  so statements written on a single line stream just as well
+- closing_balance is the statement's own ending balance (OFX LEDGERBAL,
+  last "balance" cell of a CSV), or None; only final after iterating
+"""
+import csv
+from datetime import datetime, timedelta, timezone
+from html import unescape
+
+from utils.money import parse_amount
+
+# Canonical column → accepted header names (lowercase)
+CSV_COLUMNS = {
+    "date": ("date", "posting date", "posted date", "transaction date", "value date", "trans date"),
+    "amount": ("amount", "transaction amount"),
+    "debit": ("debit", "debits", "withdrawal", "withdrawals", "debit amount"),
+    "credit": ("credit", "credits", "deposit", "deposits", "credit amount"),
+    "description": ("description", "details", "particulars", "memo", "payee", "narrative", "name"),
+    "category": ("category",),
+    "balance": ("balance", "running balance", "available balance"),
+}
+
+# Tried in order after ISO 8601 / OFX dates
+DATE_FORMATS = ("%m/%d/%Y", "%m/%d/%Y %H:%M", "%m/%d/%Y %H:%M:%S", "%d %b %Y", "%b %d, %Y", "%d-%b-%Y")
+
+OFX_CHUNK_SIZE = 64 * 1024
+
+# <STMTTRN> children → canonical field
+_OFX_FIELDS = {"DTPOSTED": "date", "TRNAMT": "amount", "NAME": "description", "MEMO": "memo"}
+
+
+def parse_statement_date(text: str) -> datetime:
+    """
+    Parse a statement date into a naive datetime (UTC when the date has an offset).
+
+    Accepts ISO 8601 ("2025-01-31", "2025-01-31T14:05:00+08:00"), OFX
+    ("20250131", "20250131140500.000[+8:PHT]") and DATE_FORMATS.
+
+    Raises:
+        ValueError: if the text is not a date in any of those forms
+    """
+    text = text.strip()
+    if len(text) >= 8 and text[:8].isdigit():
+        return _parse_ofx_date(text)
+    try:
+        value = datetime.fromisoformat(text)
+    except ValueError:
+        for fmt in DATE_FORMATS:
+            try:
+                return datetime.strptime(text, fmt)
+            except ValueError:
+                continue
+        raise ValueError(f"Invalid date '{text}'") from None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _parse_ofx_date(text: str) -> datetime:
+    """YYYYMMDD[HHMMSS[.XXX]][[+-offset[:TZ]]] → naive datetime (UTC if an offset is given)."""
+    main, _, zone = text.partition("[")
+    digits, _, fraction = main.partition(".")
+    try:
+        if len(digits) not in (8, 12, 14) or not digits.isdigit():
+            raise ValueError
+        # Sliced by hand: strptime was most of the OFX import time
+        value = datetime(int(digits[:4]), int(digits[4:6]), int(digits[6:8]),
+                         int(digits[8:10] or 0), int(digits[10:12] or 0), int(digits[12:14] or 0))
+        if fraction:
+            value += timedelta(microseconds=int(fraction.ljust(6, "0")[:6]))
+        if zone:
+            value -= timedelta(hours=float(zone.rstrip("]").partition(":")[0]))
+    except ValueError:
+        raise ValueError(f"Invalid date '{text}'") from None
+    return value
+
+
+def parse_statement_amount(text: str) -> int:
+    """
+    Parse a statement amount into signed centavos.
+
+    Besides what utils.money.parse_amount() accepts, "(1,250.00)" and a
+    trailing "-" are negative, and a "PHP" prefix is ignored.
+
+    Raises:
+        ValueError: if it is not a number or has more than 2 decimal places
+    """
+    cleaned = text.strip().removeprefix("PHP").strip()
+    negative = False
+    if cleaned.startswith("(") and cleaned.endswith(")"):
+        cleaned, negative = cleaned[1:-1], True
+    elif cleaned.endswith("-"):
+        cleaned, negative = cleaned[:-1], True
+    amount = parse_amount(cleaned)
+    return -amount if negative else amount
+
+
+class CsvStatement:
+    """
+    Rows of a CSV statement, read line by line.
+
+    Raises ValueError on creation if the header has no date column or no
+    amount / debit / credit column.
+    """
+
+    def __init__(self, stream):
+        self._reader = csv.reader(stream)
+        header = next(self._reader, None)
+        if header is None:
+            raise ValueError("Empty CSV statement")
+        names = {name.strip().lower(): index for index, name in enumerate(header)}
+        self._columns = {}  # canonical name → column index
+        for column, aliases in CSV_COLUMNS.items():
+            index = next((names[a] for a in aliases if a in names), None)
+            if index is not None:
+                self._columns[column] = index
+        if "date" not in self._columns:
+            raise ValueError("CSV statement has no date column")
+        if not self._columns.keys() & {"amount", "debit", "credit"}:
+            raise ValueError("CSV statement has no amount, debit or credit column")
+        self.closing_balance = None
+
+    def __iter__(self):
+        columns = list(self._columns.items())
+        balance_index = self._columns.get("balance")
+        reader = self._reader
+        for cells in reader:
+            if not cells or not any(cells):
+                continue  # blank line
+            if balance_index is not None and balance_index < len(cells) and cells[balance_index].strip():
+                self.closing_balance = cells[balance_index]
+            yield reader.line_num, {name: cells[index] for name, index in columns if index < len(cells)}
+
+
+class OfxStatement:
+    """Rows (<STMTTRN> elements) of an OFX 1.x/2.x statement, read in chunks."""
+
+    def __init__(self, stream, chunk_size: int = OFX_CHUNK_SIZE):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self.closing_balance = None
+
+    def _tokens(self):
+        """(TAG, text) for every <TAG>text in the file; end tags come as "/TAG"."""
+        pending = ""
+        while True:
+            chunk = self._stream.read(self._chunk_size)
+            parts = (pending + chunk).split("<")
+            # The last piece may continue in the next chunk (all of it at EOF)
+            pending = parts.pop() if chunk else ""
+            for part in parts:
+                tag, _, text = part.partition(">")
+                if tag and tag[0] not in "?!":
+                    text = text.strip()
+                    yield tag.strip().upper(), (unescape(text) if "&" in text else text)
+            if not chunk:
+                return
+
+    def __iter__(self):
+        fields = None  # inside a <STMTTRN>
+        in_ledger = False
+        count = 0
+        for tag, text in self._tokens():
+            if fields is not None:
+                if tag == "/STMTTRN":
+                    count += 1
+                    memo = fields.pop("memo", None)
+                    if not fields.get("description"):
+                        fields["description"] = memo or ""
+                    yield count, fields
+                    fields = None
+                elif tag in _OFX_FIELDS:
+                    fields[_OFX_FIELDS[tag]] = text
+            elif tag == "STMTTRN":
+                fields = {}
+            elif tag == "LEDGERBAL":
+                in_ledger = True
+            elif tag == "/LEDGERBAL":
+                in_ledger = False
+            elif in_ledger and tag == "BALAMT":
+                self.closing_balance = text
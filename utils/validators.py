@@ -1,9 +1,14 @@
 # utils/validators.py
 import re
+from utils.money import parse_amount, format_pesos
 
 # Philippine Peso Currency
 PHP_SYMBOL = "₱"
 
+# Transaction limits in centavos (₱0.01 - ₱999,999.99)
+MIN_TRANSACTION_AMOUNT = 1
+MAX_TRANSACTION_AMOUNT = 99_999_999
+
 # Philippines-based bank account types
 ACCOUNT_TYPES = [
     "checking",
@@ -164,13 +169,13 @@ def validate_account_name(account_name: str) -> tuple[bool, str]:
     return True, "✅ Account name valid."
 
 #BALANCE VALIDATION, ERROR MESSAGES
-def validate_balance(balance: float) -> tuple[bool, str]:
+def validate_balance(balance) -> tuple[bool, str]:
     """
-    Validate balance.
+    Validate balance (int centavos, or the peso amount as typed).
     - Must be non-negative
     """
     try:
-        balance = float(balance)
+        balance = _as_centavos(balance)
         if balance < 0:
             return False, "Balance cannot be negative."
         return True, "✅ Balance valid."
@@ -178,18 +183,18 @@ def validate_balance(balance: float) -> tuple[bool, str]:
         return False, "Invalid balance amount."
     
 #TRANSFER AMOUNT VALIDATION, ERROR MESSAGES
-def validate_transfer_amount(amount: float, available_balance: float) -> tuple[bool, str]:
+def validate_transfer_amount(amount, available_balance: int) -> tuple[bool, str]:
     """
-    Validate transfer amount.
+    Validate transfer amount (int centavos, or the peso amount as typed).
     - Must be positive
-    - Must not exceed available balance
+    - Must not exceed available balance (centavos)
     """
     try:
-        amount = float(amount)
+        amount = _as_centavos(amount)
         if amount <= 0:
             return False, "Amount must be positive."
         if amount > available_balance:
-            return False, f"Insufficient balance. Available: ${available_balance:.2f}"
+            return False, f"Insufficient balance. Available: {format_currency(available_balance)}"
         return True, "✅ Amount valid."
     except (ValueError, TypeError):
         return False, "Invalid amount."
@@ -215,22 +220,31 @@ def validate_bank_name(bank_name: str) -> tuple[bool, str]:
     return True, "✅ Bank name valid."
 
 #TRANSACTION AMOUNT VALIDATION, ERROR MESSAGES
-def validate_transaction_amount(amount: float) -> tuple[bool, str]:
+def validate_transaction_amount(amount) -> tuple[bool, str]:
     """
     Validate transaction amount (deposit/withdraw).
+    - int centavos, or the peso amount as typed
     - Must be between 0.01 and 999,999.99
     """
     try:
-        amt = float(amount)
-        if amt < 0.01:
-            return False, f"Amount must be at least {PHP_SYMBOL}0.01"
-        if amt > 999999.99:
-            return False, f"Amount cannot exceed {PHP_SYMBOL}999,999.99"
+        amt = _as_centavos(amount)
+        if amt < MIN_TRANSACTION_AMOUNT:
+            return False, f"Amount must be at least {format_currency(MIN_TRANSACTION_AMOUNT)}"
+        if amt > MAX_TRANSACTION_AMOUNT:
+            return False, f"Amount cannot exceed {format_currency(MAX_TRANSACTION_AMOUNT)}"
         return True, ""
     except (ValueError, TypeError):
-        return False, "Amount must be a valid number."
+        return False, "Amount must be a valid number with at most 2 decimal places."
+
+def _as_centavos(amount) -> int:
+    """Amounts in the app are int centavos; text is parsed as pesos."""
+    if isinstance(amount, int):
+        return amount
+    if isinstance(amount, str):
+        return parse_amount(amount)
+    raise TypeError("Amounts must be int centavos")
   
 #CURRENCY FORMATTING
-def format_currency(amount: float) -> str:
-    """Format amount as Philippine Peso."""
-    return f"{PHP_SYMBOL}{amount:,.2f}"
+def format_currency(amount: int) -> str:
+    """Format an amount in centavos as Philippine Peso (123450 → ₱1,234.50)."""
+    return f"{PHP_SYMBOL}{format_pesos(amount)}"